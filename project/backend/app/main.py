@@ -4,16 +4,26 @@ FastAPI routing, CORS middleware, and optional lightweight telemetry hooks."""
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import AsyncGenerator, Dict, List
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import asdict
+from datetime import timedelta
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional
 
 import logging
 
-from fastapi import Depends, FastAPI, HTTPException, UploadFile, File, Form, Query
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, Response
-
-from clients.llm import LLMService, get_llm_service
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+
+from clients.database.client_registry import close_clients
+from clients.database.embedding_cache import get_embedding_cache
+from clients.database.vector_store import close_vector_stores
+from clients.ingestion.batch import BatchFile
+from clients.ingestion.extraction_pool import shutdown_extraction_pool
+from clients.ingestion.jobs import JobQueueFullError
+from clients.llm import LLMService, get_llm_service, shutdown_llm_service
 from clients.llm.settings import get_settings
 from clients.quiz import (
     QuizDefinitionNotFoundError,
@@ -26,6 +36,15 @@ from clients.quiz import (
     get_quiz_service,
 )
 
+from .uploads import (
+    InvalidUploadError,
+    SpooledForm,
+    SpooledStreamingResponse,
+    TooManyFilesError,
+    UploadTooLargeError,
+    spool_multipart,
+)
+from .warmup import default_warmup_tasks, run_warmup, warmup_state
 from .schemas import (
     ChatAnalyticsResponse,
     ChatHistoryResponse,
@@ -51,12 +70,16 @@ from .schemas import (
 
 # Set up logging early so LLMService can use it during initialization.
 _TELEMETRY_ENABLED = False
+_WARMUP_ENABLED = False
 
 try:
-    _TELEMETRY_ENABLED = get_settings().telemetry_enabled
+    _settings = get_settings()
+    _TELEMETRY_ENABLED = _settings.telemetry_enabled
+    _WARMUP_ENABLED = _settings.warmup_on_startup
 except RuntimeError:
     # Settings may fail to load during startup before env vars are ready; defer logging setup.
     _TELEMETRY_ENABLED = False
+    _WARMUP_ENABLED = False
 
 if _TELEMETRY_ENABLED:
     if not logging.getLogger().handlers:
@@ -67,8 +90,54 @@ if _TELEMETRY_ENABLED:
 
     logging.getLogger("telemetry").setLevel(logging.INFO)
 
+def _hybrid_retrieval_status() -> str:
+    """"active", "disabled", or "no_chunk_store" when hybrid is on but nothing feeds the lexical index."""
+    try:
+        settings = get_settings()
+    except RuntimeError:
+        return "unknown"
+    if not getattr(settings, "retrieval_hybrid_enabled", True):
+        return "disabled"
+    if not getattr(settings, "chunk_store_path", None):
+        return "no_chunk_store"
+    return "active"
+
+
+def _recover_ingestion_jobs() -> None:
+    """Fail ingestion jobs orphaned by a previous process; startup continues if this fails."""
+    try:
+        get_llm_service().recover_orphaned_ingestion_jobs()
+    except Exception as exc:
+        logging.getLogger("uvicorn.error").warning("Unable to recover orphaned ingestion jobs: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Kick off background warm-up once startup completes; /ready reports when it has finished."""
+    recovery = asyncio.create_task(asyncio.to_thread(_recover_ingestion_jobs))
+    if _hybrid_retrieval_status() == "no_chunk_store":
+        logging.getLogger("uvicorn.error").warning(
+            "RETRIEVAL_HYBRID_ENABLED is on but CHUNK_STORE_PATH is unset; retrieval will be vector-only"
+        )
+    task = None
+    if _WARMUP_ENABLED:
+        task = asyncio.create_task(run_warmup(warmup_state, default_warmup_tasks()))
+    else:
+        warmup_state.mark_disabled()
+    try:
+        yield
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+        await asyncio.gather(recovery, return_exceptions=True)
+        await shutdown_llm_service()
+        shutdown_extraction_pool()
+        close_vector_stores()
+        close_clients()
+
+
 # FastAPI app and CORS setup
-app = FastAPI(title="Horizon Labs Chat API")
+app = FastAPI(title="Horizon Labs Chat API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -97,6 +166,13 @@ def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def readiness() -> JSONResponse:
+    """Readiness probe: 503 until background warm-up of clients and indexes has completed."""
+    payload = {**warmup_state.snapshot(), "hybrid_retrieval": _hybrid_retrieval_status()}
+    return JSONResponse(payload, status_code=200 if warmup_state.ready else 503)
+
+
 @app.get("/")
 def root() -> dict[str, str]:
     """Mirror of /health for platform health checks and browser probes."""
@@ -211,44 +287,263 @@ def friction_state(
     return {"session_id": session_id, **state}
 
 
-@app.post("/ingest/upload")
-async def ingest_upload(
-    *,
-    session_id: str = Form(..., description="Chat session to associate with the upload"),
-    file: UploadFile = File(..., description="Document to ingest"),
-    metadata: str | None = Form(None, description="Optional JSON metadata for the document"),
+@app.get("/debug/session-cache")
+def session_cache_stats(
     llm_service: LLMService = Depends(get_llm_service),
 ) -> dict[str, object]:
-    """Upload a document for LLMService ingestion into the vector index for chat grounding."""
+    """Report chat session cache size, hit ratio, and evictions for memory tuning."""
+    return llm_service.get_session_cache_stats()
 
-    metadata_dict = None
-    if metadata:
-        try:
-            metadata_dict = json.loads(metadata)
-        except json.JSONDecodeError as exc:  # pragma: no cover - pending full implementation
-            raise HTTPException(status_code=400, detail=f"Invalid metadata JSON: {exc}")
 
-    file_bytes = await file.read()
+@app.get("/debug/embedding-cache")
+def embedding_cache_stats() -> dict[str, object]:
+    """Report embedding cache hit ratio and bytes stored (shared by ingestion and retrieval)."""
+    try:
+        cache = get_embedding_cache(get_settings())
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def _upload_limits() -> tuple[int, str | None]:
+    """Return (max upload bytes, spool directory) from settings, with safe defaults."""
+    try:
+        settings = get_settings()
+    except RuntimeError:
+        return 200 * 1024 * 1024, None
+    return settings.ingest_max_upload_bytes, settings.ingest_spool_dir
+
+
+# Allowance for multipart boundaries and form fields on top of the file itself.
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _multipart_body(properties: Dict[str, object], required: List[str]) -> Dict[str, object]:
+    """OpenAPI request body for endpoints that parse their multipart form themselves."""
+    schema = {"type": "object", "properties": properties, "required": required}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": schema}}}}
+
+
+async def _spool_form(request: Request, *, max_files: int, skip_oversized: bool) -> SpooledForm:
+    max_bytes, spool_dir = _upload_limits()
+    declared = request.headers.get("content-length")
+    # A single-file upload whose declared size is already over the cap is rejected before reading.
+    limit = max_bytes + _MULTIPART_OVERHEAD_BYTES
+    if not skip_oversized and max_bytes and declared and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=str(UploadTooLargeError(max_bytes)))
+    try:
+        return await spool_multipart(
+            request, max_bytes=max_bytes, directory=spool_dir, max_files=max_files, skip_oversized=skip_oversized
+        )
+    except (UploadTooLargeError, TooManyFilesError) as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except InvalidUploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _parse_metadata(raw: str | None) -> Optional[Dict[str, object]]:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid metadata JSON: {exc}")
+
+
+@app.post(
+    "/ingest/upload",
+    response_model=None,
+    openapi_extra=_multipart_body(
+        {
+            "session_id": {"type": "string", "description": "Chat session to associate with the upload"},
+            "file": {"type": "string", "format": "binary", "description": "Document to ingest"},
+            "metadata": {"type": "string", "description": "Optional JSON metadata for the document"},
+        },
+        ["session_id", "file"],
+    ),
+)
+async def ingest_upload(
+    *,
+    request: Request,
+    wait: bool = Query(False, description="Ingest inline and return the summary instead of queueing a job"),
+    llm_service: LLMService = Depends(get_llm_service),
+) -> Response | dict[str, object]:
+    """Upload a document for ingestion into the vector index for chat grounding.
+
+    By default the upload is queued as a background job and ``202`` is returned with a job id to
+    poll at ``/ingest/jobs/{job_id}``; ``?wait=true`` ingests inline and returns the summary.
+    """
+    # The body is parsed here rather than through Form/File parameters so the file is written
+    # straight to its spool file with the size cap applied while it streams in.
+    form = await _spool_form(request, max_files=1, skip_oversized=False)
+    uploads = form.files_named("file")
+    try:
+        session_id = form.fields.get("session_id")
+        if not session_id or not uploads:
+            raise HTTPException(status_code=422, detail="session_id and file are required")
+        metadata_dict = _parse_metadata(form.fields.get("metadata"))
+    except HTTPException:
+        form.discard()
+        raise
+    form.discard(keep=uploads)
+    upload = uploads[0]
+    spooled = upload.path
+    assert spooled is not None
+
+    filename = upload.filename or "upload.bin"
+    if not wait:
+        try:
+            # The job owns the spooled file from here and deletes it when it finishes.
+            job = await llm_service.submit_ingestion_job(
+                session_id=session_id,
+                file_path=spooled,
+                filename=filename,
+                metadata=metadata_dict,
+            )
+        except RuntimeError as exc:
+            spooled.unlink(missing_ok=True)
+            status = 503 if isinstance(exc, JobQueueFullError) else 500
+            raise HTTPException(status_code=status, detail=str(exc))
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "queued",
+                "job_id": job.job_id,
+                "document_id": job.document_id,
+                "status_url": f"/ingest/jobs/{job.job_id}",
+            },
+        )
 
     try:
         result = await llm_service.ingest_upload(
             session_id=session_id,
-            file_bytes=file_bytes,
-            filename=file.filename or "upload.bin",
+            file_path=spooled,
+            filename=filename,
             metadata=metadata_dict,
         )
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    finally:
+        spooled.unlink(missing_ok=True)
 
+    return {"status": "indexed", **asdict(result)}
+
+
+def _batch_max_files() -> int:
+    try:
+        return get_settings().ingest_batch_max_files
+    except RuntimeError:
+        return 50
+
+
+@app.post(
+    "/ingest/batch",
+    response_model=None,
+    openapi_extra=_multipart_body(
+        {
+            "session_id": {"type": "string", "description": "Chat session to associate with the uploads"},
+            "files": {
+                "type": "array",
+                "items": {"type": "string", "format": "binary"},
+                "description": "Documents to ingest",
+            },
+            "metadata": {"type": "string", "description": "Optional JSON metadata applied to every document"},
+        },
+        ["session_id", "files"],
+    ),
+)
+async def ingest_batch(
+    *,
+    request: Request,
+    stream: bool = Query(False, description="Stream one NDJSON line per file as it finishes"),
+    llm_service: LLMService = Depends(get_llm_service),
+) -> Response | dict[str, object]:
+    """Ingest several documents in one request through the shared pipeline and embedding budget.
+
+    Files are ingested a few at a time (``INGEST_BATCH_FILE_CONCURRENCY``); one failing file does
+    not stop the others. The response lists per-file results in upload order, or with
+    ``?stream=true`` an NDJSON line per file in completion order followed by a summary line.
+    """
+    max_files = _batch_max_files()
+    # Too-large files are recorded as per-file failures instead of rejecting the whole batch.
+    form = await _spool_form(request, max_files=max_files, skip_oversized=True)
+    uploads = form.files_named("files")
+    try:
+        session_id = form.fields.get("session_id")
+        if not session_id or not uploads:
+            raise HTTPException(status_code=422, detail="session_id and files are required")
+        metadata_dict = _parse_metadata(form.fields.get("metadata"))
+        llm_service.check_batch_filenames(
+            session_id=session_id, filenames=[upload.filename or "upload.bin" for upload in uploads]
+        )
+    except ValueError as exc:
+        form.discard()
+        raise HTTPException(status_code=400, detail=str(exc))
+    except BaseException:
+        form.discard()
+        raise
+    form.discard(keep=uploads)
+
+    spooled = [
+        BatchFile(filename=upload.filename or "upload.bin", file_path=upload.path, error=upload.error)
+        for upload in uploads
+    ]
+    try:
+        results = llm_service.ingest_batch(session_id=session_id, files=spooled, metadata=metadata_dict)
+    except BaseException as exc:
+        for batch_file in spooled:
+            if batch_file.file_path is not None:
+                batch_file.file_path.unlink(missing_ok=True)
+        if isinstance(exc, ValueError):
+            raise HTTPException(status_code=400, detail=str(exc))
+        if isinstance(exc, RuntimeError):
+            raise HTTPException(status_code=500, detail=str(exc))
+        raise
+
+    if stream:
+
+        async def ndjson() -> AsyncGenerator[str, None]:
+            succeeded = 0
+            async with aclosing(results) as items:
+                async for item in items:
+                    succeeded += item.status == "indexed"
+                    yield json.dumps(item.to_dict()) + "\n"
+            summary = {"status": "completed", "files": len(spooled), "succeeded": succeeded, "failed": len(spooled) - succeeded}
+            yield json.dumps(summary) + "\n"
+
+        # Removes the spool files even if the client leaves before the first line is sent.
+        return SpooledStreamingResponse(
+            ndjson(),
+            spooled=[batch_file.file_path for batch_file in spooled if batch_file.file_path is not None],
+            media_type="application/x-ndjson",
+        )
+
+    collected = sorted([item async for item in results], key=lambda item: item.index)
+    succeeded = sum(item.status == "indexed" for item in collected)
     return {
-        "status": "indexed",
-        "document_id": result.document_id,
-        "slide_count": result.slide_count,
-        "chunk_count": result.chunk_count,
-        "namespace": result.namespace,
+        "status": "completed",
+        "succeeded": succeeded,
+        "failed": len(collected) - succeeded,
+        "files": [item.to_dict() for item in collected],
     }
 
 
+@app.get("/ingest/jobs/{job_id}")
+def ingest_job_status(
+    job_id: str,
+    llm_service: LLMService = Depends(get_llm_service),
+) -> dict[str, object]:
+    """Report a background ingestion job's status, stage, chunk progress, errors, and ETA."""
+    job = llm_service.get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    payload = job.to_dict()
+    # Owner and spool path are only for orphan recovery; don't leak server paths to clients.
+    payload.pop("owner", None)
+    payload.pop("spool_path", None)
+    return {**payload, "eta_seconds": job.eta_seconds()}
+
+
 @app.delete("/ingest/document/{document_id}")
 async def ingest_delete_document(
     document_id: str,
@@ -263,12 +558,75 @@ async def ingest_delete_document(
     return {"status": "deleted", "document_id": document_id}
 
 
+@app.post("/maintenance/documents/sweep")
+async def maintenance_sweep_documents(
+    older_than_days: Optional[float] = Query(None, gt=0),
+    unreferenced_only: bool = Query(True),
+    dry_run: bool = Query(True),
+    quiz_service: QuizService = Depends(get_quiz_service),
+    llm_service: LLMService = Depends(get_llm_service),
+) -> dict:
+    """Delete indexed documents older than ``older_than_days`` and/or not referenced by any quiz.
+
+    Defaults to a dry run that only lists the selection; ``dry_run=false`` also requires
+    ``older_than_days``. Meant to be triggered by a scheduler.
+    """
+    referenced = {
+        definition.embedding_document_id
+        for definition in quiz_service.list_quiz_definitions()
+        if definition.embedding_document_id
+    }
+    try:
+        report = await llm_service.sweep_documents(
+            referenced_document_ids=referenced,
+            older_than=timedelta(days=older_than_days) if older_than_days is not None else None,
+            unreferenced_only=unreferenced_only,
+            dry_run=dry_run,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    return report.to_dict()
+
+
+@app.post("/maintenance/namespaces/migrate")
+async def maintenance_migrate_namespaces(
+    document_id: Optional[str] = Query(None),
+    dry_run: bool = Query(True),
+    quiz_service: QuizService = Depends(get_quiz_service),
+    llm_service: LLMService = Depends(get_llm_service),
+) -> dict:
+    """Move indexed documents into the namespaces ``PINECONE_NAMESPACE_STRATEGY`` assigns.
+
+    Quiz definitions built on a moved document are repointed at its new namespace. Defaults to a
+    dry run that only lists the planned moves.
+    """
+    try:
+        report = await llm_service.migrate_namespaces(document_id=document_id, dry_run=dry_run)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    updated: List[str] = []
+    if not report.dry_run:
+        for moved_id, (_, namespace) in report.moves.items():
+            updated.extend(quiz_service.set_embedding_namespace(moved_id, namespace))
+    return {**report.to_dict(), "definitions_updated": updated}
+
+
 @app.post("/quiz/definitions", response_model=QuizDefinitionResponse)
 def quiz_upsert_definition(
     request: QuizDefinitionRequest,
+    background_tasks: BackgroundTasks,
     quiz_service: QuizService = Depends(get_quiz_service),
+    llm_service: LLMService = Depends(get_llm_service),
 ) -> QuizDefinitionResponse:
-    """Create or update a quiz definition in QuizService, validating generation inputs."""
+    """Create or update a quiz definition in QuizService, validating generation inputs.
+
+    The embedding document's vector namespace is recorded on the definition so question retrieval
+    queries only that namespace. When the request does not name it, it is looked up after the
+    response is sent, together with prefetching retrieval query embeddings for every topic and
+    difficulty.
+    """
     try:
         record = quiz_service.upsert_quiz_definition(
             quiz_id=request.quiz_id,
@@ -283,13 +641,25 @@ def quiz_upsert_definition(
             source_filename=request.source_filename,
             is_published=request.is_published,
             metadata=request.metadata,
+            embedding_namespace=request.embedding_namespace,
         )
     except QuizGenerationError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+    background_tasks.add_task(_complete_quiz_definition, quiz_service, llm_service, record)
     return _serialize_quiz_definition(record)
 
 
+def _complete_quiz_definition(quiz_service: QuizService, llm_service: LLMService, record) -> None:
+    """Record the embedding document's namespace (a manifest read) and warm the query cache."""
+    document_id = record.embedding_document_id
+    if document_id and not record.embedding_namespace:
+        namespace = llm_service.document_namespace(document_id)
+        if namespace:
+            quiz_service.set_embedding_namespace(document_id, namespace)
+    quiz_service.prefetch_query_embeddings(record)
+
+
 @app.get("/quiz/definitions/{quiz_id}", response_model=QuizDefinitionResponse)
 def quiz_get_definition(
     quiz_id: str,
@@ -521,6 +891,7 @@ def _serialize_quiz_definition(record) -> QuizDefinitionResponse:
         assessment_time_limit_minutes=record.assessment_time_limit_minutes,
         assessment_max_attempts=record.assessment_max_attempts,
         embedding_document_id=record.embedding_document_id,
+        embedding_namespace=record.embedding_namespace,
         source_filename=record.source_filename,
         is_published=record.is_published,
         metadata=record.metadata or None,
@@ -120,6 +120,10 @@ class QuizDefinitionRequest(BaseModel):
         default=None,
         description="Identifier of the ingested document backing this quiz",
     )
+    embedding_namespace: Optional[str] = Field(
+        default=None,
+        description="Vector namespace of the embedding document (the ingest result's namespace); looked up when omitted",
+    )
     source_filename: Optional[str] = Field(
         default=None,
         description="Original filename for the uploaded material",
@@ -145,6 +149,7 @@ class QuizDefinitionResponse(BaseModel):
     assessment_time_limit_minutes: Optional[int]
     assessment_max_attempts: Optional[int]
     embedding_document_id: Optional[str]
+    embedding_namespace: Optional[str] = None
     source_filename: Optional[str]
     is_published: bool
     metadata: Optional[Dict[str, Any]]
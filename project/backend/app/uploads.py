@@ -0,0 +1,247 @@
+"""Disk spooling for document uploads: parses the multipart request body as it arrives and writes
+each file part straight to its own temporary file, enforcing a byte cap while reading, so large
+decks are neither buffered in memory nor copied from an intermediate spool before ingestion."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.types import Receive, Scope, Send
+
+# Text fields (session id, JSON metadata) are held in memory, so they get a small cap of their own.
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size cap."""
+
+    def __init__(self, limit_bytes: int) -> None:
+        super().__init__(f"Upload exceeds the {limit_bytes // (1024 * 1024)} MiB limit")
+        self.limit_bytes = limit_bytes
+
+
+class InvalidUploadError(ValueError):
+    """Raised when the request body is not usable multipart/form-data."""
+
+
+class TooManyFilesError(InvalidUploadError):
+    """Raised when a request carries more file parts than allowed."""
+
+
+@dataclass
+class SpooledFile:
+    """One uploaded file part: its spool path, or the error that stopped it from being kept."""
+
+    field_name: str
+    filename: str
+    path: Optional[Path] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class SpooledForm:
+    """Text fields and spooled file parts of a multipart upload, in request order."""
+
+    fields: Dict[str, str] = field(default_factory=dict)
+    files: List[SpooledFile] = field(default_factory=list)
+
+    def files_named(self, field_name: str) -> List[SpooledFile]:
+        return [item for item in self.files if item.field_name == field_name]
+
+    def discard(self, keep: Sequence[SpooledFile] = ()) -> None:
+        """Delete every spooled file except those in ``keep``."""
+        kept = {id(item) for item in keep}
+        for item in self.files:
+            if item.path is not None and id(item) not in kept:
+                item.path.unlink(missing_ok=True)
+
+
+async def spool_multipart(
+    request: Request,
+    *,
+    max_bytes: int,
+    directory: Optional[str] = None,
+    max_files: int = 1,
+    skip_oversized: bool = False,
+) -> SpooledForm:
+    """Parse ``request``'s multipart body, writing each file part directly to a temporary file.
+
+    Only the chunk currently being received is resident. A file part larger than ``max_bytes``
+    raises ``UploadTooLargeError`` as soon as the cap is passed, or with ``skip_oversized`` is
+    recorded with an error and the rest of it discarded. On any failure every spooled file is
+    removed before the error propagates; on success the caller owns the files.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUploadError("Expected a multipart/form-data request body")
+
+    spooler = _MultipartSpooler(
+        max_bytes=max_bytes, directory=directory, max_files=max_files, skip_oversized=skip_oversized
+    )
+    parser = MultipartParser(boundary, spooler.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await spooler.flush()
+        parser.finalize()
+        await spooler.flush()
+    except BaseException as exc:
+        spooler.abort()
+        if isinstance(exc, FormParserError):
+            raise InvalidUploadError("Invalid multipart data") from exc
+        raise
+    return spooler.form
+
+
+class _MultipartSpooler:
+    """python-multipart callbacks that collect fields and queue file writes for ``flush``."""
+
+    def __init__(self, *, max_bytes: int, directory: Optional[str], max_files: int, skip_oversized: bool) -> None:
+        self.form = SpooledForm()
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._max_files = max_files
+        self._skip_oversized = skip_oversized
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._field_name = ""
+        self._field_data = bytearray()
+        self._file: Optional[SpooledFile] = None
+        self._handle: Optional[BinaryIO] = None
+        self._written = 0
+        self._pending: List[Tuple[BinaryIO, bytes]] = []
+        self._finished: List[BinaryIO] = []
+        self._open: List[BinaryIO] = []
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    async def flush(self) -> None:
+        # Callbacks run synchronously inside parser.write(); disk writes happen here, off the loop.
+        pending, self._pending = self._pending, []
+        for handle, data in pending:
+            await asyncio.to_thread(handle.write, data)
+        finished, self._finished = self._finished, []
+        for handle in finished:
+            handle.close()
+            self._open.remove(handle)
+
+    def abort(self) -> None:
+        for handle in self._open:
+            handle.close()
+        self._open = []
+        self._pending = []
+        self.form.discard()
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+        self._field_data = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise InvalidUploadError('Each form part needs a Content-Disposition "name"')
+        self._field_name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            self._file = None
+            return
+        if len(self.form.files) >= self._max_files:
+            raise TooManyFilesError(f"At most {self._max_files} files can be ingested per request")
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        fd, raw_path = tempfile.mkstemp(prefix="ingest-", suffix=Path(filename).suffix, dir=self._directory)
+        self._handle = os.fdopen(fd, "wb")
+        self._open.append(self._handle)
+        self._file = SpooledFile(field_name=self._field_name, filename=filename, path=Path(raw_path))
+        self.form.files.append(self._file)
+        self._written = 0
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._file is None:
+            if len(self._field_data) + len(chunk) > MAX_FIELD_BYTES:
+                raise InvalidUploadError(f"Form field {self._field_name!r} is too large")
+            self._field_data.extend(chunk)
+            return
+        if self._handle is None:
+            return  # oversized part being skipped
+        self._written += len(chunk)
+        if self._max_bytes and self._written > self._max_bytes:
+            if not self._skip_oversized:
+                raise UploadTooLargeError(self._max_bytes)
+            self._drop_current(str(UploadTooLargeError(self._max_bytes)))
+            return
+        self._pending.append((self._handle, chunk))
+
+    def _on_part_end(self) -> None:
+        if self._file is None:
+            self.form.fields[self._field_name] = self._field_data.decode("utf-8", errors="replace")
+        elif self._handle is not None:
+            self._finished.append(self._handle)
+        self._file = None
+        self._handle = None
+
+    def _drop_current(self, error: str) -> None:
+        handle = self._handle
+        assert handle is not None and self._file is not None and self._file.path is not None
+        self._pending = [(target, data) for target, data in self._pending if target is not handle]
+        handle.close()
+        self._open.remove(handle)
+        self._file.path.unlink(missing_ok=True)
+        self._file.path = None
+        self._file.error = error
+        self._handle = None
+
+
+class SpooledStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes its body and deletes spooled uploads however the response ends.
+
+    Starlette skips ``background`` tasks when the client disconnects, and a body generator's own
+    cleanup never runs if iteration never started, so the files are removed here instead.
+    """
+
+    def __init__(self, content: Any, *, spooled: Sequence[Path], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._spooled = list(spooled)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            close = getattr(self.body_iterator, "aclose", None)
+            try:
+                if close is not None:
+                    await close()
+            finally:
+                for path in self._spooled:
+                    path.unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+"""Background warm-up for the API process: once the server is accepting traffic, initialise the
+chat/quiz services, ingestion pipeline, and retriever concurrently so the first real request does
+not pay for Firestore/Pinecone/embedding client construction. Backs the /ready endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+WarmupTask = Callable[[], Optional[bool]]
+
+
+@dataclass
+class ComponentStatus:
+    """Outcome of warming a single component ("pending" | "ok" | "skipped" | "failed")."""
+
+    status: str = "pending"
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class WarmupState:
+    """Thread-safe record of warm-up progress reported by /ready."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._components: Dict[str, ComponentStatus] = {}
+        self._started = False
+        self._completed = False
+
+    @property
+    def ready(self) -> bool:
+        return self._completed
+
+    def begin(self, names: Mapping[str, object]) -> None:
+        with self._lock:
+            self._components = {name: ComponentStatus() for name in names}
+            self._started = True
+            self._completed = False
+
+    def record(self, name: str, status: ComponentStatus) -> None:
+        with self._lock:
+            self._components[name] = status
+
+    def finish(self) -> None:
+        with self._lock:
+            self._completed = True
+
+    def mark_disabled(self) -> None:
+        """Treat the process as ready immediately when warm-up is turned off."""
+        with self._lock:
+            self._components = {}
+            self._completed = True
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            if not self._completed:
+                status = "warming" if self._started else "starting"
+            elif any(item.status == "failed" for item in self._components.values()):
+                status = "degraded"
+            else:
+                status = "ready"
+            return {
+                "status": status,
+                "components": {name: asdict(item) for name, item in self._components.items()},
+            }
+
+
+warmup_state = WarmupState()
+
+
+async def run_warmup(
+    state: WarmupState,
+    tasks: Mapping[str, WarmupTask],
+    *,
+    delay_seconds: float = 0.0,
+) -> None:
+    """Run each warm-up task in a worker thread concurrently and mark the state ready when done."""
+    # Yield first so the server finishes binding before any client construction starts.
+    await asyncio.sleep(max(delay_seconds, 0.0))
+    state.begin(tasks)
+    await asyncio.gather(*(_warm_component(state, name, task) for name, task in tasks.items()))
+    state.finish()
+    logger.info("Warm-up finished: %s", state.snapshot()["status"])
+
+
+async def _warm_component(state: WarmupState, name: str, task: WarmupTask) -> None:
+    started = time.perf_counter()
+    try:
+        result = await asyncio.to_thread(task)
+    except Exception as exc:
+        logger.warning("Warm-up of %s failed: %s", name, exc)
+        status = ComponentStatus(status="failed", error=str(exc))
+    else:
+        status = ComponentStatus(status="skipped" if result is False else "ok")
+    status.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    state.record(name, status)
+
+
+def default_warmup_tasks() -> Dict[str, WarmupTask]:
+    """Warm-up tasks for the production services; imports stay deferred until warm-up runs."""
+    from clients.llm import get_llm_service
+    from clients.quiz import get_quiz_service
+
+    def _ingestion_pipeline() -> Optional[bool]:
+        return get_llm_service().warm_up_ingestion()
+
+    def _retriever() -> Optional[bool]:
+        return get_quiz_service().warm_up_retriever()
+
+    return {
+        "llm_service": get_llm_service,
+        "quiz_service": get_quiz_service,
+        "ingestion_pipeline": _ingestion_pipeline,
+        "retriever": _retriever,
+    }
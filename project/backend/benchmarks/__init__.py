@@ -0,0 +1 @@
+"""Offline benchmarks for backend hot paths; run modules with ``python -m benchmarks.<name>``."""
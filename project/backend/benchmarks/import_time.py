@@ -0,0 +1,125 @@
+"""Cold-start benchmark for the API process: parses ``python -X importtime`` for ``app.main`` and
+times import + first ``GET /health`` in fresh interpreters, flagging heavy SDKs loaded at import.
+
+Usage (from project/backend): python -m benchmarks.import_time [--runs N] [--top N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# SDKs that should only load on first use, never while the port is being bound.
+HEAVY_MODULES = (
+    "langchain_openai",
+    "langchain_core",
+    "langchain_google_genai",
+    "openai",
+    "pinecone",
+    "google.cloud.firestore",
+    "pypdf",
+    "pptx",
+    "numpy",
+)
+
+_COLD_START_SNIPPET = """
+import asyncio, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def _health():
+    sent = []
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/health", "raw_path": b"/health", "root_path": "",
+             "query_string": b"", "headers": [], "client": ("bench", 0), "server": ("bench", 80)}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    await app.main.app(scope, receive, send)
+    return sent[0]["status"]
+
+status = asyncio.run(_health())
+done = time.perf_counter()
+heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+print(f"{imported - start:.4f} {done - start:.4f} {status} {','.join(heavy) or '-'}")
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENROUTER_API_KEY", "benchmark-key")
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_profile(top: int) -> List[Tuple[int, str]]:
+    """Return the ``top`` modules by cumulative import time (microseconds)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        rows.append((int(cumulative_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def cold_start(runs: int) -> Tuple[List[float], List[float], str]:
+    """Time import and import + first /health response across fresh interpreters."""
+    import_times: List[float] = []
+    health_times: List[float] = []
+    heavy = "-"
+    snippet = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n{_COLD_START_SNIPPET}"
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", snippet],
+            cwd=BACKEND_DIR,
+            env=_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imported, healthy, status, heavy = proc.stdout.split()
+        if status != "200":
+            raise RuntimeError(f"/health returned {status}")
+        import_times.append(float(imported))
+        health_times.append(float(healthy))
+    return import_times, health_times, heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"Top {args.top} modules by cumulative import time (python -X importtime -c 'import app.main'):")
+    for cumulative_us, name in import_profile(args.top):
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    import_times, health_times, heavy = cold_start(args.runs)
+    print(f"\ncold start over {args.runs} runs (median):")
+    print(f"  import app.main      : {statistics.median(import_times) * 1000:8.1f} ms")
+    print(f"  import + GET /health : {statistics.median(health_times) * 1000:8.1f} ms")
+    print(f"  heavy SDKs loaded    : {heavy}")
+
+
+if __name__ == "__main__":
+    main()
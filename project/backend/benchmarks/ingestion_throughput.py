@@ -0,0 +1,240 @@
+"""End-to-end ingestion benchmark that runs offline: SlideIngestionPipeline over a synthetic PPTX or
+PDF deck, with a deterministic hash-based embedding client behind the real EmbeddingService and
+the in-memory LocalVectorStore in place of Pinecone. Optional latency on both mimics the network.
+
+Reports per-stage busy seconds, wall time and chunks/s (median over timed runs), then one pass
+under tracemalloc for peak traced memory, blocks still allocated afterwards and gen-0 garbage
+collections (a proxy for allocation churn), plus the process peak RSS. Use it to compare
+extractor, chunker and batching changes without Google or Pinecone keys.
+
+Usage (from project/backend): python -m benchmarks.ingestion_throughput [--format pptx|pdf]
+    [--slides N] [--words N] [--runs N] [--dimension N] [--batch-size N] [--embed-concurrency N]
+    [--embed-latency MS] [--upsert-latency MS] [--extract-workers N] [--no-dedup]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+from pptx import Presentation  # noqa: E402
+
+from clients.database.local_vector_store import LocalVectorStore  # noqa: E402
+from clients.database.manifest_repository import InMemoryManifestRepository  # noqa: E402
+from clients.ingestion.pipeline import EmbeddingService, IngestionResult, SlideIngestionPipeline  # noqa: E402
+from clients.llm.settings import Settings  # noqa: E402
+
+_VOCABULARY = (
+    "gradient descent learning rate loss function convex optimum matrix vector eigenvalue basis "
+    "derivative integral limit series convergence probability variance estimator hypothesis sample "
+    "entropy network layer activation backpropagation regularization overfitting validation kernel"
+).split()
+
+
+def _slide_text(rng: random.Random, index: int, words: int) -> List[str]:
+    # Lines of shuffled vocabulary; the slide number keeps every slide distinct so dedup folds nothing.
+    body = [rng.choice(_VOCABULARY) for _ in range(words)]
+    lines = [" ".join(body[start : start + 12]) for start in range(0, len(body), 12)]
+    return [f"Topic {index}: {lines[0]}", *lines[1:]]
+
+
+def build_pptx(slides: int, words: int, seed: int = 7) -> bytes:
+    """A deck of ``slides`` title-and-content slides with about ``words`` words each."""
+    rng = random.Random(seed)
+    ppt = Presentation()
+    layout = ppt.slide_layouts[1]
+    for index in range(slides):
+        title, *lines = _slide_text(rng, index, words)
+        slide = ppt.slides.add_slide(layout)
+        slide.shapes.title.text = title
+        slide.placeholders[1].text = "\n".join(lines)
+    buffer = BytesIO()
+    ppt.save(buffer)
+    return buffer.getvalue()
+
+
+def build_pdf(pages: int, words: int, seed: int = 7) -> bytes:
+    """A text-only PDF (Helvetica, one content stream per page) with about ``words`` words per page."""
+    rng = random.Random(seed)
+    objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids: List[str] = []
+    for index in range(pages):
+        commands = ["BT", "/F1 11 Tf", "14 TL", "50 760 Td"]
+        for line in _slide_text(rng, index, words):
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({escaped}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("ascii")
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+class HashEmbeddingClient:
+    """Stands in for the provider SDK: each text maps to a fixed unit vector seeded by its SHA-256.
+
+    Returns lists of floats, as the SDK does, after sleeping ``latency_seconds`` per request.
+    """
+
+    def __init__(self, dimension: int, latency_seconds: float = 0.0) -> None:
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        self.requests += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [self._vector(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+class LatentVectorStore:
+    """Wraps a vector store, sleeping ``latency_seconds`` per upsert call to mimic an index round trip."""
+
+    def __init__(self, inner: Any, latency_seconds: float) -> None:
+        self._inner = inner
+        self.latency_seconds = latency_seconds
+
+    def upsert(self, items: Sequence[Dict[str, Any]]) -> Any:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._inner.upsert(items)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+@dataclass(frozen=True)
+class RunResult:
+    elapsed_seconds: float
+    chunks: int
+    chunks_per_second: float
+    stage_seconds: Dict[str, float]
+    embed_requests: int
+
+
+def _settings(args: argparse.Namespace) -> Settings:
+    return Settings(
+        openrouter_api_key="offline",
+        vector_store_backend="local",
+        pinecone_index_dimension=args.dimension,
+        ingest_batch_size=args.batch_size,
+        ingest_queue_size=args.queue_size,
+        ingest_extract_workers=args.extract_workers,
+        ingest_dedup_enabled=not args.no_dedup,
+        embed_concurrency=args.embed_concurrency,
+    )
+
+
+def run_once(deck: bytes, filename: str, args: argparse.Namespace) -> RunResult:
+    """Ingest ``deck`` into a fresh in-memory store and return its timings."""
+    settings = _settings(args)
+    client = HashEmbeddingClient(args.dimension, args.embed_latency / 1000)
+    store = LocalVectorStore(None, dimension=args.dimension)
+    pipeline = SlideIngestionPipeline(
+        settings=settings,
+        repository=LatentVectorStore(store, args.upsert_latency / 1000),  # type: ignore[arg-type]
+        embedding_service=EmbeddingService(settings, client=client),
+        manifest_repository=InMemoryManifestRepository(),
+    )
+    result: IngestionResult = asyncio.run(pipeline.ingest(document_id="bench-deck", file_bytes=deck, filename=filename))
+    store.close()
+    return RunResult(
+        elapsed_seconds=result.elapsed_seconds,
+        chunks=result.chunk_count,
+        chunks_per_second=result.chunks_per_second,
+        stage_seconds=dict(result.stage_seconds),
+        embed_requests=client.requests,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=("pptx", "pdf"), default="pptx")
+    parser.add_argument("--slides", type=int, default=300, help="slides (or PDF pages) in the deck")
+    parser.add_argument("--words", type=int, default=120, help="words per slide")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--embed-concurrency", type=int, default=4)
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="milliseconds per embedding request")
+    parser.add_argument("--upsert-latency", type=float, default=0.0, help="milliseconds per upsert call")
+    parser.add_argument("--extract-workers", type=int, default=0)
+    parser.add_argument("--no-dedup", action="store_true")
+    args = parser.parse_args()
+
+    deck = build_pptx(args.slides, args.words) if args.format == "pptx" else build_pdf(args.slides, args.words)
+    filename = f"bench.{args.format}"
+    print(
+        f"format={args.format} slides={args.slides} words={args.words} deck_bytes={len(deck):,} "
+        f"dimension={args.dimension} batch_size={args.batch_size} embed_concurrency={args.embed_concurrency} "
+        f"embed_latency={args.embed_latency}ms upsert_latency={args.upsert_latency}ms runs={args.runs}"
+    )
+
+    run_once(deck, filename, args)  # warm imports, the chunker and the extraction pool
+    results = [run_once(deck, filename, args) for _ in range(max(args.runs, 1))]
+    stages = {stage: statistics.median(run.stage_seconds.get(stage, 0.0) for run in results) for stage in results[0].stage_seconds}
+    elapsed = statistics.median(run.elapsed_seconds for run in results)
+    print(f"chunks={results[0].chunks} embed_requests={results[0].embed_requests}")
+    print(f"wall      : {elapsed * 1000:8.1f} ms  ({statistics.median(run.chunks_per_second for run in results):,.0f} chunks/s)")
+    for stage, seconds in stages.items():
+        print(f"{stage:<10}: {seconds * 1000:8.1f} ms busy")
+
+    gc.collect()
+    collections_before = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    run_once(deck, filename, args)
+    gc.collect()
+    retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    collections = gc.get_stats()[0]["collections"] - collections_before
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak_rss *= 1024  # Linux reports KiB
+    print(f"traced    : peak {peak / 2**20:8.1f} MiB   retained blocks {retained_blocks:,}   gen-0 collections {collections:,}")
+    print(f"peak RSS  : {peak_rss / 2**20:8.1f} MiB (process lifetime)")
+
+
+if __name__ == "__main__":
+    main()
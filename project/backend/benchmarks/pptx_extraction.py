@@ -0,0 +1,69 @@
+"""Throughput benchmark for PPTX text extraction: python-pptx's object model (SlideExtractor)
+versus stream-parsing slide XML (SlideXMLExtractor) on a synthetic deck, checking both agree.
+
+Usage (from project/backend): python -m benchmarks.pptx_extraction [--slides N] [--shapes N] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from pptx import Presentation  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+from clients.ingestion.pipeline import SlideExtractor, SlideXMLExtractor  # noqa: E402
+
+
+def _build_deck(slides: int, shapes: int) -> bytes:
+    ppt = Presentation()
+    layout = ppt.slide_layouts[1]
+    for index in range(slides):
+        slide = ppt.slides.add_slide(layout)
+        slide.shapes.title.text = f"Lecture {index}: gradient descent"
+        slide.placeholders[1].text = "\n".join(f"Bullet {line} on slide {index}" for line in range(5))
+        for shape in range(shapes):
+            box = slide.shapes.add_textbox(Inches(1), Inches(1 + shape * 0.2), Inches(4), Inches(0.5))
+            box.text_frame.text = f"Note {shape}: the learning rate controls the step size."
+    buffer = BytesIO()
+    ppt.save(buffer)
+    return buffer.getvalue()
+
+
+def _time(extractor: SlideExtractor, deck: bytes, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        extractor.extract(deck)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slides", type=int, default=200)
+    parser.add_argument("--shapes", type=int, default=8, help="extra text boxes per slide")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    deck = _build_deck(args.slides, args.shapes)
+    if SlideExtractor().extract(deck) != SlideXMLExtractor().extract(deck):
+        raise SystemExit("extractors disagree on the synthetic deck")
+
+    print(f"slides={args.slides} extra_shapes_per_slide={args.shapes} deck_bytes={len(deck):,} runs={args.runs}")
+    baseline = statistics.median(_time(SlideExtractor(), deck, args.runs))
+    fast = statistics.median(_time(SlideXMLExtractor(), deck, args.runs))
+    print(f"python-pptx : {baseline * 1000:8.1f} ms  ({args.slides / baseline:,.0f} slides/s)")
+    print(f"slide XML   : {fast * 1000:8.1f} ms  ({args.slides / fast:,.0f} slides/s)")
+    print(f"speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
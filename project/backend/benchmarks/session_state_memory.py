@@ -0,0 +1,117 @@
+"""Memory benchmark for cached chat sessions: bytes per session at 10k sessions for the compact
+SessionState layout versus the previous six-dict layout holding LangChain messages.
+
+Usage (from project/backend): python -m benchmarks.session_state_memory [--sessions N] [--turns N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+from clients.llm.classifier import ClassificationResult  # noqa: E402
+from clients.llm.session_state import SessionState, SessionStateCache, StoredMessage  # noqa: E402
+
+
+def _turn_text(session: int, turn: int) -> tuple[str, str]:
+    question = f"Session {session} turn {turn}: why does the gradient vanish in deep networks?"
+    answer = f"Consider how repeated multiplication by small derivatives behaves (turn {turn})."
+    return question, answer
+
+
+def _build_legacy(sessions: int, turns: int) -> object:
+    conversations: Dict[str, list] = defaultdict(list)
+    modes: Dict[str, str] = defaultdict(lambda: "friction")
+    prompts: Dict[str, str] = defaultdict(lambda: "friction")
+    progress: Dict[str, int] = defaultdict(int)
+    ready: Dict[str, bool] = defaultdict(bool)
+    classifications: Dict[str, ClassificationResult] = {}
+    for session in range(sessions):
+        session_id = f"session-{session}"
+        for turn in range(turns):
+            question, answer = _turn_text(session, turn)
+            stamp = datetime.now(timezone.utc).isoformat()
+            conversations[session_id].append(
+                HumanMessage(
+                    content=f"Question:\n{question}",
+                    additional_kwargs={
+                        "created_at": stamp,
+                        "display_text": question,
+                        "turn_classification": "good",
+                        "classification_source": "heuristic",
+                    },
+                )
+            )
+            conversations[session_id].append(
+                AIMessage(content=answer, additional_kwargs={"created_at": stamp, "display_text": answer})
+            )
+        modes[session_id] = "friction"
+        prompts[session_id] = "friction"
+        progress[session_id] = 1
+        ready[session_id] = False
+        classifications[session_id] = ClassificationResult(label="good", rationale=None, used_model=False)
+    return (conversations, modes, prompts, progress, ready, classifications)
+
+
+def _build_compact(sessions: int, turns: int) -> object:
+    cache = SessionStateCache()
+    for session in range(sessions):
+        state = SessionState(f"session-{session}")
+        for turn in range(turns):
+            question, answer = _turn_text(session, turn)
+            stamp = datetime.now(timezone.utc).isoformat()
+            state.messages.append(
+                StoredMessage(
+                    role="human",
+                    content=f"Question:\n{question}",
+                    created_at=stamp,
+                    display_text=question,
+                    turn_classification="good",
+                    classification_source="heuristic",
+                )
+            )
+            state.messages.append(StoredMessage(role="ai", content=answer, created_at=stamp, display_text=answer))
+        state.friction_progress = 1
+        state.last_classification = ClassificationResult(label="good", rationale=None, used_model=False)
+        cache.put(state)
+    return cache
+
+
+def _measure(builder: Callable[[int, int], object], sessions: int, turns: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        retained = builder(sessions, turns)
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del retained
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=4, help="learner/assistant exchanges per session")
+    args = parser.parse_args()
+
+    legacy = _measure(_build_legacy, args.sessions, args.turns)
+    compact = _measure(_build_compact, args.sessions, args.turns)
+    print(f"sessions={args.sessions} exchanges_per_session={args.turns}")
+    print(f"legacy  (6 dicts + LangChain messages): {legacy / args.sessions:,.0f} bytes/session")
+    print(f"compact (SessionState LRU map)        : {compact / args.sessions:,.0f} bytes/session")
+    print(f"reduction: {100 * (1 - compact / legacy):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
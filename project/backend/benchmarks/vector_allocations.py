@@ -0,0 +1,115 @@
+"""Allocation benchmark for embeddings between the provider response and the Pinecone request:
+the previous List[float] path (copied by the payload builder, the normalizer, and the dimension
+matcher) versus float32 batches converted to lists one upsert request at a time.
+
+Each embed batch starts as a freshly decoded provider response (new float objects, as the SDK
+returns them); every batch is held until the upsert stage drains it, as when the upsert queue backs
+up behind a slow index. Reports peak traced memory (tracemalloc) and untraced wall time per 1k chunks.
+
+Usage (from project/backend): python -m benchmarks.vector_allocations [--chunks N] [--dimension N]
+    [--source-dimension N] [--batch-size N] [--request-size N] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from clients.database.pinecone import PineconeRepository  # noqa: E402
+from clients.database.vectors import as_matrix, to_list  # noqa: E402
+
+HandOff = Callable[[np.ndarray, int, int, int], int]
+
+
+def _provider_batches(source: np.ndarray, batch_size: int):
+    for start in range(0, len(source), batch_size):
+        yield start, source[start : start + batch_size].tolist()
+
+
+def _list_path(source: np.ndarray, dimension: int, batch_size: int, request_size: int) -> int:
+    # Mirrors the previous release: list(embedding) in the payload builder, then list(values) in
+    # _normalize_vectors and list(values) (+ padding) in _match_dimension.
+    queued: List[List[Dict[str, Any]]] = []
+    for offset, vectors in _provider_batches(source, batch_size):
+        queued.append([{"id": f"v{offset + index}", "values": list(vector)} for index, vector in enumerate(vectors)])
+    sent = 0
+    for items in queued:
+        normalized: List[Dict[str, Any]] = []
+        for item in items:
+            values = list(item["values"])
+            if len(values) >= dimension:
+                fitted = list(values[:dimension])
+            else:
+                fitted = list(values) + [0.0] * (dimension - len(values))
+            normalized.append({**item, "values": fitted})
+        for start in range(0, len(normalized), request_size):
+            sent += len(normalized[start : start + request_size])
+    return sent
+
+
+def _float32_path(source: np.ndarray, dimension: int, batch_size: int, request_size: int) -> int:
+    queued: List[List[Dict[str, Any]]] = []
+    for offset, vectors in _provider_batches(source, batch_size):
+        matrix = as_matrix(vectors)
+        queued.append([{"id": f"v{offset + index}", "values": row} for index, row in enumerate(matrix)])
+    repository = SimpleNamespace(dimension=dimension)
+    sent = 0
+    for items in queued:
+        normalized = PineconeRepository._normalize_vectors(repository, items)  # type: ignore[arg-type]
+        for start in range(0, len(normalized), request_size):
+            # Lists exist only for the request in flight, as in PineconeRepository._send_upsert.
+            request = normalized[start : start + request_size]
+            sent += len([{**vector, "values": to_list(vector["values"])} for vector in request])
+    return sent
+
+
+def _measure(path: HandOff, source: np.ndarray, args: argparse.Namespace, runs: int) -> Tuple[float, float]:
+    peaks, timings = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        sent = path(source, args.dimension, args.batch_size, args.request_size)
+        timings.append(time.perf_counter() - started)
+        if sent != len(source):
+            raise SystemExit(f"{path.__name__} sent {sent} of {len(source)} vectors")
+        tracemalloc.start()
+        path(source, args.dimension, args.batch_size, args.request_size)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(peaks), statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--dimension", type=int, default=3072, help="index dimension")
+    parser.add_argument("--source-dimension", type=int, default=None, help="embedding width (default: index dimension)")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embed batch")
+    parser.add_argument("--request-size", type=int, default=100, help="vectors per upsert request")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    width = args.source_dimension or args.dimension
+    source = np.random.default_rng(7).uniform(-1.0, 1.0, size=(args.chunks, width))
+
+    print(f"chunks={args.chunks} source_dimension={width} index_dimension={args.dimension} runs={args.runs}")
+    scale = 1000 / args.chunks
+    results = {}
+    for label, path in (("List[float]", _list_path), ("float32", _float32_path)):
+        peak, seconds = _measure(path, source, args, args.runs)
+        results[label] = peak
+        print(f"{label:<12}: peak {peak * scale / 2**20:8.1f} MiB / 1k chunks   {seconds * scale * 1000:8.1f} ms / 1k chunks")
+    print(f"peak memory reduction: {results['List[float]'] / results['float32']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Dict, List, Literal, Optional, Protocol
 
-try:  # pragma: no cover - optional dependency
-    from google.cloud import firestore  # type: ignore[import]
-except Exception:  # pragma: no cover - optional dependency missing
-    firestore = None  # type: ignore[assignment]
-
-from .firebase import get_firestore
+from .firebase import get_firestore, load_firestore
 
 ChatRole = Literal["human", "ai", "system"]
 
@@ -76,6 +71,8 @@ class ChatSessionRecord:
     session_mode: str
     last_prompt: str
     guidance_ready: bool = False
+    # Token rewritten on every save; workers compare it to decide whether a cached copy is current.
+    revision: Optional[str] = None
 
     def to_dict(self) -> Dict[str, object]:
         payload = {
@@ -86,6 +83,8 @@ class ChatSessionRecord:
             "last_prompt": self.last_prompt,
             "guidance_ready": self.guidance_ready,
         }
+        if self.revision is not None:
+            payload["revision"] = self.revision
         payload["updated_at"] = _firestore_timestamp()
         return payload
 
@@ -104,6 +103,7 @@ class ChatSessionRecord:
             session_mode=str(payload.get("session_mode", "friction")),
             last_prompt=str(payload.get("last_prompt", "friction")),
             guidance_ready=bool(payload.get("guidance_ready", False)),
+            revision=str(payload["revision"]) if payload.get("revision") else None,
         )
 
 
@@ -121,6 +121,9 @@ class ChatRepository(Protocol):
     def load_session(self, session_id: str) -> Optional[ChatSessionRecord]:
         ...
 
+    def load_revision(self, session_id: str) -> Optional[str]:
+        ...
+
     def save_session(self, record: ChatSessionRecord) -> None:
         ...
 
@@ -152,6 +155,13 @@ class FirestoreChatRepository:
         data = doc.to_dict() or {}
         return ChatSessionRecord.from_dict(session_id, data)
 
+    def load_revision(self, session_id: str) -> Optional[str]:
+        """Read only the session's revision token ("" for sessions saved without one; None if absent)."""
+        doc = self._collection.document(session_id).get(field_paths=["revision"])
+        if not doc.exists:
+            return None
+        return str((doc.to_dict() or {}).get("revision") or "")
+
     def save_session(self, record: ChatSessionRecord) -> None:
         """Upsert a chat session document into Firestore."""
         doc_ref = self._collection.document(record.session_id)
@@ -198,6 +208,13 @@ class InMemoryChatRepository:
             return None
         return ChatSessionRecord.from_dict(session_id, payload)
 
+    def load_revision(self, session_id: str) -> Optional[str]:
+        """Return a stored session's revision token, or None when it does not exist."""
+        payload = self._store.get(session_id)
+        if not payload:
+            return None
+        return str(payload.get("revision") or "")
+
     def save_session(self, record: ChatSessionRecord) -> None:
         """Persist or update a session in memory."""
         self._store[record.session_id] = record.to_dict()
@@ -231,11 +248,12 @@ class InMemoryChatRepository:
 
 def _firestore_available() -> bool:
     """Check whether google-cloud-firestore is importable."""
-    return firestore is not None
+    return load_firestore() is not None
 
 
 def _firestore_timestamp():
     """Return a Firestore server timestamp placeholder or a UTC fallback."""
+    firestore = load_firestore()
     if firestore is not None:
         return firestore.SERVER_TIMESTAMP
     return datetime.now(timezone.utc)
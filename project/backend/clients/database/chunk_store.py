@@ -0,0 +1,239 @@
+"""Local SQLite store for chunk text and rich metadata, keyed by Pinecone vector id.
+
+With the store enabled Pinecone metadata carries only the fields queries filter on; the retriever
+looks up text for the handful of matches it actually samples, which keeps both upsert payloads and
+query responses small. The store also keeps a per-document inverted index (term postings and chunk
+lengths) so the retriever can rank chunks by BM25 without an embedding call."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from .lexical import LexicalHit, bm25_idf, bm25_term_score, term_frequencies
+
+if TYPE_CHECKING:  # pragma: no cover - settings imports clients.llm, which imports the pipeline
+    from clients.llm.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    vector_id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_document ON chunks (document_id);
+CREATE TABLE IF NOT EXISTS postings (
+    document_id TEXT NOT NULL,
+    term TEXT NOT NULL,
+    vector_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (document_id, term, vector_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_vector ON postings (vector_id);
+CREATE TABLE IF NOT EXISTS chunk_lengths (
+    vector_id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunk_lengths_document ON chunk_lengths (document_id);
+"""
+
+# SQLite caps bound parameters per statement; stay well below the historical 999 default.
+_MAX_KEYS_PER_QUERY = 500
+
+
+@dataclass(frozen=True)
+class StoredChunk:
+    """Text and full metadata for one indexed chunk."""
+
+    vector_id: str
+    document_id: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ChunkStore:
+    """SQLite map of vector id -> chunk text/metadata with per-document bulk operations."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = str(path)
+        if self._path != ":memory:":
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if self._path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def put_many(self, chunks: Sequence[StoredChunk]) -> None:
+        """Insert or replace chunks (idempotent by vector id) and their lexical postings."""
+        if not chunks:
+            return
+        rows = [
+            (chunk.vector_id, chunk.document_id, chunk.text, json.dumps(chunk.metadata, default=str))
+            for chunk in chunks
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (vector_id, document_id, text, metadata) VALUES (?, ?, ?, ?)", rows
+            )
+            self._index_terms_locked(chunks)
+            self._conn.commit()
+
+    def get_many(self, vector_ids: Sequence[str]) -> Dict[str, StoredChunk]:
+        """Return stored chunks for the ids that exist."""
+        unique = list(dict.fromkeys(vector_id for vector_id in vector_ids if vector_id))
+        found: Dict[str, StoredChunk] = {}
+        with self._lock:
+            for start in range(0, len(unique), _MAX_KEYS_PER_QUERY):
+                group = unique[start : start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(group))
+                rows = self._conn.execute(
+                    f"SELECT vector_id, document_id, text, metadata FROM chunks WHERE vector_id IN ({placeholders})",
+                    group,
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = _row_to_chunk(row)
+        return found
+
+    def load_document(self, document_id: str) -> List[StoredChunk]:
+        """Bulk-load every chunk stored for ``document_id``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector_id, document_id, text, metadata FROM chunks WHERE document_id = ? ORDER BY vector_id",
+                (document_id,),
+            ).fetchall()
+        return [_row_to_chunk(row) for row in rows]
+
+    def document_ids(self, document_id: str) -> Set[str]:
+        """Vector ids currently stored for ``document_id``."""
+        with self._lock:
+            rows = self._conn.execute("SELECT vector_id FROM chunks WHERE document_id = ?", (document_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def merge_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+        """Merge ``metadata`` into a stored chunk's metadata (no-op when the id is unknown)."""
+        with self._lock:
+            row = self._conn.execute("SELECT metadata FROM chunks WHERE vector_id = ?", (vector_id,)).fetchone()
+            if row is None:
+                return
+            merged = {**json.loads(row[0]), **metadata}
+            self._conn.execute(
+                "UPDATE chunks SET metadata = ? WHERE vector_id = ?", (json.dumps(merged, default=str), vector_id)
+            )
+            self._conn.commit()
+
+    def search(self, document_id: str, terms: Sequence[str], *, limit: int) -> List[LexicalHit]:
+        """Rank ``document_id``'s chunks by BM25 over ``terms``, best first.
+
+        Chunks stored before the lexical index existed are indexed on the first search.
+        """
+        unique = list(dict.fromkeys(term for term in terms if term))
+        if not unique or limit <= 0:
+            return []
+        with self._lock:
+            self._backfill_terms_locked(document_id)
+            chunk_count, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunk_lengths WHERE document_id = ?", (document_id,)
+            ).fetchone()
+            if not chunk_count:
+                return []
+            placeholders = ",".join("?" * len(unique))
+            postings = self._conn.execute(
+                "SELECT p.term, p.vector_id, p.tf, l.length FROM postings p "
+                "JOIN chunk_lengths l ON l.vector_id = p.vector_id "
+                f"WHERE p.document_id = ? AND p.term IN ({placeholders})",
+                [document_id, *unique],
+            ).fetchall()
+        frequencies: Dict[str, int] = {}
+        for term, *_ in postings:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        average_length = total_length / chunk_count
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for term, vector_id, tf, length in postings:
+            idf = bm25_idf(chunk_count, frequencies[term])
+            scores[vector_id] = scores.get(vector_id, 0.0) + bm25_term_score(tf, length, average_length, idf)
+            matched[vector_id] = matched.get(vector_id, 0) + 1
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [LexicalHit(vector_id, score, matched[vector_id]) for vector_id, score in ranked]
+
+    def delete_ids(self, vector_ids: Iterable[str]) -> None:
+        ids = [vector_id for vector_id in vector_ids if vector_id]
+        with self._lock:
+            for start in range(0, len(ids), _MAX_KEYS_PER_QUERY):
+                group = ids[start : start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(group))
+                for table in ("chunks", "postings", "chunk_lengths"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE vector_id IN ({placeholders})", group)
+            self._conn.commit()
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            for table in ("chunks", "postings", "chunk_lengths"):
+                self._conn.execute(f"DELETE FROM {table} WHERE document_id = ?", (document_id,))
+            self._conn.commit()
+
+    def _index_terms_locked(self, chunks: Sequence[StoredChunk]) -> None:
+        ids = [(chunk.vector_id,) for chunk in chunks]
+        self._conn.executemany("DELETE FROM postings WHERE vector_id = ?", ids)
+        postings = []
+        lengths = []
+        for chunk in chunks:
+            frequencies = term_frequencies(chunk.text)
+            lengths.append((chunk.vector_id, chunk.document_id, sum(frequencies.values())))
+            postings.extend((chunk.document_id, term, chunk.vector_id, tf) for term, tf in frequencies.items())
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO chunk_lengths (vector_id, document_id, length) VALUES (?, ?, ?)", lengths
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO postings (document_id, term, vector_id, tf) VALUES (?, ?, ?, ?)", postings
+        )
+
+    def _backfill_terms_locked(self, document_id: str) -> None:
+        rows = self._conn.execute(
+            "SELECT c.vector_id, c.document_id, c.text FROM chunks c "
+            "LEFT JOIN chunk_lengths l ON l.vector_id = c.vector_id "
+            "WHERE c.document_id = ? AND l.vector_id IS NULL",
+            (document_id,),
+        ).fetchall()
+        if rows:
+            self._index_terms_locked([StoredChunk(vector_id=row[0], document_id=row[1], text=row[2]) for row in rows])
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_chunk(row: Sequence[Any]) -> StoredChunk:
+    return StoredChunk(vector_id=row[0], document_id=row[1], text=row[2], metadata=json.loads(row[3]))
+
+
+_stores: Dict[str, ChunkStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_chunk_store(settings: "Settings") -> Optional[ChunkStore]:
+    """Return the process-wide store for the configured path, or None when the store is disabled."""
+    path = getattr(settings, "chunk_store_path", None)
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            try:
+                store = ChunkStore(path)
+            except (OSError, sqlite3.Error):
+                logger.exception("Unable to open chunk store at %s; keeping chunk text in vector metadata", path)
+                return None
+            _stores[path] = store
+        return store
@@ -0,0 +1,97 @@
+"""Process-wide registry of external clients (Firestore, Pinecone clients and index handles, shared
+request pools) plus a TTL cache for remote metadata such as the Pinecone index dimension.
+
+Each client is built once per configuration key and then shared by every repository, so the
+process holds one gRPC channel / HTTP connection pool per backend instead of one per repository.
+Creation is guarded by a per-key lock, so sync endpoints running on the thread pool never build
+duplicates and a slow construction does not block lookups of other keys."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientRegistry:
+    """Thread-safe ``key -> client`` map with lazily built entries and TTL-cached metadata."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[Hashable, Any] = {}
+        self._metadata: Dict[Hashable, Tuple[float, Any]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return the client registered under ``key``, building it with ``factory`` on first use.
+
+        A factory that raises leaves nothing registered, so the next call tries again.
+        """
+        try:
+            return self._clients[key]
+        except KeyError:
+            pass
+        with self._key_lock(key):
+            if key not in self._clients:
+                self._clients[key] = factory()
+            return self._clients[key]
+
+    def cached(self, key: Hashable, loader: Callable[[], Optional[T]], ttl_seconds: float) -> Optional[T]:
+        """Return ``loader()``'s value, reusing it for ``ttl_seconds``; None results are not cached."""
+        entry = self._metadata.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        with self._key_lock(("metadata", key)):
+            entry = self._metadata.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            value = loader()
+            if value is not None and ttl_seconds > 0:
+                self._metadata[key] = (time.monotonic() + ttl_seconds, value)
+            return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget cached metadata for ``key`` (e.g. after the index was recreated)."""
+        self._metadata.pop(key, None)
+
+    def close(self) -> None:
+        """Close every registered client (``close()`` or ``shutdown()``) and empty the registry."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._metadata.clear()
+            self._key_locks.clear()
+        for client in clients:
+            closer = getattr(client, "shutdown", None) or getattr(client, "close", None)
+            if not callable(closer):
+                continue
+            try:
+                closer()
+            except Exception:  # pragma: no cover - best effort on shutdown
+                logger.warning("Unable to close %s", type(client).__name__, exc_info=True)
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """The process-wide registry."""
+    return _registry
+
+
+def close_clients() -> None:
+    """Close shared clients and pools (called on application shutdown); later lookups rebuild them."""
+    _registry.close()
@@ -0,0 +1,243 @@
+"""Content-addressed on-disk embedding cache shared by ingestion and retrieval.
+
+Vectors are keyed by a hash of (model, dimension, task, text) and stored as float32 blobs in a
+local SQLite file, so re-uploading a deck with one changed slide only pays for the new chunks.
+The store is bounded by payload bytes with least-recently-used eviction; recency from hits is
+buffered in memory and written with the next put, so reads never commit. Hits are returned as
+float32 arrays read straight from the stored blobs."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+
+from .vectors import DTYPE, lazy_module
+
+if TYPE_CHECKING:  # pragma: no cover - settings imports clients.llm, which imports this module
+    import numpy as np
+
+    from clients.llm.settings import Settings
+else:
+    np = lazy_module("numpy")
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+# SQLite caps bound parameters per statement; stay well below the historical 999 default.
+_MAX_KEYS_PER_QUERY = 500
+# Recency updates from reads are buffered and written with the next put (or once this many pile up),
+# so a cache hit costs a SELECT and no commit.
+_TOUCH_FLUSH_SIZE = 1024
+
+
+class EmbeddingCache:
+    """SQLite-backed map of content hash -> float32 vector with LRU eviction by stored bytes."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = 0,
+        model: str = "",
+        dimension: Optional[int] = None,
+    ) -> None:
+        self._path = str(path)
+        if self._path != ":memory:":
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max(max_bytes, 0)
+        self._model = model
+        self._dimension = dimension
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if self._path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._bytes = int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0])
+        self._last_stamp = 0.0
+        self._pending_touches: Dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def key(self, text: str, *, task: str = "document") -> str:
+        """Content address for ``text`` under this cache's model/dimension and embedding task."""
+        digest = hashlib.sha256()
+        for part in (self._model, str(self._dimension or ""), task, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get_many(self, texts: Sequence[str], *, task: str = "document") -> List[Optional[np.ndarray]]:
+        """Return cached float32 vectors aligned with ``texts`` (None for misses), refreshing their recency."""
+        keys = [self.key(text, task=task) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), _MAX_KEYS_PER_QUERY):
+                group = unique[start : start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(group))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", group
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _decode(blob)
+            if found:
+                now = self._stamp()
+                self._pending_touches.update((key, now) for key in found)
+                if len(self._pending_touches) >= _TOUCH_FLUSH_SIZE:
+                    self._flush_touches_locked()
+                    self._conn.commit()
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for item in results if item is not None)
+            self._hits += hits
+            self._misses += len(results) - hits
+        return results
+
+    def get(self, text: str, *, task: str = "document") -> Optional[np.ndarray]:
+        return self.get_many([text], task=task)[0]
+
+    def put_many(self, texts: Sequence[str], vectors: Any, *, task: str = "document") -> None:
+        """Store vectors for ``texts`` and evict least-recently-used entries beyond ``max_bytes``."""
+        if not texts:
+            return
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = _encode(vector)
+            rows.append((self.key(text, task=task), blob, len(blob)))
+        with self._lock:
+            # Recency from earlier reads must land before eviction picks its victims.
+            self._flush_touches_locked()
+            now = self._stamp()
+            rows = [(*row, now) for row in rows]
+            keys = [row[0] for row in rows]
+            previous = 0
+            for start in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+                group = keys[start : start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(group))
+                previous += int(
+                    self._conn.execute(
+                        f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})", group
+                    ).fetchone()[0]
+                )
+            unique_rows = list({row[0]: row for row in rows}.values())
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_used) VALUES (?, ?, ?, ?)", unique_rows
+            )
+            self._bytes += sum(row[2] for row in unique_rows) - previous
+            self._evict_locked()
+            self._conn.commit()
+
+    def put(self, text: str, vector: Any, *, task: str = "document") -> None:
+        self.put_many([text], [vector], task=task)
+
+    def stats(self) -> Dict[str, object]:
+        """Return hit ratio, stored bytes, and eviction counters."""
+        with self._lock:
+            entries = int(self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+            lookups = self._hits + self._misses
+            return {
+                "enabled": True,
+                "path": self._path,
+                "entries": entries,
+                "bytes_stored": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    def flush(self) -> None:
+        """Write buffered recency updates from reads to disk."""
+        with self._lock:
+            if self._pending_touches:
+                self._flush_touches_locked()
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches_locked()
+            self._conn.commit()
+            self._conn.close()
+
+    def _stamp(self) -> float:
+        # Strictly increasing recency stamps so LRU order survives coarse wall-clock resolution.
+        self._last_stamp = max(time.time(), self._last_stamp + 1e-6)
+        return self._last_stamp
+
+    def _flush_touches_locked(self) -> None:
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(stamp, key) for key, stamp in self._pending_touches.items()],
+        )
+        self._pending_touches.clear()
+
+    def _evict_locked(self) -> None:
+        if not self._max_bytes or self._bytes <= self._max_bytes:
+            return
+        excess = self._bytes - self._max_bytes
+        freed = 0
+        victims: List[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_used ASC"):
+            victims.append(key)
+            freed += int(size)
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in victims])
+        self._bytes -= freed
+        self._evictions += len(victims)
+
+
+def _encode(vector: Any) -> bytes:
+    return np.asarray(vector, dtype=DTYPE).tobytes()
+
+
+def _decode(blob: bytes) -> np.ndarray:
+    # Read-only view over the blob; callers copy when they pad or stack.
+    return np.frombuffer(blob, dtype=DTYPE)
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(settings: "Settings") -> Optional[EmbeddingCache]:
+    """Return the process-wide cache for the configured path, or None when caching is disabled."""
+    path = getattr(settings, "embedding_cache_path", None)
+    if not path:
+        return None
+    model = getattr(settings, "google_embeddings_model_name", "") or ""
+    dimension = getattr(settings, "pinecone_index_dimension", None)
+    cache_key = f"{path}|{model}|{dimension}"
+    with _caches_lock:
+        cache = _caches.get(cache_key)
+        if cache is None:
+            try:
+                cache = EmbeddingCache(
+                    path,
+                    max_bytes=getattr(settings, "embedding_cache_max_bytes", 0) or 0,
+                    model=model,
+                    dimension=dimension,
+                )
+            except (OSError, sqlite3.Error):
+                logger.exception("Unable to open embedding cache at %s; continuing without it", path)
+                return None
+            _caches[cache_key] = cache
+        return cache
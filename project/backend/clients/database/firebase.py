@@ -1,19 +1,35 @@
 """Helpers to initialize a Google Cloud Firestore client for chat/quiz persistence.
-Relies on google-cloud-firestore, FIREBASE_PROJECT_ID, and application credentials."""
+Relies on google-cloud-firestore, FIREBASE_PROJECT_ID, and application credentials. One client per
+project is shared process-wide through the client registry."""
 
 from __future__ import annotations
 
 import os
 
-try:  # pragma: no cover - optional dependency
-    from google.cloud import firestore  # type: ignore[import]
-except Exception:  # pragma: no cover - optional dependency missing
-    firestore = None  # type: ignore[assignment]
+from .client_registry import get_client_registry
+
+_NOT_LOADED = object()
+
+# google-cloud-firestore is imported on first use by load_firestore(); None means unavailable.
+firestore = _NOT_LOADED
+
+
+def load_firestore():
+    """Import and cache the google.cloud.firestore module, returning None when it is not installed."""
+    global firestore
+    if firestore is _NOT_LOADED:
+        try:  # pragma: no cover - optional dependency
+            from google.cloud import firestore as _firestore  # type: ignore[import]
+        except Exception:  # pragma: no cover - optional dependency missing
+            _firestore = None  # type: ignore[assignment]
+        firestore = _firestore
+    return firestore
 
 
 def get_firestore():
-    """Construct and return a Firestore client using FIREBASE_PROJECT_ID and default credentials."""
+    """Return the shared Firestore client for FIREBASE_PROJECT_ID, creating it with default credentials on first use."""
 
+    firestore = load_firestore()
     if firestore is None:
         raise RuntimeError(
             "google-cloud-firestore is not installed. Install the package or configure the application "
@@ -28,11 +44,14 @@ def get_firestore():
             "Please set it to your Firebase project ID."
         )
 
-    try:
-        # Uses credentials from GOOGLE_APPLICATION_CREDENTIALS env var
-        return firestore.Client(project=project_id)
-    except Exception as e:
-        raise RuntimeError(
-            f"Failed to initialize Firestore client: {e}. "
-            "Ensure GOOGLE_APPLICATION_CREDENTIALS points to your service account key JSON."
-        )
+    def _create_client():
+        try:
+            # Uses credentials from GOOGLE_APPLICATION_CREDENTIALS env var
+            return firestore.Client(project=project_id)
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to initialize Firestore client: {e}. "
+                "Ensure GOOGLE_APPLICATION_CREDENTIALS points to your service account key JSON."
+            )
+
+    return get_client_registry().get(("firestore", project_id), _create_client)
@@ -0,0 +1,183 @@
+"""Persistence for asynchronous ingestion jobs: status, pipeline stage, progress counters, errors,
+and the final ingestion summary. Firestore-backed with an in-memory fallback for tests/local dev."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Protocol, Sequence
+
+from .firebase import get_firestore, load_firestore
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+UNFINISHED_STATUSES: tuple[JobStatus, ...] = ("queued", "running")
+
+
+def _now() -> datetime:
+    """Return current UTC timestamp; isolated for testing."""
+    return datetime.now(timezone.utc)
+
+
+def _parse_datetime(raw: object) -> Optional[datetime]:
+    """Parse stored timestamps (ISO strings or Firestore datetimes)."""
+    if isinstance(raw, datetime):
+        return raw
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(str(raw))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class IngestionJobRecord:
+    """Snapshot of one background ingestion job."""
+
+    job_id: str
+    session_id: str
+    filename: str
+    status: JobStatus = "queued"
+    stage: str = "queued"
+    document_id: Optional[str] = None
+    slides_extracted: int = 0
+    chunks_queued: int = 0
+    chunks_unchanged: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    extraction_complete: bool = False
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # "<host>:<pid>" of the process that accepted the job and the spool file it owns, so a restarted
+    # process can tell its own orphaned jobs apart from ones still running elsewhere.
+    owner: Optional[str] = None
+    spool_path: Optional[str] = None
+
+    def eta_seconds(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Estimate remaining seconds from the upsert rate once the total chunk count is known."""
+        if self.status != "running" or not self.extraction_complete or not self.started_at:
+            return None
+        if self.chunks_upserted <= 0:
+            return None
+        remaining = max(self.chunks_queued - self.chunks_upserted, 0)
+        elapsed = ((now or _now()) - self.started_at).total_seconds()
+        return round(elapsed / self.chunks_upserted * remaining, 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "document_id": self.document_id,
+            "slides_extracted": self.slides_extracted,
+            "chunks_queued": self.chunks_queued,
+            "chunks_unchanged": self.chunks_unchanged,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_upserted": self.chunks_upserted,
+            "extraction_complete": self.extraction_complete,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "owner": self.owner,
+            "spool_path": self.spool_path,
+        }
+
+    @staticmethod
+    def from_dict(payload: Dict[str, object]) -> "IngestionJobRecord":
+        result = payload.get("result")
+        return IngestionJobRecord(
+            job_id=str(payload.get("job_id", "")),
+            session_id=str(payload.get("session_id", "")),
+            filename=str(payload.get("filename", "")),
+            status=payload.get("status", "queued"),  # type: ignore[arg-type]
+            stage=str(payload.get("stage", "queued")),
+            document_id=payload.get("document_id"),  # type: ignore[arg-type]
+            slides_extracted=int(payload.get("slides_extracted", 0) or 0),
+            chunks_queued=int(payload.get("chunks_queued", 0) or 0),
+            chunks_unchanged=int(payload.get("chunks_unchanged", 0) or 0),
+            chunks_embedded=int(payload.get("chunks_embedded", 0) or 0),
+            chunks_upserted=int(payload.get("chunks_upserted", 0) or 0),
+            extraction_complete=bool(payload.get("extraction_complete", False)),
+            error=payload.get("error"),  # type: ignore[arg-type]
+            result=dict(result) if isinstance(result, dict) else None,
+            created_at=_parse_datetime(payload.get("created_at")) or _now(),
+            started_at=_parse_datetime(payload.get("started_at")),
+            finished_at=_parse_datetime(payload.get("finished_at")),
+            owner=payload.get("owner"),  # type: ignore[arg-type]
+            spool_path=payload.get("spool_path"),  # type: ignore[arg-type]
+        )
+
+
+class JobRepository(Protocol):
+    """Persistence operations required by the ingestion job manager."""
+
+    def save_job(self, record: IngestionJobRecord) -> None:
+        ...
+
+    def load_job(self, job_id: str) -> Optional[IngestionJobRecord]:
+        ...
+
+    def list_jobs(self, statuses: Sequence[JobStatus]) -> List[IngestionJobRecord]:
+        ...
+
+
+class FirestoreJobRepository:
+    """Firestore-backed implementation used in production."""
+
+    def __init__(self, *, collection_name: str = "ingestion_jobs") -> None:
+        """Configure Firestore collection used for ingestion job documents."""
+        if load_firestore() is None:
+            raise RuntimeError(
+                "google-cloud-firestore is required for FirestoreJobRepository. Install the package "
+                "and configure credentials, or use InMemoryJobRepository instead."
+            )
+        self._client = get_firestore()
+        self._collection = self._client.collection(collection_name)
+
+    def save_job(self, record: IngestionJobRecord) -> None:
+        """Upsert a job document into Firestore."""
+        self._collection.document(record.job_id).set(record.to_dict())
+
+    def load_job(self, job_id: str) -> Optional[IngestionJobRecord]:
+        """Fetch a job document from Firestore."""
+        doc = self._collection.document(job_id).get()
+        if not doc.exists:
+            return None
+        return IngestionJobRecord.from_dict(doc.to_dict() or {})
+
+    def list_jobs(self, statuses: Sequence[JobStatus]) -> List[IngestionJobRecord]:
+        """Return jobs whose status is one of ``statuses``."""
+        query = self._collection.where("status", "in", list(statuses))
+        return [IngestionJobRecord.from_dict(doc.to_dict() or {}) for doc in query.stream()]
+
+
+class InMemoryJobRepository:
+    """Fallback repository that keeps job state in-process for testing/local dev."""
+
+    def __init__(self) -> None:
+        self._store: Dict[str, Dict[str, object]] = {}
+
+    def save_job(self, record: IngestionJobRecord) -> None:
+        """Persist or update a job in memory."""
+        self._store[record.job_id] = record.to_dict()
+
+    def load_job(self, job_id: str) -> Optional[IngestionJobRecord]:
+        """Return a stored job from the in-memory dict."""
+        payload = self._store.get(job_id)
+        if not payload:
+            return None
+        return IngestionJobRecord.from_dict(payload)
+
+    def list_jobs(self, statuses: Sequence[JobStatus]) -> List[IngestionJobRecord]:
+        """Return in-memory jobs whose status is one of ``statuses``."""
+        wanted = set(statuses)
+        return [
+            IngestionJobRecord.from_dict(payload) for payload in self._store.values() if payload.get("status") in wanted
+        ]
@@ -0,0 +1,46 @@
+"""Tokenisation and BM25 scoring for the per-document lexical index kept in the chunk store."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Okapi BM25 defaults: term-frequency saturation and length normalisation.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were will with".split()
+)
+
+
+@dataclass(frozen=True)
+class LexicalHit:
+    """A chunk matched by a lexical query and how many distinct query terms it contains."""
+
+    vector_id: str
+    score: float
+    matched_terms: int
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens with common English stopwords removed."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def term_frequencies(text: str) -> Dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+def bm25_idf(chunk_count: int, document_frequency: int) -> float:
+    """Non-negative BM25 idf (the Lucene variant)."""
+    return math.log(1.0 + (chunk_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def bm25_term_score(tf: int, length: int, average_length: float, idf: float) -> float:
+    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / average_length) if average_length else BM25_K1
+    return idf * tf * (BM25_K1 + 1.0) / (tf + norm)
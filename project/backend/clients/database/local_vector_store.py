@@ -0,0 +1,619 @@
+"""In-process vector index for single-node deployments and offline development.
+
+Vectors live in a memory-mapped float32 matrix on the API host (``vectors.f32``) with row
+metadata in SQLite beside it, and are L2-normalised on write so scores are cosine similarities.
+Queries scoped to a ``document_id`` (how the retriever always queries) scan that document's rows
+exactly; unscoped queries scan every row until the store holds ``exact_search_limit`` vectors, after
+which a navigable small-world graph answers them approximately. The graph is linked on a background
+thread in bounded steps; rows it has not reached yet are scanned exactly."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .pinecone import UpsertReport
+from .vectors import DTYPE, as_matrix, fit_dimension, fit_rows, width
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    row INTEGER PRIMARY KEY,
+    vector_id TEXT NOT NULL UNIQUE,
+    document_id TEXT,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vectors_document ON vectors (document_id);
+CREATE TABLE IF NOT EXISTS store_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_MATRIX_FILE = "vectors.f32"
+_ROWS_FILE = "rows.sqlite3"
+_GRAPH_FILE = "graph.npz"
+_MIN_CAPACITY = 1024
+# SQLite caps bound parameters per statement; stay well below the historical 999 default.
+_MAX_KEYS_PER_QUERY = 500
+# Graph rows added between saves of graph.npz; rows added after the last save are re-linked on load.
+_GRAPH_SAVE_INTERVAL = 1024
+# Rows the background builder links per hold of the store lock, so writes and queries interleave.
+_GRAPH_BUILD_STEP = 64
+
+
+class LocalVectorStore:
+    """``VectorStore`` backed by a local float32 matrix; ``path=None`` keeps everything in memory.
+
+    Deleted rows are tombstoned and reclaimed by compaction once they outnumber live rows. The
+    store is safe to share between threads of one process; run a single API process per store
+    directory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | Path],
+        *,
+        namespace: str = "slides",
+        dimension: Optional[int] = None,
+        exact_search_limit: int = 20_000,
+        graph_degree: int = 16,
+        ef_construction: int = 64,
+        ef_search: int = 64,
+    ) -> None:
+        self.namespace = namespace
+        self.dimension: Optional[int] = dimension or None
+        self._root = str(path) if path else None
+        self._directory = Path(path) / namespace if path else None
+        self._index_name = f"local vector store {self._directory or ':memory:'}"
+        self._exact_search_limit = max(exact_search_limit, 0)
+        self._graph_degree = max(graph_degree, 2)
+        self._ef_construction = max(ef_construction, self._graph_degree)
+        self._ef_search = max(ef_search, 1)
+        self._lock = threading.RLock()
+
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self._directory / _ROWS_FILE) if self._directory else ":memory:", check_same_thread=False
+        )
+        self._conn.executescript(_SCHEMA)
+        if self._directory is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+
+        self._matrix: Optional[np.ndarray] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._count = 0  # rows in use, live or tombstoned
+        self._row_ids: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._document_rows: Dict[str, Set[int]] = {}
+        self._graph: Optional[_NeighborGraph] = None
+        self._graph_saved_size = 0
+        self._graph_builder: Optional[threading.Thread] = None
+        self._graph_idle = threading.Event()
+        self._graph_idle.set()
+        self._closed = False
+        self._load()
+
+    # -- VectorStore -------------------------------------------------------------------------
+
+    def upsert(self, items: Sequence[Dict[str, Any]]) -> UpsertReport:
+        """Insert or replace vectors by id; a replaced id gets a new row and its old row is tombstoned."""
+        started = time.perf_counter()
+        latest = {str(item["id"]): item for item in items if width(item.get("values"))}
+        if not latest:
+            return UpsertReport()
+        entries = list(latest.values())
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = width(entries[0]["values"])
+                self._set_state("dimension", self.dimension)
+            batch = as_matrix(fit_rows([item["values"] for item in entries], self.dimension))
+            norms = np.linalg.norm(batch, axis=1, keepdims=True)
+            batch = batch / np.where(norms > 0, norms, 1.0)
+
+            start = self._count
+            self._ensure_capacity(start + len(entries))
+            self._matrix[start : start + len(entries)] = batch  # type: ignore[index]
+            rows = []
+            for offset, item in enumerate(entries):
+                row = start + offset
+                vector_id = str(item["id"])
+                previous = self._rows.get(vector_id)
+                if previous is not None:
+                    self._forget_row(previous)
+                metadata = dict(item.get("metadata") or {})
+                document_id = metadata.get("document_id")
+                self._row_ids.append(vector_id)
+                self._metadata.append(metadata)
+                self._rows[vector_id] = row
+                self._live[row] = True
+                if document_id:
+                    self._document_rows.setdefault(str(document_id), set()).add(row)
+                rows.append((row, vector_id, document_id, json.dumps(metadata, default=str)))
+            self._count += len(entries)
+
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            # INSERT OR REPLACE drops the replaced id's old row through the UNIQUE constraint.
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (row, vector_id, document_id, metadata) VALUES (?, ?, ?, ?)", rows
+            )
+            self._set_state("count", self._count, commit=False)
+            self._conn.commit()
+            self._schedule_graph_build()
+        return UpsertReport(vectors=len(entries), requests=1, seconds=time.perf_counter() - started)
+
+    def delete_document(self, document_id: str) -> None:
+        if not document_id:
+            return
+        with self._lock:
+            for row in list(self._document_rows.get(document_id, ())):
+                self._forget_row(row)
+            self._conn.execute("DELETE FROM vectors WHERE document_id = ?", (document_id,))
+            self._conn.commit()
+            self._maybe_compact()
+
+    def delete_ids(self, vector_ids: Sequence[str]) -> None:
+        ids = [vector_id for vector_id in vector_ids if vector_id]
+        if not ids:
+            return
+        with self._lock:
+            for vector_id in ids:
+                row = self._rows.get(vector_id)
+                if row is not None:
+                    self._forget_row(row)
+            for start in range(0, len(ids), _MAX_KEYS_PER_QUERY):
+                group = ids[start : start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(group))
+                self._conn.execute(f"DELETE FROM vectors WHERE vector_id IN ({placeholders})", group)
+            self._conn.commit()
+            self._maybe_compact()
+
+    def existing_ids(self, vector_ids: Sequence[str]) -> Set[str]:
+        with self._lock:
+            return {vector_id for vector_id in vector_ids if vector_id in self._rows}
+
+    def fetch_vectors(self, vector_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored records by id; values come back L2-normalised, as they were indexed."""
+        with self._lock:
+            records: Dict[str, Dict[str, Any]] = {}
+            for vector_id in vector_ids:
+                row = self._rows.get(vector_id)
+                if row is None:
+                    continue
+                records[vector_id] = {
+                    "id": vector_id,
+                    "values": np.array(self._matrix[row], dtype=DTYPE),  # type: ignore[index]
+                    "metadata": dict(self._metadata[row] or {}),
+                }
+            return records
+
+    def with_namespace(self, namespace: str) -> "LocalVectorStore":
+        if namespace == self.namespace:
+            return self
+        from .vector_store import open_local_store
+
+        return open_local_store(
+            self._root, namespace, dimension=self.dimension, exact_search_limit=self._exact_search_limit
+        )
+
+    def delete_namespace(self) -> None:
+        """Close the store and remove its directory; the namespace reopens empty on next use."""
+        from .vector_store import forget_local_store
+
+        forget_local_store(self._root, self.namespace)
+        with self._lock:
+            self._matrix = None
+            self._conn.close()
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+        if not vector_id or not metadata:
+            return
+        with self._lock:
+            row = self._rows.get(vector_id)
+            if row is None:
+                return
+            merged = {**(self._metadata[row] or {}), **metadata}
+            self._metadata[row] = merged
+            self._conn.execute(
+                "UPDATE vectors SET metadata = ? WHERE row = ?", (json.dumps(merged, default=str), row)
+            )
+            self._conn.commit()
+
+    def query(
+        self,
+        *,
+        vector: Any,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        include_metadata: bool = True,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Cosine-similarity search with Pinecone's response shape and filter operators."""
+        if not width(vector):
+            return {}
+        with self._lock:
+            if self._matrix is None or not self._rows or top_k <= 0:
+                return {"matches": [], "namespace": self.namespace}
+            query = fit_dimension(as_matrix(vector), self.dimension or 0)[0]
+            norm = float(np.linalg.norm(query))
+            if norm > 0:
+                query = query / norm
+
+            if document_id is not None:
+                candidates = np.sort(np.fromiter(self._document_rows.get(document_id, ()), dtype=np.int64))
+            elif self._graph is not None:
+                linked = self._graph.search(self._matrix, query, max(self._ef_search, top_k))
+                # Rows the background builder has not linked yet are scanned exactly.
+                pending = np.arange(self._graph.size, self._count, dtype=np.int64)
+                candidates = np.concatenate([linked, pending])
+                candidates = candidates[self._live[candidates]]
+            else:
+                candidates = np.flatnonzero(self._live[: self._count])
+            if not len(candidates):
+                return {"matches": [], "namespace": self.namespace}
+
+            scores = self._candidate_block(candidates) @ query
+            if metadata_filter:
+                # Walk rows best-first and stop at top_k passing rows, so the filter runs on few rows.
+                order = np.argsort(-scores)
+            else:
+                keep = min(top_k, len(candidates))
+                order = np.argpartition(-scores, keep - 1)[:keep]
+                order = order[np.argsort(-scores[order])]
+            matches = []
+            for position in order:
+                row = int(candidates[position])
+                metadata = self._metadata[row] or {}
+                if metadata_filter and not _matches_filter(metadata, metadata_filter):
+                    continue
+                match: Dict[str, Any] = {"id": self._row_ids[row], "score": float(scores[position])}
+                if include_metadata:
+                    match["metadata"] = dict(metadata)
+                matches.append(match)
+                if len(matches) >= top_k:
+                    break
+        return {"matches": matches, "namespace": self.namespace}
+
+    def _candidate_block(self, rows: np.ndarray) -> np.ndarray:
+        # A document's chunks are usually upserted together, so its rows are often one contiguous
+        # run that can be scored through a view instead of a gathered copy.
+        first, last = int(rows[0]), int(rows[-1])
+        if last - first + 1 == len(rows) and np.all(rows[1:] > rows[:-1]):
+            return self._matrix[first : last + 1]  # type: ignore[index]
+        return self._matrix[rows]  # type: ignore[index]
+
+    # -- Persistence -------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Persist the search graph and release the matrix map and SQLite connection."""
+        with self._lock:
+            self._closed = True
+            self._save_graph()
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            self._matrix = None
+            self._conn.close()
+
+    def _load(self) -> None:
+        state = dict(self._conn.execute("SELECT key, value FROM store_state").fetchall())
+        stored_dimension = int(state["dimension"]) if "dimension" in state else None
+        if stored_dimension and self.dimension and stored_dimension != self.dimension:
+            raise RuntimeError(
+                f"Local vector store {self._directory} holds {stored_dimension}-dimensional vectors, but "
+                f"PINECONE_INDEX_DIMENSION={self.dimension}. Point LOCAL_VECTOR_STORE_PATH at a new directory "
+                "or re-ingest into an empty store."
+            )
+        if stored_dimension:
+            self.dimension = stored_dimension
+        elif self.dimension:
+            self._set_state("dimension", self.dimension)
+
+        records = self._conn.execute("SELECT row, vector_id, metadata FROM vectors ORDER BY row").fetchall()
+        self._count = max(int(state.get("count", 0)), (records[-1][0] + 1) if records else 0)
+        self._row_ids = [None] * self._count
+        self._metadata = [None] * self._count
+        if self._count:
+            self._ensure_capacity(self._count)
+        for row, vector_id, raw_metadata in records:
+            metadata = json.loads(raw_metadata)
+            self._row_ids[row] = vector_id
+            self._metadata[row] = metadata
+            self._rows[vector_id] = row
+            self._live[row] = True
+            if metadata.get("document_id"):
+                self._document_rows.setdefault(str(metadata["document_id"]), set()).add(row)
+        self._load_graph()
+        self._schedule_graph_build()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        current = len(self._matrix) if self._matrix is not None else 0
+        if current >= rows:
+            return
+        dimension = self.dimension or 0
+        capacity = max(rows, _MIN_CAPACITY, current * 2)
+        if self._directory is None:
+            grown = np.zeros((capacity, dimension), dtype=DTYPE)
+            if self._matrix is not None:
+                grown[: self._count] = self._matrix[: self._count]
+            self._matrix = grown
+        else:
+            path = self._directory / _MATRIX_FILE
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            self._matrix = None
+            path.touch(exist_ok=True)
+            if path.stat().st_size < capacity * dimension * np.dtype(DTYPE).itemsize:
+                os.truncate(path, capacity * dimension * np.dtype(DTYPE).itemsize)
+            capacity = path.stat().st_size // (dimension * np.dtype(DTYPE).itemsize)
+            self._matrix = np.memmap(path, dtype=DTYPE, mode="r+", shape=(capacity, dimension))
+        live = np.zeros(capacity, dtype=bool)
+        live[: len(self._live)] = self._live
+        self._live = live
+
+    def _set_state(self, key: str, value: Any, *, commit: bool = True) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO store_state (key, value) VALUES (?, ?)", (key, str(value)))
+        if commit:
+            self._conn.commit()
+
+    def _forget_row(self, row: int) -> None:
+        vector_id = self._row_ids[row]
+        metadata = self._metadata[row] or {}
+        self._live[row] = False
+        self._row_ids[row] = None
+        self._metadata[row] = None
+        if vector_id is not None and self._rows.get(vector_id) == row:
+            del self._rows[vector_id]
+        document_id = metadata.get("document_id")
+        if document_id:
+            rows = self._document_rows.get(str(document_id))
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._document_rows[str(document_id)]
+
+    def _maybe_compact(self) -> None:
+        """Rewrite live rows to the front of the matrix once tombstones outnumber them."""
+        live_rows = np.flatnonzero(self._live[: self._count])
+        dead = self._count - len(live_rows)
+        if dead <= max(len(live_rows), _MIN_CAPACITY) or self._matrix is None:
+            return
+        self._matrix[: len(live_rows)] = self._matrix[live_rows]
+        # Live rows only move down and are renumbered in ascending order, so no two rows collide.
+        self._conn.executemany(
+            "UPDATE vectors SET row = ? WHERE row = ?",
+            [(new, int(old)) for new, old in enumerate(live_rows) if new != old],
+        )
+        self._row_ids = [self._row_ids[row] for row in live_rows]
+        self._metadata = [self._metadata[row] for row in live_rows]
+        self._count = len(live_rows)
+        self._live[:] = False
+        self._live[: self._count] = True
+        self._rows = {vector_id: row for row, vector_id in enumerate(self._row_ids) if vector_id is not None}
+        self._document_rows = {}
+        for row, metadata in enumerate(self._metadata):
+            if metadata and metadata.get("document_id"):
+                self._document_rows.setdefault(str(metadata["document_id"]), set()).add(row)
+        self._set_state("count", self._count, commit=False)
+        self._conn.commit()
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        self._graph = None
+        self._graph_saved_size = 0
+        if self._directory is not None:
+            (self._directory / _GRAPH_FILE).unlink(missing_ok=True)
+        self._schedule_graph_build()
+        logger.info("Compacted local vector store %s: reclaimed %s rows", self._index_name, dead)
+
+    # -- Approximate search graph ----------------------------------------------------------------
+
+    def wait_for_graph(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background builder has linked every row; False if ``timeout`` expired."""
+        return self._graph_idle.wait(timeout)
+
+    def _schedule_graph_build(self) -> None:
+        # Called with the lock held. One builder per store; it keeps going until it has caught up.
+        if self._graph_builder is not None or not self._graph_work_pending():
+            return
+        self._graph_idle.clear()
+        self._graph_builder = threading.Thread(
+            target=self._build_graph, name=f"vector-graph-{self.namespace}", daemon=True
+        )
+        self._graph_builder.start()
+
+    def _graph_work_pending(self) -> bool:
+        if self._closed or self._matrix is None:
+            return False
+        if self._graph is None:
+            return bool(self._exact_search_limit) and len(self._rows) >= self._exact_search_limit
+        return self._graph.size < self._count
+
+    def _build_graph(self) -> None:
+        while True:
+            with self._lock:
+                try:
+                    if not self._graph_work_pending():
+                        self._graph_builder = None
+                        self._graph_idle.set()
+                        return
+                    self._extend_graph(_GRAPH_BUILD_STEP)
+                except Exception:
+                    logger.exception("Building the search graph for %s failed", self._index_name)
+                    self._graph_builder = None
+                    self._graph_idle.set()
+                    return
+            time.sleep(0)  # let waiting writers and queries take the lock between steps
+
+    def _extend_graph(self, max_rows: int) -> None:
+        if self._graph is None:
+            self._graph = _NeighborGraph(self._graph_degree)
+        target = min(self._count, self._graph.size + max_rows)
+        self._graph.extend(self._matrix, target, self._live, self._ef_construction)  # type: ignore[arg-type]
+        if self._graph.size - self._graph_saved_size >= _GRAPH_SAVE_INTERVAL:
+            self._save_graph()
+
+    def _load_graph(self) -> None:
+        if self._directory is None or not (self._directory / _GRAPH_FILE).exists():
+            return
+        try:
+            with np.load(self._directory / _GRAPH_FILE) as saved:
+                graph = _NeighborGraph(
+                    int(saved["degree"]), saved["neighbors"].copy(), int(saved["entry"]), int(saved["size"])
+                )
+        except (OSError, KeyError, ValueError):
+            logger.warning("Ignoring unreadable search graph in %s; it will be rebuilt", self._directory)
+            return
+        if graph.size > self._count or graph.degree != self._graph_degree:
+            return
+        self._graph = graph
+        self._graph_saved_size = graph.size
+
+    def _save_graph(self) -> None:
+        if self._directory is None or self._graph is None or self._graph.size == self._graph_saved_size:
+            return
+        target = self._directory / _GRAPH_FILE
+        partial = target.with_name(target.name + ".tmp")
+        with open(partial, "wb") as handle:
+            np.savez(
+                handle,
+                neighbors=self._graph.neighbors[: self._graph.size],
+                entry=self._graph.entry,
+                size=self._graph.size,
+                degree=self._graph.degree,
+            )
+        os.replace(partial, target)
+        self._graph_saved_size = self._graph.size
+
+
+class _NeighborGraph:
+    """Single-layer navigable small-world graph over the rows ``[0, size)`` of a normalised matrix.
+
+    Each row links to at most ``degree`` neighbours found by a beam search at insert time; a search
+    walks greedily from the entry row, keeping the ``ef`` best rows seen. Tombstoned rows stay in
+    the graph as waypoints and are filtered from results by the caller.
+    """
+
+    def __init__(self, degree: int, neighbors: Optional[np.ndarray] = None, entry: int = -1, size: int = 0) -> None:
+        self.degree = degree
+        self.neighbors = neighbors if neighbors is not None else np.full((0, degree), -1, dtype=np.int32)
+        self.entry = entry
+        self.size = size
+
+    def extend(self, matrix: np.ndarray, count: int, live: np.ndarray, ef: int) -> None:
+        """Link rows ``[size, count)`` that are live into the graph."""
+        if count <= self.size:
+            return
+        if len(self.neighbors) < count:
+            grown = np.full((max(count, len(self.neighbors) * 2), self.degree), -1, dtype=np.int32)
+            grown[: len(self.neighbors)] = self.neighbors
+            self.neighbors = grown
+        for row in range(self.size, count):
+            if live[row]:
+                self._insert(matrix, row, ef)
+        self.size = count
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, ef: int) -> np.ndarray:
+        """Rows of the ``ef`` best matches found, ordered by descending similarity."""
+        if self.entry < 0:
+            return np.empty(0, dtype=np.int64)
+        score = float(matrix[self.entry] @ query)
+        visited = {self.entry}
+        frontier = [(-score, self.entry)]
+        best = [(score, self.entry)]
+        while frontier:
+            negative, row = heapq.heappop(frontier)
+            if len(best) >= ef and -negative < best[0][0]:
+                break
+            fresh = [int(neighbor) for neighbor in self.neighbors[row] if neighbor >= 0 and neighbor not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for neighbor, neighbor_score in zip(fresh, (matrix[fresh] @ query).tolist()):
+                if len(best) < ef or neighbor_score > best[0][0]:
+                    heapq.heappush(frontier, (-neighbor_score, neighbor))
+                    heapq.heappush(best, (neighbor_score, neighbor))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return np.array([row for _, row in sorted(best, reverse=True)], dtype=np.int64)
+
+    def _insert(self, matrix: np.ndarray, row: int, ef: int) -> None:
+        if self.entry < 0:
+            self.entry = row
+            return
+        nearest = self.search(matrix, matrix[row], ef)[: self.degree]
+        self.neighbors[row, : len(nearest)] = nearest
+        for neighbor in nearest:
+            self._link(matrix, int(neighbor), row)
+
+    def _link(self, matrix: np.ndarray, node: int, new: int) -> None:
+        links = self.neighbors[node]
+        free = np.flatnonzero(links < 0)
+        if len(free):
+            links[free[0]] = new
+            return
+        # Full: keep the ``degree`` closest of the current links plus the new row.
+        pool = np.append(links, new)
+        self.neighbors[node] = pool[np.argsort(-(matrix[pool] @ matrix[node]))[: self.degree]]
+
+
+def _matches_filter(metadata: Dict[str, Any], metadata_filter: Dict[str, Any]) -> bool:
+    """Evaluate a Pinecone metadata filter ($eq/$ne/$in/$nin/$gt/$gte/$lt/$lte/$exists/$and/$or)."""
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(_matches_filter(metadata, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches_filter(metadata, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(metadata.get(key), key in metadata, op, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _compare(value: Any, present: bool, op: str, operand: Any) -> bool:
+    if op == "$exists":
+        return present == bool(operand)
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in _as_collection(operand)
+    if op == "$nin":
+        return value not in _as_collection(operand)
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported metadata filter operator {op}")
+
+
+def _as_collection(operand: Any) -> Iterable[Any]:
+    return operand if isinstance(operand, (list, tuple, set, frozenset)) else [operand]
@@ -0,0 +1,142 @@
+"""Per-document chunk manifests used for incremental re-ingestion: maps each Pinecone vector id of
+an ingested document to a content hash (and the slide position it was stored at) so a re-upload
+only embeds changed chunks, re-points moved ones and deletes the ids that disappeared. The same ids drive id-based document deletion, and ``updated_at`` lets the
+maintenance sweep find stale documents. Firestore-backed with an in-memory fallback."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Protocol
+
+from .firebase import get_firestore, load_firestore
+
+
+@dataclass(frozen=True)
+class DocumentManifest:
+    """Vector ids currently indexed for a document and the content hash each was built from."""
+
+    document_id: str
+    namespace: str
+    chunk_hashes: Dict[str, str] = field(default_factory=dict)
+    # vector id -> "slide:chunk" position last written to its metadata
+    chunk_positions: Dict[str, str] = field(default_factory=dict)
+    course_id: Optional[str] = None
+    updated_at: Optional[datetime] = field(default=None, compare=False)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "document_id": self.document_id,
+            "namespace": self.namespace,
+            "chunk_hashes": dict(self.chunk_hashes),
+            "chunk_positions": dict(self.chunk_positions),
+            "course_id": self.course_id,
+            "updated_at": _firestore_timestamp(),
+        }
+
+    @staticmethod
+    def from_dict(document_id: str, payload: Dict[str, object]) -> "DocumentManifest":
+        raw_hashes = payload.get("chunk_hashes") or {}
+        hashes = {str(key): str(value) for key, value in raw_hashes.items()} if isinstance(raw_hashes, dict) else {}
+        raw_positions = payload.get("chunk_positions") or {}
+        positions = (
+            {str(key): str(value) for key, value in raw_positions.items()} if isinstance(raw_positions, dict) else {}
+        )
+        return DocumentManifest(
+            document_id=document_id,
+            namespace=str(payload.get("namespace") or ""),
+            chunk_hashes=hashes,
+            chunk_positions=positions,
+            course_id=str(payload["course_id"]) if payload.get("course_id") else None,
+            updated_at=_as_utc(payload.get("updated_at")),
+        )
+
+
+class ManifestRepository(Protocol):
+    """Persistence operations required by the ingestion pipeline."""
+
+    def load_manifest(self, document_id: str) -> Optional[DocumentManifest]:
+        ...
+
+    def save_manifest(self, manifest: DocumentManifest) -> None:
+        ...
+
+    def delete_manifest(self, document_id: str) -> None:
+        ...
+
+    def list_manifests(self) -> List[DocumentManifest]:
+        ...
+
+
+class FirestoreManifestRepository:
+    """Firestore-backed implementation used in production."""
+
+    def __init__(self, *, collection_name: str = "document_manifests") -> None:
+        """Configure Firestore collection used for document manifests."""
+        if load_firestore() is None:
+            raise RuntimeError(
+                "google-cloud-firestore is required for FirestoreManifestRepository. Install the package "
+                "and configure credentials, or use InMemoryManifestRepository instead."
+            )
+        self._client = get_firestore()
+        self._collection = self._client.collection(collection_name)
+
+    def load_manifest(self, document_id: str) -> Optional[DocumentManifest]:
+        """Fetch a document manifest from Firestore."""
+        doc = self._collection.document(document_id).get()
+        if not doc.exists:
+            return None
+        return DocumentManifest.from_dict(document_id, doc.to_dict() or {})
+
+    def save_manifest(self, manifest: DocumentManifest) -> None:
+        """Replace the stored manifest (no merge, so removed ids disappear)."""
+        self._collection.document(manifest.document_id).set(manifest.to_dict())
+
+    def delete_manifest(self, document_id: str) -> None:
+        """Remove a document manifest from Firestore."""
+        self._collection.document(document_id).delete()
+
+    def list_manifests(self) -> List[DocumentManifest]:
+        """Return every stored manifest."""
+        return [DocumentManifest.from_dict(doc.id, doc.to_dict() or {}) for doc in self._collection.stream()]
+
+
+class InMemoryManifestRepository:
+    """Fallback repository that keeps manifests in-process for testing/local dev."""
+
+    def __init__(self) -> None:
+        self._store: Dict[str, Dict[str, object]] = {}
+
+    def load_manifest(self, document_id: str) -> Optional[DocumentManifest]:
+        """Return a stored manifest from the in-memory dict."""
+        payload = self._store.get(document_id)
+        if not payload:
+            return None
+        return DocumentManifest.from_dict(document_id, payload)
+
+    def save_manifest(self, manifest: DocumentManifest) -> None:
+        """Persist or replace a manifest in memory."""
+        self._store[manifest.document_id] = {**manifest.to_dict(), "updated_at": datetime.now(timezone.utc)}
+
+    def delete_manifest(self, document_id: str) -> None:
+        """Delete a manifest from the in-memory store."""
+        self._store.pop(document_id, None)
+
+    def list_manifests(self) -> List[DocumentManifest]:
+        """Return every manifest held in memory."""
+        return [DocumentManifest.from_dict(document_id, payload) for document_id, payload in self._store.items()]
+
+
+def _firestore_timestamp():
+    """Return a Firestore server timestamp placeholder or a UTC fallback."""
+    firestore = load_firestore()
+    if firestore is not None:
+        return firestore.SERVER_TIMESTAMP
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: object) -> Optional[datetime]:
+    """Stored timestamps as aware UTC datetimes; anything else (e.g. a pending sentinel) is None."""
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
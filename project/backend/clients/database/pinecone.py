@@ -1,21 +1,73 @@
 """Pinecone vector index client wrapper used by the ingestion and retrieval pipeline.
-Responsible for upserting, deleting, and querying vectors with dimension safeguards."""
+Responsible for upserting, deleting, and querying vectors with dimension safeguards. Upserts are
+split into requests by vector count and serialized size, sent concurrently, and retried on
+transient errors (upserts are idempotent by vector id). Vector values arrive as float32 arrays and
+are converted to lists only when a request is handed to the SDK. The Pinecone client, index handle,
+index dimension, and request pool come from the process-wide client registry."""
 
 from __future__ import annotations
 
+import copy
+import json
 import logging
-from typing import Any, Dict, Sequence, List, Optional
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Sequence, List, Optional, Set, Tuple
 
-from pinecone import Pinecone
+from .client_registry import get_client_registry
+from .vectors import as_matrix, as_vector, fit_dimension, fit_rows, to_list, width
 
-from clients.llm.settings import Settings
+if TYPE_CHECKING:  # pragma: no cover - clients.llm imports the ingestion pipeline
+    from clients.llm.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Pinecone accepts at most 1000 ids per delete request.
+_DELETE_BATCH_SIZE = 1000
+# Fetch sends ids in the query string, so keep batches well under URL length limits.
+_FETCH_BATCH_SIZE = 100
+
+# HTTP statuses worth retrying: throttling and server-side/availability failures.
+_TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+_TRANSIENT_MARKERS = ("timed out", "timeout", "temporarily unavailable", "connection reset", "connection aborted")
+_PAYLOAD_MARKERS = ("exceeds the maximum", "request size", "too large", "message length")
+
+# Upper bound on one float32 value's JSON form including its separator (e.g. "-1.2345678901234567e-05,"),
+# so request sizes are estimated without materializing value lists.
+_JSON_BYTES_PER_VALUE = 24
+
+
+@dataclass(frozen=True)
+class UpsertReport:
+    """Outcome of one ``PineconeRepository.upsert`` call."""
+
+    vectors: int = 0
+    requests: int = 0
+    bytes_sent: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def vectors_per_second(self) -> float:
+        return self.vectors / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_sent / self.seconds if self.seconds > 0 else 0.0
+
+# The Pinecone SDK is imported when the first repository is built (see _pinecone_client_class).
+Pinecone = None
+
 
 class PineconeRepository:
     """Wrapper around Pinecone vector operations used by the ingestion pipeline."""
 
+    # First retry delay for transient upsert failures; doubles per attempt with up to 50% jitter.
+    _base_backoff_seconds = 0.5
+    _max_backoff_seconds = 20.0
+
     def __init__(self, settings: Settings) -> None:
         """Initialize Pinecone client/index using settings-derived API key, env, and namespace."""
         if not settings.pinecone_api_key:
@@ -26,14 +78,27 @@ class PineconeRepository:
         self.namespace = settings.pinecone_namespace
         self._index_name = settings.pinecone_index_name
         self._declared_dimension = settings.pinecone_index_dimension
-        self._client = Pinecone(
-            api_key=settings.pinecone_api_key,
-            environment=settings.pinecone_environment,
+        self._upsert_max_vectors = max(getattr(settings, "pinecone_upsert_max_vectors", 100) or 100, 1)
+        self._upsert_max_bytes = max(getattr(settings, "pinecone_upsert_max_bytes", 0) or 0, 0)
+        self._upsert_concurrency = max(getattr(settings, "pinecone_upsert_concurrency", 4) or 1, 1)
+        self._upsert_max_retries = max(getattr(settings, "pinecone_upsert_max_retries", 3) or 0, 0)
+        registry = get_client_registry()
+        client_key = ("pinecone", settings.pinecone_api_key, settings.pinecone_environment)
+        self._client = registry.get(
+            client_key,
+            lambda: _pinecone_client_class()(
+                api_key=settings.pinecone_api_key,
+                environment=settings.pinecone_environment,
+            ),
         )
 
         try:
-            self._index = self._client.Index(self._index_name)
-            fetched = self._fetch_index_dimension()
+            self._index = registry.get((*client_key, "index", self._index_name), lambda: self._client.Index(self._index_name))
+            fetched = registry.cached(
+                (*client_key, "dimension", self._index_name),
+                self._fetch_index_dimension,
+                getattr(settings, "pinecone_index_metadata_ttl_seconds", 300),
+            )
             self.dimension = self._resolve_dimension(fetched)
         except Exception as exc:  # pragma: no cover - depends on remote state
             logger.exception("Unable to access Pinecone index '%s'", self._index_name)
@@ -65,43 +130,95 @@ class PineconeRepository:
         return declared or fetched
 
     def _normalize_vectors(self, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Normalize incoming vectors to match index dimension, padding or truncating as needed."""
+        """Normalize incoming vectors to match index dimension, padding or truncating as needed.
+
+        Empty vectors are dropped; mismatched widths are fitted a whole group at a time (``fit_rows``).
+        """
         if not items or not self.dimension:
             return list(items)
 
-        normalized: List[Dict[str, Any]] = []
-        for item in items:
-            values = list(item.get("values") or [])
-            if not values:
-                continue
-            adjusted = self._match_dimension(values)
-            if adjusted is None:
-                continue
-            normalized.append({**item, "values": adjusted})
-
-        return normalized
-
-    def _match_dimension(self, values: Sequence[float]) -> Optional[List[float]]:
-        """Ensure a single vector matches the index dimension; pad/truncate when necessary."""
-        if not self.dimension:
-            return list(values)
-        if not values:
-            return None
-        if len(values) == self.dimension:
-            return list(values)
-        if len(values) > self.dimension:
-            return list(values[: self.dimension])
-        padding = [0.0] * (self.dimension - len(values))
-        return list(values) + padding
-
-    def upsert(self, items: Sequence[Dict[str, Any]]) -> None:
-        """Insert or update vectors in Pinecone after normalizing dimensions."""
+        kept = [item for item in items if width(item.get("values"))]
+        rows = fit_rows([item["values"] for item in kept], self.dimension)
+        return [{**item, "values": row} for item, row in zip(kept, rows)]
+
+    def upsert(self, items: Sequence[Dict[str, Any]]) -> UpsertReport:
+        """Insert or update vectors in Pinecone after normalizing dimensions.
+
+        Vectors are packed into requests of at most ``pinecone_upsert_max_vectors`` vectors and
+        ``pinecone_upsert_max_bytes`` serialized bytes, which run on up to
+        ``pinecone_upsert_concurrency`` threads; each request is retried on transient errors.
+        """
         if not items:
-            return
+            return UpsertReport()
         prepared = self._normalize_vectors(items)
         if not prepared:
-            return
-        self._index.upsert(vectors=prepared, namespace=self.namespace)
+            return UpsertReport()
+        started = time.perf_counter()
+        requests = _pack_requests(prepared, max_vectors=self._upsert_max_vectors, max_bytes=self._upsert_max_bytes)
+        if len(requests) == 1 or self._upsert_concurrency == 1:
+            retries = [self._send_upsert(vectors) for vectors, _ in requests]
+        else:
+            pool = self._get_upsert_pool()
+            futures = [pool.submit(self._send_upsert, vectors) for vectors, _ in requests]
+            retries = [future.result() for future in futures]
+        return UpsertReport(
+            vectors=len(prepared),
+            requests=len(requests),
+            bytes_sent=sum(size for _, size in requests),
+            retries=sum(retries),
+            seconds=time.perf_counter() - started,
+        )
+
+    def _send_upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        """Send one upsert request, retrying transient failures; returns the number of retries.
+
+        A request rejected as too large (the byte estimate can miss oversized metadata) is split in
+        half and each half sent on its own.
+        """
+        payload = [{**vector, "values": to_list(vector["values"])} for vector in vectors]
+        try:
+            return self._with_retries(
+                lambda: self._index.upsert(vectors=payload, namespace=self.namespace),
+                f"upsert of {len(vectors)} vectors",
+                "Failed to upsert vectors to vector index",
+            )
+        except RuntimeError as exc:
+            if len(vectors) < 2 or not _is_payload_error(exc.__cause__):
+                raise
+        middle = len(vectors) // 2
+        logger.warning("Pinecone rejected an upsert of %s vectors as too large; splitting it", len(vectors))
+        return 1 + self._send_upsert(vectors[:middle]) + self._send_upsert(vectors[middle:])
+
+    def _with_retries(self, operation: Callable[[], Any], description: str, failure: str) -> int:
+        """Run ``operation``, retrying transient failures with jittered backoff; returns the retry count."""
+        attempt = 0
+        while True:
+            try:
+                operation()
+                return attempt
+            except Exception as exc:
+                if attempt >= self._upsert_max_retries or not _is_transient(exc):
+                    logger.exception("Pinecone %s failed after %s attempts", description, attempt + 1)
+                    raise RuntimeError(failure) from exc
+                delay = min(self._base_backoff_seconds * (2**attempt), self._max_backoff_seconds)
+                delay += random.uniform(0, delay / 2)
+                attempt += 1
+                logger.warning(
+                    "Transient Pinecone %s failure (%s); retry %s/%s in %.2fs",
+                    description,
+                    exc,
+                    attempt,
+                    self._upsert_max_retries,
+                    delay,
+                )
+                time.sleep(delay)
+
+    def _get_upsert_pool(self) -> ThreadPoolExecutor:
+        # One pool per concurrency setting, shared by every repository and namespace view.
+        return get_client_registry().get(
+            ("pinecone-requests", self._upsert_concurrency),
+            lambda: ThreadPoolExecutor(max_workers=self._upsert_concurrency, thread_name_prefix="pinecone-upsert"),
+        )
 
     def delete_document(self, document_id: str) -> None:
         """Delete all vectors tied to a document id using metadata filter."""
@@ -116,18 +233,100 @@ class PineconeRepository:
             logger.exception("Unable to delete document %s from Pinecone", document_id)
             raise RuntimeError("Failed to delete document from vector index") from exc
 
+    def delete_ids(self, vector_ids: Sequence[str]) -> None:
+        """Delete specific vectors by id.
+
+        Ids are split into batches under Pinecone's per-request limit, which run in parallel on the
+        upsert pool; each batch is retried on transient errors.
+        """
+        ids = [vector_id for vector_id in vector_ids if vector_id]
+        if not ids:
+            return
+        batches = [ids[start : start + _DELETE_BATCH_SIZE] for start in range(0, len(ids), _DELETE_BATCH_SIZE)]
+        if len(batches) == 1 or self._upsert_concurrency == 1:
+            for batch in batches:
+                self._delete_batch(batch)
+            return
+        pool = self._get_upsert_pool()
+        for future in [pool.submit(self._delete_batch, batch) for batch in batches]:
+            future.result()
+
+    def _delete_batch(self, ids: List[str]) -> int:
+        return self._with_retries(
+            lambda: self._index.delete(ids=ids, namespace=self.namespace),
+            f"delete of {len(ids)} vectors",
+            "Failed to delete vectors from vector index",
+        )
+
+    def existing_ids(self, vector_ids: Sequence[str]) -> Set[str]:
+        """Return the subset of ``vector_ids`` still present in the namespace (fetched by id in batches)."""
+        return set(self._fetch(vector_ids))
+
+    def fetch_vectors(self, vector_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored ``{"id", "values", "metadata"}`` records by id, values as float32 arrays."""
+        records: Dict[str, Dict[str, Any]] = {}
+        for vector_id, vector in self._fetch(vector_ids).items():
+            values = vector.get("values") if isinstance(vector, dict) else getattr(vector, "values", None)
+            metadata = vector.get("metadata") if isinstance(vector, dict) else getattr(vector, "metadata", None)
+            records[vector_id] = {"id": vector_id, "values": as_vector(values or []), "metadata": dict(metadata or {})}
+        return records
+
+    def _fetch(self, vector_ids: Sequence[str]) -> Dict[str, Any]:
+        ids = [vector_id for vector_id in vector_ids if vector_id]
+        found: Dict[str, Any] = {}
+        try:
+            for start in range(0, len(ids), _FETCH_BATCH_SIZE):
+                response = self._index.fetch(ids=ids[start : start + _FETCH_BATCH_SIZE], namespace=self.namespace)
+                vectors = response.get("vectors") if isinstance(response, dict) else getattr(response, "vectors", None)
+                found.update(vectors or {})
+        except Exception as exc:  # pragma: no cover - depends on remote state
+            logger.exception("Unable to fetch %s vectors from Pinecone", len(ids))
+            raise RuntimeError("Failed to fetch vectors from vector index") from exc
+        return found
+
+    def with_namespace(self, namespace: str) -> "PineconeRepository":
+        """A view of the same index bound to ``namespace``; it shares the client and request pool."""
+        if namespace == self.namespace:
+            return self
+        view = copy.copy(self)
+        view.namespace = namespace
+        return view
+
+    def delete_namespace(self) -> None:
+        """Drop every vector in this namespace; a namespace that no longer exists counts as dropped."""
+        try:
+            self._with_retries(
+                lambda: self._index.delete(delete_all=True, namespace=self.namespace),
+                f"drop of namespace {self.namespace}",
+                "Failed to delete vector namespace",
+            )
+        except RuntimeError as exc:
+            if _status(exc.__cause__) != 404:
+                raise
+
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+        """Merge ``metadata`` into an existing vector's metadata without re-sending its values."""
+        if not vector_id or not metadata:
+            return
+        try:
+            self._index.update(id=vector_id, set_metadata=metadata, namespace=self.namespace)
+        except Exception as exc:  # pragma: no cover - depends on remote state
+            logger.exception("Unable to update metadata for vector %s", vector_id)
+            raise RuntimeError("Failed to update vector metadata") from exc
+
     def query(
         self,
         *,
-        vector: Sequence[float],
+        vector: Any,
         top_k: int = 5,
         document_id: Optional[str] = None,
         include_metadata: bool = True,
         metadata_filter: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Run a similarity search with optional document scoping and metadata filters."""
-        if not vector:
+        if not width(vector):
             return {}
+        prepared = fit_dimension(as_matrix(vector), self.dimension or 0)[0]
         try:
             query_filter: Optional[Dict[str, Any]] = {}
             if metadata_filter:
@@ -136,12 +335,9 @@ class PineconeRepository:
                 query_filter["document_id"] = document_id
             if not query_filter:
                 query_filter = None
-            prepared = self._match_dimension(vector)
-            if prepared is None:
-                raise RuntimeError("Query vector is empty; cannot perform similarity search.")
             return self._index.query(
                 namespace=self.namespace,
-                vector=prepared,
+                vector=to_list(prepared),
                 top_k=top_k,
                 include_metadata=include_metadata,
                 include_values=False,
@@ -150,3 +346,73 @@ class PineconeRepository:
         except Exception as exc:  # pragma: no cover - depends on remote state
             logger.exception("Vector query failed for document %s", document_id)
             raise RuntimeError("Failed to query vector index") from exc
+
+
+def _pack_requests(
+    vectors: Sequence[Dict[str, Any]], *, max_vectors: int, max_bytes: int
+) -> List[Tuple[List[Dict[str, Any]], int]]:
+    """Greedily group vectors (in order) into requests bounded by count and serialized bytes.
+
+    A single vector larger than ``max_bytes`` is sent on its own; ``max_bytes=0`` disables the cap.
+    """
+    requests: List[Tuple[List[Dict[str, Any]], int]] = []
+    current: List[Dict[str, Any]] = []
+    current_bytes = 0
+    for vector in vectors:
+        size = _estimated_request_bytes(vector)
+        if current and (len(current) >= max_vectors or (max_bytes and current_bytes + size > max_bytes)):
+            requests.append((current, current_bytes))
+            current, current_bytes = [], 0
+        if max_bytes and size > max_bytes:
+            logger.warning(
+                "Vector %s serializes to %s bytes, above the %s byte request cap", vector.get("id"), size, max_bytes
+            )
+        current.append(vector)
+        current_bytes += size
+    if current:
+        requests.append((current, current_bytes))
+    return requests
+
+
+def _estimated_request_bytes(vector: Dict[str, Any]) -> int:
+    """JSON size of one vector: exact for id/metadata, an upper bound for the values."""
+    rest = {key: value for key, value in vector.items() if key != "values"}
+    values_bytes = len(',"values":[]') + width(vector.get("values")) * _JSON_BYTES_PER_VALUE
+    return len(json.dumps(rest, separators=(",", ":"), default=str)) + values_bytes
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """True for throttling, 5xx, timeout, and connection errors that are safe to retry."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if _status(exc) in _TRANSIENT_STATUSES:
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in _TRANSIENT_MARKERS)
+
+
+def _is_payload_error(exc: Optional[BaseException]) -> bool:
+    """True when Pinecone rejected a request for its size (413, or a 400 naming the size limit)."""
+    if exc is None:
+        return False
+    message = str(exc).lower()
+    return _status(exc) == 413 or any(marker in message for marker in _PAYLOAD_MARKERS)
+
+
+def _status(exc: Optional[BaseException]) -> Optional[int]:
+    """HTTP status carried by an SDK exception, if any."""
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def _pinecone_client_class():
+    """Import the Pinecone client on first use so importing this module stays cheap."""
+    global Pinecone
+    if Pinecone is None:
+        from pinecone import Pinecone as _Pinecone
+
+        Pinecone = _Pinecone
+    return Pinecone
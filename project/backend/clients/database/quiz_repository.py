@@ -7,12 +7,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Literal, Optional, Protocol
 
-try:  # pragma: no cover - optional dependency
-    from google.cloud import firestore  # type: ignore[import]
-except Exception:  # pragma: no cover - optional dependency missing
-    firestore = None  # type: ignore[assignment]
-
-from .firebase import get_firestore
+from .firebase import get_firestore, load_firestore
 
 DifficultyLevel = Literal["easy", "medium", "hard"]
 QuizMode = Literal["assessment", "practice"]
@@ -46,6 +41,8 @@ class QuizDefinitionRecord:
     assessment_time_limit_minutes: Optional[int]
     assessment_max_attempts: Optional[int]
     embedding_document_id: Optional[str] = None
+    # Vector namespace holding the embedding document (None: the shared namespace).
+    embedding_namespace: Optional[str] = None
     source_filename: Optional[str] = None
     is_published: bool = False
     metadata: Dict[str, object] = field(default_factory=dict)
@@ -64,6 +61,7 @@ class QuizDefinitionRecord:
             "assessment_time_limit_minutes": self.assessment_time_limit_minutes,
             "assessment_max_attempts": self.assessment_max_attempts,
             "embedding_document_id": self.embedding_document_id,
+            "embedding_namespace": self.embedding_namespace,
             "source_filename": self.source_filename,
             "is_published": self.is_published,
             "metadata": self.metadata,
@@ -84,6 +82,7 @@ class QuizDefinitionRecord:
             assessment_time_limit_minutes=int(payload["assessment_time_limit_minutes"]) if payload.get("assessment_time_limit_minutes") is not None else None,
             assessment_max_attempts=int(payload["assessment_max_attempts"]) if payload.get("assessment_max_attempts") is not None else None,
             embedding_document_id=payload.get("embedding_document_id"),
+            embedding_namespace=payload.get("embedding_namespace"),
             source_filename=payload.get("source_filename"),
             is_published=bool(payload.get("is_published", False)),
             metadata=dict(payload.get("metadata", {}) or {}),
@@ -459,7 +458,7 @@ class FirestoreQuizRepository:
         if user_id:
             query = query.where("user_id", "==", user_id)
         try:
-            query = query.order_by("started_at", direction=firestore.Query.DESCENDING)
+            query = query.order_by("started_at", direction=load_firestore().Query.DESCENDING)
         except Exception:
             pass
         if limit:
@@ -612,4 +611,4 @@ class InMemoryQuizRepository:
 
 def _firestore_available() -> bool:
     """Check whether google-cloud-firestore is importable."""
-    return firestore is not None
+    return load_firestore() is not None
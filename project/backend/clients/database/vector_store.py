@@ -0,0 +1,151 @@
+"""Vector store interface shared by ingestion and retrieval, and the backend selector.
+
+``PineconeRepository`` is the hosted backend; ``LocalVectorStore`` keeps vectors in a
+memory-mapped file on the API host for single-node deployments and offline development.
+
+With ``pinecone_namespace_strategy`` set to "document" or "course", each document (or course) gets its
+own namespace derived from ``pinecone_namespace``, so a query only scans the deck it targets and a
+document can be deleted by dropping its namespace."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Protocol, Sequence, Set, Tuple
+
+from .pinecone import PineconeRepository, UpsertReport
+
+if TYPE_CHECKING:  # pragma: no cover - clients.llm imports the ingestion pipeline
+    from clients.llm.settings import Settings
+
+
+class VectorStore(Protocol):
+    """Vector operations required by the ingestion pipeline and the slide retriever.
+
+    ``query`` returns a Pinecone-shaped response: ``{"matches": [{"id", "score", "metadata"}]}``.
+    """
+
+    namespace: str
+    dimension: Optional[int]
+
+    def upsert(self, items: Sequence[Dict[str, Any]]) -> UpsertReport:
+        ...
+
+    def delete_document(self, document_id: str) -> None:
+        ...
+
+    def delete_ids(self, vector_ids: Sequence[str]) -> None:
+        ...
+
+    def existing_ids(self, vector_ids: Sequence[str]) -> Set[str]:
+        """Subset of ``vector_ids`` still stored; used to verify deletes."""
+        ...
+
+    def fetch_vectors(self, vector_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored ``{"id", "values", "metadata"}`` records by id (missing ids are left out)."""
+        ...
+
+    def with_namespace(self, namespace: str) -> "VectorStore":
+        """The same backend bound to another namespace (``self`` when it already matches)."""
+        ...
+
+    def delete_namespace(self) -> None:
+        """Drop every vector in this store's namespace."""
+        ...
+
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any]) -> None:
+        ...
+
+    def query(
+        self,
+        *,
+        vector: Any,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        include_metadata: bool = True,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        ...
+
+
+_local_stores: Dict[Tuple[Optional[str], str], Any] = {}
+_local_stores_lock = threading.Lock()
+_NAMESPACE_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def namespace_for(settings: "Settings", document_id: str, course_id: Optional[str] = None) -> Optional[str]:
+    """Namespace a document belongs in under ``pinecone_namespace_strategy``.
+
+    None means the shared namespace the store was configured with. The "course" strategy falls
+    back to a per-document namespace when the upload names no course.
+    """
+    strategy = getattr(settings, "pinecone_namespace_strategy", "shared")
+    if strategy == "shared" or not document_id:
+        return None
+    base = getattr(settings, "pinecone_namespace", "slides") or "slides"
+    if strategy == "course" and course_id:
+        return f"{base}--course-{_namespace_slug(course_id)}"
+    return document_namespace(base, document_id)
+
+
+def document_namespace(base: str, document_id: str) -> str:
+    """Name of the namespace dedicated to one document (safe to drop when the document is deleted)."""
+    return f"{base}--doc-{_namespace_slug(document_id)}"
+
+
+def _namespace_slug(value: str) -> str:
+    # Namespaces double as local directory names; ids that need escaping get a hash suffix to stay unique.
+    slug = _NAMESPACE_UNSAFE.sub("-", value)[:64]
+    if slug != value:
+        slug = f"{slug}-{hashlib.sha1(value.encode('utf-8')).hexdigest()[:8]}"
+    return slug
+
+
+def get_vector_store(settings: "Settings") -> VectorStore:
+    """Build the configured backend (``vector_store_backend``).
+
+    Local stores are process-wide per (path, namespace) so ingestion and retrieval see the same
+    in-memory index.
+    """
+    if getattr(settings, "vector_store_backend", "pinecone") != "local":
+        return PineconeRepository(settings)
+
+    return open_local_store(
+        getattr(settings, "local_vector_store_path", None),
+        getattr(settings, "pinecone_namespace", "slides") or "slides",
+        dimension=getattr(settings, "pinecone_index_dimension", None),
+        exact_search_limit=getattr(settings, "local_vector_exact_search_limit", 20_000),
+    )
+
+
+def open_local_store(
+    path: Optional[str], namespace: str, *, dimension: Optional[int], exact_search_limit: int
+) -> Any:
+    """Process-wide ``LocalVectorStore`` for (path, namespace), opened on first use."""
+    from .local_vector_store import LocalVectorStore
+
+    key = (str(path) if path else None, namespace)
+    with _local_stores_lock:
+        store = _local_stores.get(key)
+        if store is None:
+            store = LocalVectorStore(
+                path, namespace=namespace, dimension=dimension, exact_search_limit=exact_search_limit
+            )
+            _local_stores[key] = store
+        return store
+
+
+def forget_local_store(path: Optional[str], namespace: str) -> None:
+    """Drop a (path, namespace) entry so the next ``open_local_store`` starts a fresh store."""
+    with _local_stores_lock:
+        _local_stores.pop((str(path) if path else None, namespace), None)
+
+
+def close_vector_stores() -> None:
+    """Persist and close local stores (called on application shutdown); a later call reopens them."""
+    with _local_stores_lock:
+        stores = list(_local_stores.values())
+        _local_stores.clear()
+    for store in stores:
+        store.close()
@@ -0,0 +1,104 @@
+"""Float32 vector helpers shared by ingestion, retrieval, and the vector repository.
+
+Embeddings travel as contiguous NumPy float32 arrays from the provider response to the Pinecone
+request; they become Python lists only at the SDK boundary (``to_list``)."""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+
+
+class _LazyModule:
+    """Stands in for a module until an attribute is first used, keeping it off the cold-start path."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(importlib.import_module(self._name), attribute)
+        setattr(self, attribute, value)  # later lookups skip __getattr__
+        return value
+
+
+def lazy_module(name: str) -> Any:
+    """Return a placeholder that imports ``name`` on first attribute access (e.g. ``np = lazy_module("numpy")``)."""
+    return _LazyModule(name)
+
+
+if not TYPE_CHECKING:
+    np = lazy_module("numpy")
+
+# A dtype name rather than np.float32, so importing this module does not load NumPy.
+DTYPE = "float32"
+
+
+def as_matrix(vectors: Any) -> np.ndarray:
+    """Return ``vectors`` as a C-contiguous 2-D float32 batch (no copy when it already is one).
+
+    Accepts an ndarray, a sequence of lists, or a sequence of 1-D arrays; a single 1-D vector
+    becomes a batch of one.
+    """
+    if not isinstance(vectors, np.ndarray) and len(vectors) == 0:
+        return np.empty((0, 0), dtype=DTYPE)
+    try:
+        matrix = np.asarray(vectors, dtype=DTYPE)
+    except ValueError as exc:
+        raise RuntimeError("Embedding batch contains vectors of different lengths") from exc
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise RuntimeError(f"Expected a 2-D embedding batch, got shape {matrix.shape}")
+    return np.ascontiguousarray(matrix)
+
+
+def as_vector(values: Any) -> np.ndarray:
+    """Return one vector as a 1-D float32 array (no copy when it already is one)."""
+    return np.asarray(values, dtype=DTYPE).reshape(-1)
+
+
+def width(values: Any) -> int:
+    """Length of a vector given as a list or array; 0 for None."""
+    return 0 if values is None else len(values)
+
+
+def fit_dimension(matrix: np.ndarray, dimension: int) -> np.ndarray:
+    """Pad with zeros or truncate every row of ``matrix`` to ``dimension`` columns in one operation."""
+    columns = matrix.shape[1]
+    if not dimension or columns == dimension:
+        return matrix
+    if columns > dimension:
+        return matrix[:, :dimension]
+    fitted = np.zeros((matrix.shape[0], dimension), dtype=DTYPE)
+    fitted[:, :columns] = matrix
+    return fitted
+
+
+def fit_rows(vectors: Sequence[Any], dimension: int) -> List[np.ndarray]:
+    """Fit each vector to ``dimension``, preserving order.
+
+    Vectors are grouped by width; each mismatched group is padded/truncated as one matrix and
+    rows that already match pass through without a copy.
+    """
+    by_width: Dict[int, List[int]] = {}
+    for position, values in enumerate(vectors):
+        by_width.setdefault(width(values), []).append(position)
+    fitted: List[Any] = [None] * len(vectors)
+    for columns, positions in by_width.items():
+        if columns == dimension or not dimension:
+            rows = [as_vector(vectors[position]) for position in positions]
+        else:
+            rows = list(fit_dimension(as_matrix([vectors[position] for position in positions]), dimension))
+        for position, row in zip(positions, rows):
+            fitted[position] = row
+    return fitted
+
+
+def to_list(values: Any) -> List[float]:
+    """Convert a vector to the plain ``List[float]`` the Pinecone SDK serializes."""
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
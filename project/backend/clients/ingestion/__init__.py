@@ -1,5 +1,5 @@
 """Document ingestion pipeline components."""
 
-from .pipeline import SlideIngestionPipeline, IngestionResult
+from .pipeline import SlideIngestionPipeline, IngestionProgress, IngestionResult
 
-__all__ = ["SlideIngestionPipeline", "IngestionResult"]
+__all__ = ["SlideIngestionPipeline", "IngestionProgress", "IngestionResult"]
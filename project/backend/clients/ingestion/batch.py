@@ -0,0 +1,98 @@
+"""Batch ingestion: several uploaded files scheduled through the one shared pipeline, with results
+yielded per file as each finishes.
+
+At most ``file_concurrency`` files are ingested at once, and every file's embedding requests go
+through the same ``EmbeddingService``. Its request semaphore and quota token bucket therefore form
+one budget for the whole batch, instead of each upload competing for quota on its own."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .pipeline import IngestionResult
+
+logger = logging.getLogger(__name__)
+
+# Called as runner(session_id=..., file_path=..., filename=..., metadata=...).
+BatchRunner = Callable[..., Awaitable[IngestionResult]]
+
+
+@dataclass(frozen=True)
+class BatchFile:
+    """One spooled upload in a batch; ``error`` marks a file rejected before ingestion (e.g. too large)."""
+
+    filename: str
+    file_path: Optional[Path] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class BatchFileResult:
+    """Outcome for one file; ``index`` is its position in the upload."""
+
+    index: int
+    filename: str
+    status: str  # "indexed" | "failed"
+    result: Optional[IngestionResult] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"index": self.index, "filename": self.filename, "status": self.status}
+        if self.result is not None:
+            payload.update(asdict(self.result))
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+async def ingest_batch(
+    runner: BatchRunner,
+    files: Sequence[BatchFile],
+    *,
+    session_id: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    file_concurrency: int = 2,
+) -> AsyncIterator[BatchFileResult]:
+    """Ingest ``files`` with ``runner``, yielding each file's result in completion order.
+
+    The batch owns the spooled files and deletes each one when its ingest finishes. A failed file
+    is reported and the rest continue. Closing the iterator early (e.g. the client disconnected
+    from a stream) cancels the files still running and removes every remaining spool file.
+    """
+    slots = asyncio.Semaphore(max(file_concurrency, 1))
+
+    async def _ingest(index: int, upload: BatchFile) -> BatchFileResult:
+        if upload.error is not None or upload.file_path is None:
+            return BatchFileResult(index, upload.filename, "failed", error=upload.error or "No file content")
+        try:
+            async with slots:
+                result = await runner(
+                    session_id=session_id,
+                    file_path=upload.file_path,
+                    filename=upload.filename,
+                    metadata=dict(metadata or {}),
+                )
+        except Exception as exc:
+            logger.warning("Batch ingest of %s failed: %s", upload.filename, exc)
+            return BatchFileResult(index, upload.filename, "failed", error=str(exc))
+        finally:
+            upload.file_path.unlink(missing_ok=True)
+        return BatchFileResult(index, upload.filename, "indexed", result=result)
+
+    tasks: List["asyncio.Task[BatchFileResult]"] = [
+        asyncio.ensure_future(_ingest(index, upload)) for index, upload in enumerate(files)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for upload in files:
+            if upload.file_path is not None:
+                upload.file_path.unlink(missing_ok=True)
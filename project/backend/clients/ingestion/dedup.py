@@ -0,0 +1,103 @@
+"""Near-duplicate detection for ingestion chunks: exact hashes of whitespace- and case-normalized
+text plus MinHash signatures over word shingles with LSH banding, so repeated boilerplate (footers, agenda and
+"Questions?" slides, recaps) is embedded and stored once."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class ChunkDeduplicator:
+    """Streaming near-duplicate index: ``check`` each text once, in document order.
+
+    A text whose normalized form (whitespace collapsed, case folded, symbols kept so ``x > y`` and
+    ``x < y`` stay distinct) was seen before, or whose estimated Jaccard similarity to a kept
+    text (MinHash over ``shingle_size``-word shingles) is at least ``threshold``, is reported as a
+    duplicate of that earlier entry; anything else is kept and indexed. Texts shorter than one
+    shingle only match exactly.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self._threshold = threshold
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._shingle_size = max(shingle_size, 1)
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._exact: Dict[str, int] = {}
+        self._signatures: List[Optional[Tuple[int, ...]]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def check(self, text: str) -> Optional[int]:
+        """Return the index of the kept text ``text`` duplicates, or None after keeping it."""
+        normalized = _SPACE_RE.sub(" ", text).strip().casefold()
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        existing = self._exact.get(digest)
+        if existing is not None:
+            return existing
+
+        tokens = _WORD_RE.findall(normalized)
+        signature = self._signature(tokens) if len(tokens) >= self._shingle_size else None
+        if signature is not None:
+            match = self._near_match(signature)
+            if match is not None:
+                return match
+
+        index = len(self._signatures)
+        self._exact[digest] = index
+        self._signatures.append(signature)
+        if signature is not None:
+            for band in self._band_keys(signature):
+                self._buckets.setdefault(band, []).append(index)
+        return None
+
+    def _near_match(self, signature: Tuple[int, ...]) -> Optional[int]:
+        # LSH: only entries sharing at least one band are compared; the closest (earliest on ties) wins.
+        candidates = {index for band in self._band_keys(signature) for index in self._buckets.get(band, ())}
+        best: Optional[int] = None
+        best_score = 0.0
+        for candidate in sorted(candidates):
+            score = _similarity(signature, self._signatures[candidate])  # type: ignore[arg-type]
+            if score >= self._threshold and score > best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _signature(self, tokens: Sequence[str]) -> Tuple[int, ...]:
+        size = self._shingle_size
+        shingles = {" ".join(tokens[start : start + size]) for start in range(len(tokens) - size + 1)}
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in shingles
+        ]
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes) for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        rows = self._rows
+        return [(band, signature[band * rows : (band + 1) * rows]) for band in range(self._bands)]
+
+
+def _similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: the share of MinHash slots that agree."""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
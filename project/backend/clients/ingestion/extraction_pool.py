@@ -0,0 +1,43 @@
+"""Process pool for CPU-bound document extraction, so parsing a large PPTX/PDF runs outside the API
+worker's interpreter and cannot starve the event loop (chat streams) of the GIL."""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Return the shared extraction pool sized to ``workers``, or None when ``workers`` is 0.
+
+    Workers are spawned rather than forked: the API process runs threads (warm-up, to_thread
+    calls, gRPC clients) and forking a threaded process can deadlock the child.
+    """
+    global _pool, _pool_workers
+    if workers <= 0:
+        return None
+    if _pool is not None and _pool_workers == workers:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            previous = _pool
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+            if previous is not None:
+                previous.shutdown(wait=False, cancel_futures=False)
+        return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Stop the shared pool (called on application shutdown); a later request recreates it."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool, _pool_workers = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
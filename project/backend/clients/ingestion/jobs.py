@@ -0,0 +1,269 @@
+"""Background ingestion jobs: uploads are queued and processed by a bounded pool of asyncio workers
+so the HTTP request returns immediately, while stage and chunk progress are tracked per job and
+persisted through the job repository for polling."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import uuid4
+
+from clients.database.job_repository import UNFINISHED_STATUSES, IngestionJobRecord, JobRepository
+
+from .pipeline import IngestionProgress, IngestionResult
+
+logger = logging.getLogger(__name__)
+
+# Called as runner(session_id=..., file_path=..., filename=..., metadata=..., progress=...).
+IngestRunner = Callable[..., Awaitable[IngestionResult]]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the ingestion backlog is at capacity."""
+
+
+class _QueuedJob:
+    __slots__ = ("job_id", "file_path", "metadata")
+
+    def __init__(self, job_id: str, file_path: Path, metadata: Optional[Dict[str, Any]]) -> None:
+        self.job_id = job_id
+        self.file_path = file_path
+        self.metadata = metadata
+
+
+class IngestionJobManager:
+    """Queues ingestion work and runs it on ``workers`` concurrent asyncio tasks.
+
+    The manager owns submitted spool files and deletes them when a job finishes. Running jobs are
+    served from memory so polling sees live counters; finished jobs are read back from the
+    repository, which is written on every stage change and at completion. Jobs left queued or
+    running by a process that died are failed by ``recover_orphans`` on the next startup.
+    """
+
+    def __init__(
+        self,
+        runner: IngestRunner,
+        repository: JobRepository,
+        *,
+        workers: int = 2,
+        max_queued: int = 32,
+        owner: Optional[str] = None,
+    ) -> None:
+        self._runner = runner
+        self._owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._repository = repository
+        self._worker_count = max(workers, 1)
+        self._max_queued = max(max_queued, 1)
+        self._active: Dict[str, IngestionJobRecord] = {}
+        self._last_write: Dict[str, "asyncio.Future[None]"] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[_QueuedJob]"] = None
+        self._workers: list["asyncio.Task[None]"] = []
+
+    async def submit(
+        self,
+        *,
+        session_id: str,
+        filename: str,
+        file_path: Path,
+        metadata: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None,
+    ) -> IngestionJobRecord:
+        """Record a queued job and hand it to the worker pool; raises JobQueueFullError when saturated."""
+        queue = self._ensure_workers()
+        if queue.full():
+            raise JobQueueFullError("Ingestion queue is full; retry shortly")
+        record = IngestionJobRecord(
+            job_id=uuid4().hex,
+            session_id=session_id,
+            filename=filename,
+            document_id=document_id,
+            owner=self._owner,
+            spool_path=str(file_path),
+        )
+        self._active[record.job_id] = record
+        await asyncio.to_thread(self._repository.save_job, record)
+        queue.put_nowait(_QueuedJob(record.job_id, Path(file_path), metadata))
+        return record
+
+    def get(self, job_id: str) -> Optional[IngestionJobRecord]:
+        """Return live state for running jobs, otherwise the persisted record."""
+        record = self._active.get(job_id)
+        if record is not None:
+            return record
+        return self._repository.load_job(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self._worker_count,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "active": len(self._active),
+            "max_queued": self._max_queued,
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel the worker pool and record running and still-queued jobs as failed."""
+        queue = self._queue
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+        while queue is not None and not queue.empty():
+            job = queue.get_nowait()
+            job.file_path.unlink(missing_ok=True)
+            record = self._active.pop(job.job_id, None)
+            if record is not None:
+                failed = replace(
+                    record, status="failed", error="Server shut down before the job started", finished_at=_now()
+                )
+                await asyncio.to_thread(self._repository.save_job, failed)
+
+    def recover_orphans(self, *, stale_after_seconds: float) -> int:
+        """Fail unfinished jobs whose owning process is gone and delete their spool files.
+
+        Jobs owned by a process on this host are orphaned once that pid is no longer alive. Jobs
+        from other hosts (or with no owner) cannot be checked that way and are only failed once
+        they are older than ``stale_after_seconds``; 0 leaves them alone. Returns the number failed.
+        """
+        host = self._owner.rpartition(":")[0]
+        cutoff = _now() - timedelta(seconds=stale_after_seconds) if stale_after_seconds > 0 else None
+        recovered = 0
+        for record in self._repository.list_jobs(UNFINISHED_STATUSES):
+            if record.job_id in self._active:
+                continue
+            owner_host, _, owner_pid = (record.owner or "").rpartition(":")
+            local = owner_host == host and owner_pid.isdigit()
+            if local:
+                orphaned = int(owner_pid) == os.getpid() or not _process_alive(int(owner_pid))
+            else:
+                orphaned = cutoff is not None and (record.started_at or record.created_at) < cutoff
+            if not orphaned:
+                continue
+            if local and record.spool_path:
+                Path(record.spool_path).unlink(missing_ok=True)
+            self._repository.save_job(
+                replace(
+                    record,
+                    status="failed",
+                    error="Ingestion was interrupted by a server restart",
+                    finished_at=_now(),
+                )
+            )
+            recovered += 1
+        if recovered:
+            logger.warning("Marked %d orphaned ingestion job(s) as failed", recovered)
+        return recovered
+
+    def _ensure_workers(self) -> "asyncio.Queue[_QueuedJob]":
+        # Workers are bound to the loop that first submits; rebuild them if the loop changed.
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._max_queued)
+            self._workers = [
+                loop.create_task(self._worker(self._queue), name=f"ingestion-worker-{index}")
+                for index in range(self._worker_count)
+            ]
+        return self._queue
+
+    async def _worker(self, queue: "asyncio.Queue[_QueuedJob]") -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            except Exception:  # pragma: no cover - _run records failures itself
+                logger.exception("Ingestion worker crashed while running job %s", job.job_id)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: _QueuedJob) -> None:
+        record = replace(self._active[job.job_id], status="running", stage="extracting", started_at=_now())
+        self._update(record, persist=True)
+
+        def _on_progress(progress: IngestionProgress) -> None:
+            current = self._active[job.job_id]
+            self._update(
+                replace(
+                    current,
+                    stage=progress.stage,
+                    slides_extracted=progress.slides_extracted,
+                    chunks_queued=progress.chunks_queued,
+                    chunks_unchanged=progress.chunks_unchanged,
+                    chunks_embedded=progress.chunks_embedded,
+                    chunks_upserted=progress.chunks_upserted,
+                    extraction_complete=progress.extraction_complete,
+                ),
+                persist=progress.stage != current.stage,
+            )
+
+        final: Optional[IngestionJobRecord] = None
+        try:
+            result = await self._runner(
+                session_id=record.session_id,
+                file_path=job.file_path,
+                filename=record.filename,
+                metadata=job.metadata,
+                progress=_on_progress,
+            )
+        except Exception as exc:
+            logger.warning("Ingestion job %s failed: %s", job.job_id, exc)
+            final = replace(self._active[job.job_id], status="failed", error=str(exc), finished_at=_now())
+        else:
+            final = replace(
+                self._active[job.job_id],
+                status="succeeded",
+                stage="done",
+                document_id=result.document_id,
+                result=asdict(result),
+                finished_at=_now(),
+            )
+        finally:
+            job.file_path.unlink(missing_ok=True)
+            if final is None:
+                # Cancelled mid-run (e.g. worker shutdown): record it rather than leave it "running".
+                final = replace(
+                    self._active[job.job_id], status="failed", error="Ingestion was cancelled", finished_at=_now()
+                )
+            self._update(final, persist=True)
+            last_write = self._last_write.pop(job.job_id)
+            try:
+                await asyncio.gather(last_write, return_exceptions=True)
+            finally:
+                self._active.pop(job.job_id, None)
+
+    def _update(self, record: IngestionJobRecord, *, persist: bool) -> None:
+        self._active[record.job_id] = record
+        if persist:
+            # Chain writes per job so an older stage snapshot can never land after a newer one.
+            previous = self._last_write.get(record.job_id)
+            self._last_write[record.job_id] = asyncio.ensure_future(self._save_after(previous, record))
+
+    async def _save_after(self, previous: Optional["asyncio.Future[None]"], record: IngestionJobRecord) -> None:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await asyncio.to_thread(self._repository.save_job, record)
+        except Exception:
+            logger.exception("Unable to persist ingestion job %s", record.job_id)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
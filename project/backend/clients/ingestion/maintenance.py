@@ -0,0 +1,104 @@
+"""Maintenance sweep that removes indexed documents nobody needs any more: documents whose manifest
+is older than a cutoff and/or that no quiz definition references."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Collection, Dict, List, Optional, Sequence
+
+from clients.database.manifest_repository import DocumentManifest
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .pipeline import SlideIngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SweepReport:
+    """Outcome of one sweep; with ``dry_run`` nothing in ``selected`` was deleted."""
+
+    dry_run: bool
+    scanned: int
+    selected: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "scanned": self.scanned,
+            "selected": list(self.selected),
+            "deleted": list(self.deleted),
+            "failed": dict(self.failed),
+        }
+
+
+def select_documents(
+    manifests: Sequence[DocumentManifest],
+    *,
+    referenced_document_ids: Collection[str],
+    older_than: Optional[timedelta] = None,
+    unreferenced_only: bool = True,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Ids of documents matching every given criterion.
+
+    Manifests without a known ``updated_at`` never count as old. At least one criterion is
+    required so a sweep cannot select every document by accident.
+    """
+    if older_than is None and not unreferenced_only:
+        raise ValueError("A sweep needs an age cutoff, the unreferenced criterion, or both")
+    cutoff = (now or datetime.now(timezone.utc)) - older_than if older_than is not None else None
+    selected: List[str] = []
+    for manifest in manifests:
+        if unreferenced_only and manifest.document_id in referenced_document_ids:
+            continue
+        if cutoff is not None and (manifest.updated_at is None or manifest.updated_at >= cutoff):
+            continue
+        selected.append(manifest.document_id)
+    return sorted(selected)
+
+
+def sweep_documents(
+    pipeline: "SlideIngestionPipeline",
+    *,
+    referenced_document_ids: Collection[str],
+    older_than: Optional[timedelta] = None,
+    unreferenced_only: bool = True,
+    dry_run: bool = True,
+    now: Optional[datetime] = None,
+) -> SweepReport:
+    """Delete (or with ``dry_run`` only list) the documents chosen by ``select_documents``.
+
+    A deleting sweep requires ``older_than``: without it every unreferenced document would go,
+    including chat-only uploads and decks still being ingested for a quiz that is not saved yet.
+    One failed delete does not stop the sweep; it is reported under ``failed``.
+    """
+    if not dry_run and older_than is None:
+        raise ValueError("A deleting sweep needs an age cutoff (older_than) so recent uploads are kept")
+    manifests = pipeline.list_documents()
+    selected = select_documents(
+        manifests,
+        referenced_document_ids=referenced_document_ids,
+        older_than=older_than,
+        unreferenced_only=unreferenced_only,
+        now=now,
+    )
+    if dry_run:
+        return SweepReport(dry_run=True, scanned=len(manifests), selected=selected)
+
+    deleted: List[str] = []
+    failed: Dict[str, str] = {}
+    for document_id in selected:
+        try:
+            pipeline.delete_document(document_id)
+        except Exception as exc:
+            logger.warning("Sweep could not delete document %s: %s", document_id, exc)
+            failed[document_id] = str(exc)
+        else:
+            deleted.append(document_id)
+    logger.info("Document sweep deleted %s of %s selected documents", len(deleted), len(selected))
+    return SweepReport(dry_run=False, scanned=len(manifests), selected=selected, deleted=deleted, failed=failed)
@@ -0,0 +1,83 @@
+"""Moves already-indexed documents into the namespaces ``pinecone_namespace_strategy`` assigns them,
+e.g. after switching from the shared namespace to per-document or per-course namespaces."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from clients.database.vector_store import namespace_for
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from clients.llm.settings import Settings
+
+    from .pipeline import SlideIngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MigrationReport:
+    """Planned (``dry_run``) or completed moves as document id -> (source, target) namespace."""
+
+    dry_run: bool
+    moves: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    vectors_moved: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "moves": {document_id: {"from": source, "to": target} for document_id, (source, target) in self.moves.items()},
+            "vectors_moved": self.vectors_moved,
+            "failed": dict(self.failed),
+        }
+
+
+def plan_migration(
+    pipeline: "SlideIngestionPipeline", settings: "Settings", *, document_id: Optional[str] = None
+) -> Dict[str, Tuple[str, str]]:
+    """Documents whose recorded namespace differs from the one the current strategy assigns."""
+    base = getattr(settings, "pinecone_namespace", "slides") or "slides"
+    moves: Dict[str, Tuple[str, str]] = {}
+    for manifest in pipeline.list_documents():
+        if document_id and manifest.document_id != document_id:
+            continue
+        source = manifest.namespace or base
+        target = namespace_for(settings, manifest.document_id, manifest.course_id) or base
+        if source != target:
+            moves[manifest.document_id] = (source, target)
+    return dict(sorted(moves.items()))
+
+
+def migrate_namespaces(
+    pipeline: "SlideIngestionPipeline",
+    settings: "Settings",
+    *,
+    document_id: Optional[str] = None,
+    dry_run: bool = True,
+) -> MigrationReport:
+    """Move every planned document (or just ``document_id``) with ``SlideIngestionPipeline.move_document``.
+
+    Quiz definitions still point at the old namespaces afterwards; callers update them from
+    ``moves`` (the API endpoint does). A failed move is reported and the rest continue.
+    """
+    planned = plan_migration(pipeline, settings, document_id=document_id)
+    if dry_run:
+        return MigrationReport(dry_run=True, moves=planned)
+
+    moves: Dict[str, Tuple[str, str]] = {}
+    failed: Dict[str, str] = {}
+    vectors_moved = 0
+    for planned_id, (source, target) in planned.items():
+        try:
+            vectors_moved += pipeline.move_document(planned_id, target)
+        except Exception as exc:
+            logger.warning("Could not move document %s from %s to %s: %s", planned_id, source, target, exc)
+            failed[planned_id] = str(exc)
+        else:
+            moves[planned_id] = (source, target)
+    logger.info("Namespace migration moved %s documents (%s vectors)", len(moves), vectors_moved)
+    return MigrationReport(dry_run=False, moves=moves, vectors_moved=vectors_moved, failed=failed)
+
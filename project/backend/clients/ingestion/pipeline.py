@@ -1,25 +1,76 @@
 """Slide/document ingestion pipeline for vector search: extracts text from PPTX/PDF, chunks,
-embeds via Google GenAI, and upserts to Pinecone with dimension validation."""
+embeds via Google GenAI, and upserts to Pinecone with dimension validation. Stages stream into
+each other through bounded asyncio queues so embedding and upserts overlap. Embeddings are carried
+as float32 NumPy batches from the provider response to the Pinecone request."""
 
 from __future__ import annotations
 
 import io
+import hashlib
+import json
 import logging
 import asyncio
-from dataclasses import dataclass
-from typing import Any, Dict, Iterator, List, Optional, Sequence
+import os
+import posixpath
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from xml.etree import ElementTree
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
-try:  # pragma: no cover - dependency optional during local testing
-    from pypdf import PdfReader as _PdfReader  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover - executed when package missing
-    _PdfReader = None  # type: ignore[assignment]
+from clients.database.chunk_store import ChunkStore, StoredChunk, get_chunk_store
+from clients.database.embedding_cache import EmbeddingCache, get_embedding_cache
+from clients.database.manifest_repository import (
+    DocumentManifest,
+    FirestoreManifestRepository,
+    InMemoryManifestRepository,
+    ManifestRepository,
+)
+from clients.database.pinecone import UpsertReport
+from clients.database.vector_store import VectorStore, document_namespace, get_vector_store, namespace_for
+from clients.database.vectors import DTYPE, as_matrix, lazy_module
+if TYPE_CHECKING:  # pragma: no cover - clients.llm imports the ingestion pipeline
+    import numpy as np
 
-from clients.database.pinecone import PineconeRepository
-from clients.llm.settings import Settings
+    from clients.llm.settings import Settings
+else:
+    np = lazy_module("numpy")
+
+from .dedup import ChunkDeduplicator
+from .extraction_pool import get_extraction_pool
+from .rate_limit import PAYLOAD_TOO_LARGE, RATE_LIMITED, TokenBucket, backoff_delay, classify_error
 
 logger = logging.getLogger(__name__)
 
-PdfReader = _PdfReader
+_PIPELINE_STAGES = ("extract", "chunk", "embed", "upsert")
+# Metadata kept on Pinecone vectors when the local chunk store holds text and everything else.
+_FILTERABLE_METADATA = (
+    "document_id",
+    "session_id",
+    "slide_id",
+    "slide_number",
+    "page_number",
+    "chunk_index",
+    "source_type",
+)
+# Metadata that only says where a chunk sits; left out of the content hash so moves are not edits.
+_POSITIONAL_METADATA = ("slide_number", "chunk_index", "page_number", "source_slides", "duplicate_count")
+_PROGRESS_STAGES = ("extracting", "embedding", "upserting", "finalizing")
+_END_OF_STREAM = object()
+# Id deletes can take a moment to become visible; re-check (and re-delete) this many times.
+_DELETE_VERIFY_ATTEMPTS = 3
+# Vectors fetched and re-upserted per round trip when moving a document between namespaces.
+_MOVE_BATCH_SIZE = 100
+
+# In-memory bytes (tests, small payloads) or a path to a spooled upload on disk.
+DocumentSource = Union[bytes, str, "os.PathLike[str]"]
+
+# pypdf is imported on the first PDF ingest by _pdf_reader_class(); tests may patch this name.
+PdfReader = None
 
 
 @dataclass
@@ -31,6 +82,10 @@ class SlideChunk:
     slide_title: Optional[str]
     chunk_index: int
     source_type: str = "slide"
+    # Every slide/page this text appeared on, set when near-duplicate copies were folded into it.
+    source_slides: List[int] = field(default_factory=list)
+    # Id of the vector holding this chunk, assigned by the ingest run; positional when unset.
+    vector_id: Optional[str] = field(default=None, compare=False)
 
     def metadata(self) -> Dict[str, Any]:
         """Return metadata describing the origin of this chunk (slide/page, index, title)."""
@@ -40,10 +95,26 @@ class SlideChunk:
             "slide_title": self.slide_title,
             "source_type": self.source_type,
         }
+        if self.source_type == "page":
+            payload["page_number"] = self.slide_number
+        if self.source_slides:
+            payload.update(self.provenance())
+        return payload
+
+    def position(self) -> Dict[str, Any]:
+        """The positional part of ``metadata()``; rewritten in place when a chunk moves."""
+        payload: Dict[str, Any] = {"slide_number": self.slide_number, "chunk_index": self.chunk_index}
         if self.source_type == "page":
             payload["page_number"] = self.slide_number
         return payload
 
+    def provenance(self) -> Dict[str, Any]:
+        """Duplicate provenance in Pinecone-compatible form (metadata lists must hold strings)."""
+        return {
+            "source_slides": [str(number) for number in self.source_slides],
+            "duplicate_count": len(self.source_slides) - 1,
+        }
+
 
 @dataclass
 class IngestionResult:
@@ -53,12 +124,62 @@ class IngestionResult:
     slide_count: int
     chunk_count: int
     namespace: str
+    # Busy seconds per stage (extract/chunk/embed/upsert) and wall-clock seconds for the whole run;
+    # stages overlap, so the stage totals can exceed elapsed_seconds.
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+    chunks_per_second: float = 0.0
+    # Incremental re-ingestion: chunks embedded (new or changed), skipped as unchanged, and vector
+    # ids deleted because they no longer exist in the document.
+    added_count: int = 0
+    unchanged_count: int = 0
+    removed_count: int = 0
+    # Near-duplicate chunks folded into an earlier copy instead of being embedded and stored.
+    embeddings_avoided: int = 0
+    # Pinecone upsert throughput over the time spent in upsert calls.
+    upsert_requests: int = 0
+    upsert_bytes: int = 0
+    upsert_vectors_per_second: float = 0.0
+    upsert_bytes_per_second: float = 0.0
+
+
+@dataclass(frozen=True)
+class IngestionProgress:
+    """Point-in-time counters reported to an ``ingest(progress=...)`` callback."""
+
+    stage: str  # "extracting" | "embedding" | "upserting" | "finalizing"
+    slides_extracted: int
+    chunks_queued: int
+    chunks_unchanged: int
+    chunks_embedded: int
+    chunks_upserted: int
+    extraction_complete: bool
+
+
+ProgressCallback = Callable[[IngestionProgress], None]
+
+# A picklable unit of extraction work run in the process pool; results are merged in task order.
+ExtractionTask = Callable[[], List[SlideChunk]]
 
 
 class SlideExtractor:
     """Pulls raw text (and titles) from a slide deck."""
 
-    def extract(self, file_bytes: bytes) -> List[SlideChunk]:
+    def extract(self, file_bytes: DocumentSource) -> List[SlideChunk]:
+        return list(self.iter_slides(file_bytes))
+
+    def extraction_tasks(self, source: DocumentSource, *, pages_per_task: int) -> Optional[List[ExtractionTask]]:
+        """Split extraction into process-pool tasks, or return None to stream ``iter_slides`` in-process.
+
+        python-pptx has to load the whole package to reach any slide, so a deck is one task.
+        Subclasses that override ``iter_slides`` keep in-process extraction.
+        """
+        if type(self).iter_slides is not SlideExtractor.iter_slides:
+            return None
+        return [partial(_extract_all, type(self), source)]
+
+    def iter_slides(self, file_bytes: DocumentSource) -> Iterator[SlideChunk]:
+        """Yield one chunk per non-empty slide as the deck is walked."""
         try:
             from pptx import Presentation  # type: ignore
         except ModuleNotFoundError as exc:  # pragma: no cover - import guard
@@ -66,8 +187,8 @@ class SlideExtractor:
                 "python-pptx is required to ingest PowerPoint files. Install the dependency to continue."
             ) from exc
 
-        presentation = Presentation(io.BytesIO(file_bytes))
-        chunks: List[SlideChunk] = []
+        with _open_document(file_bytes) as handle:
+            presentation = Presentation(handle)
         for slide_number, slide in enumerate(presentation.slides, start=1):
             title = None
             if slide.shapes.title:
@@ -85,47 +206,96 @@ class SlideExtractor:
             if not slide_text:
                 continue
 
-            chunks.append(
-                SlideChunk(
+            yield SlideChunk(
+                slide_number=slide_number,
+                text=slide_text,
+                slide_title=title,
+                chunk_index=0,
+                source_type="slide",
+            )
+
+
+class SlideXMLExtractor(SlideExtractor):
+    """Reads slide text straight from the PPTX package instead of building python-pptx's object model.
+
+    Slides are visited in presentation order (``p:sldIdLst``) and each ``slideN.xml`` is
+    stream-parsed with ``iterparse``, keeping only the shape being read in memory. Output matches
+    ``SlideExtractor``: one chunk per slide holding the stripped text of each top-level ``p:sp`` shape
+    (paragraphs joined by newlines, ``a:br`` as ``\\v``) and the index-0 placeholder as the title.
+    """
+
+    def extraction_tasks(self, source: DocumentSource, *, pages_per_task: int) -> Optional[List[ExtractionTask]]:
+        if type(self).iter_slides is not SlideXMLExtractor.iter_slides:
+            return None
+        return [partial(_extract_all, type(self), source)]
+
+    def iter_slides(self, file_bytes: DocumentSource) -> Iterator[SlideChunk]:
+        with _open_document(file_bytes) as handle, zipfile.ZipFile(handle) as package:
+            for slide_number, part_name in enumerate(_pptx_slide_parts(package), start=1):
+                with package.open(part_name) as part:
+                    title, fragments = _parse_slide_xml(part)
+                slide_text = "\n".join(fragments).strip()
+                if not slide_text:
+                    continue
+                yield SlideChunk(
                     slide_number=slide_number,
                     text=slide_text,
                     slide_title=title,
                     chunk_index=0,
                     source_type="slide",
                 )
-            )
-        return chunks
 
 
 class PDFExtractor:
     """Extracts page-level text from a PDF document."""
 
-    def extract(self, file_bytes: bytes) -> List[SlideChunk]:
-        if PdfReader is None:
-            raise RuntimeError(
-                "pypdf is required to ingest PDF files. Install the dependency to continue."
-            )
+    def extract(self, file_bytes: DocumentSource) -> List[SlideChunk]:
+        return list(self.iter_slides(file_bytes))
 
-        reader = PdfReader(io.BytesIO(file_bytes))
-        chunks: List[SlideChunk] = []
-        for page_number, page in enumerate(reader.pages, start=1):
-            try:
-                page_text = (page.extract_text() or "").strip()
-            except Exception:  # pragma: no cover - defensive guard for uncommon PDFs
-                logger.exception("Failed extracting text from PDF page %s", page_number)
-                continue
-            if not page_text:
-                continue
-            chunks.append(
-                SlideChunk(
+    def extraction_tasks(self, source: DocumentSource, *, pages_per_task: int) -> Optional[List[ExtractionTask]]:
+        """Split the PDF into page ranges of ``pages_per_task`` that are parsed in parallel."""
+        if type(self).iter_slides is not PDFExtractor.iter_slides:
+            return None
+        pages_per_task = max(pages_per_task, 1)
+        return [
+            partial(_extract_pdf_pages, type(self), source, start, start + pages_per_task)
+            for start in range(0, self.page_count(source), pages_per_task)
+        ]
+
+    def page_count(self, source: DocumentSource) -> int:
+        with _open_document(source) as handle:
+            return len(_pdf_reader_class()(handle).pages)
+
+    def extract_pages(self, source: DocumentSource, start: int, stop: int) -> List[SlideChunk]:
+        """Extract pages ``start``..``stop - 1`` (0-based); chunks keep their 1-based page numbers."""
+        return list(self._iter_pages(source, start, stop))
+
+    def iter_slides(self, file_bytes: DocumentSource) -> Iterator[SlideChunk]:
+        """Yield one chunk per non-empty page, extracting text lazily page by page."""
+        return self._iter_pages(file_bytes, 0, None)
+
+    def _iter_pages(self, file_bytes: DocumentSource, start: int, stop: Optional[int]) -> Iterator[SlideChunk]:
+        # pypdf seeks into the stream per object, so a spooled file stays on disk while we iterate.
+        with _open_document(file_bytes) as handle:
+            reader = _pdf_reader_class()(handle)
+            pages = reader.pages
+            stop = len(pages) if stop is None else min(stop, len(pages))
+            for page_number in range(start + 1, stop + 1):
+                page = pages[page_number - 1]
+                try:
+                    page_text = (page.extract_text() or "").strip()
+                except Exception:  # pragma: no cover - defensive guard for uncommon PDFs
+                    logger.exception("Failed extracting text from PDF page %s", page_number)
+                    continue
+                if not page_text:
+                    continue
+                yield SlideChunk(
                     slide_number=page_number,
                     text=page_text,
                     slide_title=f"Page {page_number}",
                     chunk_index=0,
                     source_type="page",
                 )
-            )
-        return chunks
 
 
 class SlideChunker:
@@ -166,7 +336,22 @@ class SlideChunker:
 class EmbeddingService:
     """Generates embeddings using the configured provider."""
 
-    def __init__(self, settings: Settings) -> None:
+    # First retry backoff; doubles per retry with up to 50% jitter, capped at _max_backoff_seconds.
+    _base_backoff_seconds = 1.0
+    _max_backoff_seconds = 60.0
+
+    def __init__(
+        self,
+        settings: Settings,
+        client: Optional[Any] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self._settings = settings
+        self._configure_limits(settings)
+        self._cache = cache if cache is not None else get_embedding_cache(settings)
+        if client is not None:
+            self._client = client
+            return
         if not settings.google_api_key:
             raise RuntimeError(
                 "GOOGLE_API_KEY is required to generate embeddings. Update your .env with a valid key."
@@ -178,107 +363,562 @@ class EmbeddingService:
                 "langchain-google-genai is required for embeddings. Install the dependency to continue."
             ) from exc
 
-        self._settings = settings
         self._client = GoogleGenerativeAIEmbeddings(
             model=settings.google_embeddings_model_name,
             google_api_key=settings.google_api_key,
         )
 
-    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
-        """Generate embeddings for a batch of texts using Google Generative AI embeddings."""
+    def _configure_limits(self, settings: Settings) -> None:
+        """Set up request concurrency, the quota token bucket, and adaptive retry/backoff state."""
+        self._concurrency = max(getattr(settings, "embed_concurrency", 4) or 1, 1)
+        requests_per_minute = getattr(settings, "embed_requests_per_minute", 0) or 0
+        self._limiter: Optional[TokenBucket] = (
+            TokenBucket(requests_per_minute / 60.0, capacity=self._concurrency)
+            if requests_per_minute > 0
+            else None
+        )
+        self._max_retries = max(getattr(settings, "embed_max_retries", 5) or 0, 0)
+        self._semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        # Largest number of texts sent in one request; halved on 429s and payload-size errors, grown back after successes.
+        self._request_size: Optional[int] = None
+        self._max_request_size: Optional[int] = None
+        self._successes_since_shrink = 0
+        self._requests = 0
+        self._rate_limited = 0
+        self._retried = 0
+        self._split_requests = 0
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Generate embeddings for a batch of texts as one ``(len(texts), dimension)`` float32 array.
+
+        Texts already in the embedding cache are served from disk; the rest are split into
+        requests of at most the current adaptive request size, which run concurrently (bounded by
+        ``embed_concurrency``) and are paced by the quota token bucket. Rows keep input order.
+        """
         payload = list(texts)
         if not payload:
-            return []
+            return np.empty((0, 0), dtype=DTYPE)
+        cache = getattr(self, "_cache", None)
+        if cache is None:
+            return await self._embed_uncached(payload)
+
+        cached = await asyncio.to_thread(cache.get_many, payload)
+        missing = [index for index, vector in enumerate(cached) if vector is None]
+        if not missing:
+            return as_matrix(cached)
+        fresh = await self._embed_uncached([payload[index] for index in missing])
+        await asyncio.to_thread(cache.put_many, [payload[index] for index in missing], fresh)
+        if len(missing) == len(payload):
+            return fresh
+        hits = [index for index, vector in enumerate(cached) if vector is not None]
+        vectors = np.empty((len(payload), fresh.shape[1]), dtype=DTYPE)
+        vectors[missing] = fresh
+        vectors[hits] = as_matrix([cached[index] for index in hits])
+        return vectors
+
+    async def _embed_uncached(self, payload: List[str]) -> np.ndarray:
+        if self._max_request_size is None or len(payload) > self._max_request_size:
+            self._max_request_size = len(payload)
+        size = min(self._request_size or len(payload), len(payload))
+        parts = await asyncio.gather(
+            *(self._embed_request(payload[start : start + size]) for start in range(0, len(payload), size))
+        )
+        return _concatenate(parts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters, current adaptive batch size, and embedding cache stats for diagnostics."""
+        return {
+            "requests": self._requests,
+            "rate_limited": self._rate_limited,
+            "retried": self._retried,
+            "split_requests": self._split_requests,
+            "request_size": self._request_size or self._max_request_size,
+            "concurrency": self._concurrency,
+            "cache": self._cache.stats() if self._cache is not None else {"enabled": False},
+        }
+
+    async def _embed_request(self, texts: List[str], attempt: int = 0) -> np.ndarray:
+        """Embed one request, retrying per ``classify_error``.
+
+        Rate limits shrink the adaptive request size and back off; payload-size errors split the
+        request in half straight away; transient errors (timeouts, 5xx) back off and retry as-is.
+        Anything else, or running out of ``embed_max_retries``, propagates.
+        """
+        async with self._request_slot():
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            self._requests += 1
+            loop = asyncio.get_running_loop()
+            try:
+                vectors = await loop.run_in_executor(None, self._client.embed_documents, texts)
+            except Exception as exc:
+                kind = classify_error(exc)
+                if kind is None or attempt >= self._max_retries or (kind == PAYLOAD_TOO_LARGE and len(texts) < 2):
+                    raise
+                logger.warning(
+                    "Embedding request of %s texts failed (%s, attempt %s): %s", len(texts), kind, attempt + 1, exc
+                )
+            else:
+                self._record_success()
+                # The provider returns lists; this is the only list -> array conversion on the way in.
+                return as_matrix(vectors)
+
+        if kind == PAYLOAD_TOO_LARGE:
+            self._split_requests += 1
+            self._shrink_request_size(len(texts))
+            size = (len(texts) + 1) // 2
+        else:
+            if kind == RATE_LIMITED:
+                self._record_rate_limited(len(texts))
+            else:
+                self._retried += 1
+            # Back off outside the concurrency slot, then retry in pieces no larger than the current size.
+            await asyncio.sleep(backoff_delay(attempt, base=self._base_backoff_seconds, cap=self._max_backoff_seconds))
+            size = self._request_size or len(texts)
+        if len(texts) <= size:
+            return await self._embed_request(texts, attempt + 1)
+        parts = await asyncio.gather(
+            *(self._embed_request(texts[start : start + size], attempt + 1) for start in range(0, len(texts), size))
+        )
+        return _concatenate(parts)
+
+    def _request_slot(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they are first used on; rebuild one per loop.
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._client.embed_documents, payload)
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self._concurrency))
+        return self._semaphore[1]
+
+    def _record_rate_limited(self, attempted: int) -> None:
+        self._rate_limited += 1
+        self._shrink_request_size(attempted)
+
+    def _shrink_request_size(self, attempted: int) -> None:
+        self._successes_since_shrink = 0
+        self._request_size = max(1, min(self._request_size or attempted, attempted) // 2)
+
+    def _record_success(self) -> None:
+        if self._request_size is None:
+            return
+        self._successes_since_shrink += 1
+        # Grow back gradually once the provider has accepted a run of requests at the smaller size.
+        if self._successes_since_shrink >= self._concurrency * 2:
+            self._successes_since_shrink = 0
+            grown = self._request_size * 2
+            if self._max_request_size is not None and grown >= self._max_request_size:
+                self._request_size = None
+            else:
+                self._request_size = grown
 
 
 class SlideIngestionPipeline:
     """Full orchestration for parsing, chunking, embedding, and indexing slides."""
 
+    _delete_verify_backoff_seconds = 0.5
+
     def __init__(
         self,
         settings: Settings,
-        repository: Optional[PineconeRepository] = None,
+        repository: Optional[VectorStore] = None,
         extractor: Optional[SlideExtractor] = None,
         pdf_extractor: Optional[PDFExtractor] = None,
         chunker: Optional[SlideChunker] = None,
         embedding_service: Optional[EmbeddingService] = None,
+        manifest_repository: Optional[ManifestRepository] = None,
+        chunk_store: Optional[ChunkStore] = None,
     ) -> None:
         self._settings = settings
-        self._repository = repository or PineconeRepository(settings)
-        self._pptx_extractor = extractor or SlideExtractor()
+        self._repository: VectorStore = repository or get_vector_store(settings)
+        self._pptx_extractor = extractor or self._default_pptx_extractor(settings)
         self._pdf_extractor = pdf_extractor or PDFExtractor()
         self._chunker = chunker or SlideChunker()
         self._embedding_service = embedding_service or EmbeddingService(settings)
+        self._manifests: ManifestRepository = manifest_repository or self._select_manifest_repository()
+        self._chunk_store = chunk_store if chunk_store is not None else get_chunk_store(settings)
+        # Text leaves Pinecone metadata only when the store is durable and shared by every instance;
+        # otherwise the store is a local copy feeding the lexical index.
+        self._text_in_store = self._chunk_store is not None and bool(getattr(settings, "chunk_store_shared", False))
 
     async def ingest(
         self,
         *,
         document_id: str,
-        file_bytes: bytes,
+        file_bytes: bytes | None = None,
         filename: str | None = None,
         metadata: Optional[Dict[str, Any]] = None,
+        file_path: str | os.PathLike[str] | None = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> IngestionResult:
-        """Process a PPTX/PDF file through extraction, chunking, embedding, and Pinecone upsert."""
-        extractor = self._select_extractor(filename)
-        slides = extractor.extract(file_bytes)
-        chunked = self._chunker.chunk(slides)
+        """Stream a PPTX/PDF file through extraction, chunking, embedding, and Pinecone upsert.
 
-        if not chunked:
-            logger.info("No text detected in presentation %s; skipping index", document_id)
-            return IngestionResult(
-                document_id=document_id,
-                slide_count=len(slides),
-                chunk_count=0,
-                namespace=self._repository.namespace,
-            )
-        repo_dimension = getattr(self._repository, "dimension", None)
-        dimension_validated = False
+        Each stage runs as its own task connected by bounded queues, so slides are chunked as they
+        are extracted and the next batch is embedded while the previous one is being upserted.
+        Chunks whose content hash matches one in the document's stored manifest keep their vector
+        (only its slide position is updated when it moved), and vector ids missing from the new
+        version are deleted once the upserts have landed. ``progress`` is
+        called with an ``IngestionProgress`` snapshot whenever a stage makes progress.
+        """
+        source: Optional[DocumentSource] = file_path if file_path is not None else file_bytes
+        if source is None:
+            raise RuntimeError("Either file_bytes or file_path is required for ingestion")
+        extractor = self._select_extractor(filename)
         batch_size = getattr(self._settings, "ingest_batch_size", 64) or 64
-        base_metadata: Dict[str, Any] = dict(metadata or {})
-        total_chunks = 0
-
-        for batch in self._batched(chunked, batch_size):
-            texts = [chunk.text for chunk in batch]
-            # Generate embeddings and upsert to Pinecone so downstream chat/quiz can retrieve with citations.
-            vectors = await self._embedding_service.embed(texts)
-            if not vectors:
-                continue
-            if repo_dimension and not dimension_validated:
-                embedding_dimension = len(vectors[0])
-                if embedding_dimension != repo_dimension:
-                    index_name = getattr(self._repository, "_index_name", "Pinecone index")
-                    raise RuntimeError(
-                        f"Embedding model produced dimension {embedding_dimension}, but Pinecone index "
-                        f"{index_name} expects {repo_dimension}. "
-                        "Ensure PINECONE_INDEX_DIMENSION matches the embedding model output and recreate/reconfigure "
-                        "the Pinecone index if necessary."
-                    )
-                dimension_validated = True
-
-            items: List[Dict[str, Any]] = []
-            for chunk, embedding in zip(batch, vectors):
-                payload = self._build_pinecone_payload(
-                    chunk=chunk,
-                    embedding=embedding,
-                    base_metadata=base_metadata,
-                    document_id=document_id,
-                    snippet_chars=0,
-                )
-                items.append(payload)
+        queue_size = max(getattr(self._settings, "ingest_queue_size", 4) or 4, 1)
+        base_metadata = dict(metadata or {})
+        course_id = str(base_metadata["course_id"]) if base_metadata.get("course_id") else None
+        repository = self._namespaced(namespace_for(self._settings, document_id, course_id))
+        namespace = repository.namespace
+        previous = await asyncio.to_thread(self._manifests.load_manifest, document_id)
+        same_namespace = previous is not None and self._namespace_of(previous) == namespace
+        previous_ids = set(previous.chunk_hashes) if same_namespace else set()  # type: ignore[union-attr]
+        previous_hashes = dict(previous.chunk_hashes) if same_namespace else {}  # type: ignore[union-attr]
+        if previous_hashes and self._text_in_store:
+            # Only chunks whose text is in the store count as indexed; the rest are rebuilt.
+            stored_ids = await asyncio.to_thread(self._chunk_store.document_ids, document_id)
+            previous_hashes = {key: value for key, value in previous_hashes.items() if key in stored_ids}
+        run = _PipelineRun(
+            document_id=document_id,
+            base_metadata=base_metadata,
+            repository=repository,
+            batch_size=max(batch_size, 1),
+            previous_hashes=previous_hashes,
+            previous_ids=previous_ids,
+            previous_positions=dict(previous.chunk_positions) if same_namespace else {},  # type: ignore[union-attr]
+            hash_salt=getattr(self._settings, "google_embeddings_model_name", "") or "",
+            progress=progress,
+            deduplicator=self._new_deduplicator(),
+            previous_manifest=previous,
+            course_id=course_id,
+        )
+        slide_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size * batch_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
 
-            if items:
-                self._repository.upsert(items)
-                total_chunks += len(items)
+        started = time.perf_counter()
+        try:
+            await self._run_stages(
+                self._extract_stage(run, extractor, source, slide_queue),
+                self._chunk_stage(run, slide_queue, embed_queue),
+                self._embed_stage(run, embed_queue, upsert_queue),
+                self._upsert_stage(run, upsert_queue),
+            )
+        except BaseException:
+            # Vectors that did land stay deletable by id: record them alongside the old version's ids.
+            if run.upserted_ids:
+                await self._save_partial_manifest(run)
+            raise
+        run.report("finalizing")
+        await self._write_moved_positions(run)
+        await self._write_late_provenance(run)
+        removed = sorted(previous_ids - set(run.current_hashes))
+        if removed:
+            await asyncio.to_thread(repository.delete_ids, removed)
+            if self._chunk_store is not None:
+                await asyncio.to_thread(self._chunk_store.delete_ids, removed)
+        await asyncio.to_thread(
+            self._manifests.save_manifest,
+            DocumentManifest(
+                document_id=document_id,
+                namespace=namespace,
+                chunk_hashes=run.indexed_hashes(),
+                chunk_positions=run.indexed_positions(),
+                course_id=course_id,
+            ),
+        )
+        if previous is not None and previous.chunk_hashes and self._namespace_of(previous) != namespace:
+            # The document moved namespaces (strategy or course changed): remove the old copy.
+            old_store = self._namespaced(self._namespace_of(previous))
+            await asyncio.to_thread(self._remove_vectors, old_store, document_id, sorted(previous.chunk_hashes))
+        elapsed = time.perf_counter() - started
 
+        if not run.chunk_count:
+            logger.info("No text detected in presentation %s; skipping index", document_id)
+        throughput = run.chunk_count / elapsed if elapsed > 0 else 0.0
+        upsert_seconds = run.stage_seconds["upsert"]
+        upsert_vps = run.added_count / upsert_seconds if upsert_seconds > 0 else 0.0
+        upsert_bps = run.upsert_bytes / upsert_seconds if upsert_seconds > 0 else 0.0
+        logger.info(
+            "Ingested %s: %s slides, %s chunks (%s added, %s unchanged, %s removed, %s duplicates folded) "
+            "in %.2fs (%.1f chunks/s; upserts %.1f vectors/s, %.0f bytes/s; stage seconds: %s)",
+            document_id,
+            run.slide_count,
+            run.chunk_count,
+            run.added_count,
+            run.unchanged_count,
+            len(removed),
+            run.embeddings_avoided,
+            elapsed,
+            throughput,
+            upsert_vps,
+            upsert_bps,
+            run.rounded_stage_seconds(),
+        )
         return IngestionResult(
             document_id=document_id,
-            slide_count=len(slides),
-            chunk_count=total_chunks,
-            namespace=self._repository.namespace,
+            slide_count=run.slide_count,
+            chunk_count=run.chunk_count,
+            namespace=namespace,
+            stage_seconds=run.rounded_stage_seconds(),
+            elapsed_seconds=round(elapsed, 4),
+            chunks_per_second=round(throughput, 2),
+            added_count=run.added_count,
+            unchanged_count=run.unchanged_count,
+            removed_count=len(removed),
+            embeddings_avoided=run.embeddings_avoided,
+            upsert_requests=run.upsert_requests,
+            upsert_bytes=run.upsert_bytes,
+            upsert_vectors_per_second=round(upsert_vps, 2),
+            upsert_bytes_per_second=round(upsert_bps, 2),
         )
 
+    @staticmethod
+    async def _run_stages(*stages: Any) -> None:
+        """Run stage coroutines together; the first failure cancels the rest and is re-raised."""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _extract_stage(
+        self,
+        run: "_PipelineRun",
+        extractor: SlideExtractor,
+        source: DocumentSource,
+        slide_queue: asyncio.Queue,
+    ) -> None:
+        pool = get_extraction_pool(getattr(self._settings, "ingest_extract_workers", 0) or 0)
+        tasks: Optional[List[ExtractionTask]] = None
+        if pool is not None:
+            pages_per_task = getattr(self._settings, "ingest_pdf_pages_per_task", 25) or 25
+            with run.timed("extract"):
+                plan = getattr(extractor, "extraction_tasks", None)
+                if plan is not None:
+                    tasks = await asyncio.to_thread(plan, source, pages_per_task=pages_per_task)
+        if tasks is not None:
+            await self._extract_in_pool(run, pool, tasks, slide_queue)
+        else:
+            await self._extract_in_thread(run, extractor, source, slide_queue)
+        await slide_queue.put(_END_OF_STREAM)
+
+    async def _extract_in_pool(
+        self,
+        run: "_PipelineRun",
+        pool: Executor,
+        tasks: List[ExtractionTask],
+        slide_queue: asyncio.Queue,
+    ) -> None:
+        # Submit every page range up front (the pool bounds parallelism) and merge results in task
+        # order, so slides reach the chunker in document order while later ranges are still parsing.
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(pool, task) for task in tasks]
+        try:
+            for future in futures:
+                with run.timed("extract"):
+                    slides = await future
+                for slide in slides:
+                    run.slide_count += 1
+                    run.report()
+                    await slide_queue.put(slide)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _extract_in_thread(
+        self,
+        run: "_PipelineRun",
+        extractor: SlideExtractor,
+        source: DocumentSource,
+        slide_queue: asyncio.Queue,
+    ) -> None:
+        # Pull slides one at a time in a worker thread so parsing never blocks the event loop.
+        slides = extractor.iter_slides(source)
+        try:
+            while True:
+                with run.timed("extract"):
+                    slide = await asyncio.to_thread(next, slides, _END_OF_STREAM)
+                if slide is _END_OF_STREAM:
+                    break
+                run.slide_count += 1
+                run.report()
+                await slide_queue.put(slide)
+        finally:
+            # Release the spooled file handle even when a later stage fails mid-document.
+            close = getattr(slides, "close", None)
+            if close is not None:
+                close()
+
+    async def _chunk_stage(
+        self,
+        run: "_PipelineRun",
+        slide_queue: asyncio.Queue,
+        embed_queue: asyncio.Queue,
+    ) -> None:
+        pending: List[SlideChunk] = []
+        while True:
+            slide = await slide_queue.get()
+            if slide is _END_OF_STREAM:
+                break
+            with run.timed("chunk"):
+                changed = run.changed_chunks(run.unique_chunks(self._chunker.chunk([slide])))
+            pending.extend(changed)
+            run.chunks_queued += len(changed)
+            while len(pending) >= run.batch_size:
+                await embed_queue.put(pending[: run.batch_size])
+                pending = pending[run.batch_size :]
+        if pending:
+            await embed_queue.put(pending)
+        run.extraction_complete = True
+        run.report()
+        await embed_queue.put(_END_OF_STREAM)
+
+    async def _embed_stage(
+        self,
+        run: "_PipelineRun",
+        embed_queue: asyncio.Queue,
+        upsert_queue: asyncio.Queue,
+    ) -> None:
+        # Keep up to embed_concurrency batches in flight and forward them oldest-first so upserts
+        # stay in document order.
+        concurrency = max(getattr(self._settings, "embed_concurrency", 1) or 1, 1)
+        in_flight: Deque[Tuple[List[SlideChunk], "asyncio.Future[np.ndarray]"]] = deque()
+        try:
+            while True:
+                batch = await embed_queue.get()
+                if batch is _END_OF_STREAM:
+                    break
+                in_flight.append((batch, asyncio.ensure_future(self._embed_batch(run, batch))))
+                if len(in_flight) >= concurrency:
+                    await self._forward_embedded(run, *in_flight.popleft(), upsert_queue)
+            while in_flight:
+                await self._forward_embedded(run, *in_flight.popleft(), upsert_queue)
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+        await upsert_queue.put(_END_OF_STREAM)
+
+    async def _embed_batch(self, run: "_PipelineRun", batch: List[SlideChunk]) -> np.ndarray:
+        # Generate embeddings and upsert to Pinecone so downstream chat/quiz can retrieve with citations.
+        with run.timed("embed"):
+            return await self._embedding_service.embed([chunk.text for chunk in batch])
+
+    async def _forward_embedded(
+        self,
+        run: "_PipelineRun",
+        batch: List[SlideChunk],
+        task: "asyncio.Future[np.ndarray]",
+        upsert_queue: asyncio.Queue,
+    ) -> None:
+        vectors = as_matrix(await task)
+        run.chunks_embedded += len(batch)
+        run.report("embedding")
+        if not len(vectors):
+            return
+        if not run.dimension_validated:
+            self._validate_dimension(vectors[0])
+            run.dimension_validated = True
+
+        items = [
+            self._build_pinecone_payload(
+                chunk=chunk,
+                embedding=embedding,
+                base_metadata=run.base_metadata,
+                document_id=run.document_id,
+            )
+            for chunk, embedding in zip(batch, vectors)
+        ]
+        run.note_written_provenance(batch)
+        if items:
+            await upsert_queue.put(self._split_stored_text(items, run.document_id))
+
+    def _split_stored_text(
+        self, items: List[Dict[str, Any]], document_id: str
+    ) -> Tuple[List[Dict[str, Any]], List[StoredChunk]]:
+        """Copy text and metadata to the chunk store when it is enabled, slimming the Pinecone payload
+        to filterable fields only when the store is shared."""
+        if self._chunk_store is None:
+            return items, []
+        stored: List[StoredChunk] = []
+        slim: List[Dict[str, Any]] = []
+        for item in items:
+            metadata = dict(item["metadata"])
+            text = str(metadata.pop("text", ""))
+            stored.append(StoredChunk(vector_id=item["id"], document_id=document_id, text=text, metadata=metadata))
+            filterable = {key: metadata[key] for key in _FILTERABLE_METADATA if metadata.get(key) is not None}
+            slim.append({**item, "metadata": filterable})
+        return (slim if self._text_in_store else items), stored
+
+    async def _upsert_stage(self, run: "_PipelineRun", upsert_queue: asyncio.Queue) -> None:
+        checkpoint_interval = getattr(self._settings, "ingest_checkpoint_interval", 8) or 0
+        while True:
+            batch = await upsert_queue.get()
+            if batch is _END_OF_STREAM:
+                break
+            items, stored = batch
+            with run.timed("upsert"):
+                # Text lands locally first so a vector is never queryable without its chunk text.
+                if stored:
+                    await asyncio.to_thread(self._chunk_store.put_many, stored)  # type: ignore[union-attr]
+                report = await asyncio.to_thread(run.repository.upsert, items)
+            if isinstance(report, UpsertReport):
+                run.upsert_requests += report.requests
+                run.upsert_bytes += report.bytes_sent
+            run.upserted_ids.update(item["id"] for item in items)
+            run.added_count += len(items)
+            run.chunk_count += len(items)
+            run.upsert_batches += 1
+            if checkpoint_interval and run.upsert_batches % checkpoint_interval == 0:
+                # A process killed mid-ingest resumes from here: checkpointed ids count as unchanged.
+                await self._save_partial_manifest(run)
+            run.report("upserting")
+
+    async def _write_moved_positions(self, run: "_PipelineRun") -> None:
+        # Unchanged chunks that now sit on another slide keep their vector; only the position moves.
+        for vector_id, chunk in run.moved:
+            position = chunk.position()
+            if self._chunk_store is not None:
+                await asyncio.to_thread(self._chunk_store.merge_metadata, vector_id, position)
+            await asyncio.to_thread(run.repository.update_metadata, vector_id, position)
+
+    async def _write_late_provenance(self, run: "_PipelineRun") -> None:
+        # Copies found after their kept chunk was already upserted (or left unchanged) get their
+        # provenance merged into the stored vector's metadata instead of a re-embed.
+        for vector_id, chunk in run.stale_provenance():
+            if self._chunk_store is not None:
+                await asyncio.to_thread(self._chunk_store.merge_metadata, vector_id, chunk.provenance())
+            if not self._text_in_store:
+                await asyncio.to_thread(run.repository.update_metadata, vector_id, chunk.provenance())
+
+    def _new_deduplicator(self) -> Optional[ChunkDeduplicator]:
+        if not getattr(self._settings, "ingest_dedup_enabled", True):
+            return None
+        return ChunkDeduplicator(threshold=getattr(self._settings, "ingest_dedup_threshold", 0.9))
+
+    def _validate_dimension(self, embedding: Sequence[float]) -> None:
+        """Fail fast when the embedding width does not match the Pinecone index."""
+        repo_dimension = getattr(self._repository, "dimension", None)
+        if not repo_dimension:
+            return
+        embedding_dimension = len(embedding)
+        if embedding_dimension != repo_dimension:
+            index_name = getattr(self._repository, "_index_name", "Pinecone index")
+            raise RuntimeError(
+                f"Embedding model produced dimension {embedding_dimension}, but Pinecone index "
+                f"{index_name} expects {repo_dimension}. "
+                "Ensure PINECONE_INDEX_DIMENSION matches the embedding model output and recreate/reconfigure "
+                "the Pinecone index if necessary."
+            )
+
+    @staticmethod
+    def _default_pptx_extractor(settings: Settings) -> SlideExtractor:
+        """Pick the PPTX extractor named by ``ingest_pptx_extractor`` ("xml" or "python-pptx")."""
+        if getattr(settings, "ingest_pptx_extractor", "xml") == "python-pptx":
+            return SlideExtractor()
+        return SlideXMLExtractor()
+
     def _select_extractor(self, filename: str | None) -> SlideExtractor:
         """Choose the correct extractor based on filename; defaults to PPTX extractor."""
         if not filename:
@@ -292,41 +932,484 @@ class SlideIngestionPipeline:
 
         raise RuntimeError("Unsupported file type for ingestion; expected .pptx or .pdf")
 
+    async def _save_partial_manifest(self, run: "_PipelineRun") -> None:
+        """Record the vectors upserted so far next to the previous version's ids (checkpoint or failure)."""
+        previous = run.previous_manifest
+        namespace = run.repository.namespace
+        if previous is not None and self._namespace_of(previous) != namespace:
+            # Keep the record of the old namespace's vectors; the new namespace is re-derived on retry.
+            logger.warning("Ingest of %s into namespace %s failed; keeping its previous manifest", run.document_id, namespace)
+            return
+        hashes = dict(previous.chunk_hashes) if previous is not None else {}
+        hashes.update(run.indexed_hashes())
+        positions = dict(previous.chunk_positions) if previous is not None else {}
+        positions.update(run.indexed_positions())
+        try:
+            await asyncio.to_thread(
+                self._manifests.save_manifest,
+                DocumentManifest(
+                    document_id=run.document_id,
+                    namespace=namespace,
+                    chunk_hashes=hashes,
+                    chunk_positions=positions,
+                    course_id=run.course_id,
+                ),
+            )
+        except Exception:  # pragma: no cover - the ingest error is the one worth surfacing
+            logger.exception("Unable to record partially ingested vectors for %s", run.document_id)
+
     def delete_document(self, document_id: str) -> None:
-        """Delete all vectors associated with a document id from Pinecone."""
+        """Delete a document's vectors, plus its manifest and locally stored chunk text.
+
+        A namespace dedicated to the document is dropped outright. Otherwise vectors are deleted by
+        id (the manifest's ids plus any in the local chunk store) and the delete is verified;
+        documents without either fall back to a metadata-filter delete.
+        """
         if not document_id:
             return
-        self._repository.delete_document(document_id)
+        manifest = self._manifests.load_manifest(document_id)
+        namespace = self._namespace_of(manifest) if manifest is not None else namespace_for(self._settings, document_id)
+        ids = set(manifest.chunk_hashes) if manifest is not None else set()
+        if self._chunk_store is not None:
+            ids |= self._chunk_store.document_ids(document_id)
+        self._remove_vectors(self._namespaced(namespace), document_id, sorted(ids))
+        self._manifests.delete_manifest(document_id)
+        if self._chunk_store is not None:
+            self._chunk_store.delete_document(document_id)
+
+    def document_namespace(self, document_id: str) -> Optional[str]:
+        """Namespace recorded for an ingested document, or None when it has no manifest."""
+        manifest = self._manifests.load_manifest(document_id)
+        return self._namespace_of(manifest) if manifest is not None else None
+
+    def move_document(self, document_id: str, namespace: str) -> int:
+        """Copy a document's vectors into ``namespace``, repoint its manifest, then remove the old copy.
+
+        The manifest is switched before the source is deleted, so an interrupted move leaves a
+        duplicate rather than a gap. Returns the number of vectors copied.
+        """
+        manifest = self._manifests.load_manifest(document_id)
+        if manifest is None:
+            raise RuntimeError(f"No manifest recorded for document {document_id}; re-ingest it instead")
+        source = self._namespaced(self._namespace_of(manifest))
+        target = self._namespaced(namespace)
+        if source.namespace == target.namespace:
+            return 0
+        ids = sorted(manifest.chunk_hashes)
+        moved = 0
+        for start in range(0, len(ids), _MOVE_BATCH_SIZE):
+            records = source.fetch_vectors(ids[start : start + _MOVE_BATCH_SIZE])
+            if records:
+                target.upsert(list(records.values()))
+                moved += len(records)
+        if moved < len(ids):
+            logger.warning("Moved %s of %s vectors for %s; the rest were missing", moved, len(ids), document_id)
+        self._manifests.save_manifest(
+            DocumentManifest(
+                document_id=document_id,
+                namespace=target.namespace,
+                chunk_hashes=dict(manifest.chunk_hashes),
+                chunk_positions=dict(manifest.chunk_positions),
+                course_id=manifest.course_id,
+            )
+        )
+        self._remove_vectors(source, document_id, ids)
+        return moved
+
+    def _namespaced(self, namespace: Optional[str]) -> VectorStore:
+        if not namespace or namespace == self._repository.namespace:
+            return self._repository
+        return self._repository.with_namespace(namespace)
+
+    def _namespace_of(self, manifest: DocumentManifest) -> str:
+        # Manifests written before namespaces were recorded belong to the shared namespace.
+        return manifest.namespace or self._repository.namespace
+
+    def _remove_vectors(self, store: VectorStore, document_id: str, ids: List[str]) -> None:
+        if store.namespace == document_namespace(self._repository.namespace, document_id):
+            store.delete_namespace()
+        elif ids:
+            self._delete_vectors(store, ids)
+        else:
+            store.delete_document(document_id)
+
+    def _delete_vectors(self, store: VectorStore, ids: List[str]) -> None:
+        """Delete ``ids`` and re-check until none remain, re-deleting stragglers with backoff."""
+        store.delete_ids(ids)
+        remaining = ids
+        for attempt in range(_DELETE_VERIFY_ATTEMPTS):
+            remaining = sorted(store.existing_ids(remaining))
+            if not remaining:
+                return
+            time.sleep(self._delete_verify_backoff_seconds * (2**attempt))
+            store.delete_ids(remaining)
+        remaining = sorted(store.existing_ids(remaining))
+        if remaining:
+            raise RuntimeError(f"{len(remaining)} vectors were still present in the vector index after deletion")
+
+    def list_documents(self) -> List[DocumentManifest]:
+        """Manifests of every indexed document (input to the maintenance sweep)."""
+        return self._manifests.list_manifests()
 
     @staticmethod
-    def _batched(items: Sequence[SlideChunk], batch_size: int) -> Iterator[List[SlideChunk]]:
-        """Yield fixed-size batches from a list of slide chunks."""
-        if batch_size <= 0:
-            batch_size = 1
-        for start in range(0, len(items), batch_size):
-            yield items[start : start + batch_size]
+    def _select_manifest_repository() -> ManifestRepository:
+        try:
+            return FirestoreManifestRepository()
+        except RuntimeError as exc:
+            logger.warning("Firestore unavailable (%s); falling back to in-memory manifest repository.", exc)
+            return InMemoryManifestRepository()
 
     def _build_pinecone_payload(
         self,
         *,
         chunk: SlideChunk,
-        embedding: Sequence[float],
+        embedding: np.ndarray,
         base_metadata: Dict[str, Any],
         document_id: str,
-        snippet_chars: int,
     ) -> Dict[str, Any]:
-        """Build the Pinecone vector payload with merged metadata and optional snippet."""
+        """Build the Pinecone vector payload with merged metadata and the chunk text."""
         metadata_payload: Dict[str, Any] = {**base_metadata}
         metadata_payload.update(chunk.metadata())
         metadata_payload["document_id"] = document_id
-        if snippet_chars > 0:
-            snippet = chunk.text[:snippet_chars].strip()
-            metadata_payload["text"] = snippet or chunk.text
-        else:
-            metadata_payload["text"] = chunk.text
+        metadata_payload["text"] = chunk.text
 
         return {
-            "id": f"{document_id}-s{chunk.slide_number}-c{chunk.chunk_index}",
-            "values": list(embedding),
+            "id": _vector_id(document_id, chunk),
+            # A row view of the batch matrix; Pinecone converts it to a list at the SDK call.
+            "values": embedding,
             "metadata": metadata_payload,
         }
+
+
+@contextmanager
+def _open_document(source: DocumentSource) -> Iterator[BinaryIO]:
+    """Open a document source as a seekable binary stream without copying files into memory."""
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as handle:
+        yield handle
+
+
+_NS_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Direct spTree children python-pptx treats as shapes; only p:sp carries a text frame.
+_PPTX_SHAPE_TAGS = frozenset(
+    _NS_P + tag for tag in ("sp", "grpSp", "graphicFrame", "cxnSp", "pic", "contentPart")
+)
+_PPTX_TEXT_PARENTS = frozenset((_NS_A + "r", _NS_A + "fld"))
+
+
+def _pptx_slide_parts(package: zipfile.ZipFile) -> List[str]:
+    """Return slide part names in presentation order, resolved through presentation.xml.rels."""
+    rels_root = ElementTree.fromstring(package.read("ppt/_rels/presentation.xml.rels"))
+    targets: Dict[str, str] = {}
+    for rel in rels_root.iter(_NS_PKG_REL + "Relationship"):
+        target = rel.get("Target", "")
+        targets[rel.get("Id", "")] = (
+            target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("ppt", target))
+        )
+    presentation = ElementTree.fromstring(package.read("ppt/presentation.xml"))
+    slide_ids = presentation.find(f"{_NS_P}sldIdLst")
+    if slide_ids is None:
+        return []
+    return [targets[entry.get(f"{_NS_R}id", "")] for entry in slide_ids.findall(f"{_NS_P}sldId")]
+
+
+def _parse_slide_xml(stream: BinaryIO) -> Tuple[Optional[str], List[str]]:
+    """Stream-parse one slide part into (title, stripped text of each non-empty top-level p:sp)."""
+    title: Optional[str] = None
+    title_found = False
+    fragments: List[str] = []
+    path: List[str] = []
+    paragraphs: List[List[str]] = []
+    placeholder_idx: Optional[str] = None
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            path.append(tag)
+            # sld > cSld > spTree > <shape> ...; nested (grouped) shapes are not read, as in python-pptx.
+            depth = len(path)
+            if depth == 4 and tag in _PPTX_SHAPE_TAGS:
+                paragraphs = []
+                placeholder_idx = None
+            elif depth == 7 and tag == _NS_P + "ph" and path[4].endswith("Pr") and path[5] == _NS_P + "nvPr":
+                placeholder_idx = element.get("idx", "0")
+            elif depth == 6 and tag == _NS_A + "p" and path[3] == _NS_P + "sp" and path[4] == _NS_P + "txBody":
+                paragraphs.append([])
+            elif depth == 7 and tag == _NS_A + "br" and _in_text_body(path):
+                paragraphs[-1].append("\v")
+            continue
+
+        depth = len(path)
+        path.pop()
+        if depth == 8 and tag == _NS_A + "t" and path[6] in _PPTX_TEXT_PARENTS and _in_text_body(path):
+            paragraphs[-1].append(element.text or "")
+        elif depth == 4 and tag in _PPTX_SHAPE_TAGS:
+            is_text_shape = tag == _NS_P + "sp"
+            text = "\n".join("".join(runs) for runs in paragraphs) if is_text_shape else ""
+            if placeholder_idx == "0" and not title_found:
+                title_found = True
+                title = text.strip() or None
+            if is_text_shape and text.strip():
+                fragments.append(text.strip())
+            element.clear()
+    return title, fragments
+
+
+def _in_text_body(path: List[str]) -> bool:
+    """True when ``path`` is inside a paragraph of a top-level p:sp text body (sp > txBody > a:p)."""
+    return path[3] == _NS_P + "sp" and path[4] == _NS_P + "txBody" and path[5] == _NS_A + "p"
+
+
+def _extract_all(extractor_cls: type, source: DocumentSource) -> List[SlideChunk]:
+    """Process-pool entry point: extract a whole document with a fresh extractor."""
+    return extractor_cls().extract(source)
+
+
+def _extract_pdf_pages(extractor_cls: type, source: DocumentSource, start: int, stop: int) -> List[SlideChunk]:
+    """Process-pool entry point: extract one page range of a PDF."""
+    return extractor_cls().extract_pages(source, start, stop)
+
+
+def _concatenate(parts: Sequence[np.ndarray]) -> np.ndarray:
+    """Join per-request embedding batches in order (no copy for a single request)."""
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def _vector_id(document_id: str, chunk: SlideChunk) -> str:
+    return chunk.vector_id or _positional_id(document_id, chunk)
+
+
+def _positional_id(document_id: str, chunk: SlideChunk) -> str:
+    return f"{document_id}-s{chunk.slide_number}-c{chunk.chunk_index}"
+
+
+def _position_key(chunk: SlideChunk) -> str:
+    return f"{chunk.slide_number}:{chunk.chunk_index}"
+
+
+class _PipelineRun:
+    """Mutable counters and per-stage timers shared by the stages of one ingest call."""
+
+    def __init__(
+        self,
+        *,
+        document_id: str,
+        base_metadata: Dict[str, Any],
+        batch_size: int,
+        repository: Any = None,
+        previous_hashes: Optional[Dict[str, str]] = None,
+        previous_ids: Optional[Set[str]] = None,
+        previous_positions: Optional[Dict[str, str]] = None,
+        hash_salt: str = "",
+        progress: Optional[ProgressCallback] = None,
+        deduplicator: Optional[ChunkDeduplicator] = None,
+        previous_manifest: Optional[DocumentManifest] = None,
+        course_id: Optional[str] = None,
+    ) -> None:
+        self.document_id = document_id
+        self.base_metadata = base_metadata
+        self.batch_size = batch_size
+        # Vector store bound to the namespace this document is written to.
+        self.repository = repository
+        self.slide_count = 0
+        self.chunk_count = 0
+        self.added_count = 0
+        self.unchanged_count = 0
+        self.chunks_queued = 0
+        self.chunks_embedded = 0
+        self.extraction_complete = False
+        self.stage = "extracting"
+        self._progress = progress
+        self.dimension_validated = False
+        self.stage_seconds: Dict[str, float] = {stage: 0.0 for stage in _PIPELINE_STAGES}
+        # Manifest of the version being replaced; partial manifests keep its ids deletable.
+        self.previous_manifest = previous_manifest
+        self.course_id = course_id
+        self.previous_hashes: Dict[str, str] = dict(previous_hashes or {})
+        self.current_hashes: Dict[str, str] = {}
+        self.current_positions: Dict[str, str] = {}
+        self._previous_positions: Dict[str, str] = dict(previous_positions or {})
+        # content hash -> previous vector ids still free to be claimed by an identical chunk
+        self._reusable: Dict[str, List[str]] = {}
+        for vector_id in sorted(self.previous_hashes):
+            self._reusable.setdefault(self.previous_hashes[vector_id], []).append(vector_id)
+        # Ids a new vector must not take: the previous version's (they may still be claimed) and this run's.
+        self._taken: Set[str] = set(previous_ids or ()) | set(self.previous_hashes)
+        # Reused vectors whose chunk moved to another slide position.
+        self.moved: List[Tuple[str, SlideChunk]] = []
+        self.unchanged_ids: set[str] = set()
+        self.upserted_ids: set[str] = set()
+        self.embeddings_avoided = 0
+        self.upsert_requests = 0
+        self.upsert_bytes = 0
+        self.upsert_batches = 0
+        self._deduplicator = deduplicator
+        self._kept_chunks: List[SlideChunk] = []
+        # vector id -> number of source slides included when its payload was built
+        self._written_provenance: Dict[str, int] = {}
+        # Anything stored alongside the vector except its position feeds the hash, so metadata-only
+        # edits re-upsert too.
+        self._salt = hash_salt + "\x00" + json.dumps(base_metadata, sort_keys=True, default=str)
+
+    def report(self, stage: Optional[str] = None) -> None:
+        """Advance to ``stage`` (stages only move forward) and notify the progress callback."""
+        if stage and _PROGRESS_STAGES.index(stage) > _PROGRESS_STAGES.index(self.stage):
+            self.stage = stage
+        if self._progress is None:
+            return
+        try:
+            self._progress(
+                IngestionProgress(
+                    stage=self.stage,
+                    slides_extracted=self.slide_count,
+                    chunks_queued=self.chunks_queued,
+                    chunks_unchanged=self.unchanged_count,
+                    chunks_embedded=self.chunks_embedded,
+                    chunks_upserted=self.added_count,
+                    extraction_complete=self.extraction_complete,
+                )
+            )
+        except Exception:  # pragma: no cover - progress reporting must never fail an ingest
+            logger.exception("Ingestion progress callback failed for %s", self.document_id)
+
+    def unique_chunks(self, chunks: Sequence[SlideChunk]) -> List[SlideChunk]:
+        """Drop near-duplicates of earlier chunks, recording each copy's slide on the kept chunk."""
+        if self._deduplicator is None:
+            return list(chunks)
+        unique: List[SlideChunk] = []
+        for chunk in chunks:
+            match = self._deduplicator.check(chunk.text)
+            if match is None:
+                self._kept_chunks.append(chunk)
+                unique.append(chunk)
+                continue
+            kept = self._kept_chunks[match]
+            if not kept.source_slides:
+                kept.source_slides.append(kept.slide_number)
+            kept.source_slides.append(chunk.slide_number)
+            self.embeddings_avoided += 1
+        return unique
+
+    def note_written_provenance(self, chunks: Sequence[SlideChunk]) -> None:
+        for chunk in chunks:
+            self._written_provenance[_vector_id(self.document_id, chunk)] = len(chunk.source_slides)
+
+    def stale_provenance(self) -> List[Tuple[str, SlideChunk]]:
+        """Indexed kept chunks whose stored metadata predates some of their duplicates."""
+        indexed = self.unchanged_ids | self.upserted_ids
+        stale: List[Tuple[str, SlideChunk]] = []
+        for chunk in self._kept_chunks:
+            if not chunk.source_slides:
+                continue
+            vector_id = _vector_id(self.document_id, chunk)
+            if vector_id in indexed and self._written_provenance.get(vector_id) != len(chunk.source_slides):
+                stale.append((vector_id, chunk))
+        return stale
+
+    def changed_chunks(self, chunks: Sequence[SlideChunk]) -> List[SlideChunk]:
+        """Assign each chunk a vector id and return only those whose content is not indexed yet.
+
+        A chunk whose content hash matches a previous vector claims that vector's id (its own
+        position's first), so slides inserted or removed earlier in the deck shift positions
+        without re-embedding everything after them. New content takes its positional id when no
+        previous vector holds it, and a content-derived id otherwise, so it never overwrites a
+        vector a later chunk may still claim.
+        """
+        changed: List[SlideChunk] = []
+        for chunk in chunks:
+            digest = self._content_hash(chunk)
+            positional = _positional_id(self.document_id, chunk)
+            vector_id = self._claim(digest, positional)
+            if vector_id is None:
+                vector_id = self._new_id(digest, positional)
+                changed.append(chunk)
+            else:
+                self.unchanged_ids.add(vector_id)
+                self.unchanged_count += 1
+                self.chunk_count += 1
+                recorded = self._previous_positions.get(vector_id)
+                if recorded is None and vector_id == positional:
+                    recorded = _position_key(chunk)
+                if recorded != _position_key(chunk):
+                    self.moved.append((vector_id, chunk))
+            chunk.vector_id = vector_id
+            self.current_hashes[vector_id] = digest
+            self.current_positions[vector_id] = _position_key(chunk)
+        return changed
+
+    def indexed_hashes(self) -> Dict[str, str]:
+        """Manifest for the new version: unchanged chunks plus those confirmed upserted."""
+        indexed = self.unchanged_ids | self.upserted_ids
+        return {vector_id: digest for vector_id, digest in self.current_hashes.items() if vector_id in indexed}
+
+    def indexed_positions(self) -> Dict[str, str]:
+        """Slide positions of the vectors in ``indexed_hashes()``."""
+        indexed = self.unchanged_ids | self.upserted_ids
+        return {vector_id: key for vector_id, key in self.current_positions.items() if vector_id in indexed}
+
+    def _claim(self, digest: str, positional: str) -> Optional[str]:
+        candidates = self._reusable.get(digest)
+        if not candidates:
+            return None
+        vector_id = positional if positional in candidates else candidates[0]
+        candidates.remove(vector_id)
+        return vector_id
+
+    def _new_id(self, digest: str, positional: str) -> str:
+        vector_id = positional
+        if vector_id in self._taken:
+            base = f"{self.document_id}-h{digest[:16]}"
+            vector_id, suffix = base, 0
+            while vector_id in self._taken:
+                suffix += 1
+                vector_id = f"{base}-{suffix}"
+        self._taken.add(vector_id)
+        return vector_id
+
+    def _content_hash(self, chunk: SlideChunk) -> str:
+        content = {key: value for key, value in chunk.metadata().items() if key not in _POSITIONAL_METADATA}
+        digest = hashlib.sha256(self._salt.encode("utf-8"))
+        digest.update(json.dumps(content, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(chunk.text.encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def timed(self, stage: str) -> "_StageTimer":
+        return _StageTimer(self.stage_seconds, stage)
+
+    def rounded_stage_seconds(self) -> Dict[str, float]:
+        return {stage: round(seconds, 4) for stage, seconds in self.stage_seconds.items()}
+
+
+class _StageTimer:
+    """Context manager adding the time spent inside the block to one stage's total."""
+
+    def __init__(self, totals: Dict[str, float], stage: str) -> None:
+        self._totals = totals
+        self._stage = stage
+        self._started = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._totals[self._stage] += time.perf_counter() - self._started
+
+
+def _pdf_reader_class():
+    """Import pypdf's PdfReader on first use, raising a setup hint when it is missing."""
+    global PdfReader
+    if PdfReader is None:
+        try:
+            from pypdf import PdfReader as _PdfReader  # type: ignore
+        except ModuleNotFoundError as exc:  # pragma: no cover - executed when package missing
+            raise RuntimeError(
+                "pypdf is required to ingest PDF files. Install the dependency to continue."
+            ) from exc
+        PdfReader = _PdfReader
+    return PdfReader
@@ -0,0 +1,118 @@
+"""Client-side rate limiting for embedding calls: a token bucket sized to the provider quota, and
+error classification so callers know whether to back off (429 / quota), split the request
+(payload too large), retry as-is (timeouts, 5xx), or give up."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+_RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resource exhausted", "rate limit", "quota")
+_PAYLOAD_MARKERS = (
+    "payload size",
+    "request size",
+    "too large",
+    "exceeds the limit",
+    "exceeds the maximum",
+    "at most 100 requests",
+    "input token count",
+)
+_TRANSIENT_STATUSES = frozenset({408, 500, 502, 503, 504})
+_TRANSIENT_MARKERS = (
+    "timed out",
+    "timeout",
+    "deadline exceeded",
+    "temporarily unavailable",
+    "service unavailable",
+    "internal error",
+    "connection reset",
+    "connection aborted",
+)
+
+RATE_LIMITED = "rate_limited"
+PAYLOAD_TOO_LARGE = "payload_too_large"
+TRANSIENT = "transient"
+
+
+class TokenBucket:
+    """Async token bucket: ``rate_per_second`` sustained with bursts up to ``capacity``.
+
+    Callers reserve tokens up front (the balance may go negative) and then sleep off the deficit,
+    so concurrent waiters are released in arrival order without holding a lock across awaits.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float = 1.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self._rate = rate_per_second
+        self._capacity = max(capacity, 1.0)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until ``tokens`` are available; returns the seconds spent waiting."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= tokens
+            deficit = -self._tokens
+        if deficit <= 0:
+            return 0.0
+        delay = deficit / self._rate
+        await self._sleep(delay)
+        return delay
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Best-effort detection of HTTP 429 / quota errors across provider SDK exception types."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if value == 429 or str(value).upper() == "RESOURCE_EXHAUSTED":
+            return True
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """``RATE_LIMITED``, ``PAYLOAD_TOO_LARGE``, ``TRANSIENT``, or None when retrying cannot help."""
+    if is_rate_limit_error(exc):
+        return RATE_LIMITED
+    status = _status(exc)
+    text = f"{type(exc).__name__} {exc}".lower()
+    if status == 413 or any(marker in text for marker in _PAYLOAD_MARKERS):
+        return PAYLOAD_TOO_LARGE
+    if isinstance(exc, (TimeoutError, ConnectionError, asyncio.TimeoutError)) or status in _TRANSIENT_STATUSES:
+        return TRANSIENT
+    if any(marker in text for marker in _TRANSIENT_MARKERS):
+        return TRANSIENT
+    return None
+
+
+def backoff_delay(attempt: int, *, base: float, cap: float) -> float:
+    """Exponential backoff for retry ``attempt`` (0-based) with up to 50% jitter, capped at ``cap``."""
+    delay = min(base * (2**attempt), cap)
+    return min(delay + random.uniform(0, delay / 2), cap)
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
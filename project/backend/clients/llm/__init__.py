@@ -1,5 +1,5 @@
 """LLM service exports."""
 
-from .service import LLMService, get_llm_service
+from .service import LLMService, get_llm_service, shutdown_llm_service
 
-__all__ = ["LLMService", "get_llm_service"]
+__all__ = ["LLMService", "get_llm_service", "shutdown_llm_service"]
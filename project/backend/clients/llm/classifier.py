@@ -6,18 +6,15 @@ from __future__ import annotations
 import json
 import logging
 from dataclasses import dataclass
-from typing import Iterable, Optional
-
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-
-try:  # pragma: no cover - dependency optional in some deployments
-    from langchain_openai import ChatOpenAI as _ChatOpenAI  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover - executed when package missing
-    _ChatOpenAI = None  # type: ignore[assignment]
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from .settings import Settings
 
-ChatOpenAI = _ChatOpenAI
+if TYPE_CHECKING:  # pragma: no cover - typing only; LangChain is imported on first use
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+# Resolved on first model-backed classification by _chat_model_class(); tests may patch it.
+ChatOpenAI = None
 
 logger = logging.getLogger(__name__)
 
@@ -55,14 +52,11 @@ class TurnClassifier:
 
         raw_response_text: Optional[str] = None
         try:
-            if ChatOpenAI is None:
-                raise RuntimeError(
-                    "langchain-openai is required to run the turn classifier. Install the dependency to continue."
-                )
+            chat_model = _chat_model_class()
 
             # LLM-backed classification path (uses OpenRouter/OpenAI compatible ChatOpenAI).
             # OpenRouter credentials/base URL come from Settings (openrouter_api_key/base_url).
-            llm = ChatOpenAI(
+            llm = chat_model(
                 model=self._model_name,
                 temperature=self._temperature,
                 timeout=self._timeout,
@@ -126,6 +120,8 @@ class TurnClassifier:
     @staticmethod
     def _summarise_history(messages: Iterable[SystemMessage | HumanMessage | AIMessage]) -> str:
         """Compact the recent conversation into a small excerpt for the classifier prompt."""
+        from langchain_core.messages import AIMessage, HumanMessage
+
         turns = []
         for message in messages:
             role = "User" if isinstance(message, HumanMessage) else "Assistant" if isinstance(message, AIMessage) else "System"
@@ -136,6 +132,8 @@ class TurnClassifier:
     @staticmethod
     def _build_prompt(history: str, learner_text: str) -> list[SystemMessage | HumanMessage]:
         """Build a constrained JSON-only prompt instructing the classifier model."""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
         system_instruction = SystemMessage(
             content=(
                 "You are an instructional coach evaluating the learner's latest message.\n"
@@ -201,3 +199,17 @@ class TurnClassifier:
             if result:
                 return result
         return None
+
+
+def _chat_model_class():
+    """Import langchain-openai's ChatOpenAI on first use, raising a setup hint when missing."""
+    global ChatOpenAI
+    if ChatOpenAI is None:
+        try:
+            from langchain_openai import ChatOpenAI as _ChatOpenAI  # type: ignore
+        except ModuleNotFoundError as exc:  # pragma: no cover - executed when package missing
+            raise RuntimeError(
+                "langchain-openai is required to run the turn classifier. Install the dependency to continue."
+            ) from exc
+        ChatOpenAI = _ChatOpenAI
+    return ChatOpenAI
@@ -3,17 +3,16 @@ state, classifies learner turns, persists chat history, and ingests documents fo
 
 from __future__ import annotations
 
-from collections import defaultdict, OrderedDict
-from datetime import datetime, timezone
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 import logging
 from pathlib import Path
+import threading
 import time
-from typing import Any, AsyncGenerator, DefaultDict, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterator, Collection, DefaultDict, Dict, List, Optional, Sequence
 from uuid import uuid4
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-
 from ..database.chat_repository import (
     ChatMessageRecord,
     ChatRepository,
@@ -21,34 +20,59 @@ from ..database.chat_repository import (
     FirestoreChatRepository,
     InMemoryChatRepository,
 )
+from ..database.job_repository import (
+    FirestoreJobRepository,
+    IngestionJobRecord,
+    InMemoryJobRepository,
+    JobRepository,
+)
 from ..ingestion import IngestionResult, SlideIngestionPipeline
+from ..ingestion.batch import BatchFile, BatchFileResult, ingest_batch
+from ..ingestion.jobs import IngestionJobManager
+from ..ingestion.maintenance import SweepReport, sweep_documents
+from ..ingestion.namespace_migration import MigrationReport, migrate_namespaces
+from ..ingestion.pipeline import ProgressCallback
 from .classifier import ClassificationResult, TurnClassifier
+from .session_state import SessionState, SessionStateCache, StoredMessage
 from .settings import Settings, get_settings
 from .telemetry import TelemetryEvent, TelemetryLogger
 
+if TYPE_CHECKING:  # pragma: no cover - typing only; LangChain is imported on first use
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
 logger = logging.getLogger(__name__)
 
+# Resolved on first chat request by _chat_model_class() so importing this module stays cheap.
+ChatOpenAI = None
+
+# Matches the excerpt window used by TurnClassifier._summarise_history.
+_CLASSIFIER_HISTORY_TURNS = 6
+
 
 class LLMService:
     """Maintains in-memory chat history per session and streams model output."""
 
-    def __init__(self, settings: Settings, repository: Optional[ChatRepository] = None) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        repository: Optional[ChatRepository] = None,
+        job_repository: Optional[JobRepository] = None,
+    ) -> None:
         self._settings = settings
-        self._system_prompts = self._build_system_prompts()
-        self._conversations: Dict[str, List[HumanMessage | AIMessage]] = defaultdict(list)
-        self._session_modes: DefaultDict[str, str] = defaultdict(lambda: "friction")
-        self._last_prompts: DefaultDict[str, str] = defaultdict(lambda: "friction")
-        self._friction_progress: DefaultDict[str, int] = defaultdict(int)
-        self._guidance_ready: DefaultDict[str, bool] = defaultdict(bool)
-        self._last_classifications: Dict[str, ClassificationResult] = {}
+        self._system_prompts: Optional[Dict[str, SystemMessage]] = None
         self._friction_threshold = settings.friction_attempts_required
         self._friction_min_words = settings.friction_min_words
         self._telemetry = TelemetryLogger(settings)
         self._repository: ChatRepository = repository or self._select_repository()
         self._classifier: Optional[TurnClassifier] = None
-        self._session_cache_order: "OrderedDict[str, None]" = OrderedDict()
-        self._max_cached_sessions = settings.max_cached_sessions or 0
+        self._sessions = SessionStateCache(
+            max_entries=settings.max_cached_sessions or 0,
+            max_bytes=settings.session_cache_max_bytes,
+            ttl_seconds=settings.session_cache_ttl_seconds,
+        )
         self._ingestion_pipeline: Optional[SlideIngestionPipeline] = None
+        self._job_repository = job_repository
+        self._job_manager: Optional[IngestionJobManager] = None
 
     async def stream_chat(
         self,
@@ -61,7 +85,7 @@ class LLMService:
     ) -> AsyncGenerator[str, None]:
         # Core chat streaming: invoke OpenRouter/OpenAI-compatible ChatOpenAI with SSE streaming.
         # OpenRouter credentials/base URL come from Settings (openrouter_api_key/base_url).
-        llm = ChatOpenAI(
+        llm = _chat_model_class()(
             model=self._settings.model_name,
             streaming=True,
             openai_api_key=self._settings.openrouter_api_key,
@@ -69,20 +93,18 @@ class LLMService:
             timeout=self._settings.request_timeout_seconds,
         )
 
-        self._ensure_session_loaded(session_id)
-        session_history = self._conversations[session_id]
+        state = self._ensure_session_loaded(session_id)
 
         classification = await self._classify_turn(
-            session_id=session_id,
+            state,
             learner_text=question,
-            session_history=session_history,
         )
 
         word_count = self._count_words(question)
-        current_mode = self._session_modes[session_id]
-        progress_before = self._friction_progress[session_id]
+        current_mode = state.mode
+        progress_before = state.friction_progress
         friction_attempts = progress_before
-        guidance_ready = self._guidance_ready[session_id]
+        guidance_ready = state.guidance_ready
         qualifies_by_length = word_count >= self._friction_min_words
         qualifies_by_label = classification.label == "good"
         qualifies_for_progress = qualifies_by_label or qualifies_by_length
@@ -90,9 +112,9 @@ class LLMService:
             if not guidance_ready:
                 if qualifies_for_progress:
                     friction_attempts = min(progress_before + 1, self._friction_threshold)
-                    self._friction_progress[session_id] = friction_attempts
+                    state.friction_progress = friction_attempts
                     if friction_attempts >= self._friction_threshold:
-                        self._guidance_ready[session_id] = True
+                        state.guidance_ready = True
                         guidance_ready = True
                 else:
                     friction_attempts = progress_before
@@ -102,45 +124,45 @@ class LLMService:
             guidance_ready = True
 
         guidance_for_turn = False
-        attempts_for_event = self._friction_progress[session_id]
+        attempts_for_event = state.friction_progress
         if use_guidance and guidance_ready:
             guidance_for_turn = True
             attempts_for_event = max(attempts_for_event, friction_attempts, progress_before)
-            self._guidance_ready[session_id] = False
-            self._friction_progress[session_id] = 0
+            state.guidance_ready = False
+            state.friction_progress = 0
             friction_attempts = 0
         elif use_guidance and not guidance_ready:
             logger.info("Guidance requested for session %s but not yet unlocked; staying in friction mode", session_id)
         else:
-            attempts_for_event = self._friction_progress[session_id]
+            attempts_for_event = state.friction_progress
 
         prompt_key = "guidance" if guidance_for_turn else "friction"
-        self._session_modes[session_id] = prompt_key
-        self._last_prompts[session_id] = prompt_key
+        state.mode = prompt_key
+        state.last_prompt = prompt_key
 
         timestamp = datetime.now(timezone.utc).isoformat()
         # Persist the learner's raw question separately from the prompt template so the
         # frontend can render it verbatim while the LLM still receives full context.
-        user_message = HumanMessage(
+        user_message = StoredMessage(
+            role="human",
             content=self._build_prompt(question, context, metadata),
-            additional_kwargs={
-                "created_at": timestamp,
-                "display_text": question,
-                "turn_classification": classification.label,
-                "classification_rationale": classification.rationale,
-                "classification_source": "model" if classification.used_model else "heuristic",
-                "classification_raw": classification.raw_output,
-            },
+            created_at=timestamp,
+            display_text=question,
+            turn_classification=classification.label,
+            classification_rationale=classification.rationale,
+            classification_source="model" if classification.used_model else "heuristic",
+            classification_raw=classification.raw_output,
         )
+        # LangChain message objects are only materialised here, at prompt assembly time.
         messages: List[SystemMessage | HumanMessage | AIMessage] = [
-            self._system_prompts[prompt_key],
-            *session_history,
-            user_message,
+            self._get_system_prompts()[prompt_key],
+            *self._to_langchain_messages(state.messages),
+            self._to_langchain_message(user_message),
         ]
 
         # Persist the user's turn before calling the model so retries keep state aligned.
-        session_history.append(user_message)
-        self._persist_session(session_id)
+        state.messages.append(user_message)
+        self._persist_session(state)
 
         response_chunks: List[str] = []
         usage: Dict[str, float] = {
@@ -160,12 +182,15 @@ class LLMService:
                 self._accumulate_usage(usage, chunk_usage)
 
         response_text = "".join(response_chunks)
-        assistant_metadata = {
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "display_text": response_text,
-        }
-        session_history.append(AIMessage(content=response_text, additional_kwargs=assistant_metadata))
-        self._persist_session(session_id)
+        state.messages.append(
+            StoredMessage(
+                role="ai",
+                content=response_text,
+                created_at=datetime.now(timezone.utc).isoformat(),
+                display_text=response_text,
+            )
+        )
+        self._persist_session(state)
 
         if guidance_for_turn:
             logger.info(
@@ -173,7 +198,7 @@ class LLMService:
                 session_id,
                 self._friction_threshold,
             )
-        self._session_modes[session_id] = "friction"
+        state.mode = "friction"
 
         latency_ms = (time.perf_counter() - latency_start) * 1000
         event = TelemetryEvent(
@@ -196,33 +221,183 @@ class LLMService:
         self,
         *,
         session_id: str,
-        file_bytes: bytes,
+        file_bytes: Optional[bytes] = None,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None,
+        file_path: Optional[str | Path] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> IngestionResult:
-        """Ingest a deck/document for retrieval augmentation; wires session/file metadata."""
-        pipeline = self._get_ingestion_pipeline()
-        base_metadata: Dict[str, Any] = dict(metadata or {})
-        base_metadata.setdefault("session_id", session_id)
-        base_metadata.setdefault("source_filename", filename)
+        """Ingest a deck/document for retrieval augmentation; wires session/file metadata.
 
-        document_id = str(
-            base_metadata.get("document_id")
-            or self._derive_document_id(filename=filename, session_id=session_id)
+        Pass ``file_path`` for uploads spooled to disk so the document is never held in memory.
+        """
+        pipeline = self._get_ingestion_pipeline()
+        base_metadata, document_id = self._ingest_metadata(
+            session_id=session_id, filename=filename, metadata=metadata
         )
 
+        if file_path is not None:
+            return await pipeline.ingest(
+                document_id=document_id,
+                file_path=file_path,
+                filename=filename,
+                metadata=base_metadata,
+                progress=progress,
+            )
         return await pipeline.ingest(
             document_id=document_id,
             file_bytes=file_bytes,
             filename=filename,
             metadata=base_metadata,
+            progress=progress,
         )
 
+    def ingest_batch(
+        self,
+        *,
+        session_id: str,
+        files: Sequence[BatchFile],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[BatchFileResult]:
+        """Ingest several spooled uploads through the shared pipeline, yielding results as files finish.
+
+        ``metadata`` applies to every file; each file still gets its own document id, so a
+        ``document_id`` in it is ignored. Raises RuntimeError up front when ingestion is unavailable,
+        and ValueError when two files would share a document id (see ``check_batch_filenames``).
+        """
+        self.check_batch_filenames(session_id=session_id, filenames=[upload.filename for upload in files])
+        self._get_ingestion_pipeline()
+        shared = {key: value for key, value in (metadata or {}).items() if key != "document_id"}
+        return ingest_batch(
+            self.ingest_upload,
+            files,
+            session_id=session_id,
+            metadata=shared,
+            file_concurrency=getattr(self._settings, "ingest_batch_file_concurrency", 2),
+        )
+
+    def check_batch_filenames(self, *, session_id: str, filenames: Sequence[str]) -> None:
+        """Raise ValueError when two batch files would derive the same document id.
+
+        Ids come from the filename stem, so ``deck.pptx`` and ``deck.pdf`` would overwrite each
+        other's vectors and manifest.
+        """
+        seen: Dict[str, str] = {}
+        for filename in filenames:
+            document_id = self._derive_document_id(filename=filename, session_id=session_id)
+            if document_id in seen:
+                raise ValueError(f"Files {seen[document_id]!r} and {filename!r} map to the same document; rename one")
+            seen[document_id] = filename
+
+    async def submit_ingestion_job(
+        self,
+        *,
+        session_id: str,
+        file_path: str | Path,
+        filename: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> IngestionJobRecord:
+        """Queue a spooled upload for background ingestion; the job takes ownership of the file."""
+        base_metadata, document_id = self._ingest_metadata(
+            session_id=session_id, filename=filename, metadata=metadata
+        )
+        base_metadata["document_id"] = document_id
+        return await self._get_job_manager().submit(
+            session_id=session_id,
+            filename=filename,
+            file_path=Path(file_path),
+            metadata=base_metadata,
+            document_id=document_id,
+        )
+
+    def get_ingestion_job(self, job_id: str) -> Optional[IngestionJobRecord]:
+        """Return the current state of a background ingestion job, if known."""
+        return self._get_job_manager().get(job_id)
+
+    def recover_orphaned_ingestion_jobs(self) -> int:
+        """Fail ingestion jobs left unfinished by a process that is no longer running."""
+        return self._get_job_manager().recover_orphans(
+            stale_after_seconds=getattr(self._settings, "ingest_job_orphan_seconds", 3600)
+        )
+
+    def _ingest_metadata(
+        self,
+        *,
+        session_id: str,
+        filename: str,
+        metadata: Optional[Dict[str, Any]],
+    ) -> tuple[Dict[str, Any], str]:
+        base_metadata: Dict[str, Any] = dict(metadata or {})
+        base_metadata.setdefault("session_id", session_id)
+        base_metadata.setdefault("source_filename", filename)
+        document_id = str(
+            base_metadata.get("document_id")
+            or self._derive_document_id(filename=filename, session_id=session_id)
+        )
+        return base_metadata, document_id
+
+    def _get_job_manager(self) -> IngestionJobManager:
+        if self._job_manager is None:
+            repository = self._job_repository or self._select_job_repository()
+            self._job_manager = IngestionJobManager(
+                self.ingest_upload,
+                repository,
+                workers=getattr(self._settings, "ingest_job_workers", 2),
+                max_queued=getattr(self._settings, "ingest_job_queue_size", 32),
+            )
+        return self._job_manager
+
+    @staticmethod
+    def _select_job_repository() -> JobRepository:
+        try:
+            return FirestoreJobRepository()
+        except RuntimeError as exc:
+            logger.warning("Firestore unavailable (%s); falling back to in-memory job repository.", exc)
+            return InMemoryJobRepository()
+
+    def warm_up_ingestion(self) -> None:
+        """Construct the ingestion pipeline (Pinecone index lookup, embeddings client) ahead of use."""
+        self._get_ingestion_pipeline()
+
     async def delete_document(self, document_id: str) -> None:
         if not document_id:
             return
         pipeline = self._get_ingestion_pipeline()
-        pipeline.delete_document(document_id)
+        await asyncio.to_thread(pipeline.delete_document, document_id)
+
+    async def migrate_namespaces(self, *, document_id: Optional[str] = None, dry_run: bool = True) -> MigrationReport:
+        """Move indexed documents into the namespaces the current strategy assigns (see ``namespace_migration``)."""
+        pipeline = self._get_ingestion_pipeline()
+        return await asyncio.to_thread(
+            migrate_namespaces, pipeline, self._settings, document_id=document_id, dry_run=dry_run
+        )
+
+    def document_namespace(self, document_id: str) -> Optional[str]:
+        """Vector namespace recorded for an ingested document; None when unknown or ingestion is unavailable."""
+        try:
+            return self._get_ingestion_pipeline().document_namespace(document_id)
+        except RuntimeError as exc:
+            logger.warning("Unable to look up the namespace of document %s: %s", document_id, exc)
+            return None
+
+    async def sweep_documents(
+        self,
+        *,
+        referenced_document_ids: Collection[str],
+        older_than: Optional[timedelta] = None,
+        unreferenced_only: bool = True,
+        dry_run: bool = True,
+    ) -> SweepReport:
+        """Run the indexed-document maintenance sweep (see ``clients.ingestion.maintenance``)."""
+        pipeline = self._get_ingestion_pipeline()
+        return await asyncio.to_thread(
+            sweep_documents,
+            pipeline,
+            referenced_document_ids=referenced_document_ids,
+            older_than=older_than,
+            unreferenced_only=unreferenced_only,
+            dry_run=dry_run,
+        )
 
     @staticmethod
     def _build_prompt(
@@ -245,24 +420,24 @@ class LLMService:
 
     async def _classify_turn(
         self,
+        state: SessionState,
         *,
-        session_id: str,
         learner_text: str,
-        session_history: List[HumanMessage | AIMessage],
     ) -> ClassificationResult:
         classifier = self._get_classifier()
         if classifier is None:
             result = TurnClassifier._heuristic_label(learner_text, self._friction_min_words)
-            self._last_classifications[session_id] = result
+            state.last_classification = result
             return result
 
+        # The classifier only summarises the most recent turns, so convert just those.
         result = await classifier.classify(
-            session_id=session_id,
+            session_id=state.session_id,
             learner_text=learner_text,
-            conversation=session_history,
+            conversation=self._to_langchain_messages(state.messages[-_CLASSIFIER_HISTORY_TURNS:]),
             min_words=self._friction_min_words,
         )
-        self._last_classifications[session_id] = result
+        state.last_classification = result
         return result
 
     def _get_classifier(self) -> Optional[TurnClassifier]:
@@ -301,152 +476,94 @@ class LLMService:
         base = f"{name_slug}-{session_slug}".strip("-")
         return base or f"document-{uuid4().hex[:8]}"
 
-    def _ensure_session_loaded(self, session_id: str) -> None:
+    def _ensure_session_loaded(self, session_id: str) -> SessionState:
+        # Another worker or device may have written the session since we cached it, so a cached
+        # state is only reused while the stored revision still matches the one it was loaded at.
+        cached = self._sessions.get(session_id)
         try:
+            if cached is not None and cached.revision:
+                if self._repository.load_revision(session_id) == cached.revision:
+                    return cached
             record = self._repository.load_session(session_id)
         except Exception:
             logger.exception("Failed loading session %s from Firestore", session_id)
             raise
         if record is None:
-            self._remove_session_from_cache(session_id)
-        else:
-            self._hydrate_session_from_record(record)
-            self._mark_session_accessed(session_id)
-
-    def _hydrate_session_from_record(self, record: ChatSessionRecord) -> None:
-        session_messages: List[HumanMessage | AIMessage | SystemMessage] = []
-        for entry in record.messages:
-            metadata = {
-                "created_at": entry.created_at.isoformat(),
-            }
-            if entry.display_content is not None:
-                metadata["display_text"] = entry.display_content
-            if entry.turn_classification is not None:
-                metadata["turn_classification"] = entry.turn_classification
-            if entry.classification_rationale is not None:
-                metadata["classification_rationale"] = entry.classification_rationale
-            if entry.classification_source is not None:
-                metadata["classification_source"] = entry.classification_source
-            if entry.classification_raw is not None:
-                metadata["classification_raw"] = entry.classification_raw
-
-            if entry.role == "human":
-                session_messages.append(HumanMessage(content=entry.content, additional_kwargs=metadata))
-            elif entry.role == "ai":
-                session_messages.append(AIMessage(content=entry.content, additional_kwargs=metadata))
-            else:
-                session_messages.append(SystemMessage(content=entry.content, additional_kwargs=metadata))
-
-        if session_messages:
-            self._conversations[record.session_id] = session_messages
-        self._friction_progress[record.session_id] = record.friction_progress
-        self._session_modes[record.session_id] = record.session_mode or "friction"
-        self._last_prompts[record.session_id] = record.last_prompt or "friction"
-        self._guidance_ready[record.session_id] = record.guidance_ready
-        last_classification: Optional[ClassificationResult] = None
-        for message in reversed(session_messages):
-            if isinstance(message, HumanMessage):
-                additional = getattr(message, "additional_kwargs", {}) or {}
-                label = additional.get("turn_classification")
-                if label:
-                    rationale = additional.get("classification_rationale")
-                    source = additional.get("classification_source")
-                    raw_output = additional.get("classification_raw")
-                    used_model = True if source == "model" else False
-                    last_classification = ClassificationResult(
-                        label=label,
-                        rationale=rationale,
-                        used_model=used_model,
-                        raw_output=raw_output,
-                    )
-                    break
-        if last_classification:
-            self._last_classifications[record.session_id] = last_classification
-        else:
-            self._last_classifications.pop(record.session_id, None)
+            self._sessions.pop(session_id)
+            return SessionState(session_id)
+        state = SessionState.from_record(record)
+        self._sessions.put(state)
+        return state
 
-    def _persist_session(self, session_id: str) -> None:
+    def _persist_session(self, state: SessionState) -> None:
         try:
-            self._mark_session_accessed(session_id)
             # Always persist the latest turn so refreshes and multi-device sessions stay in sync.
-            record = self._build_session_record(session_id)
+            state.revision = uuid4().hex
+            record = self._build_session_record(state)
             self._repository.save_session(record)
         except Exception:
-            logger.exception("Unable to persist session %s to Firestore", session_id)
+            # The cached copy no longer matches what is stored; force the next turn to reload.
+            self._sessions.pop(state.session_id)
+            logger.exception("Unable to persist session %s to Firestore", state.session_id)
             raise
+        self._sessions.put(state)
 
-    def _mark_session_accessed(self, session_id: str) -> None:
-        if not self._max_cached_sessions:
-            return
-        self._session_cache_order.pop(session_id, None)
-        self._session_cache_order[session_id] = None
-        self._evict_session_cache()
-
-    def _evict_session_cache(self) -> None:
-        if not self._max_cached_sessions:
-            return
-        while len(self._session_cache_order) > self._max_cached_sessions:
-            stale_session, _ = self._session_cache_order.popitem(last=False)
-            self._remove_session_from_cache(stale_session)
-
-    def _remove_session_from_cache(self, session_id: str) -> None:
-        self._session_cache_order.pop(session_id, None)
-        self._conversations.pop(session_id, None)
-        self._friction_progress.pop(session_id, None)
-        self._session_modes.pop(session_id, None)
-        self._last_prompts.pop(session_id, None)
-        self._guidance_ready.pop(session_id, None)
-        self._last_classifications.pop(session_id, None)
-
-    def _build_session_record(self, session_id: str) -> ChatSessionRecord:
-        history = self._conversations.get(session_id, [])
+    @staticmethod
+    def _build_session_record(state: SessionState) -> ChatSessionRecord:
         entries: List[ChatMessageRecord] = []
-        for message in history:
-            record = self._convert_message_to_record(message)
-            if record:
-                entries.append(record)
+        for message in state.messages:
+            if message.role == "system":
+                continue
+            entries.append(
+                ChatMessageRecord(
+                    role=message.role,  # type: ignore[arg-type]
+                    content=message.content,
+                    created_at=LLMService._parse_timestamp(message.created_at),
+                    display_content=message.display,
+                    turn_classification=message.turn_classification,
+                    classification_rationale=message.classification_rationale,
+                    classification_source=message.classification_source,
+                    classification_raw=message.classification_raw,
+                )
+            )
 
         return ChatSessionRecord(
-            session_id=session_id,
+            session_id=state.session_id,
             messages=entries,
-            friction_progress=self._friction_progress.get(session_id, 0),
-            session_mode=self._session_modes.get(session_id, "friction"),
-            last_prompt=self._last_prompts.get(session_id, "friction"),
-            guidance_ready=self._guidance_ready.get(session_id, False),
-        )
-
-    def _convert_message_to_record(
-        self, message: SystemMessage | HumanMessage | AIMessage
-    ) -> Optional[ChatMessageRecord]:
-        role = self._coerce_role(message)
-        if role == "system":
-            return None
-
-        created_at = self._extract_timestamp(message)
-        display_text = self._extract_display_text(message)
-        additional = getattr(message, "additional_kwargs", {}) or {}
-        return ChatMessageRecord(
-            role=role,
-            content=message.content,
-            created_at=created_at,
-            display_content=display_text,
-            turn_classification=additional.get("turn_classification"),
-            classification_rationale=additional.get("classification_rationale"),
-            classification_source=additional.get("classification_source"),
-            classification_raw=additional.get("classification_raw"),
+            friction_progress=state.friction_progress,
+            session_mode=state.mode,
+            last_prompt=state.last_prompt,
+            guidance_ready=state.guidance_ready,
+            revision=state.revision,
         )
 
     @staticmethod
-    def _coerce_role(message: SystemMessage | HumanMessage | AIMessage) -> str:
-        if isinstance(message, HumanMessage):
-            return "human"
-        if isinstance(message, AIMessage):
-            return "ai"
-        return "system"
+    def _to_langchain_message(message: StoredMessage) -> SystemMessage | HumanMessage | AIMessage:
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+        metadata: Dict[str, Any] = {"created_at": message.created_at, "display_text": message.display}
+        if message.turn_classification is not None:
+            metadata["turn_classification"] = message.turn_classification
+        if message.classification_rationale is not None:
+            metadata["classification_rationale"] = message.classification_rationale
+        if message.classification_source is not None:
+            metadata["classification_source"] = message.classification_source
+        if message.classification_raw is not None:
+            metadata["classification_raw"] = message.classification_raw
+        if message.role == "human":
+            return HumanMessage(content=message.content, additional_kwargs=metadata)
+        if message.role == "ai":
+            return AIMessage(content=message.content, additional_kwargs=metadata)
+        return SystemMessage(content=message.content, additional_kwargs=metadata)
+
+    @classmethod
+    def _to_langchain_messages(
+        cls, messages: Sequence[StoredMessage]
+    ) -> List[SystemMessage | HumanMessage | AIMessage]:
+        return [cls._to_langchain_message(message) for message in messages]
 
     @staticmethod
-    def _extract_timestamp(message: SystemMessage | HumanMessage | AIMessage) -> datetime:
-        raw_ts = message.additional_kwargs.get("created_at") if hasattr(message, "additional_kwargs") else None
+    def _parse_timestamp(raw_ts: Optional[str]) -> datetime:
         if isinstance(raw_ts, str):
             try:
                 return datetime.fromisoformat(raw_ts)
@@ -454,31 +571,22 @@ class LLMService:
                 pass
         return datetime.now(timezone.utc)
 
-    @staticmethod
-    def _extract_display_text(message: SystemMessage | HumanMessage | AIMessage) -> str:
-        if hasattr(message, "additional_kwargs"):
-            value = message.additional_kwargs.get("display_text")
-            if isinstance(value, str):
-                return value
-        return message.content
-
     def get_chat_history(self, session_id: str) -> Dict[str, Any]:
-        self._ensure_session_loaded(session_id)
+        state = self._ensure_session_loaded(session_id)
         history: List[Dict[str, Any]] = []
-        for message in self._conversations.get(session_id, []):
-            role = self._coerce_role(message)
-            if role == "system":
+        for message in state.messages:
+            if message.role == "system":
                 continue
-        # Return a lean payload tailored for the frontend UI.
+            # Return a lean payload tailored for the frontend UI.
             history.append(
                 {
-                    "role": "user" if role == "human" else "assistant",
-                    "content": self._extract_display_text(message),
-                    "created_at": self._extract_timestamp(message).isoformat(),
-                    "turn_classification": message.additional_kwargs.get("turn_classification") if hasattr(message, "additional_kwargs") else None,
-                    "classification_rationale": message.additional_kwargs.get("classification_rationale") if hasattr(message, "additional_kwargs") else None,
-                    "classification_source": message.additional_kwargs.get("classification_source") if hasattr(message, "additional_kwargs") else None,
-                    "classification_raw": message.additional_kwargs.get("classification_raw") if hasattr(message, "additional_kwargs") else None,
+                    "role": "user" if message.role == "human" else "assistant",
+                    "content": message.display,
+                    "created_at": self._parse_timestamp(message.created_at).isoformat(),
+                    "turn_classification": message.turn_classification,
+                    "classification_rationale": message.classification_rationale,
+                    "classification_source": message.classification_source,
+                    "classification_raw": message.classification_raw,
                 }
             )
 
@@ -599,22 +707,40 @@ class LLMService:
         except Exception:
             logger.exception("Failed deleting session %s from Firestore", session_id)
             raise
-        self._remove_session_from_cache(session_id)
+        self._sessions.pop(session_id)
+
+    def get_session_cache_stats(self) -> Dict[str, Any]:
+        """Expose session cache size, hit ratio, and eviction counters for debugging/metrics."""
+        return self._sessions.stats()
+
+    def start_session_sweeper(self) -> None:
+        """Begin evicting idle cached sessions in the background."""
+        self._sessions.start_sweeper(self._settings.session_cache_sweep_interval_seconds)
+
+    def stop_session_sweeper(self) -> None:
+        """Stop the idle-session sweeper thread, if it is running."""
+        self._sessions.stop_sweeper()
+
+    async def shutdown(self) -> None:
+        """Stop the session sweeper and the ingestion worker pool."""
+        self.stop_session_sweeper()
+        if self._job_manager is not None:
+            await self._job_manager.shutdown()
 
     def get_session_state(self, session_id: str) -> Dict[str, Any]:
-        self._ensure_session_loaded(session_id)
-        progress = self._friction_progress.get(session_id, 0)
+        state = self._ensure_session_loaded(session_id)
+        progress = state.friction_progress
         threshold = self._friction_threshold
-        guidance_ready = self._guidance_ready.get(session_id, False)
+        guidance_ready = state.guidance_ready
         remaining = 0 if guidance_ready else max(threshold - progress, 0)
-        next_prompt = "guidance" if self._session_modes.get(session_id) == "guidance" else "friction"
-        classification = self._last_classifications.get(session_id)
+        next_prompt = "guidance" if state.mode == "guidance" else "friction"
+        classification = state.last_classification
         classification_source = None
         if classification is not None:
             classification_source = "model" if classification.used_model else "heuristic"
         return {
             "next_prompt": next_prompt,
-            "last_prompt": self._last_prompts.get(session_id, "friction"),
+            "last_prompt": state.last_prompt,
             "friction_attempts": progress,
             "friction_threshold": threshold,
             "responses_needed": remaining,
@@ -626,9 +752,15 @@ class LLMService:
             "classification_raw": classification.raw_output if classification else None,
         }
 
+    def _get_system_prompts(self) -> Dict[str, SystemMessage]:
+        if self._system_prompts is None:
+            self._system_prompts = self._build_system_prompts()
+        return self._system_prompts
+
     @staticmethod
     def _build_system_prompts() -> Dict[str, SystemMessage]:
         """Return static system prompts keyed by service usage."""
+        from langchain_core.messages import SystemMessage
 
         return {
             "friction": SystemMessage(
@@ -656,12 +788,36 @@ class LLMService:
             target["total_cost"] += float(cost)
 
 
+def _chat_model_class():
+    """Import langchain-openai's ChatOpenAI on first use (tests may patch the module attribute)."""
+    global ChatOpenAI
+    if ChatOpenAI is None:
+        from langchain_openai import ChatOpenAI as _ChatOpenAI
+
+        ChatOpenAI = _ChatOpenAI
+    return ChatOpenAI
+
+
 _llm_service: Optional[LLMService] = None
+_llm_service_lock = threading.Lock()
 
 
 def get_llm_service() -> LLMService:
     global _llm_service
     if _llm_service is None:
-        settings = get_settings()
-        _llm_service = LLMService(settings)
+        # Warm-up and the sync endpoint thread pool may race to build the singleton.
+        with _llm_service_lock:
+            if _llm_service is None:
+                settings = get_settings()
+                service = LLMService(settings)
+                service.start_session_sweeper()
+                _llm_service = service
     return _llm_service
+
+
+async def shutdown_llm_service() -> None:
+    """Release background resources held by the singleton service, if it was ever built."""
+    service = _llm_service
+    if service is None:
+        return
+    await service.shutdown()
@@ -0,0 +1,305 @@
+"""Compact per-session chat state for LLMService: slotted message/state objects held in a single
+LRU map so each turn hashes the session id once and eviction touches one structure. The map is
+bounded by entry count, estimated bytes, and idle TTL."""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..database.chat_repository import ChatMessageRecord, ChatSessionRecord
+from .classifier import ClassificationResult
+
+logger = logging.getLogger(__name__)
+
+_STRING_FIELDS = (
+    "content",
+    "created_at",
+    "display_text",
+    "turn_classification",
+    "classification_rationale",
+    "classification_source",
+    "classification_raw",
+)
+
+
+class StoredMessage:
+    """Lightweight chat turn kept in the session cache instead of a full LangChain message."""
+
+    __slots__ = (
+        "role",
+        "content",
+        "created_at",
+        "display_text",
+        "turn_classification",
+        "classification_rationale",
+        "classification_source",
+        "classification_raw",
+    )
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        created_at: str,
+        display_text: Optional[str] = None,
+        turn_classification: Optional[str] = None,
+        classification_rationale: Optional[str] = None,
+        classification_source: Optional[str] = None,
+        classification_raw: Optional[str] = None,
+    ) -> None:
+        self.role = role
+        self.content = content
+        self.created_at = created_at
+        # Only keep display text when it differs from the prompt content (assistant turns share it).
+        self.display_text = display_text if display_text != content else None
+        self.turn_classification = turn_classification
+        self.classification_rationale = classification_rationale
+        self.classification_source = classification_source
+        self.classification_raw = classification_raw
+
+    @property
+    def display(self) -> str:
+        """Return the learner-facing text for this turn."""
+        return self.display_text if self.display_text is not None else self.content
+
+    def estimated_bytes(self) -> int:
+        """Approximate resident size: the slotted object plus every text/metadata string it holds."""
+        total = sys.getsizeof(self)
+        for field in _STRING_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                total += sys.getsizeof(value)
+        return total
+
+    @classmethod
+    def from_record(cls, record: ChatMessageRecord) -> "StoredMessage":
+        """Build a cached message from a persisted chat record."""
+        return cls(
+            role=record.role,
+            content=record.content,
+            created_at=record.created_at.isoformat(),
+            display_text=record.display_content,
+            turn_classification=record.turn_classification,
+            classification_rationale=record.classification_rationale,
+            classification_source=record.classification_source,
+            classification_raw=record.classification_raw,
+        )
+
+
+class SessionState:
+    """All mutable chat state for one session (history, friction gate, last classification)."""
+
+    __slots__ = (
+        "session_id",
+        "messages",
+        "mode",
+        "last_prompt",
+        "friction_progress",
+        "guidance_ready",
+        "last_classification",
+        "revision",
+    )
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.messages: List[StoredMessage] = []
+        self.mode = "friction"
+        self.last_prompt = "friction"
+        self.friction_progress = 0
+        self.guidance_ready = False
+        self.last_classification: Optional[ClassificationResult] = None
+        # Revision of the stored copy this state matches; None when unknown (never saved, or a legacy record).
+        self.revision: Optional[str] = None
+
+    def estimated_bytes(self) -> int:
+        """Approximate resident size of the session including its message history."""
+        total = sys.getsizeof(self) + sys.getsizeof(self.session_id) + sys.getsizeof(self.messages)
+        return total + sum(message.estimated_bytes() for message in self.messages)
+
+    @classmethod
+    def from_record(cls, record: ChatSessionRecord) -> "SessionState":
+        """Hydrate state from a persisted session, restoring the latest learner classification."""
+        state = cls(record.session_id)
+        state.messages = [StoredMessage.from_record(entry) for entry in record.messages]
+        state.friction_progress = record.friction_progress
+        state.mode = record.session_mode or "friction"
+        state.last_prompt = record.last_prompt or "friction"
+        state.guidance_ready = record.guidance_ready
+        state.revision = record.revision
+        for message in reversed(state.messages):
+            if message.role != "human" or not message.turn_classification:
+                continue
+            state.last_classification = ClassificationResult(
+                label=message.turn_classification,
+                rationale=message.classification_rationale,
+                used_model=message.classification_source == "model",
+                raw_output=message.classification_raw,
+            )
+            break
+        return state
+
+
+class SessionStateCache:
+    """LRU map of session id -> SessionState bounded by entry count, estimated bytes, and idle TTL.
+
+    Any limit set to 0 is disabled. The most recently used entry is never evicted for size so an
+    oversized active session stays resident until another session is touched.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        ttl_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._last_access: Dict[str, float] = {}
+        self._max_entries = max(max_entries, 0)
+        self._max_bytes = max(max_bytes, 0)
+        self._ttl_seconds = max(ttl_seconds, 0)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions: Dict[str, int] = {"capacity": 0, "memory": 0, "ttl": 0}
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Return cached state (recording a hit or miss) without creating entries."""
+        with self._lock:
+            state = self._entries.get(session_id)
+            if state is not None and self._is_expired(session_id, self._clock()):
+                self._remove(session_id, reason="ttl")
+                state = None
+            if state is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._mark_used(session_id)
+            return state
+
+    def put(self, state: SessionState) -> None:
+        """Insert or refresh state as most recently used, re-measuring it and enforcing limits."""
+        with self._lock:
+            session_id = state.session_id
+            size = state.estimated_bytes()
+            self._total_bytes += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._entries[session_id] = state
+            self._mark_used(session_id)
+            self._enforce_limits()
+
+    def touch(self, session_id: str) -> None:
+        """Mark a cached session as most recently used."""
+        with self._lock:
+            if session_id not in self._entries:
+                return
+            self._mark_used(session_id)
+            self._enforce_limits()
+
+    def pop(self, session_id: str) -> Optional[SessionState]:
+        """Remove and return a session's state if present (not counted as an eviction)."""
+        with self._lock:
+            return self._remove(session_id)
+
+    def sweep_expired(self) -> int:
+        """Evict entries idle for longer than the TTL; returns how many were removed."""
+        if not self._ttl_seconds:
+            return 0
+        with self._lock:
+            now = self._clock()
+            # Entries are kept in access order, so the first fresh entry ends the scan.
+            expired: List[str] = []
+            for session_id in self._entries:
+                if not self._is_expired(session_id, now):
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                self._remove(session_id, reason="ttl")
+            return len(expired)
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """Run ``sweep_expired`` from a daemon thread every ``interval_seconds``."""
+        if not self._ttl_seconds or self._sweeper is not None:
+            return
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop,
+            args=(max(interval_seconds, 0.01),),
+            name="session-cache-sweeper",
+            daemon=True,
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Signal the background sweeper to exit."""
+        self._sweeper_stop.set()
+        self._sweeper = None
+
+    def stats(self) -> Dict[str, object]:
+        """Return size, limit, hit-ratio, and eviction counters for the debug/metrics surface."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": sum(self._evictions.values()),
+                "evictions_by_reason": dict(self._evictions),
+            }
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def _mark_used(self, session_id: str) -> None:
+        self._entries.move_to_end(session_id)
+        self._last_access[session_id] = self._clock()
+
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        if not self._ttl_seconds:
+            return False
+        return now - self._last_access.get(session_id, now) > self._ttl_seconds
+
+    def _enforce_limits(self) -> None:
+        while self._max_entries and len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)), reason="capacity")
+        while self._max_bytes and self._total_bytes > self._max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)), reason="memory")
+
+    def _remove(self, session_id: str, *, reason: Optional[str] = None) -> Optional[SessionState]:
+        state = self._entries.pop(session_id, None)
+        if state is None:
+            return None
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        self._last_access.pop(session_id, None)
+        if reason:
+            self._evictions[reason] += 1
+        return state
+
+    def _sweep_loop(self, interval_seconds: float) -> None:
+        while not self._sweeper_stop.wait(interval_seconds):
+            try:
+                self.sweep_expired()
+            except Exception:  # pragma: no cover - keep the sweeper alive
+                logger.exception("Session cache sweep failed")
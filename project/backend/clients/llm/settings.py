@@ -7,7 +7,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -94,6 +94,15 @@ class Settings(BaseModel):
         default="slides",
         description="Pinecone namespace used for uploaded slide decks",
     )
+    pinecone_namespace_strategy: Literal["shared", "document", "course"] = Field(
+        default="shared",
+        description="Vector namespace per upload: one shared namespace, one per document, or one per course",
+    )
+    pinecone_index_metadata_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="How long the Pinecone index description (dimension) is cached process-wide (0 disables)",
+    )
     pinecone_index_dimension: Optional[int] = Field(
         default=None,
         description="Expected dimensionality of vectors stored in the Pinecone index",
@@ -103,11 +112,188 @@ class Settings(BaseModel):
         ge=0,
         description="Maximum number of chat sessions to keep in memory (0 disables eviction)",
     )
+    session_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Memory ceiling for cached chat sessions, estimated from message text and metadata (0 disables)",
+    )
+    session_cache_ttl_seconds: int = Field(
+        default=1800,
+        ge=0,
+        description="Evict cached chat sessions idle for longer than this many seconds (0 disables)",
+    )
+    session_cache_sweep_interval_seconds: int = Field(
+        default=60,
+        ge=1,
+        description="How often the background sweeper scans the session cache for idle entries",
+    )
     ingest_batch_size: int = Field(
         default=64,
         ge=1,
         description="Number of chunks to embed/index per batch during ingestion",
     )
+    ingest_queue_size: int = Field(
+        default=4,
+        ge=1,
+        description="Batches buffered between ingestion stages (chunk -> embed -> upsert) before backpressure",
+    )
+    ingest_checkpoint_interval: int = Field(
+        default=8,
+        ge=0,
+        description="Upserted batches between manifest checkpoints, so a killed ingest resumes; 0 disables",
+    )
+    embed_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Embedding requests allowed in flight at once during ingestion",
+    )
+    embed_requests_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description="Client-side embedding request quota (token bucket); 0 disables the limiter",
+    )
+    embed_max_retries: int = Field(
+        default=5,
+        ge=0,
+        description="Retries for rate-limited (429) embedding requests before failing the ingest",
+    )
+    ingest_job_workers: int = Field(
+        default=2,
+        ge=1,
+        description="Background ingestion jobs processed concurrently",
+    )
+    ingest_job_queue_size: int = Field(
+        default=32,
+        ge=1,
+        description="Queued ingestion jobs accepted before uploads are rejected with 503",
+    )
+    ingest_job_orphan_seconds: int = Field(
+        default=3600,
+        ge=0,
+        description=(
+            "Age after which an unfinished job owned by another host is failed at startup; "
+            "jobs from dead processes on this host are failed immediately (0 = only those)"
+        ),
+    )
+    ingest_batch_file_concurrency: int = Field(
+        default=2,
+        ge=1,
+        description="Files from one /ingest/batch upload ingested at once (embedding requests share one budget)",
+    )
+    ingest_batch_max_files: int = Field(
+        default=50,
+        ge=1,
+        description="Most files accepted by one /ingest/batch upload",
+    )
+    ingest_max_upload_bytes: int = Field(
+        default=200 * 1024 * 1024,
+        ge=0,
+        description=(
+            "Largest accepted uploaded file, enforced while the request body streams to its spool file "
+            "(0 disables the cap)"
+        ),
+    )
+    ingest_spool_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for spooled uploads (defaults to the system temp dir)",
+    )
+    ingest_extract_workers: int = Field(
+        default=0,
+        ge=0,
+        description="Processes in the document extraction pool (0 extracts on a worker thread in-process)",
+    )
+    ingest_pptx_extractor: Literal["xml", "python-pptx"] = Field(
+        default="xml",
+        description="PPTX text extractor: stream-parse slide XML directly, or build python-pptx's object model",
+    )
+    ingest_dedup_enabled: bool = Field(
+        default=True,
+        description="Fold exact and near-duplicate chunks (MinHash) into one vector before embedding",
+    )
+    ingest_dedup_threshold: float = Field(
+        default=0.9,
+        gt=0.0,
+        le=1.0,
+        description="Estimated Jaccard similarity at which a chunk counts as a near-duplicate",
+    )
+    ingest_pdf_pages_per_task: int = Field(
+        default=25,
+        ge=1,
+        description="PDF pages parsed per extraction-pool task; larger PDFs are split into page ranges",
+    )
+    vector_store_backend: Literal["pinecone", "local"] = Field(
+        default="pinecone",
+        description="Vector index: hosted Pinecone, or a memory-mapped index on this host (single node only)",
+    )
+    local_vector_store_path: Optional[str] = Field(
+        default=None,
+        description="Directory for the local vector index (None keeps it in memory only)",
+    )
+    local_vector_exact_search_limit: int = Field(
+        default=20_000,
+        ge=0,
+        description="Vectors in the local index before unscoped queries switch to the approximate graph (0 never)",
+    )
+    pinecone_upsert_max_vectors: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Most vectors sent in one Pinecone upsert request",
+    )
+    pinecone_upsert_max_bytes: int = Field(
+        default=1_900_000,
+        ge=0,
+        description="Serialized bytes per Pinecone upsert request, kept under the 2 MB API limit (0 disables)",
+    )
+    pinecone_upsert_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Pinecone upsert requests sent in parallel for one batch",
+    )
+    pinecone_upsert_max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries for transient (429/5xx/timeout) Pinecone upsert failures",
+    )
+    embedding_cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the content-addressed embedding cache (None disables caching)",
+    )
+    chunk_store_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file holding chunk text/metadata by vector id for lexical retrieval (None disables)",
+    )
+    chunk_store_shared: bool = Field(
+        default=False,
+        description="Chunk store is durable and shared by every API instance (only then is text dropped from Pinecone)",
+    )
+    retrieval_hybrid_enabled: bool = Field(
+        default=True,
+        description="Fuse BM25 ranks from the chunk store's lexical index with vector ranks (needs the chunk store)",
+    )
+    retrieval_rrf_k: int = Field(
+        default=60,
+        ge=1,
+        description="Reciprocal rank fusion constant: larger values flatten the advantage of top ranks",
+    )
+    retrieval_lexical_shortcut: bool = Field(
+        default=True,
+        description="Skip the embedding call when enough chunks contain every topic term",
+    )
+    retrieval_query_cache_size: int = Field(
+        default=512,
+        ge=0,
+        description="Retrieval query vectors kept in an in-process LRU (0 disables; the embedding cache persists them)",
+    )
+    embedding_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        ge=0,
+        description="Vector payload bytes kept in the embedding cache before LRU eviction (0 disables eviction)",
+    )
+    warmup_on_startup: bool = Field(
+        default=True,
+        description="Initialise chat/quiz services, ingestion, and retrieval clients in the background after startup",
+    )
 
 
 @lru_cache
@@ -123,9 +309,52 @@ def get_settings() -> Settings:
     cache_limit = int(cache_limit_raw) if cache_limit_raw is not None else 200
     if cache_limit < 0:
         cache_limit = 0
+    session_cache_max_bytes = max(int(os.environ.get("LLM_SESSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))), 0)
+    session_cache_ttl = max(int(os.environ.get("LLM_SESSION_CACHE_TTL_SECONDS", "1800")), 0)
+    session_cache_sweep = max(int(os.environ.get("LLM_SESSION_CACHE_SWEEP_SECONDS", "60")), 1)
     ingest_batch_size = int(os.environ.get("INGEST_BATCH_SIZE", "64"))
     if ingest_batch_size < 1:
         ingest_batch_size = 64
+    ingest_queue_size = int(os.environ.get("INGEST_QUEUE_SIZE", "4"))
+    if ingest_queue_size < 1:
+        ingest_queue_size = 4
+    ingest_checkpoint_interval = max(int(os.environ.get("INGEST_CHECKPOINT_INTERVAL", "8")), 0)
+    embed_concurrency = int(os.environ.get("EMBED_CONCURRENCY", "4"))
+    if embed_concurrency < 1:
+        embed_concurrency = 4
+    embed_requests_per_minute = max(int(os.environ.get("EMBED_REQUESTS_PER_MINUTE", "0")), 0)
+    embed_max_retries = max(int(os.environ.get("EMBED_MAX_RETRIES", "5")), 0)
+    ingest_job_workers = max(int(os.environ.get("INGEST_JOB_WORKERS", "2")), 1)
+    ingest_job_queue_size = max(int(os.environ.get("INGEST_JOB_QUEUE_SIZE", "32")), 1)
+    ingest_job_orphan_seconds = max(int(os.environ.get("INGEST_JOB_ORPHAN_SECONDS", "3600")), 0)
+    ingest_batch_file_concurrency = max(int(os.environ.get("INGEST_BATCH_FILE_CONCURRENCY", "2")), 1)
+    ingest_batch_max_files = max(int(os.environ.get("INGEST_BATCH_MAX_FILES", "50")), 1)
+    ingest_max_upload_bytes = max(int(os.environ.get("INGEST_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024))), 0)
+    # Off by default: each pool process costs memory on small instances. Set it to keep PDF parsing
+    # off the API worker's GIL.
+    ingest_extract_workers = max(int(os.environ.get("INGEST_EXTRACT_WORKERS", "0")), 0)
+    ingest_pdf_pages_per_task = max(int(os.environ.get("INGEST_PDF_PAGES_PER_TASK", "25")), 1)
+    ingest_dedup_threshold = float(os.environ.get("INGEST_DEDUP_THRESHOLD", "0.9"))
+    if not 0.0 < ingest_dedup_threshold <= 1.0:
+        ingest_dedup_threshold = 0.9
+    ingest_pptx_extractor = os.environ.get("INGEST_PPTX_EXTRACTOR", "xml").strip().lower()
+    if ingest_pptx_extractor not in ("xml", "python-pptx"):
+        ingest_pptx_extractor = "xml"
+    pinecone_namespace_strategy = os.environ.get("PINECONE_NAMESPACE_STRATEGY", "shared").strip().lower()
+    if pinecone_namespace_strategy not in ("shared", "document", "course"):
+        pinecone_namespace_strategy = "shared"
+    vector_store_backend = os.environ.get("VECTOR_STORE_BACKEND", "pinecone").strip().lower()
+    if vector_store_backend not in ("pinecone", "local"):
+        vector_store_backend = "pinecone"
+    local_vector_exact_search_limit = max(int(os.environ.get("LOCAL_VECTOR_EXACT_SEARCH_LIMIT", "20000")), 0)
+    pinecone_upsert_max_vectors = min(max(int(os.environ.get("PINECONE_UPSERT_MAX_VECTORS", "100")), 1), 1000)
+    pinecone_upsert_max_bytes = max(int(os.environ.get("PINECONE_UPSERT_MAX_BYTES", "1900000")), 0)
+    pinecone_upsert_concurrency = max(int(os.environ.get("PINECONE_UPSERT_CONCURRENCY", "4")), 1)
+    pinecone_upsert_max_retries = max(int(os.environ.get("PINECONE_UPSERT_MAX_RETRIES", "3")), 0)
+    embedding_cache_path = _local_store_path("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+    embedding_cache_max_bytes = max(
+        int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024))), 0
+    )
 
     # Load OpenRouter, embeddings, and vector-store credentials; used by chat, classifier, and ingestion.
     return Settings(
@@ -148,9 +377,60 @@ def get_settings() -> Settings:
         pinecone_index_name=os.environ.get("PINECONE_INDEX_NAME"),
         pinecone_environment=os.environ.get("PINECONE_ENVIRONMENT"),
         pinecone_namespace=os.environ.get("PINECONE_NAMESPACE", "slides"),
+        pinecone_namespace_strategy=pinecone_namespace_strategy,
+        pinecone_index_metadata_ttl_seconds=max(int(os.environ.get("PINECONE_INDEX_METADATA_TTL_SECONDS", "300")), 0),
         pinecone_index_dimension=(
             int(os.environ["PINECONE_INDEX_DIMENSION"]) if os.environ.get("PINECONE_INDEX_DIMENSION") else None
         ),
         max_cached_sessions=cache_limit,
+        session_cache_max_bytes=session_cache_max_bytes,
+        session_cache_ttl_seconds=session_cache_ttl,
+        session_cache_sweep_interval_seconds=session_cache_sweep,
         ingest_batch_size=ingest_batch_size,
+        ingest_queue_size=ingest_queue_size,
+        ingest_checkpoint_interval=ingest_checkpoint_interval,
+        embed_concurrency=embed_concurrency,
+        embed_requests_per_minute=embed_requests_per_minute,
+        embed_max_retries=embed_max_retries,
+        ingest_job_workers=ingest_job_workers,
+        ingest_job_queue_size=ingest_job_queue_size,
+        ingest_job_orphan_seconds=ingest_job_orphan_seconds,
+        ingest_batch_file_concurrency=ingest_batch_file_concurrency,
+        ingest_batch_max_files=ingest_batch_max_files,
+        ingest_max_upload_bytes=ingest_max_upload_bytes,
+        ingest_spool_dir=os.environ.get("INGEST_SPOOL_DIR") or None,
+        ingest_extract_workers=ingest_extract_workers,
+        ingest_pdf_pages_per_task=ingest_pdf_pages_per_task,
+        ingest_pptx_extractor=ingest_pptx_extractor,
+        ingest_dedup_enabled=os.environ.get("INGEST_DEDUP_ENABLED", "true").lower() == "true",
+        ingest_dedup_threshold=ingest_dedup_threshold,
+        vector_store_backend=vector_store_backend,
+        local_vector_store_path=_local_store_path("LOCAL_VECTOR_STORE_PATH", ".cache/vectors"),
+        local_vector_exact_search_limit=local_vector_exact_search_limit,
+        pinecone_upsert_max_vectors=pinecone_upsert_max_vectors,
+        pinecone_upsert_max_bytes=pinecone_upsert_max_bytes,
+        pinecone_upsert_concurrency=pinecone_upsert_concurrency,
+        pinecone_upsert_max_retries=pinecone_upsert_max_retries,
+        embedding_cache_path=embedding_cache_path,
+        chunk_store_path=_local_store_path("CHUNK_STORE_PATH", ""),
+        chunk_store_shared=os.environ.get("CHUNK_STORE_SHARED", "false").lower() == "true",
+        embedding_cache_max_bytes=embedding_cache_max_bytes,
+        retrieval_hybrid_enabled=os.environ.get("RETRIEVAL_HYBRID_ENABLED", "true").lower() == "true",
+        retrieval_rrf_k=max(int(os.environ.get("RETRIEVAL_RRF_K", "60")), 1),
+        retrieval_lexical_shortcut=os.environ.get("RETRIEVAL_LEXICAL_SHORTCUT", "true").lower() == "true",
+        retrieval_query_cache_size=max(int(os.environ.get("RETRIEVAL_QUERY_CACHE_SIZE", "512")), 0),
+        warmup_on_startup=os.environ.get("WARMUP_ON_STARTUP", "true").lower() == "true",
     )
+
+
+def _local_store_path(env_name: str, default: str) -> Optional[str]:
+    """Resolve a local store path from the environment; empty or "off" disables the store.
+
+    Relative paths resolve against the backend directory.
+    """
+    raw = os.environ.get(env_name, default).strip()
+    if not raw or raw.lower() == "off":
+        return None
+    if not Path(raw).is_absolute():
+        return str(Path(__file__).resolve().parents[2] / raw)
+    return raw
@@ -9,13 +9,13 @@ import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Sequence
 
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-
 from clients.llm.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Resolved when the first generator is constructed by _chat_model_class(); tests may patch it.
+ChatOpenAI = None
+
 
 @dataclass(frozen=True)
 class GeneratedQuestion:
@@ -42,7 +42,7 @@ class QuizQuestionGenerator:
     ) -> None:
         settings = llm_settings or get_settings()
         # Initialize OpenRouter/OpenAI-compatible ChatOpenAI client for question generation.
-        self._model = ChatOpenAI(
+        self._model = _chat_model_class()(
             model=settings.model_name,
             temperature=temperature,
             openai_api_key=settings.openrouter_api_key,
@@ -83,6 +83,8 @@ class QuizQuestionGenerator:
         if context_block:
             learner_prompt += f"\n\nSource Material:\n{context_block}"
 
+        from langchain_core.messages import HumanMessage, SystemMessage
+
         # Core LLM call: synthesize a grounded MCQ from topic/difficulty and retrieved contexts.
         response = self._model.invoke(
             [
@@ -185,3 +187,13 @@ def _strip_markdown_fence(raw: str) -> str:
     if "```" in text:
         text = text[: text.rfind("```")]
     return text.strip()
+
+
+def _chat_model_class():
+    """Import langchain-openai's ChatOpenAI on first use so importing the quiz package stays cheap."""
+    global ChatOpenAI
+    if ChatOpenAI is None:
+        from langchain_openai import ChatOpenAI as _ChatOpenAI
+
+        ChatOpenAI = _ChatOpenAI
+    return ChatOpenAI
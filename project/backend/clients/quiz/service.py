@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import logging
 import random
+import threading
 import uuid
 from collections import defaultdict
 from dataclasses import replace
@@ -100,6 +101,7 @@ class QuizService:
         source_filename: Optional[str],
         is_published: bool,
         metadata: Optional[Dict[str, object]],
+        embedding_namespace: Optional[str] = None,
     ) -> QuizDefinitionRecord:
         """Create or update a quiz definition (metadata, topics, defaults, embedding doc)."""
         cleaned_topics = [topic.strip() for topic in topics if topic and topic.strip()]
@@ -123,6 +125,7 @@ class QuizService:
             assessment_time_limit_minutes=assessment_time_limit_minutes,
             assessment_max_attempts=assessment_max_attempts,
             embedding_document_id=embedding_document_id,
+            embedding_namespace=embedding_namespace if embedding_document_id else None,
             source_filename=source_filename,
             is_published=is_published,
             metadata=metadata or {},
@@ -132,6 +135,23 @@ class QuizService:
         self._repository.save_quiz_definition(record)
         return record
 
+    def prefetch_query_embeddings(self, definition: QuizDefinitionRecord) -> int:
+        """Embed the retrieval query for each of the definition's topics at every difficulty.
+
+        Called after a definition is saved so the first questions hit the query cache. Returns the
+        number of queries embedded; failures are logged and leave the cache as it was.
+        """
+        if not definition.embedding_document_id:
+            return 0
+        retriever = self._get_context_retriever()
+        if retriever is None:
+            return 0
+        try:
+            return retriever.prefetch_queries(definition.topics, DifficultySequence)
+        except Exception as exc:
+            logger.warning("Unable to prefetch query embeddings for quiz %s: %s", definition.quiz_id, exc)
+            return 0
+
     def get_quiz_definition(self, quiz_id: str) -> QuizDefinitionRecord:
         """Fetch a quiz definition or raise if missing."""
         definition = self._repository.load_quiz_definition(quiz_id)
@@ -143,6 +163,16 @@ class QuizService:
         """Return all quiz definitions."""
         return self._repository.list_quiz_definitions()
 
+    def set_embedding_namespace(self, document_id: str, namespace: str) -> List[str]:
+        """Point every definition built on ``document_id`` at ``namespace``; returns the updated quiz ids."""
+        updated: List[str] = []
+        for definition in self._repository.list_quiz_definitions():
+            if definition.embedding_document_id != document_id or definition.embedding_namespace == namespace:
+                continue
+            self._repository.save_quiz_definition(replace(definition, embedding_namespace=namespace))
+            updated.append(definition.quiz_id)
+        return updated
+
     def delete_quiz_definition(self, quiz_id: str) -> None:
         """Delete a quiz definition and associated artifacts."""
         self._repository.delete_quiz_definition(quiz_id)
@@ -590,6 +620,7 @@ class QuizService:
                     total_slide_count=session.total_slide_count,
                     coverage_threshold=self._coverage_threshold,
                     sample_size=self._retriever_sample_size,
+                    **({"namespace": definition.embedding_namespace} if definition.embedding_namespace else {}),
                 )
                 contexts_payload = [
                     {
@@ -1219,6 +1250,14 @@ class QuizService:
             )
             return None
 
+    def warm_up_retriever(self) -> bool:
+        """Initialise the slide retriever's index and embedder ahead of use; False when retrieval is disabled."""
+        retriever = self._get_context_retriever()
+        if retriever is None:
+            return False
+        retriever.warm_up()
+        return True
+
     def _get_context_retriever(self) -> Optional[SlideContextRetriever]:
         """Lazily initialize the slide context retriever unless prior initialization failed."""
         if self._context_retriever is not None:
@@ -1249,10 +1288,13 @@ class QuizService:
 
 
 _quiz_service: Optional[QuizService] = None
+_quiz_service_lock = threading.Lock()
 
 
 def get_quiz_service() -> QuizService:
     global _quiz_service
     if _quiz_service is None:
-        _quiz_service = QuizService()
+        with _quiz_service_lock:
+            if _quiz_service is None:
+                _quiz_service = QuizService()
     return _quiz_service
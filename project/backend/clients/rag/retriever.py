@@ -2,13 +2,31 @@
 
 from __future__ import annotations
 
+import inspect
+import logging
 import random
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from clients.database.pinecone import PineconeRepository
+from clients.database.chunk_store import ChunkStore, get_chunk_store
+from clients.database.embedding_cache import EmbeddingCache, get_embedding_cache
+from clients.database.lexical import tokenize
+from clients.database.vector_store import VectorStore, get_vector_store, namespace_for
+from clients.database.vectors import as_vector
 from clients.llm.settings import Settings
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Task type GoogleGenerativeAIEmbeddings.embed_query uses; batched query embeddings must match it.
+_QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
+_DIFFICULTIES = ("easy", "medium", "hard")
+_DEFAULT_DIFFICULTY = "medium"
+
 
 @dataclass(frozen=True)
 class RetrievedContext:
@@ -25,12 +43,22 @@ class SlideContextRetriever:
     def __init__(
         self,
         settings: Settings,
-        repository: Optional[PineconeRepository] = None,
+        repository: Optional[VectorStore] = None,
         embedder: Optional[object] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        chunk_store: Optional[ChunkStore] = None,
     ) -> None:
         self._settings = settings
         self._repository = repository
         self._embedder = embedder
+        self._embedding_cache = embedding_cache
+        self._embedding_cache_resolved = embedding_cache is not None
+        self._chunk_store = chunk_store
+        self._chunk_store_resolved = chunk_store is not None
+        # (model, query text) -> vector; queries come from a small topic x difficulty set.
+        self._query_cache_size = max(getattr(settings, "retrieval_query_cache_size", 512) or 0, 0)
+        self._query_vectors: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._query_lock = threading.Lock()
 
     def fetch(
         self,
@@ -43,16 +71,16 @@ class SlideContextRetriever:
         total_slide_count: Optional[int] = None,
         coverage_threshold: float = 0.7,
         sample_size: int = 4,
+        namespace: Optional[str] = None,
     ) -> Tuple[List[RetrievedContext], bool]:
-        """Query Pinecone for slide/page chunks, respecting coverage filters and sampling."""
+        """Query the vector index (fused with BM25 ranks) for slide/page chunks, respecting coverage filters and sampling.
+
+        ``namespace`` is the one recorded for the document (e.g. on its quiz definition); without it
+        the namespace is derived from ``pinecone_namespace_strategy``.
+        """
         if not document_id:
             return ([], False)
 
-        repository = self._ensure_repository()
-        embedder = self._ensure_embedder()
-
-        query = self._build_query(topic=topic, difficulty=difficulty)
-        vector = embedder.embed_query(query)
         exclude_set = {value for value in (exclude_slide_ids or []) if value}
         ratio = None
         if total_slide_count and total_slide_count > 0:
@@ -71,23 +99,35 @@ class SlideContextRetriever:
                 return None
             return {"slide_id": {"$nin": clipped}}
 
-        # Core vector search against Pinecone to fetch slide/page chunks for question grounding.
-        response = repository.query(
-            vector=vector,
-            top_k=limit,
-            document_id=document_id,
-            metadata_filter=_build_filter(),
+        # Lexical side: BM25 over the topic terms from the chunk store's per-document index.
+        terms = list(dict.fromkeys(tokenize(topic or "")))
+        lexical = self._lexical_matches(document_id, terms, limit + len(exclude_set)) if terms else []
+        allowed_lexical = (
+            [match for match in lexical if match["metadata"].get("slide_id") not in exclude_set]
+            if apply_filter
+            else lexical
         )
-        matches = (response or {}).get("matches") or []
-
-        if not matches and apply_filter:
-            coverage_reset_needed = True
-            response = repository.query(
-                vector=vector,
-                top_k=limit,
-                document_id=document_id,
-            )
-            matches = (response or {}).get("matches") or []
+        exact = [match for match in allowed_lexical if match["matched_terms"] == len(terms)]
+        enough = sample_size if sample_size > 0 else limit
+        # Difficulty only reaches retrieval through the embedded query, so a lexical-only answer is
+        # limited to the default difficulty; easy/hard requests keep their difficulty-conditioned ranking.
+        shortcut = (
+            getattr(self._settings, "retrieval_lexical_shortcut", True)
+            and (difficulty or _DEFAULT_DIFFICULTY) == _DEFAULT_DIFFICULTY
+        )
+        if shortcut and exact and len(exact) >= enough:
+            # Enough chunks literally contain every topic term: answer without an embedding call.
+            matches = exact[:limit]
+        else:
+            matches = self._vector_matches(document_id, topic, difficulty, limit, _build_filter(), namespace)
+            if not matches and apply_filter:
+                coverage_reset_needed = True
+                matches = self._vector_matches(document_id, topic, difficulty, limit, None, namespace)
+                allowed_lexical = lexical
+            if allowed_lexical:
+                matches = _reciprocal_rank_fusion(
+                    [matches, allowed_lexical], k=getattr(self._settings, "retrieval_rrf_k", 60), limit=limit
+                )
 
         if ratio is not None and ratio >= coverage_threshold:
             coverage_reset_needed = True
@@ -102,9 +142,22 @@ class SlideContextRetriever:
         if len(matches) > sample_size > 0:
             matches = matches[:sample_size]
 
+        # Text lives in the local chunk store when enabled; look it up only for the sampled matches.
+        stored = {}
+        chunk_store = self._ensure_chunk_store()
+        if chunk_store is not None and matches:
+            stored = chunk_store.get_many([str(match.get("id") or "") for match in matches])
+
         contexts: List[RetrievedContext] = []
+        missing: List[str] = []
         for match in matches:
             metadata = match.get("metadata") or {}
+            chunk = stored.get(str(match.get("id") or ""))
+            if chunk is not None:
+                metadata = {**chunk.metadata, **metadata, "text": chunk.text}
+            elif chunk_store is not None:
+                # Another instance (or a lost disk) wrote this chunk; Pinecone metadata may still carry its text.
+                missing.append(str(match.get("id") or ""))
             text = str(metadata.get("text") or "").strip()
             if not text:
                 continue
@@ -115,12 +168,150 @@ class SlideContextRetriever:
                     score=match.get("score"),
                 )
             )
+        if missing:
+            logger.warning(
+                "Chunk store has no rows for %s of %s matches in %s; used Pinecone metadata text (e.g. %s)",
+                len(missing),
+                len(matches),
+                document_id,
+                missing[0],
+            )
         return contexts, coverage_reset_needed
 
-    def _ensure_repository(self) -> PineconeRepository:
-        """Lazy-init the Pinecone repository if none was injected."""
+    def _vector_matches(
+        self,
+        document_id: str,
+        topic: str,
+        difficulty: str,
+        limit: int,
+        metadata_filter: Optional[Dict[str, Any]],
+        namespace: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        # Core vector search against Pinecone to fetch slide/page chunks for question grounding.
+        repository = self._ensure_repository()
+        target = namespace or namespace_for(self._settings, document_id)
+        if target and target != repository.namespace:
+            repository = repository.with_namespace(target)
+        vector = self._embed_query(self._ensure_embedder(), self._build_query(topic=topic, difficulty=difficulty))
+        filter_kwargs = {"metadata_filter": metadata_filter} if metadata_filter is not None else {}
+        response = repository.query(vector=vector, top_k=limit, document_id=document_id, **filter_kwargs)
+        return list((response or {}).get("matches") or [])
+
+    def _lexical_matches(self, document_id: str, terms: List[str], limit: int) -> List[Dict[str, Any]]:
+        """BM25 hits as Pinecone-shaped matches (text included), plus ``matched_terms``; [] when disabled."""
+        chunk_store = self._ensure_chunk_store()
+        if chunk_store is None or not getattr(self._settings, "retrieval_hybrid_enabled", True):
+            return []
+        hits = chunk_store.search(document_id, terms, limit=limit)
+        chunks = chunk_store.get_many([hit.vector_id for hit in hits])
+        matches = []
+        for hit in hits:
+            chunk = chunks.get(hit.vector_id)
+            if chunk is None:
+                continue
+            matches.append(
+                {
+                    "id": hit.vector_id,
+                    "score": hit.score,
+                    "metadata": {**chunk.metadata, "text": chunk.text},
+                    "matched_terms": hit.matched_terms,
+                }
+            )
+        return matches
+
+    def warm_up(self) -> None:
+        """Create the Pinecone repository and embeddings client before the first fetch."""
+        self._ensure_repository()
+        self._ensure_embedder()
+
+    def prefetch_queries(self, topics: Iterable[str], difficulties: Sequence[str] = _DIFFICULTIES) -> int:
+        """Embed the retrieval query for every topic x difficulty ahead of use; returns how many were embedded.
+
+        Queries already in the in-process LRU or the on-disk embedding cache are skipped, and the
+        rest go to the provider as one batch when the embedder supports query task types.
+        """
+        queries = list(
+            dict.fromkeys(
+                self._build_query(topic=topic, difficulty=difficulty) for topic in topics for difficulty in difficulties
+            )
+        )
+        cache = self._ensure_embedding_cache()
+        if cache is None and not self._query_cache_size:
+            return 0  # nowhere to keep the vectors
+        missing = [query for query in queries if self._remembered_query(query) is None]
+        if cache is not None and missing:
+            found = cache.get_many(missing, task="query")
+            for query, cached in zip(missing, found):
+                if cached is not None:
+                    self._remember_query(query, cached)
+            missing = [query for query, cached in zip(missing, found) if cached is None]
+        if not missing:
+            return 0
+        vectors = self._embed_queries(self._ensure_embedder(), missing)
+        if cache is not None:
+            cache.put_many(missing, vectors, task="query")
+        for query, vector in zip(missing, vectors):
+            self._remember_query(query, vector)
+        return len(missing)
+
+    def _embed_query(self, embedder: Any, query: str) -> np.ndarray:
+        """Embed the retrieval query as a float32 vector via the in-process LRU, then the on-disk embedding cache."""
+        remembered = self._remembered_query(query)
+        if remembered is not None:
+            return remembered
+        cache = self._ensure_embedding_cache()
+        vector = cache.get(query, task="query") if cache is not None else None
+        if vector is None:
+            vector = as_vector(embedder.embed_query(query))
+            if cache is not None:
+                cache.put(query, vector, task="query")
+        self._remember_query(query, vector)
+        return vector
+
+    @staticmethod
+    def _embed_queries(embedder: Any, queries: List[str]) -> List[np.ndarray]:
+        batch = getattr(embedder, "embed_documents", None)
+        if batch is not None and "task_type" in inspect.signature(batch).parameters:
+            return [as_vector(vector) for vector in batch(queries, task_type=_QUERY_TASK_TYPE)]
+        return [as_vector(embedder.embed_query(query)) for query in queries]
+
+    def _remembered_query(self, query: str) -> Optional[np.ndarray]:
+        key = (self._settings_model(), query)
+        with self._query_lock:
+            vector = self._query_vectors.get(key)
+            if vector is not None:
+                self._query_vectors.move_to_end(key)
+            return vector
+
+    def _remember_query(self, query: str, vector: np.ndarray) -> None:
+        if not self._query_cache_size:
+            return
+        key = (self._settings_model(), query)
+        with self._query_lock:
+            self._query_vectors[key] = vector
+            self._query_vectors.move_to_end(key)
+            while len(self._query_vectors) > self._query_cache_size:
+                self._query_vectors.popitem(last=False)
+
+    def _settings_model(self) -> str:
+        return getattr(self._settings, "google_embeddings_model_name", "") or ""
+
+    def _ensure_embedding_cache(self) -> Optional[EmbeddingCache]:
+        if not self._embedding_cache_resolved:
+            self._embedding_cache = get_embedding_cache(self._settings)
+            self._embedding_cache_resolved = True
+        return self._embedding_cache
+
+    def _ensure_chunk_store(self) -> Optional[ChunkStore]:
+        if not self._chunk_store_resolved:
+            self._chunk_store = get_chunk_store(self._settings)
+            self._chunk_store_resolved = True
+        return self._chunk_store
+
+    def _ensure_repository(self) -> VectorStore:
+        """Lazy-init the configured vector store if none was injected."""
         if self._repository is None:
-            self._repository = PineconeRepository(self._settings)
+            self._repository = get_vector_store(self._settings)
         return self._repository
 
     def _ensure_embedder(self):
@@ -147,8 +338,23 @@ class SlideContextRetriever:
     def _build_query(*, topic: str, difficulty: str) -> str:
         """Compose a retrieval prompt that conditions on topic and difficulty."""
         base_topic = topic or "general"
-        base_difficulty = difficulty or "medium"
+        base_difficulty = difficulty or _DEFAULT_DIFFICULTY
         return (
             f"{base_topic} key ideas suitable for a {base_difficulty} difficulty question. "
             "Return the most informative passages."
         )
+
+
+def _reciprocal_rank_fusion(rankings: Sequence[Sequence[Dict[str, Any]]], *, k: int, limit: int) -> List[Dict[str, Any]]:
+    """Merge ranked match lists by RRF (sum of 1 / (k + rank)); the first list's match dict wins per id."""
+    fused: Dict[str, float] = {}
+    first: Dict[str, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, match in enumerate(ranking, start=1):
+            key = str(match.get("id") or "")
+            if not key:
+                continue
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+            first.setdefault(key, match)
+    ordered = sorted(fused, key=lambda key: -fused[key])[:limit]
+    return [{**first[key], "score": fused[key]} for key in ordered]
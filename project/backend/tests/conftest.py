@@ -16,6 +16,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.main import app as fastapi_app
 from clients.database.chat_repository import InMemoryChatRepository
+from clients.database.client_registry import get_client_registry
 from clients.llm import get_llm_service
 from clients.llm.service import LLMService
 from clients.llm.settings import Settings
@@ -83,6 +84,14 @@ def _reset_llm_singleton() -> Iterator[None]:
         service_module._llm_service = original
 
 
+@pytest.fixture(autouse=True)
+def _reset_client_registry() -> Iterator[None]:
+    """Tests install their own fake Pinecone/Firestore clients; never share them across tests."""
+    get_client_registry().close()
+    yield
+    get_client_registry().close()
+
+
 @pytest.fixture(autouse=True)
 def _reset_quiz_singleton() -> Iterator[None]:
     original = quiz_service_module._quiz_service
@@ -3,6 +3,8 @@ from __future__ import annotations
 """Integration test for ingest upload endpoint wiring through the pipeline."""
 
 import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Dict, List
 
 import pytest
@@ -35,7 +37,7 @@ async def test_ingest_upload_endpoint_returns_ingestion_summary(
     metadata = json.dumps({"document_id": "deck-123", "course": "math"})
 
     response = await async_client.post(
-        "/ingest/upload",
+        "/ingest/upload?wait=true",
         data={"session_id": "session-1", "metadata": metadata},
         files={"file": ("Lesson.pptx", b"binary-data", "application/vnd.ms-powerpoint")},
     )
@@ -57,7 +59,7 @@ async def test_ingest_upload_endpoint_returns_ingestion_summary(
 @pytest.mark.asyncio
 async def test_ingest_upload_endpoint_rejects_bad_metadata(async_client) -> None:
     response = await async_client.post(
-        "/ingest/upload",
+        "/ingest/upload?wait=true",
         data={"session_id": "session-2", "metadata": "not-json"},
         files={"file": ("Lesson.pptx", b"binary-data", "application/vnd.ms-powerpoint")},
     )
@@ -78,7 +80,7 @@ async def test_ingest_upload_endpoint_handles_pipeline_error(
     test_llm_service._ingestion_pipeline = FailingPipeline()  # type: ignore[attr-defined]
 
     response = await async_client.post(
-        "/ingest/upload",
+        "/ingest/upload?wait=true",
         data={"session_id": "session-3"},
         files={"file": ("Lesson.pptx", b"binary-data", "application/vnd.ms-powerpoint")},
     )
@@ -110,3 +112,229 @@ async def test_ingest_delete_document_invokes_pipeline(
     assert response.status_code == 200
     assert response.json() == {"status": "deleted", "document_id": "doc-42"}
     assert pipeline.deleted == ["doc-42"]
+
+
+@pytest.mark.asyncio
+async def test_document_sweep_skips_quiz_documents_and_defaults_to_dry_run(
+    async_client,
+    test_llm_service: LLMService,
+    quiz_repository,
+) -> None:
+    from clients.database.manifest_repository import DocumentManifest
+    from clients.database.quiz_repository import QuizDefinitionRecord
+
+    class SweepPipeline:
+        def __init__(self) -> None:
+            self.deleted: list[str] = []
+
+        def list_documents(self) -> list[DocumentManifest]:
+            stamp = datetime.now(timezone.utc) - timedelta(days=30)
+            return [
+                DocumentManifest("quiz-deck", "slides", updated_at=stamp),
+                DocumentManifest("orphan-deck", "slides", updated_at=stamp),
+            ]
+
+        def delete_document(self, document_id: str) -> None:
+            self.deleted.append(document_id)
+
+    pipeline = SweepPipeline()
+    test_llm_service._ingestion_pipeline = pipeline  # type: ignore[attr-defined]
+    quiz_repository.save_quiz_definition(
+        QuizDefinitionRecord(
+            quiz_id="quiz-1",
+            name=None,
+            topics=["limits"],
+            default_mode="practice",
+            initial_difficulty="easy",
+            assessment_num_questions=None,
+            assessment_time_limit_minutes=None,
+            assessment_max_attempts=None,
+            embedding_document_id="quiz-deck",
+        )
+    )
+
+    preview = await async_client.post("/maintenance/documents/sweep")
+    no_cutoff = await async_client.post("/maintenance/documents/sweep", params={"dry_run": "false"})
+    swept = await async_client.post(
+        "/maintenance/documents/sweep", params={"dry_run": "false", "older_than_days": "7"}
+    )
+    invalid = await async_client.post("/maintenance/documents/sweep", params={"unreferenced_only": "false"})
+
+    assert preview.json()["selected"] == ["orphan-deck"] and preview.json()["deleted"] == []
+    assert no_cutoff.status_code == 400
+    assert swept.json()["deleted"] == ["orphan-deck"]
+    assert pipeline.deleted == ["orphan-deck"]
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_ingest_upload_endpoint_spools_to_disk_and_cleans_up(
+    async_client,
+    test_llm_service: LLMService,
+) -> None:
+    from pathlib import Path
+
+    seen: Dict[str, Any] = {}
+
+    class SpoolReadingPipeline:
+        async def ingest(self, **kwargs: Any) -> IngestionResult:
+            path = Path(kwargs["file_path"])
+            seen["path"] = path
+            seen["content"] = path.read_bytes()
+            seen["file_bytes"] = kwargs.get("file_bytes")
+            return IngestionResult(document_id=kwargs["document_id"], slide_count=1, chunk_count=1, namespace="slides")
+
+    test_llm_service._ingestion_pipeline = SpoolReadingPipeline()  # type: ignore[attr-defined]
+
+    response = await async_client.post(
+        "/ingest/upload?wait=true",
+        data={"session_id": "session-4"},
+        files={"file": ("Lesson.pdf", b"%PDF spooled", "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    assert seen["content"] == b"%PDF spooled"
+    assert seen["file_bytes"] is None
+    assert seen["path"].suffix == ".pdf"
+    assert not seen["path"].exists()
+
+
+@pytest.mark.asyncio
+async def test_ingest_upload_endpoint_rejects_oversized_files(
+    async_client,
+    test_llm_service: LLMService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from app import main
+
+    class UnusedPipeline:
+        async def ingest(self, **_: Any) -> IngestionResult:  # pragma: no cover - must not run
+            raise AssertionError("oversized uploads must not reach the pipeline")
+
+    test_llm_service._ingestion_pipeline = UnusedPipeline()  # type: ignore[attr-defined]
+    monkeypatch.setattr(main, "_upload_limits", lambda: (8, None))
+
+    response = await async_client.post(
+        "/ingest/upload?wait=true",
+        data={"session_id": "session-5"},
+        files={"file": ("Lesson.pptx", b"x" * 64, "application/vnd.ms-powerpoint")},
+    )
+
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_ingest_upload_endpoint_queues_job_and_reports_progress(
+    async_client,
+    test_llm_service: LLMService,
+) -> None:
+    import asyncio
+
+    class QuickPipeline:
+        async def ingest(self, **kwargs: Any) -> IngestionResult:
+            return IngestionResult(document_id=kwargs["document_id"], slide_count=2, chunk_count=5, namespace="slides")
+
+    test_llm_service._ingestion_pipeline = QuickPipeline()  # type: ignore[attr-defined]
+
+    response = await async_client.post(
+        "/ingest/upload",
+        data={"session_id": "session-6", "metadata": json.dumps({"document_id": "deck-6"})},
+        files={"file": ("Lesson.pptx", b"binary-data", "application/vnd.ms-powerpoint")},
+    )
+
+    assert response.status_code == 202
+    queued = response.json()
+    assert queued["status"] == "queued"
+    assert queued["document_id"] == "deck-6"
+    assert queued["status_url"] == f"/ingest/jobs/{queued['job_id']}"
+
+    for _ in range(200):
+        job = (await async_client.get(queued["status_url"])).json()
+        if job["status"] == "succeeded":
+            break
+        await asyncio.sleep(0.01)
+    assert job["status"] == "succeeded"
+    assert job["result"]["chunk_count"] == 5
+    assert job["eta_seconds"] is None
+
+
+@pytest.mark.asyncio
+async def test_ingest_job_status_returns_404_for_unknown_job(async_client) -> None:
+    response = await async_client.get("/ingest/jobs/does-not-exist")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_endpoint_reports_each_file(
+    async_client,
+    test_llm_service: LLMService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from app import main
+
+    class BatchPipeline:
+        def __init__(self) -> None:
+            self.calls: List[Dict[str, Any]] = []
+
+        async def ingest(self, **kwargs: Any) -> IngestionResult:
+            self.calls.append(kwargs)
+            if kwargs["filename"] == "broken.pptx":
+                raise RuntimeError("Unsupported deck")
+            return IngestionResult(document_id=kwargs["document_id"], slide_count=1, chunk_count=2, namespace="slides")
+
+    pipeline = BatchPipeline()
+    test_llm_service._ingestion_pipeline = pipeline  # type: ignore[attr-defined]
+    monkeypatch.setattr(main, "_upload_limits", lambda: (32, None))
+    files = [
+        ("files", ("week1.pptx", b"deck one", "application/vnd.ms-powerpoint")),
+        ("files", ("broken.pptx", b"deck two", "application/vnd.ms-powerpoint")),
+        ("files", ("huge.pdf", b"x" * 64, "application/pdf")),
+        ("files", ("week2.pdf", b"%PDF three", "application/pdf")),
+    ]
+    metadata = json.dumps({"course_id": "calc", "document_id": "ignored"})
+
+    response = await async_client.post("/ingest/batch", data={"session_id": "s-1", "metadata": metadata}, files=files)
+    streamed = await async_client.post("/ingest/batch?stream=true", data={"session_id": "s-1"}, files=files[:2])
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["succeeded"], payload["failed"]) == (2, 2)
+    assert [item["filename"] for item in payload["files"]] == ["week1.pptx", "broken.pptx", "huge.pdf", "week2.pdf"]
+    assert [item["status"] for item in payload["files"]] == ["indexed", "failed", "failed", "indexed"]
+    assert payload["files"][1]["error"] == "Unsupported deck" and "limit" in payload["files"][2]["error"]
+    assert len({item.get("document_id") for item in payload["files"] if item["status"] == "indexed"}) == 2
+    assert all(call["metadata"]["course_id"] == "calc" for call in pipeline.calls[:3])
+    assert not any(Path(call["file_path"]).exists() for call in pipeline.calls)
+
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert sorted(line["filename"] for line in lines[:2]) == ["broken.pptx", "week1.pptx"]
+    assert lines[-1] == {"status": "completed", "files": 2, "succeeded": 1, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_endpoint_rejects_files_that_share_a_document_id(
+    async_client,
+    test_llm_service: LLMService,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    from app import main
+
+    class UnusedPipeline:
+        async def ingest(self, **_: Any) -> IngestionResult:  # pragma: no cover - must not run
+            raise AssertionError("duplicate batches are rejected before ingesting")
+
+    test_llm_service._ingestion_pipeline = UnusedPipeline()  # type: ignore[attr-defined]
+    monkeypatch.setattr(main, "_upload_limits", lambda: (1024, str(tmp_path)))
+    files = [
+        ("files", ("Week 1.pptx", b"deck", "application/vnd.ms-powerpoint")),
+        ("files", ("week-1.pdf", b"%PDF", "application/pdf")),
+    ]
+
+    response = await async_client.post("/ingest/batch", data={"session_id": "s-1"}, files=files)
+
+    assert response.status_code == 400
+    assert "same document" in response.json()["detail"]
+    assert list(tmp_path.iterdir()) == []
@@ -154,3 +154,49 @@ async def test_delete_session_rejects_non_preview(async_client):
 
     response = await async_client.delete(f"/quiz/session/{session_id}")
     assert response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_quiz_definition_records_and_follows_document_namespace(async_client, test_llm_service):
+    from clients.ingestion.namespace_migration import MigrationReport
+
+    class NamespacePipeline:
+        def document_namespace(self, document_id: str) -> str:
+            return "slides"
+
+    async def _migrate(*, document_id=None, dry_run=True):
+        return MigrationReport(dry_run=dry_run, moves={"deck-9": ("slides", "slides--doc-deck-9")}, vectors_moved=3)
+
+    test_llm_service._ingestion_pipeline = NamespacePipeline()
+    test_llm_service.migrate_namespaces = _migrate
+    payload = {**_build_definition_payload("quiz-ns-1"), "embedding_document_id": "deck-9"}
+
+    created = await async_client.post("/quiz/definitions", json=payload)
+    resolved = await async_client.get("/quiz/definitions/quiz-ns-1")
+    migrated = await async_client.post("/maintenance/namespaces/migrate", params={"dry_run": "false"})
+    fetched = await async_client.get("/quiz/definitions/quiz-ns-1")
+
+    # The namespace lookup runs after the response, so only the stored definition carries it.
+    assert created.json()["embedding_namespace"] is None
+    assert resolved.json()["embedding_namespace"] == "slides"
+    assert migrated.json()["moves"] == {"deck-9": {"from": "slides", "to": "slides--doc-deck-9"}}
+    assert migrated.json()["definitions_updated"] == ["quiz-ns-1"]
+    assert fetched.json()["embedding_namespace"] == "slides--doc-deck-9"
+
+
+@pytest.mark.anyio
+async def test_saving_a_definition_prefetches_query_embeddings(async_client, test_quiz_service):
+    prefetched: list = []
+
+    class PrefetchRetriever:
+        def prefetch_queries(self, topics, difficulties):
+            prefetched.append((list(topics), list(difficulties)))
+            return len(topics) * len(difficulties)
+
+    test_quiz_service._context_retriever = PrefetchRetriever()
+    without_document = await async_client.post("/quiz/definitions", json=_build_definition_payload("quiz-pf-0"))
+    payload = {**_build_definition_payload("quiz-pf-1"), "embedding_document_id": "deck-1", "embedding_namespace": "slides"}
+    created = await async_client.post("/quiz/definitions", json=payload)
+
+    assert without_document.status_code == created.status_code == 200
+    assert prefetched == [(["algebra", "geometry"], ["easy", "medium", "hard"])]
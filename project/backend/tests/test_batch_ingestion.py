@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+"""Covers batch ingestion scheduling: the per-batch file limit, completion-order results, and spool cleanup."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from clients.ingestion.batch import BatchFile, ingest_batch
+from clients.ingestion.pipeline import IngestionResult
+
+
+def _spool(tmp_path: Path, count: int) -> List[BatchFile]:
+    files = []
+    for index in range(count):
+        path = tmp_path / f"deck-{index}.pptx"
+        path.write_bytes(b"deck")
+        files.append(BatchFile(filename=path.name, file_path=path))
+    return files
+
+
+@pytest.mark.asyncio
+async def test_batch_limits_files_in_flight_and_yields_as_files_finish(tmp_path: Path) -> None:
+    active: List[int] = []
+    peak = 0
+
+    async def runner(**kwargs: Any) -> IngestionResult:
+        nonlocal peak
+        active.append(1)
+        peak = max(peak, len(active))
+        # Later files finish first, so completion order differs from upload order.
+        await asyncio.sleep(0.01 * (4 - int(kwargs["filename"][5])))
+        active.pop()
+        return IngestionResult(document_id=kwargs["filename"], slide_count=1, chunk_count=1, namespace="slides")
+
+    files = _spool(tmp_path, 4)
+    results = [item async for item in ingest_batch(runner, files, session_id="s", file_concurrency=2)]
+
+    assert peak == 2
+    assert [item.index for item in results] != [0, 1, 2, 3]
+    assert sorted(item.index for item in results) == [0, 1, 2, 3]
+    assert all(item.status == "indexed" for item in results)
+    assert not any(batch_file.file_path.exists() for batch_file in files)
+
+
+@pytest.mark.asyncio
+async def test_closing_a_batch_early_cancels_and_cleans_up(tmp_path: Path) -> None:
+    started: List[str] = []
+
+    async def runner(**kwargs: Any) -> IngestionResult:
+        started.append(kwargs["filename"])
+        if kwargs["filename"] != "deck-0.pptx":
+            await asyncio.sleep(10)
+        return IngestionResult(document_id="d", slide_count=1, chunk_count=1, namespace="slides")
+
+    files = _spool(tmp_path, 3)
+    results = ingest_batch(runner, files, session_id="s", file_concurrency=1)
+
+    first = await results.__anext__()
+    await results.aclose()
+
+    assert first.filename == "deck-0.pptx"
+    assert started == ["deck-0.pptx", "deck-1.pptx"]
+    assert not any(batch_file.file_path.exists() for batch_file in files)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+"""Covers exact and MinHash near-duplicate detection for ingestion chunks."""
+
+from clients.ingestion.dedup import ChunkDeduplicator
+
+_RECAP = (
+    "Recap: gradient descent updates each weight by subtracting the learning rate times the partial "
+    "derivative of the loss, repeating until the validation loss stops improving across epochs."
+)
+
+
+def test_exact_duplicates_match_after_normalization() -> None:
+    dedup = ChunkDeduplicator()
+
+    assert dedup.check("Questions?") is None
+    assert dedup.check("  QUESTIONS?\n") == 0
+    assert dedup.check("Thank you") is None
+
+
+def test_near_duplicates_fold_into_the_first_copy() -> None:
+    dedup = ChunkDeduplicator(threshold=0.8)
+
+    assert dedup.check(_RECAP) is None
+    assert dedup.check("Backpropagation applies the chain rule layer by layer to compute gradients.") is None
+    assert dedup.check(_RECAP.replace("epochs", "training epochs")) == 0
+
+
+def test_distinct_text_is_kept_even_with_shared_boilerplate() -> None:
+    dedup = ChunkDeduplicator(threshold=0.9)
+    footer = "CS 229 Machine Learning Stanford University Autumn"
+
+    assert dedup.check(f"{footer} Lecture on support vector machines and margins") is None
+    assert dedup.check(f"{footer} Lecture on k-means clustering and expectation maximization") is None
+
+
+def test_exact_match_keeps_symbols_that_change_meaning() -> None:
+    dedup = ChunkDeduplicator()
+
+    assert dedup.check("x > y") is None
+    assert dedup.check("x < y") is None
+    assert dedup.check("X  >  Y") == 0
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+"""Covers the local chunk text store and its use by ingestion and retrieval."""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from clients.database.chunk_store import ChunkStore, StoredChunk, get_chunk_store
+from clients.ingestion.pipeline import PDFExtractor, SlideChunk, SlideExtractor, SlideIngestionPipeline
+from clients.rag.retriever import SlideContextRetriever
+
+
+def _chunk(vector_id: str, document_id: str = "deck-1", text: str = "body") -> StoredChunk:
+    return StoredChunk(vector_id=vector_id, document_id=document_id, text=text, metadata={"slide_title": "Intro"})
+
+
+def test_store_round_trips_and_deletes_by_document(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([_chunk("a"), _chunk("b", text="second"), _chunk("c", document_id="deck-2")])
+
+    assert store.get_many(["b", "missing"]) == {"b": _chunk("b", text="second")}
+    assert [chunk.vector_id for chunk in store.load_document("deck-1")] == ["a", "b"]
+
+    store.merge_metadata("a", {"source_slides": ["1", "4"]})
+    assert store.get_many(["a"])["a"].metadata == {"slide_title": "Intro", "source_slides": ["1", "4"]}
+
+    store.delete_ids(["a"])
+    store.delete_document("deck-2")
+    assert store.document_ids("deck-1") == {"b"}
+    assert store.document_ids("deck-2") == set()
+
+
+def test_get_chunk_store_is_disabled_without_a_path(tmp_path) -> None:
+    assert get_chunk_store(SimpleNamespace(chunk_store_path=None)) is None
+    path = str(tmp_path / "shared.sqlite3")
+    first = get_chunk_store(SimpleNamespace(chunk_store_path=path))
+    assert first is not None
+    assert get_chunk_store(SimpleNamespace(chunk_store_path=path)) is first
+
+
+class _Repository:
+    def __init__(self) -> None:
+        self.namespace = "slides"
+        self.dimension = 2
+        self.items: List[Dict[str, Any]] = []
+
+    def upsert(self, items):
+        self.items.extend(items)
+
+
+class _Extractor(SlideExtractor):
+    def iter_slides(self, file_bytes):  # pragma: no cover - trivial
+        slide = SlideChunk(slide_number=1, text="Entropy measures uncertainty.", slide_title="Entropy", chunk_index=0)
+        return iter([slide])
+
+
+class _Chunker:
+    def chunk(self, slides):
+        return list(slides)
+
+
+class _Embedder:
+    async def embed(self, texts):
+        return [[0.5, 0.5] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_only_filterable_metadata_on_vectors_with_a_shared_store(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    repository = _Repository()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=8, chunk_store_shared=True),
+        repository=repository,
+        extractor=_Extractor(),
+        pdf_extractor=PDFExtractor(),
+        chunker=_Chunker(),
+        embedding_service=_Embedder(),
+        chunk_store=store,
+    )
+
+    await pipeline.ingest(
+        document_id="deck-9",
+        file_bytes=b"pptx",
+        filename="deck.pptx",
+        metadata={"session_id": "s-1", "course": "info theory", "source_filename": "deck.pptx"},
+    )
+
+    assert repository.items[0]["metadata"] == {
+        "document_id": "deck-9",
+        "session_id": "s-1",
+        "slide_number": 1,
+        "chunk_index": 0,
+        "source_type": "slide",
+    }
+    stored = store.get_many([repository.items[0]["id"]])[repository.items[0]["id"]]
+    assert stored.text == "Entropy measures uncertainty."
+    assert stored.metadata["course"] == "info theory"
+    assert stored.metadata["slide_title"] == "Entropy"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_text_on_vectors_when_the_store_is_not_shared(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    repository = _Repository()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=8),
+        repository=repository,
+        extractor=_Extractor(),
+        pdf_extractor=PDFExtractor(),
+        chunker=_Chunker(),
+        embedding_service=_Embedder(),
+        chunk_store=store,
+    )
+
+    await pipeline.ingest(document_id="deck-9", file_bytes=b"pptx", filename="deck.pptx")
+
+    metadata = repository.items[0]["metadata"]
+    assert metadata["text"] == "Entropy measures uncertainty."
+    assert metadata["slide_title"] == "Entropy"
+    assert store.get_many([repository.items[0]["id"]])[repository.items[0]["id"]].text == metadata["text"]
+
+
+def test_retriever_reads_text_for_sampled_matches_from_the_store(tmp_path, caplog) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([_chunk("deck-1-s1-c0", text="Stored passage")])
+
+    class _Repo:
+        def query(self, **_: Any) -> Dict[str, Any]:
+            return {
+                "matches": [
+                    {"id": "deck-1-s1-c0", "metadata": {"document_id": "deck-1", "slide_number": 1}, "score": 0.8},
+                    {"id": "unknown", "metadata": {"document_id": "deck-1", "text": "Legacy inline text"}},
+                ]
+            }
+
+    class _QueryEmbedder:
+        def embed_query(self, text: str) -> List[float]:
+            return [1.0]
+
+    retriever = SlideContextRetriever(
+        SimpleNamespace(embedding_cache_path=None),
+        repository=_Repo(),  # type: ignore[arg-type]
+        embedder=_QueryEmbedder(),
+        chunk_store=store,
+    )
+
+    with caplog.at_level("WARNING", logger="clients.rag.retriever"):
+        contexts, _ = retriever.fetch(document_id="deck-1", topic="t", difficulty="easy", sample_size=0)
+
+    by_text = {context.text: context.metadata for context in contexts}
+    assert set(by_text) == {"Stored passage", "Legacy inline text"}
+    assert by_text["Stored passage"]["slide_title"] == "Intro"
+    assert by_text["Stored passage"]["slide_number"] == 1
+    # The match missing from the store fell back to its Pinecone metadata text, with a warning.
+    assert "no rows for 1 of 2 matches in deck-1" in caplog.text
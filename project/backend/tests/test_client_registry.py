@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+"""Covers the process-wide client registry: single construction under threads, TTL metadata, sharing."""
+
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+import pytest
+
+from clients.database import client_registry as registry_module
+from clients.database import firebase
+from clients.database import pinecone as pinecone_module
+from clients.database.client_registry import ClientRegistry, get_client_registry
+from clients.database.pinecone import PineconeRepository
+from clients.llm.settings import Settings
+
+
+def test_concurrent_lookups_build_each_client_once() -> None:
+    registry = ClientRegistry()
+    built: List[int] = []
+    gate = threading.Event()
+
+    def factory() -> object:
+        gate.wait(1)
+        built.append(1)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(registry.get, "client", factory) for _ in range(8)]
+        gate.set()
+        clients = {id(future.result()) for future in futures}
+
+    assert len(built) == 1 and len(clients) == 1
+
+
+def test_failed_factories_and_none_metadata_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    registry = ClientRegistry()
+
+    def offline() -> object:
+        raise RuntimeError("offline")
+
+    with pytest.raises(RuntimeError):
+        registry.get("client", offline)
+    assert registry.get("client", lambda: "ok") == "ok"
+
+    now = [100.0]
+    monkeypatch.setattr(registry_module.time, "monotonic", lambda: now[0])
+    loads: List[Any] = [None, 3072, 1536]
+
+    def load() -> Any:
+        return loads.pop(0)
+
+    assert registry.cached("dimension", load, ttl_seconds=60) is None
+    assert registry.cached("dimension", load, ttl_seconds=60) == 3072
+    now[0] += 30
+    assert registry.cached("dimension", load, ttl_seconds=60) == 3072
+    now[0] += 31
+    assert registry.cached("dimension", load, ttl_seconds=60) == 1536
+
+
+def test_close_shuts_down_pools_and_clients() -> None:
+    registry = ClientRegistry()
+    closed: List[str] = []
+    registry.get("client", lambda: types.SimpleNamespace(close=lambda: closed.append("client")))
+    pool = registry.get("pool", lambda: ThreadPoolExecutor(max_workers=1))
+
+    registry.close()
+
+    assert closed == ["client"]
+    with pytest.raises(RuntimeError):
+        pool.submit(time.sleep, 0)
+    assert registry.get("client", lambda: "rebuilt") == "rebuilt"
+
+
+def test_pinecone_repositories_share_client_index_and_dimension(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: List[dict] = []
+    described: List[str] = []
+
+    class _Client:
+        def __init__(self, **kwargs: Any) -> None:
+            created.append(kwargs)
+
+        def Index(self, name: str) -> object:  # noqa: N802 - SDK parity
+            return types.SimpleNamespace(name=name)
+
+        def describe_index(self, name: str) -> dict:
+            described.append(name)
+            return {"dimension": 3}
+
+    monkeypatch.setattr(pinecone_module, "Pinecone", _Client)
+    settings = Settings(
+        openrouter_api_key="k", pinecone_api_key="pc", pinecone_index_name="idx", pinecone_upsert_concurrency=2
+    )
+
+    first = PineconeRepository(settings)
+    second = PineconeRepository(settings)
+
+    assert len(created) == 1 and described == ["idx"]
+    assert first._index is second._index and first.dimension == second.dimension == 3
+    assert first._get_upsert_pool() is second.with_namespace("other")._get_upsert_pool()
+
+
+def test_firestore_client_is_shared_per_project(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(firebase, "firestore", types.SimpleNamespace(Client=lambda project: object()))
+    monkeypatch.setenv("FIREBASE_PROJECT_ID", "project-1")
+
+    assert firebase.get_firestore() is firebase.get_firestore()
+    first = firebase.get_firestore()
+    get_client_registry().close()
+    assert firebase.get_firestore() is not first
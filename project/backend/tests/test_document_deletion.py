@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+"""Covers id-based document deletion (parallel batches, verification, partial manifests), checkpoints, and the sweep."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Set
+
+import pytest
+
+from clients.database import pinecone as pinecone_module
+from clients.database.manifest_repository import DocumentManifest, InMemoryManifestRepository
+from clients.database.pinecone import PineconeRepository
+from clients.ingestion.maintenance import select_documents, sweep_documents
+from clients.ingestion.pipeline import SlideChunk, SlideIngestionPipeline
+from clients.llm.settings import Settings
+
+
+class _IdIndex:
+    def __init__(self, stored: Set[str]) -> None:
+        self.stored = set(stored)
+        self.delete_batches: List[List[str]] = []
+        self.fetches = 0
+        self.ignore_next_deletes = 0
+
+    def delete(self, *, ids: List[str], namespace: str) -> None:
+        self.delete_batches.append(list(ids))
+        if self.ignore_next_deletes:
+            self.ignore_next_deletes -= 1
+            return
+        self.stored -= set(ids)
+
+    def fetch(self, *, ids: List[str], namespace: str) -> Dict[str, Any]:
+        self.fetches += 1
+        return {"vectors": {vector_id: {"id": vector_id} for vector_id in ids if vector_id in self.stored}}
+
+
+def _repository(monkeypatch: pytest.MonkeyPatch, index: _IdIndex, **overrides: Any) -> PineconeRepository:
+    client = SimpleNamespace(Index=lambda name: index, describe_index=lambda name: {"dimension": 3})
+    monkeypatch.setattr(pinecone_module, "Pinecone", lambda **kwargs: client)
+    settings = Settings(
+        openrouter_api_key="test-key",
+        pinecone_api_key="pc-test",
+        pinecone_index_name="idx-test",
+        pinecone_index_dimension=3,
+        **overrides,
+    )
+    return PineconeRepository(settings)
+
+
+def _pipeline(repository: Any, manifests: InMemoryManifestRepository, embedding_service: Any = None):
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=2),
+        repository=repository,
+        embedding_service=embedding_service or SimpleNamespace(),
+        manifest_repository=manifests,
+        chunk_store=None,
+    )
+    pipeline._delete_verify_backoff_seconds = 0.0
+    return pipeline
+
+
+def test_delete_ids_runs_batches_in_parallel_and_reports_presence(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pinecone_module, "_DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr(pinecone_module, "_FETCH_BATCH_SIZE", 2)
+    ids = [f"v{i}" for i in range(5)]
+    index = _IdIndex(set(ids))
+    repo = _repository(monkeypatch, index, pinecone_upsert_concurrency=3)
+
+    repo.delete_ids(ids[:4])
+
+    assert sorted(map(tuple, index.delete_batches)) == [("v0", "v1"), ("v2", "v3")]
+    assert repo.existing_ids(ids) == {"v4"}
+    assert index.fetches == 3
+
+
+def test_pipeline_deletes_manifest_ids_and_retries_stragglers(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _IdIndex({"deck-s1-c0", "deck-s2-c0", "other"})
+    index.ignore_next_deletes = 1
+    manifests = InMemoryManifestRepository()
+    manifests.save_manifest(
+        DocumentManifest(document_id="deck", namespace="slides", chunk_hashes={"deck-s1-c0": "a", "deck-s2-c0": "b"})
+    )
+    pipeline = _pipeline(_repository(monkeypatch, index), manifests)
+
+    pipeline.delete_document("deck")
+
+    assert index.stored == {"other"}
+    assert index.delete_batches == [["deck-s1-c0", "deck-s2-c0"]] * 2
+    assert manifests.load_manifest("deck") is None
+
+
+def test_pipeline_reports_vectors_that_survive_deletion(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _IdIndex({"deck-s1-c0"})
+    index.ignore_next_deletes = 10
+    manifests = InMemoryManifestRepository()
+    manifests.save_manifest(DocumentManifest(document_id="deck", namespace="slides", chunk_hashes={"deck-s1-c0": "a"}))
+    pipeline = _pipeline(_repository(monkeypatch, index), manifests)
+
+    with pytest.raises(RuntimeError, match="1 vectors were still present"):
+        pipeline.delete_document("deck")
+    assert manifests.load_manifest("deck") is not None
+
+
+def test_documents_without_ids_fall_back_to_filter_delete() -> None:
+    calls: List[str] = []
+    repository = SimpleNamespace(namespace="slides", dimension=3, delete_document=calls.append)
+    pipeline = _pipeline(repository, InMemoryManifestRepository())
+
+    pipeline.delete_document("legacy")
+
+    assert calls == ["legacy"]
+
+
+@pytest.mark.asyncio
+async def test_failed_ingest_records_the_vectors_that_landed() -> None:
+    class _Repository:
+        namespace = "slides"
+        dimension = 3
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def upsert(self, items):
+            self.calls += 1
+            if self.calls > 1:
+                raise RuntimeError("Failed to upsert vectors to vector index")
+
+    class _Embedder:
+        async def embed(self, texts):
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    slides = [SlideChunk(slide_number=i, text=f"slide {i}", slide_title=None, chunk_index=0) for i in range(1, 5)]
+    manifests = InMemoryManifestRepository()
+    pipeline = _pipeline(_Repository(), manifests, _Embedder())
+    pipeline._pptx_extractor = SimpleNamespace(iter_slides=lambda source: iter(slides))
+    pipeline._chunker = SimpleNamespace(chunk=lambda batch: list(batch))
+
+    with pytest.raises(RuntimeError, match="Failed to upsert"):
+        await pipeline.ingest(document_id="deck", file_bytes=b"x", filename="deck.pptx")
+
+    assert set(manifests.load_manifest("deck").chunk_hashes) == {"deck-s1-c0", "deck-s2-c0"}
+
+
+@pytest.mark.asyncio
+async def test_checkpointed_ingest_resumes_from_completed_batches() -> None:
+    class _Repository:
+        namespace = "slides"
+        dimension = 3
+
+        def __init__(self, manifests: InMemoryManifestRepository, fail_on: int = 0) -> None:
+            self.manifests = manifests
+            self.fail_on = fail_on
+            self.batches: List[List[str]] = []
+            self.checkpoints: List[int] = []
+
+        def upsert(self, items):
+            manifest = self.manifests.load_manifest("deck")
+            self.checkpoints.append(len(manifest.chunk_hashes) if manifest else 0)
+            if len(self.batches) + 1 == self.fail_on:
+                raise RuntimeError("Failed to upsert vectors to vector index")
+            self.batches.append([item["id"] for item in items])
+
+    class _Embedder:
+        async def embed(self, texts):
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    slides = [SlideChunk(slide_number=i, text=f"slide {i}", slide_title=None, chunk_index=0) for i in range(1, 7)]
+    manifests = InMemoryManifestRepository()
+
+    def pipeline_for(repository: Any) -> SlideIngestionPipeline:
+        pipeline = _pipeline(repository, manifests, _Embedder())
+        pipeline._settings = SimpleNamespace(ingest_batch_size=2, ingest_queue_size=1, ingest_checkpoint_interval=1)
+        pipeline._pptx_extractor = SimpleNamespace(iter_slides=lambda source: iter(slides))
+        pipeline._chunker = SimpleNamespace(chunk=lambda batch: list(batch))
+        return pipeline
+
+    interrupted = _Repository(manifests, fail_on=3)
+    with pytest.raises(RuntimeError):
+        await pipeline_for(interrupted).ingest(document_id="deck", file_bytes=b"x", filename="deck.pptx")
+    # Each batch after the first saw the previous batches already checkpointed.
+    assert interrupted.checkpoints == [0, 2, 4]
+
+    resumed = _Repository(manifests)
+    result = await pipeline_for(resumed).ingest(document_id="deck", file_bytes=b"x", filename="deck.pptx")
+
+    assert resumed.batches == [["deck-s5-c0", "deck-s6-c0"]]
+    assert result.unchanged_count == 4
+    assert len(manifests.load_manifest("deck").chunk_hashes) == 6
+
+
+def test_sweep_selects_old_and_unreferenced_documents() -> None:
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    manifests = [
+        DocumentManifest("old-orphan", "slides", updated_at=now - timedelta(days=40)),
+        DocumentManifest("old-quiz", "slides", updated_at=now - timedelta(days=40)),
+        DocumentManifest("new-orphan", "slides", updated_at=now - timedelta(days=1)),
+        DocumentManifest("unknown-age", "slides"),
+    ]
+
+    def select(**criteria: Any) -> List[str]:
+        return select_documents(manifests, referenced_document_ids={"old-quiz"}, now=now, **criteria)
+
+    assert select() == ["new-orphan", "old-orphan", "unknown-age"]
+    assert select(older_than=timedelta(days=30)) == ["old-orphan"]
+    assert select(older_than=timedelta(days=30), unreferenced_only=False) == ["old-orphan", "old-quiz"]
+    with pytest.raises(ValueError):
+        select(unreferenced_only=False)
+
+
+def test_sweep_deletes_selection_and_collects_failures() -> None:
+    class _Pipeline:
+        def __init__(self) -> None:
+            self.deleted: List[str] = []
+
+        def list_documents(self):
+            stamp = datetime(2026, 9, 1, tzinfo=timezone.utc)
+            return [DocumentManifest(document_id, "slides", updated_at=stamp) for document_id in ("a", "b", "quiz-doc")]
+
+        def delete_document(self, document_id: str) -> None:
+            if document_id == "b":
+                raise RuntimeError("index unavailable")
+            self.deleted.append(document_id)
+
+    pipeline = _Pipeline()
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    preview = sweep_documents(pipeline, referenced_document_ids={"quiz-doc"})
+    with pytest.raises(ValueError):
+        sweep_documents(pipeline, referenced_document_ids={"quiz-doc"}, dry_run=False)
+    assert pipeline.deleted == []
+    report = sweep_documents(
+        pipeline, referenced_document_ids={"quiz-doc"}, older_than=timedelta(days=7), dry_run=False, now=now
+    )
+
+    assert preview.to_dict() == {"dry_run": True, "scanned": 3, "selected": ["a", "b"], "deleted": [], "failed": {}}
+    assert pipeline.deleted == ["a"]
+    assert report.deleted == ["a"] and report.failed == {"b": "index unavailable"}
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+"""Covers the content-addressed embedding cache and its use by ingestion and retrieval."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from clients.database.embedding_cache import EmbeddingCache, get_embedding_cache
+from clients.ingestion.pipeline import EmbeddingService
+from clients.rag.retriever import SlideContextRetriever
+
+
+class _CountingClient:
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [0.25, 0.75]
+
+
+def test_cache_round_trips_float32_vectors_and_tracks_hits(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", model="m", dimension=2)
+
+    cache.put_many(["alpha", "beta"], [[0.5, 1.5], [2.0, -1.0]])
+    results = cache.get_many(["alpha", "missing", "beta"])
+
+    assert [None if item is None else item.tolist() for item in results] == [[0.5, 1.5], None, [2.0, -1.0]]
+    assert results[0].dtype == np.float32
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes_stored"] == 16
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_cache_key_separates_model_dimension_and_task(tmp_path) -> None:
+    base = EmbeddingCache(tmp_path / "a.sqlite3", model="m", dimension=2)
+    other_model = EmbeddingCache(tmp_path / "b.sqlite3", model="n", dimension=2)
+    other_dimension = EmbeddingCache(tmp_path / "c.sqlite3", model="m", dimension=3)
+
+    keys = {
+        base.key("text"),
+        base.key("text", task="query"),
+        other_model.key("text"),
+        other_dimension.key("text"),
+    }
+
+    assert len(keys) == 4
+
+
+def test_cache_evicts_least_recently_used_beyond_max_bytes(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=16)
+    cache.put("old", [1.0, 2.0])
+    cache.put("newer", [3.0, 4.0])
+    cache.get("old")
+    cache.put("newest", [5.0, 6.0])
+
+    assert cache.get("newer") is None
+    assert cache.get("old").tolist() == [1.0, 2.0]
+    stats = cache.stats()
+    assert stats["bytes_stored"] == 16
+    assert stats["evictions"] == 1
+
+
+def test_cache_reads_buffer_recency_without_committing(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    cache = EmbeddingCache(path, max_bytes=16)
+    cache.put("old", [1.0, 2.0])
+    cache.put("newer", [3.0, 4.0])
+    stored = dict(cache._conn.execute("SELECT key, last_used FROM embeddings").fetchall())
+
+    cache.get("old")
+
+    assert not cache._conn.in_transaction
+    assert dict(cache._conn.execute("SELECT key, last_used FROM embeddings").fetchall()) == stored
+    cache.close()
+    reopened = EmbeddingCache(path, max_bytes=16)
+    reopened.put("newest", [5.0, 6.0])
+    assert reopened.get("newer") is None
+    assert reopened.get("old") is not None
+
+
+def test_cache_persists_across_instances(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    EmbeddingCache(path, model="m").put("slide", [0.5])
+
+    reopened = EmbeddingCache(path, model="m")
+
+    assert reopened.get("slide").tolist() == [0.5]
+    assert reopened.stats()["bytes_stored"] == 4
+
+
+async def test_embedding_service_only_embeds_cache_misses(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", model="m")
+    client = _CountingClient()
+    service = EmbeddingService(SimpleNamespace(), client=client, cache=cache)
+
+    first = await service.embed(["a", "bb"])
+    second = await service.embed(["bb", "ccc", "a"])
+
+    assert client.embedded == ["a", "bb", "ccc"]
+    assert second.dtype == np.float32 and second.shape == (3, 2)
+    assert second.tolist() == [first[1].tolist(), [3.0, 0.5], first[0].tolist()]
+    assert service.stats()["cache"]["hits"] == 2
+
+
+def test_retriever_caches_query_embeddings(tmp_path) -> None:
+    class _Repository:
+        def query(self, **kwargs):
+            return {"matches": []}
+
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", model="m")
+    client = _CountingClient()
+
+    def retriever() -> SlideContextRetriever:
+        return SlideContextRetriever(SimpleNamespace(), repository=_Repository(), embedder=client, embedding_cache=cache)
+
+    first = retriever()
+    for _ in range(2):
+        first.fetch(document_id="doc", topic="limits", difficulty="easy")
+    # The repeat is served by the in-process LRU; a new retriever (e.g. after a restart) reads the disk cache.
+    retriever().fetch(document_id="doc", topic="limits", difficulty="easy")
+
+    assert len(client.embedded) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_retriever_prefetches_topic_difficulty_queries_in_one_batch(tmp_path) -> None:
+    class _BatchClient(_CountingClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches: list[tuple[int, str]] = []
+
+        def embed_documents(self, texts, *, task_type=None):
+            self.batches.append((len(texts), task_type))
+            return [[0.25, 0.75] for _ in texts]
+
+    class _Repository:
+        def query(self, **kwargs):
+            return {"matches": []}
+
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", model="m")
+    client = _BatchClient()
+    retriever = SlideContextRetriever(
+        SimpleNamespace(retrieval_query_cache_size=4), repository=_Repository(), embedder=client, embedding_cache=cache
+    )
+
+    assert retriever.prefetch_queries(["limits", "series"]) == 6
+    assert retriever.prefetch_queries(["limits", "series"]) == 0
+    retriever.fetch(document_id="doc", topic="series", difficulty="hard")
+
+    assert client.batches == [(6, "RETRIEVAL_QUERY")]
+    assert client.embedded == []
+    assert len(retriever._query_vectors) == 4 and cache.stats()["entries"] == 6
+
+
+def test_get_embedding_cache_is_disabled_without_path(tmp_path) -> None:
+    assert get_embedding_cache(SimpleNamespace()) is None
+    settings = SimpleNamespace(embedding_cache_path=str(tmp_path / "shared.sqlite3"))
+    assert get_embedding_cache(settings) is get_embedding_cache(settings)
+
+
+async def test_embedding_cache_debug_endpoint_reports_disabled(async_client, monkeypatch) -> None:
+    from app import main
+
+    monkeypatch.setattr(main, "get_settings", lambda: SimpleNamespace(embedding_cache_path=None))
+
+    response = await async_client.get("/debug/embedding-cache")
+
+    assert response.status_code == 200
+    assert response.json() == {"enabled": False}
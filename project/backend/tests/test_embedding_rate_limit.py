@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+"""Covers embedding concurrency, the quota token bucket, adaptive 429 backoff, and error-classified retries."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from clients.ingestion.pipeline import EmbeddingService, PDFExtractor, SlideChunk, SlideIngestionPipeline
+from clients.ingestion.rate_limit import (
+    PAYLOAD_TOO_LARGE,
+    RATE_LIMITED,
+    TRANSIENT,
+    TokenBucket,
+    backoff_delay,
+    classify_error,
+    is_rate_limit_error,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+
+class _QuotaError(Exception):
+    status_code = 429
+
+
+class _FlakyClient:
+    """Embeds each text as [len(text)] and rejects requests larger than ``accept_up_to`` once."""
+
+    def __init__(self, accept_up_to: int) -> None:
+        self.accept_up_to = accept_up_to
+        self.request_sizes: list[int] = []
+        self._lock = threading.Lock()
+        self.rejected = False
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.request_sizes.append(len(texts))
+            if len(texts) > self.accept_up_to and not self.rejected:
+                self.rejected = True
+                raise _QuotaError("429 Resource has been exhausted")
+        return [[float(len(text))] for text in texts]
+
+
+def _service(client, **settings) -> EmbeddingService:
+    service = EmbeddingService(SimpleNamespace(**settings), client=client)
+    service._base_backoff_seconds = 0.0
+    return service
+
+
+async def test_token_bucket_paces_requests_after_burst() -> None:
+    clock = _FakeClock()
+    bucket = TokenBucket(2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    waits = [await bucket.acquire() for _ in range(4)]
+    clock.now = 10
+    idle_wait = await bucket.acquire()
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+    assert idle_wait == 0.0
+
+
+def test_is_rate_limit_error_matches_status_and_message() -> None:
+    assert is_rate_limit_error(_QuotaError("boom"))
+    assert is_rate_limit_error(RuntimeError("RESOURCE_EXHAUSTED: quota exceeded"))
+    assert not is_rate_limit_error(ValueError("bad input"))
+
+
+def test_classify_error_separates_retryable_kinds() -> None:
+    assert classify_error(_QuotaError("boom")) == RATE_LIMITED
+    assert classify_error(type("ApiError", (Exception,), {"status_code": 413})("too big")) == PAYLOAD_TOO_LARGE
+    assert classify_error(ValueError("Request payload size exceeds the limit")) == PAYLOAD_TOO_LARGE
+    assert classify_error(TimeoutError("read timed out")) == TRANSIENT
+    assert classify_error(type("ApiError", (Exception,), {"status": 503})("unavailable")) == TRANSIENT
+    assert classify_error(ValueError("bad input")) is None
+    assert 4.0 <= backoff_delay(10, base=1.0, cap=4.0) <= 6.0
+
+
+async def test_embed_shrinks_batch_on_429_and_preserves_order() -> None:
+    client = _FlakyClient(accept_up_to=4)
+    service = _service(client, embed_concurrency=2, embed_max_retries=3)
+    texts = ["a" * size for size in range(1, 9)]
+
+    vectors = await service.embed(texts)
+
+    assert vectors.tolist() == [[float(size)] for size in range(1, 9)]
+    assert client.request_sizes[0] == 8
+    assert sorted(client.request_sizes[1:]) == [4, 4]
+    stats = service.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["request_size"] == 4
+
+
+async def test_embed_gives_up_after_max_retries() -> None:
+    class _AlwaysLimited:
+        def embed_documents(self, texts):
+            raise _QuotaError("429")
+
+    service = _service(_AlwaysLimited(), embed_max_retries=1)
+
+    with pytest.raises(_QuotaError):
+        await service.embed(["a", "b"])
+
+
+async def test_embed_does_not_retry_other_errors() -> None:
+    class _Broken:
+        calls = 0
+
+        def embed_documents(self, texts):
+            self.calls += 1
+            raise ValueError("bad payload")
+
+    client = _Broken()
+    service = _service(client)
+
+    with pytest.raises(ValueError):
+        await service.embed(["a"])
+    assert client.calls == 1
+
+
+async def test_embed_retries_transient_errors_without_shrinking() -> None:
+    class _Timeouts:
+        def __init__(self) -> None:
+            self.request_sizes: list[int] = []
+
+        def embed_documents(self, texts):
+            self.request_sizes.append(len(texts))
+            if len(self.request_sizes) < 3:
+                raise TimeoutError("deadline exceeded")
+            return [[1.0] for _ in texts]
+
+    client = _Timeouts()
+    service = _service(client, embed_max_retries=3)
+
+    vectors = await service.embed(["a", "b", "c"])
+
+    assert vectors.shape == (3, 1)
+    assert client.request_sizes == [3, 3, 3]
+    assert service.stats()["retried"] == 2 and service.stats()["rate_limited"] == 0
+
+
+async def test_embed_splits_oversized_requests_immediately() -> None:
+    class _SizeLimited:
+        def __init__(self) -> None:
+            self.request_sizes: list[int] = []
+
+        def embed_documents(self, texts):
+            self.request_sizes.append(len(texts))
+            if len(texts) > 2:
+                raise ValueError("400 Request payload size exceeds the limit")
+            return [[float(len(text))] for text in texts]
+
+    client = _SizeLimited()
+    service = _service(client, embed_max_retries=3)
+    service._base_backoff_seconds = 5.0  # a split must not wait for backoff
+
+    vectors = await service.embed(["a" * size for size in range(1, 6)])
+
+    assert vectors.tolist() == [[float(size)] for size in range(1, 6)]
+    assert sorted(client.request_sizes) == [1, 2, 2, 3, 5]
+    assert service.stats()["split_requests"] == 2
+
+
+async def test_pipeline_embeds_batches_concurrently_in_document_order() -> None:
+    class _SlowEmbedder:
+        def __init__(self) -> None:
+            self.active = 0
+            self.peak = 0
+
+        async def embed(self, texts):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return [[0.5] for _ in texts]
+
+    class _Chunker:
+        def chunk(self, slides):
+            return list(slides)
+
+    class _Extractor:
+        def iter_slides(self, file_bytes):
+            return iter(SlideChunk(slide_number=i, text=f"s{i}", slide_title=None, chunk_index=0) for i in range(6))
+
+    class _Repository:
+        namespace = "ns"
+        dimension = 1
+
+        def __init__(self) -> None:
+            self.slides: list[int] = []
+
+        def upsert(self, items):
+            self.slides.extend(item["metadata"]["slide_number"] for item in items)
+
+    embedder = _SlowEmbedder()
+    repository = _Repository()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=1, ingest_queue_size=4, embed_concurrency=3),
+        repository=repository,
+        extractor=_Extractor(),
+        pdf_extractor=PDFExtractor(),
+        chunker=_Chunker(),
+        embedding_service=embedder,
+    )
+
+    result = await pipeline.ingest(document_id="deck", file_bytes=b"", filename="deck.pptx")
+
+    assert embedder.peak > 1
+    assert repository.slides == list(range(6))
+    assert result.chunk_count == 6
+    assert result.chunks_per_second > 0
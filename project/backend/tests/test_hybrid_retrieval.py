@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+"""Covers the chunk store's BM25 lexical index and its fusion with vector search in the retriever."""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from clients.database.chunk_store import ChunkStore, StoredChunk
+from clients.database.lexical import tokenize
+from clients.rag.retriever import SlideContextRetriever, _reciprocal_rank_fusion
+
+
+def _chunk(vector_id: str, text: str, document_id: str = "deck-1", slide_id: str = "") -> StoredChunk:
+    return StoredChunk(
+        vector_id=vector_id, document_id=document_id, text=text, metadata={"slide_id": slide_id or vector_id}
+    )
+
+
+class _Repository:
+    def __init__(self, matches: List[Dict[str, Any]]) -> None:
+        self.matches = matches
+        self.queries: List[Dict[str, Any]] = []
+
+    def query(self, **kwargs: Any) -> Dict[str, Any]:
+        self.queries.append(kwargs)
+        return {"matches": list(self.matches)}
+
+
+class _Embedder:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return [1.0, 0.0]
+
+
+def test_bm25_search_ranks_by_term_frequency_and_rarity(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([
+        _chunk("a", "Gradient descent takes a step along the negative gradient. The gradient points uphill."),
+        _chunk("b", "Learning rate schedules for gradient descent."),
+        _chunk("c", "Convexity guarantees a single minimum."),
+        _chunk("other", "Gradient gradient gradient", document_id="deck-2"),
+    ])
+
+    hits = store.search("deck-1", tokenize("gradient descent"), limit=5)
+
+    assert [hit.vector_id for hit in hits] == ["a", "b"]
+    assert [hit.matched_terms for hit in hits] == [2, 2]
+    assert hits[0].score > hits[1].score > 0
+    assert store.search("deck-1", tokenize("convexity"), limit=5)[0].vector_id == "c"
+
+    store.put_many([_chunk("a", "Momentum smooths noisy updates.")])
+    store.delete_ids(["b"])
+    assert store.search("deck-1", ["gradient"], limit=5) == []
+    store.delete_document("deck-2")
+    assert store.search("deck-2", ["gradient"], limit=5) == []
+
+
+def test_search_backfills_chunks_stored_before_the_index_existed(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([_chunk("a", "Entropy of a fair coin is one bit.")])
+    store._conn.execute("DELETE FROM postings")
+    store._conn.execute("DELETE FROM chunk_lengths")
+
+    assert [hit.vector_id for hit in store.search("deck-1", ["entropy"], limit=3)] == ["a"]
+
+
+def test_exact_term_topics_skip_the_embedding_call(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([_chunk(f"c{i}", f"Bayes theorem example {i}: posterior from prior.") for i in range(4)])
+    store.put_many([_chunk("x", "Bayes theorem is excluded here.", slide_id="s-x")])
+    embedder = _Embedder()
+    repository = _Repository([])
+    retriever = SlideContextRetriever(SimpleNamespace(), repository=repository, embedder=embedder, chunk_store=store)
+
+    contexts, reset = retriever.fetch(
+        document_id="deck-1", topic="Bayes theorem", difficulty="medium", exclude_slide_ids=["s-x"], sample_size=4
+    )
+
+    assert embedder.calls == 0 and repository.queries == []
+    assert reset is False
+    assert sorted(context.metadata["slide_id"] for context in contexts) == ["c0", "c1", "c2", "c3"]
+
+
+def test_lexical_shortcut_does_not_override_a_requested_difficulty(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([_chunk(f"c{i}", f"Bayes theorem example {i}: posterior from prior.") for i in range(4)])
+    embedder = _Embedder()
+    repository = _Repository([{"id": "proof", "score": 0.9, "metadata": {"document_id": "deck-1", "text": "Proof."}}])
+    retriever = SlideContextRetriever(SimpleNamespace(), repository=repository, embedder=embedder, chunk_store=store)
+
+    contexts, _ = retriever.fetch(document_id="deck-1", topic="Bayes theorem", difficulty="hard", limit=5, sample_size=5)
+
+    assert embedder.calls == 1 and len(repository.queries) == 1
+    assert {context.metadata.get("slide_id") for context in contexts} >= {"c0", "c1", "c2", "c3"}
+    assert any(context.text == "Proof." for context in contexts)
+
+
+def test_partial_lexical_hits_are_fused_with_vector_matches(tmp_path) -> None:
+    store = ChunkStore(tmp_path / "chunks.sqlite3")
+    store.put_many([
+        _chunk("both", "Eigenvalues of a symmetric matrix are real."),
+        _chunk("lexical-only", "Eigenvalues appear in the characteristic polynomial."),
+        _chunk("vector-only", "Spectral decomposition of symmetric operators."),
+    ])
+    embedder = _Embedder()
+    repository = _Repository([
+        {"id": "vector-only", "score": 0.9, "metadata": {"document_id": "deck-1"}},
+        {"id": "both", "score": 0.8, "metadata": {"document_id": "deck-1"}},
+    ])
+    retriever = SlideContextRetriever(
+        SimpleNamespace(retrieval_rrf_k=60), repository=repository, embedder=embedder, chunk_store=store
+    )
+
+    contexts, _ = retriever.fetch(document_id="deck-1", topic="eigenvalues", difficulty="hard", sample_size=4)
+
+    assert embedder.calls == 1
+    assert {context.metadata["slide_id"] for context in contexts} == {"both", "lexical-only", "vector-only"}
+    best = max(contexts, key=lambda context: context.score or 0.0)
+    assert best.metadata["slide_id"] == "both"
+
+
+def test_reciprocal_rank_fusion_sums_inverse_ranks() -> None:
+    fused = _reciprocal_rank_fusion(
+        [[{"id": "a"}, {"id": "b"}], [{"id": "b"}, {"id": "c"}]], k=1, limit=2
+    )
+
+    assert [match["id"] for match in fused] == ["b", "a"]
+    assert fused[0]["score"] == 1 / 3 + 1 / 2
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+"""Covers the background ingestion job manager: progress tracking, persistence, and cleanup."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+import pytest
+
+from clients.database.job_repository import IngestionJobRecord, InMemoryJobRepository
+from clients.ingestion.jobs import IngestionJobManager, JobQueueFullError
+from clients.ingestion.pipeline import IngestionProgress, IngestionResult
+
+
+async def _wait_for(manager: IngestionJobManager, job_id: str, status: str) -> IngestionJobRecord:
+    for _ in range(200):
+        record = manager.get(job_id)
+        if record is not None and record.status == status:
+            return record
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+async def test_job_manager_tracks_progress_and_persists_result(tmp_path) -> None:
+    spooled = tmp_path / "deck.pptx"
+    spooled.write_bytes(b"deck")
+    stages: List[str] = []
+
+    async def runner(**kwargs: Any) -> IngestionResult:
+        assert kwargs["file_path"].read_bytes() == b"deck"
+        for stage, upserted in (("extracting", 0), ("embedding", 0), ("upserting", 3)):
+            kwargs["progress"](
+                IngestionProgress(
+                    stage=stage,
+                    slides_extracted=2,
+                    chunks_queued=3,
+                    chunks_unchanged=0,
+                    chunks_embedded=3 if stage != "extracting" else 0,
+                    chunks_upserted=upserted,
+                    extraction_complete=stage != "extracting",
+                )
+            )
+            stages.append(manager.get(job.job_id).stage)  # type: ignore[union-attr]
+        return IngestionResult(document_id="deck-1", slide_count=2, chunk_count=3, namespace="slides")
+
+    repository = InMemoryJobRepository()
+    manager = IngestionJobManager(runner, repository, workers=1)
+    job = await manager.submit(session_id="s1", filename="deck.pptx", file_path=spooled, document_id="deck-1")
+    assert repository.load_job(job.job_id).status == "queued"  # type: ignore[union-attr]
+
+    final = await _wait_for(manager, job.job_id, "succeeded")
+
+    assert stages == ["extracting", "embedding", "upserting"]
+    assert final.stage == "done"
+    assert final.chunks_upserted == 3
+    assert final.result and final.result["chunk_count"] == 3
+    assert repository.load_job(job.job_id).status == "succeeded"  # type: ignore[union-attr]
+    assert not spooled.exists()
+    await manager.shutdown()
+
+
+async def test_job_manager_records_failures(tmp_path) -> None:
+    spooled = tmp_path / "deck.pdf"
+    spooled.write_bytes(b"%PDF")
+
+    async def runner(**_: Any) -> IngestionResult:
+        raise RuntimeError("extractor exploded")
+
+    manager = IngestionJobManager(runner, InMemoryJobRepository(), workers=1)
+    job = await manager.submit(session_id="s1", filename="deck.pdf", file_path=spooled)
+
+    final = await _wait_for(manager, job.job_id, "failed")
+
+    assert final.error == "extractor exploded"
+    assert final.finished_at is not None
+    assert not spooled.exists()
+    await manager.shutdown()
+
+
+async def test_job_manager_records_jobs_cancelled_by_shutdown(tmp_path) -> None:
+    spooled = tmp_path / "deck.pptx"
+    spooled.write_bytes(b"deck")
+    started = asyncio.Event()
+
+    async def runner(**_: Any) -> IngestionResult:
+        started.set()
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+    repository = InMemoryJobRepository()
+    manager = IngestionJobManager(runner, repository, workers=1)
+    job = await manager.submit(session_id="s1", filename="deck.pptx", file_path=spooled)
+    await started.wait()
+
+    await manager.shutdown()
+
+    stored = repository.load_job(job.job_id)
+    assert stored is not None and stored.status == "failed"
+    assert stored.error == "Ingestion was cancelled"
+    assert manager.stats()["active"] == 0
+    assert manager._last_write == {}
+    assert not spooled.exists()
+
+
+async def test_job_manager_rejects_submissions_when_queue_is_full(tmp_path) -> None:
+    release = asyncio.Event()
+
+    async def runner(**_: Any) -> IngestionResult:
+        await release.wait()
+        return IngestionResult(document_id="d", slide_count=0, chunk_count=0, namespace="slides")
+
+    manager = IngestionJobManager(runner, InMemoryJobRepository(), workers=1, max_queued=1)
+    first = await manager.submit(session_id="s", filename="a.pdf", file_path=tmp_path / "a.pdf")
+    await asyncio.sleep(0.01)  # let the worker pick up the first job
+    await manager.submit(session_id="s", filename="b.pdf", file_path=tmp_path / "b.pdf")
+
+    with pytest.raises(JobQueueFullError):
+        await manager.submit(session_id="s", filename="c.pdf", file_path=tmp_path / "c.pdf")
+
+    release.set()
+    await _wait_for(manager, first.job_id, "succeeded")
+    await manager.shutdown()
+
+
+async def test_job_manager_shutdown_fails_queued_jobs_and_deletes_their_spool_files(tmp_path) -> None:
+    started = asyncio.Event()
+
+    async def runner(**_: Any) -> IngestionResult:
+        started.set()
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+    repository = InMemoryJobRepository()
+    manager = IngestionJobManager(runner, repository, workers=1)
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"deck")
+    await manager.submit(session_id="s", filename="a.pdf", file_path=tmp_path / "a.pdf")
+    queued = await manager.submit(session_id="s", filename="b.pdf", file_path=tmp_path / "b.pdf")
+    await started.wait()
+
+    await manager.shutdown()
+
+    stored = repository.load_job(queued.job_id)
+    assert stored is not None and stored.status == "failed"
+    assert stored.error == "Server shut down before the job started"
+    assert list(tmp_path.iterdir()) == []
+    assert repository.list_jobs(("queued", "running")) == []
+
+
+def test_recover_orphans_fails_jobs_from_dead_local_processes_and_stale_remote_ones(tmp_path) -> None:
+    import os
+    import socket
+
+    host = socket.gethostname()
+    now = datetime.now(timezone.utc)
+    spooled = tmp_path / "ingest-dead.pdf"
+    spooled.write_bytes(b"deck")
+    repository = InMemoryJobRepository()
+    records = {
+        # pid of this process: it can only be a leftover from an earlier process that reused the pid.
+        "dead": IngestionJobRecord(
+            job_id="dead", session_id="s", filename="a.pdf", owner=f"{host}:{os.getpid()}", spool_path=str(spooled)
+        ),
+        "live-remote": IngestionJobRecord(
+            job_id="live-remote", session_id="s", filename="b.pdf", status="running", owner="other:1", started_at=now
+        ),
+        "stale-remote": IngestionJobRecord(
+            job_id="stale-remote",
+            session_id="s",
+            filename="c.pdf",
+            owner="other:1",
+            created_at=now - timedelta(hours=2),
+        ),
+        "done": IngestionJobRecord(job_id="done", session_id="s", filename="d.pdf", status="succeeded"),
+    }
+    for record in records.values():
+        repository.save_job(record)
+
+    async def runner(**_: Any) -> IngestionResult:
+        raise AssertionError("unreachable")
+
+    manager = IngestionJobManager(runner, repository)
+
+    assert manager.recover_orphans(stale_after_seconds=3600) == 2
+
+    statuses = {job_id: repository.load_job(job_id).status for job_id in records}  # type: ignore[union-attr]
+    assert statuses == {"dead": "failed", "live-remote": "running", "stale-remote": "failed", "done": "succeeded"}
+    assert repository.load_job("dead").error == "Ingestion was interrupted by a server restart"  # type: ignore[union-attr]
+    assert not spooled.exists()
+    assert manager.recover_orphans(stale_after_seconds=0) == 0
+
+
+def test_job_record_eta_uses_upsert_rate_once_extraction_finishes() -> None:
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    record = IngestionJobRecord(
+        job_id="j",
+        session_id="s",
+        filename="deck.pptx",
+        status="running",
+        chunks_queued=40,
+        chunks_upserted=10,
+        extraction_complete=True,
+        started_at=started,
+    )
+
+    assert record.eta_seconds(now=started + timedelta(seconds=5)) == 15.0
+    assert IngestionJobRecord.from_dict(record.to_dict()) == record
+    assert IngestionJobRecord(job_id="j", session_id="s", filename="f").eta_seconds() is None
+
+
+async def test_app_lifespan_recovers_orphans_and_shuts_down_the_job_manager(
+    test_llm_service, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app import main as main_module
+    from clients.llm import service as service_module
+
+    recovered: List[bool] = []
+    monkeypatch.setattr(main_module, "_WARMUP_ENABLED", False)
+    monkeypatch.setattr(main_module, "get_llm_service", lambda: test_llm_service)
+    monkeypatch.setattr(service_module, "_llm_service", test_llm_service)
+    monkeypatch.setattr(test_llm_service, "recover_orphaned_ingestion_jobs", lambda: recovered.append(True))
+    manager = test_llm_service._get_job_manager()
+
+    async with main_module.lifespan(main_module.app):
+        manager._ensure_workers()
+        workers = list(manager._workers)
+
+    assert recovered == [True]
+    assert workers and all(worker.done() for worker in workers)
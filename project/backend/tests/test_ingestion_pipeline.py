@@ -3,7 +3,7 @@ from __future__ import annotations
 """Validates slide ingestion pipeline parsing, chunking, embeddings, and upserts."""
 
 from io import BytesIO
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, Iterator, List, Sequence
 
 import pytest
 from pptx import Presentation
@@ -17,6 +17,7 @@ from clients.ingestion.pipeline import (
     SlideChunker,
     SlideExtractor,
     SlideIngestionPipeline,
+    SlideXMLExtractor,
 )
 from clients.llm.service import LLMService
 
@@ -159,17 +160,15 @@ async def test_pipeline_uses_pdf_extractor_for_pdf(monkeypatch, test_settings) -
             super().__init__()
             self.called = False
 
-        def extract(self, file_bytes: bytes) -> List[SlideChunk]:
+        def iter_slides(self, file_bytes: bytes) -> Iterator[SlideChunk]:
             self.called = True
-            return [
-                SlideChunk(
-                    slide_number=1,
-                    text="PDF content chunk",
-                    slide_title="Page 1",
-                    chunk_index=0,
-                    source_type="page",
-                )
-            ]
+            yield SlideChunk(
+                slide_number=1,
+                text="PDF content chunk",
+                slide_title="Page 1",
+                chunk_index=0,
+                source_type="page",
+            )
 
     stub_pdf_extractor = StubPDFExtractor()
 
@@ -215,3 +214,184 @@ async def test_pipeline_rejects_unknown_file_type(test_settings) -> None:
             filename="notes.txt",
             metadata=None,
         )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_reads_spooled_file_from_disk(tmp_path, test_settings) -> None:
+    deck = tmp_path / "deck.pptx"
+    deck.write_bytes(_build_presentation())
+    repository = CapturingRepository()
+    pipeline = SlideIngestionPipeline(
+        test_settings,
+        repository=repository,
+        extractor=SlideExtractor(),
+        chunker=SlideChunker(chunk_size=60, chunk_overlap=0),
+        embedding_service=FakeEmbeddingService(),
+    )
+
+    result = await pipeline.ingest(document_id="deck-2", file_path=deck, filename="deck.pptx")
+
+    assert result.slide_count == 2
+    assert result.chunk_count == len(repository.items)
+
+
+def test_pdf_extractor_opens_paths_as_streams(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    received: List[Any] = []
+
+    class StubReader:
+        def __init__(self, stream: Any) -> None:
+            received.append(stream.read())
+            self.pages = []
+
+    monkeypatch.setattr("clients.ingestion.pipeline.PdfReader", StubReader)
+    path = tmp_path / "handout.pdf"
+    path.write_bytes(b"%PDF on disk%")
+
+    assert PDFExtractor().extract(str(path)) == []
+    assert received == [b"%PDF on disk%"]
+
+
+def _stub_pdf_reader(texts: List[str]):
+    class StubPage:
+        def __init__(self, text: str) -> None:
+            self._text = text
+
+        def extract_text(self) -> str:
+            return self._text
+
+    class StubReader:
+        def __init__(self, stream: Any) -> None:
+            self.pages = [StubPage(text) for text in texts]
+
+    return StubReader
+
+
+def test_pdf_extractor_splits_page_ranges_that_merge_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    texts = [f"Page body {index}" for index in range(1, 8)]
+    texts[3] = ""
+    monkeypatch.setattr("clients.ingestion.pipeline.PdfReader", _stub_pdf_reader(texts))
+    extractor = PDFExtractor()
+
+    tasks = extractor.extraction_tasks(b"%PDF", pages_per_task=3)
+
+    assert tasks is not None and len(tasks) == 3
+    merged = [chunk for task in tasks for chunk in task()]
+    assert merged == extractor.extract(b"%PDF")
+    assert [chunk.slide_number for chunk in merged] == [1, 2, 3, 5, 6, 7]
+
+
+def test_custom_extractors_keep_in_process_extraction() -> None:
+    class CustomPDFExtractor(PDFExtractor):
+        def iter_slides(self, file_bytes: Any) -> Iterator[SlideChunk]:  # pragma: no cover - unused
+            yield from ()
+
+    assert CustomPDFExtractor().extraction_tasks(b"%PDF", pages_per_task=10) is None
+
+
+@pytest.mark.asyncio
+async def test_pipeline_parses_pdf_page_ranges_in_the_extraction_pool(
+    monkeypatch: pytest.MonkeyPatch, test_settings
+) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    texts = [f"Page body {index}" for index in range(1, 10)]
+    monkeypatch.setattr("clients.ingestion.pipeline.PdfReader", _stub_pdf_reader(texts))
+    executor = ThreadPoolExecutor(max_workers=3)
+    requested: List[int] = []
+
+    def _pool(workers: int) -> ThreadPoolExecutor:
+        requested.append(workers)
+        return executor
+
+    # A thread pool stands in for the process pool so the patched reader is visible to the tasks.
+    monkeypatch.setattr("clients.ingestion.pipeline.get_extraction_pool", _pool)
+    settings = test_settings.model_copy(update={"ingest_extract_workers": 3, "ingest_pdf_pages_per_task": 2})
+    repository = CapturingRepository()
+    pipeline = SlideIngestionPipeline(
+        settings,
+        repository=repository,
+        extractor=SlideExtractor(),
+        chunker=SlideChunker(chunk_size=1000, chunk_overlap=0),
+        embedding_service=FakeEmbeddingService(),
+    )
+
+    try:
+        result = await pipeline.ingest(document_id="pdf-2", file_bytes=b"%PDF", filename="handout.pdf")
+    finally:
+        executor.shutdown()
+
+    assert requested == [3]
+    assert result.slide_count == 9
+    assert [item["metadata"]["page_number"] for item in repository.items] == list(range(1, 10))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_extracts_pptx_in_a_spawned_process(test_settings) -> None:
+    from clients.ingestion.extraction_pool import shutdown_extraction_pool
+
+    repository = CapturingRepository()
+    pipeline = SlideIngestionPipeline(
+        test_settings.model_copy(update={"ingest_extract_workers": 1}),
+        repository=repository,
+        extractor=SlideExtractor(),
+        chunker=SlideChunker(chunk_size=60, chunk_overlap=0),
+        embedding_service=FakeEmbeddingService(),
+    )
+
+    try:
+        result = await pipeline.ingest(document_id="deck-3", file_bytes=_build_presentation(), filename="deck.pptx")
+    finally:
+        shutdown_extraction_pool()
+
+    assert result.slide_count == 2
+    assert repository.items[0]["metadata"]["slide_title"] == "Introduction"
+
+
+def _build_mixed_presentation() -> bytes:
+    from pptx.util import Inches
+
+    ppt = Presentation()
+    for index in range(4):
+        slide = ppt.slides.add_slide(ppt.slide_layouts[1 if index % 2 else 0])
+        slide.shapes.title.text = f"Section {index} & <review>"
+        slide.placeholders[1].text = f"First paragraph\nSecond paragraph {index}"
+        box = slide.shapes.add_textbox(Inches(1), Inches(4), Inches(3), Inches(1))
+        box.text_frame.text = "Soft\vbreak inside a text box"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(0, 0, 10, 10).text_frame.text = "grouped text is not read"
+        slide.shapes.add_table(2, 2, 0, 0, 100, 100).table.cell(0, 0).text = "table text is not read"
+    ppt.slides.add_slide(ppt.slide_layouts[6])  # blank slide is skipped
+    untitled = ppt.slides.add_slide(ppt.slide_layouts[6])
+    untitled.shapes.add_textbox(0, 0, 100, 100).text_frame.text = "  Untitled body  "
+    # Move the first slide to the end so presentation order differs from slideN.xml numbering.
+    slide_ids = ppt.slides._sldIdLst
+    first = list(slide_ids)[0]
+    slide_ids.remove(first)
+    slide_ids.append(first)
+
+    buffer = BytesIO()
+    ppt.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("build", [_build_presentation, _build_mixed_presentation])
+def test_xml_slide_extractor_matches_python_pptx(build) -> None:
+    deck = build()
+
+    expected = SlideExtractor().extract(deck)
+
+    assert expected
+    assert SlideXMLExtractor().extract(deck) == expected
+
+
+def test_pipeline_selects_pptx_extractor_from_settings(test_settings) -> None:
+    def _pipeline(name: str) -> SlideIngestionPipeline:
+        return SlideIngestionPipeline(
+            test_settings.model_copy(update={"ingest_pptx_extractor": name}),
+            repository=CapturingRepository(),
+            chunker=SlideChunker(),
+            embedding_service=FakeEmbeddingService(),
+        )
+
+    assert type(_pipeline("xml")._select_extractor("deck.pptx")) is SlideXMLExtractor
+    assert type(_pipeline("python-pptx")._select_extractor("deck.pptx")) is SlideExtractor
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+"""Guards the cold-start budget: importing app.main must not pull in heavy SDKs."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.import_time import HEAVY_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_app_import_defers_heavy_sdks() -> None:
+    env = dict(os.environ)
+    env.setdefault("OPENROUTER_API_KEY", "test-key")
+    script = (
+        "import sys, app.main\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert proc.stdout.strip() == ""
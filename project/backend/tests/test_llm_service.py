@@ -14,6 +14,7 @@ from clients.database.chat_repository import (
 from clients.ingestion import IngestionResult
 from clients.llm.classifier import ClassificationResult
 from clients.llm.service import LLMService
+from clients.llm.session_state import SessionState
 from clients.llm.settings import Settings
 
 
@@ -63,8 +64,10 @@ async def test_ingest_upload_merges_metadata(monkeypatch: pytest.MonkeyPatch) ->
         file_bytes=b"binary-data",
         filename="Week 1 Intro.pptx",
         metadata={"course": "math"},
+        progress=print,
     )
 
+    assert captured["progress"] is print
     assert captured["metadata"] == {
         "course": "math",
         "session_id": "SESSION-123",
@@ -146,26 +149,21 @@ def test_reset_session_clears_cached_state(monkeypatch: pytest.MonkeyPatch) -> N
     service = LLMService(settings, repository=repository)
 
     session_id = "session-reset"
-    service._conversations[session_id] = []
-    service._session_modes[session_id] = "friction"
-    service._last_prompts[session_id] = "guidance"
-    service._friction_progress[session_id] = 2
-    service._guidance_ready[session_id] = True
-    service._last_classifications[session_id] = ClassificationResult(
+    state = SessionState(session_id)
+    state.last_prompt = "guidance"
+    state.friction_progress = 2
+    state.guidance_ready = True
+    state.last_classification = ClassificationResult(
         label="good",
         rationale="solid",
         used_model=False,
     )
+    service._sessions.put(state)
 
     service.reset_session(session_id)
 
     assert repository.deleted == [session_id]
-    assert session_id not in service._conversations
-    assert session_id not in service._session_modes
-    assert session_id not in service._last_prompts
-    assert session_id not in service._friction_progress
-    assert session_id not in service._guidance_ready
-    assert session_id not in service._last_classifications
+    assert session_id not in service._sessions
 
 
 def test_get_analytics_summarises_sessions() -> None:
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+"""Covers the in-process vector store: scoped/filtered search, persistence, deletes, and the graph index."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from clients.database import local_vector_store as local_module
+from clients.database.local_vector_store import LocalVectorStore
+from clients.database.vector_store import close_vector_stores, get_vector_store
+from clients.rag.retriever import SlideContextRetriever
+
+
+def _item(vector_id: str, values, document_id: str = "deck-1", **metadata):
+    return {"id": vector_id, "values": values, "metadata": {"document_id": document_id, **metadata}}
+
+
+def test_query_scopes_to_document_and_applies_filters() -> None:
+    store = LocalVectorStore(None, dimension=3)
+    store.upsert([
+        _item("a", [1.0, 0.0, 0.0], slide_id="s-1", text="alpha"),
+        _item("b", [0.9, 0.1, 0.0], slide_id="s-2", text="beta"),
+        _item("c", [0.0, 1.0, 0.0], slide_id="s-3"),
+        _item("other", [1.0, 0.0, 0.0], document_id="deck-2"),
+    ])
+
+    scoped = store.query(vector=[1.0, 0.0, 0.0], top_k=2, document_id="deck-1")
+    filtered = store.query(
+        vector=[1.0, 0.0, 0.0], top_k=5, document_id="deck-1", metadata_filter={"slide_id": {"$nin": ["s-1"]}}
+    )
+
+    assert [match["id"] for match in scoped["matches"]] == ["a", "b"]
+    assert scoped["matches"][0]["score"] == pytest.approx(1.0)
+    assert scoped["matches"][0]["metadata"]["text"] == "alpha"
+    assert [match["id"] for match in filtered["matches"]] == ["b", "c"]
+    assert store.query(vector=[]) == {}
+
+
+def test_store_persists_across_instances_and_checks_dimension(tmp_path) -> None:
+    store = LocalVectorStore(tmp_path, dimension=4)
+    store.upsert([_item("a", [0.0, 1.0]), _item("b", np.array([1.0, 0.0, 0.0, 0.0, 9.0], dtype=np.float32))])
+    store.update_metadata("a", {"source_slides": ["1", "4"]})
+    store.close()
+
+    reopened = LocalVectorStore(tmp_path)
+    response = reopened.query(vector=[0.0, 1.0, 0.0, 0.0], top_k=1, document_id="deck-1")
+
+    assert reopened.dimension == 4
+    assert response["matches"][0]["id"] == "a"
+    assert response["matches"][0]["metadata"]["source_slides"] == ["1", "4"]
+    reopened.close()
+    with pytest.raises(RuntimeError, match="holds 4-dimensional vectors"):
+        LocalVectorStore(tmp_path, dimension=8)
+
+
+def test_replace_delete_and_compaction(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(local_module, "_MIN_CAPACITY", 2)
+    store = LocalVectorStore(tmp_path, dimension=2)
+    store.upsert([_item(f"v{i}", [1.0, float(i)]) for i in range(6)])
+    store.upsert([_item("v0", [0.0, 1.0], text="replaced")])
+    store.delete_ids(["v1", "v2"])
+    store.delete_document("missing")
+    store.delete_ids(["v3", "v4"])
+
+    # Five tombstones against two live rows: the matrix is compacted to the live rows.
+    assert store._count == 2
+    response = store.query(vector=[0.0, 1.0], top_k=5, document_id="deck-1")
+    assert [match["id"] for match in response["matches"]] == ["v0", "v5"]
+    assert response["matches"][0]["metadata"]["text"] == "replaced"
+    store.close()
+
+    reopened = LocalVectorStore(tmp_path)
+    assert [match["id"] for match in reopened.query(vector=[0.0, 1.0], top_k=5)["matches"]] == ["v0", "v5"]
+    reopened.delete_document("deck-1")
+    assert reopened.query(vector=[0.0, 1.0], top_k=5)["matches"] == []
+
+
+def test_unscoped_queries_use_graph_index_beyond_exact_limit(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(local_module, "_GRAPH_SAVE_INTERVAL", 1)
+    vectors = np.random.default_rng(3).normal(size=(400, 16)).astype(np.float32)
+    store = LocalVectorStore(tmp_path, exact_search_limit=100)
+    for start in range(0, len(vectors), 50):
+        store.upsert([_item(f"v{i}", vectors[i]) for i in range(start, start + 50)])
+
+    assert store.wait_for_graph(timeout=30)
+    assert store._graph is not None and store._graph.size == 400
+    hits = sum(store.query(vector=vectors[i], top_k=1)["matches"][0]["id"] == f"v{i}" for i in range(0, 400, 4))
+    assert hits >= 95
+    store.close()
+
+    reopened = LocalVectorStore(tmp_path, exact_search_limit=100)
+    assert reopened.wait_for_graph(timeout=30)
+    assert reopened._graph is not None and reopened._graph.size == 400
+    assert reopened.query(vector=vectors[7], top_k=1)["matches"][0]["id"] == "v7"
+
+
+def test_graph_is_linked_off_the_write_path_and_unlinked_rows_are_searched_exactly(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import threading
+
+    release = threading.Event()
+    original_extend = local_module._NeighborGraph.extend
+
+    def gated_extend(self, *args, **kwargs):
+        release.wait(timeout=30)
+        return original_extend(self, *args, **kwargs)
+
+    monkeypatch.setattr(local_module._NeighborGraph, "extend", gated_extend)
+    vectors = np.random.default_rng(5).normal(size=(120, 8)).astype(np.float32)
+    store = LocalVectorStore(None, exact_search_limit=50)
+
+    # The upsert returns while the builder is parked on its first step.
+    store.upsert([_item(f"v{i}", vectors[i]) for i in range(len(vectors))])
+    assert not store.wait_for_graph(timeout=0.05)
+
+    release.set()
+    assert store.wait_for_graph(timeout=30)
+    assert store._graph is not None and store._graph.size == 120
+    store.upsert([_item("late", vectors[0] * -1.0)])
+    # Rows past the graph's size (whether or not the builder has reached them yet) are still found.
+    assert store.query(vector=vectors[0] * -1.0, top_k=1)["matches"][0]["id"] == "late"
+    assert store.wait_for_graph(timeout=30)
+    assert store._graph.size == 121
+    assert store.query(vector=vectors[42], top_k=1)["matches"][0]["id"] == "v42"
+
+
+def test_retriever_reads_from_shared_local_store(tmp_path) -> None:
+    class _Embedder:
+        def embed_query(self, text):
+            return [1.0, 0.0]
+
+    settings = SimpleNamespace(vector_store_backend="local", local_vector_store_path=str(tmp_path), pinecone_namespace="ns")
+    store = get_vector_store(settings)
+    assert get_vector_store(settings) is store
+    store.upsert([_item("a", [1.0, 0.1], text="Limits describe behaviour near a point", slide_id="s-1")])
+
+    retriever = SlideContextRetriever(settings, embedder=_Embedder(), chunk_store=None)
+    retriever._chunk_store_resolved = True
+    retriever._embedding_cache_resolved = True
+    contexts, _ = retriever.fetch(document_id="deck-1", topic="limits", difficulty="easy")
+
+    assert [context.text for context in contexts] == ["Limits describe behaviour near a point"]
+    close_vector_stores()
+    assert (tmp_path / "ns" / "vectors.f32").exists()
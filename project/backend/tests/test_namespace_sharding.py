@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+"""Covers per-document/course namespaces: routing, namespace drops on delete, and the migration utility."""
+
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+from clients.database import pinecone as pinecone_module
+from clients.database.manifest_repository import InMemoryManifestRepository
+from clients.database.pinecone import PineconeRepository
+from clients.database.vector_store import close_vector_stores, get_vector_store, namespace_for
+from clients.ingestion.namespace_migration import migrate_namespaces
+from clients.ingestion.pipeline import SlideChunk, SlideIngestionPipeline
+from clients.llm.settings import Settings
+from clients.rag.retriever import SlideContextRetriever
+
+
+class _Embedder:
+    async def embed(self, texts):
+        return [[1.0, float(index), 0.5] for index, _ in enumerate(texts)]
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.5]
+
+
+def _settings(tmp_path, strategy: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        vector_store_backend="local",
+        local_vector_store_path=str(tmp_path),
+        pinecone_namespace="slides",
+        pinecone_namespace_strategy=strategy,
+        ingest_batch_size=8,
+    )
+
+
+def _pipeline(settings: SimpleNamespace, manifests: InMemoryManifestRepository) -> SlideIngestionPipeline:
+    slides = [SlideChunk(slide_number=i, text=f"Limits lecture slide {i}", slide_title=None, chunk_index=0) for i in (1, 2)]
+    pipeline = SlideIngestionPipeline(
+        settings=settings,
+        embedding_service=_Embedder(),
+        manifest_repository=manifests,
+        chunk_store=None,
+    )
+    pipeline._pptx_extractor = SimpleNamespace(iter_slides=lambda source: iter(slides))
+    pipeline._chunker = SimpleNamespace(chunk=lambda batch: list(batch))
+    return pipeline
+
+
+@pytest.fixture(autouse=True)
+def _close_local_stores():
+    yield
+    close_vector_stores()
+
+
+def test_namespace_for_follows_strategy() -> None:
+    def settings(strategy: str) -> SimpleNamespace:
+        return SimpleNamespace(pinecone_namespace="slides", pinecone_namespace_strategy=strategy)
+
+    assert namespace_for(settings("shared"), "deck-1") is None
+    assert namespace_for(settings("document"), "deck-1", "calc") == "slides--doc-deck-1"
+    assert namespace_for(settings("course"), "deck-1", "calc") == "slides--course-calc"
+    assert namespace_for(settings("course"), "deck-1") == "slides--doc-deck-1"
+    escaped = namespace_for(settings("document"), "week 1/intro")
+    assert escaped.startswith("slides--doc-week-1-intro-") and "/" not in escaped
+
+
+@pytest.mark.asyncio
+async def test_document_namespace_is_queried_and_dropped(tmp_path) -> None:
+    settings = _settings(tmp_path, "document")
+    manifests = InMemoryManifestRepository()
+    pipeline = _pipeline(settings, manifests)
+
+    result = await pipeline.ingest(document_id="deck-1", file_bytes=b"x", filename="deck.pptx")
+
+    assert result.namespace == "slides--doc-deck-1"
+    assert pipeline.document_namespace("deck-1") == "slides--doc-deck-1"
+    assert get_vector_store(settings).query(vector=[1.0, 0.0, 0.5], top_k=5)["matches"] == []
+
+    retriever = SlideContextRetriever(settings, embedder=_Embedder(), chunk_store=None)
+    retriever._chunk_store_resolved = True
+    retriever._embedding_cache_resolved = True
+    matches = retriever._vector_matches("deck-1", "limits", "easy", 5, None)
+    assert {match["id"] for match in matches} == {"deck-1-s1-c0", "deck-1-s2-c0"}
+
+    pipeline.delete_document("deck-1")
+
+    assert not (tmp_path / "slides--doc-deck-1").exists()
+    assert manifests.load_manifest("deck-1") is None
+
+
+@pytest.mark.asyncio
+async def test_migration_moves_shared_vectors_into_course_namespaces(tmp_path) -> None:
+    settings = _settings(tmp_path, "shared")
+    manifests = InMemoryManifestRepository()
+    pipeline = _pipeline(settings, manifests)
+    await pipeline.ingest(document_id="deck-1", file_bytes=b"x", filename="deck.pptx", metadata={"course_id": "calc"})
+    await pipeline.ingest(document_id="deck-2", file_bytes=b"x", filename="deck.pptx")
+
+    settings.pinecone_namespace_strategy = "course"
+    preview = migrate_namespaces(pipeline, settings)
+    report = migrate_namespaces(pipeline, settings, dry_run=False)
+
+    assert preview.to_dict()["moves"] == {
+        "deck-1": {"from": "slides", "to": "slides--course-calc"},
+        "deck-2": {"from": "slides", "to": "slides--doc-deck-2"},
+    }
+    assert report.vectors_moved == 4 and report.failed == {}
+    shared = get_vector_store(settings)
+    assert shared.existing_ids(["deck-1-s1-c0", "deck-2-s1-c0"]) == set()
+    course = shared.with_namespace("slides--course-calc")
+    assert course.existing_ids(["deck-1-s1-c0", "deck-1-s2-c0"]) == {"deck-1-s1-c0", "deck-1-s2-c0"}
+    assert manifests.load_manifest("deck-2").namespace == "slides--doc-deck-2"
+    assert migrate_namespaces(pipeline, settings).moves == {}
+
+    # Documents in a shared course namespace are deleted by id, leaving the namespace in place.
+    pipeline.delete_document("deck-1")
+    assert course.existing_ids(["deck-1-s1-c0"]) == set()
+    assert (tmp_path / "slides--course-calc").exists()
+
+
+def test_pinecone_namespace_views_share_the_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[dict] = []
+
+    class _Index:
+        def delete(self, **kwargs: Any) -> None:
+            calls.append(kwargs)
+            if kwargs["namespace"] == "gone":
+                raise type("NotFoundException", (Exception,), {"status": 404})("namespace not found")
+
+    index = _Index()
+    client = SimpleNamespace(Index=lambda name: index, describe_index=lambda name: {"dimension": 3})
+    monkeypatch.setattr(pinecone_module, "Pinecone", lambda **kwargs: client)
+    repo = PineconeRepository(
+        Settings(openrouter_api_key="k", pinecone_api_key="pc", pinecone_index_name="idx", pinecone_index_dimension=3)
+    )
+
+    view = repo.with_namespace("slides--doc-deck")
+    view.delete_namespace()
+    repo.with_namespace("gone").delete_namespace()
+
+    assert repo.with_namespace(repo.namespace) is repo
+    assert view._index is repo._index and repo.namespace == "slides"
+    assert calls[0] == {"delete_all": True, "namespace": "slides--doc-deck"}
@@ -5,10 +5,12 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pytest
 
 from clients.database import pinecone as pinecone_module
 from clients.database.pinecone import PineconeRepository
+from clients.database.vectors import as_matrix
 from clients.llm.settings import Settings
 
 
@@ -99,6 +101,35 @@ def test_upsert_normalizes_vectors(monkeypatch: pytest.MonkeyPatch) -> None:
     assert vectors[0]["values"] == [1.0, 2.0, 0.0, 0.0]
 
 
+def test_upsert_fits_float32_batches_and_sends_lists(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _install_dummy_client(monkeypatch, dimension=3)
+    repo = PineconeRepository(_make_settings(pinecone_index_dimension=3))
+    batch = np.arange(10, dtype=np.float32).reshape(2, 5)
+
+    repo.upsert([
+        {"id": "wide-0", "values": batch[0]},
+        {"id": "exact", "values": np.array([7.0, 8.0, 9.0], dtype=np.float32)},
+        {"id": "wide-1", "values": batch[1]},
+        {"id": "short", "values": [1.0]},
+    ])
+
+    sent = {vector["id"]: vector["values"] for vector in index.upserts[0]["vectors"]}
+    assert [vector["id"] for vector in index.upserts[0]["vectors"]] == ["wide-0", "exact", "wide-1", "short"]
+    assert sent == {
+        "wide-0": [0.0, 1.0, 2.0],
+        "exact": [7.0, 8.0, 9.0],
+        "wide-1": [5.0, 6.0, 7.0],
+        "short": [1.0, 0.0, 0.0],
+    }
+    assert all(type(values) is list and type(values[0]) is float for values in sent.values())
+
+
+def test_as_matrix_rejects_ragged_batches() -> None:
+    assert as_matrix([[1, 2], [3, 4]]).dtype == np.float32
+    with pytest.raises(RuntimeError, match="different lengths"):
+        as_matrix([[1.0, 2.0], [3.0]])
+
+
 def test_delete_document_propagates_errors(monkeypatch: pytest.MonkeyPatch) -> None:
     index = _install_dummy_client(monkeypatch)
     index.delete_raises = ValueError("nope")
@@ -130,3 +161,77 @@ def test_query_returns_empty_for_missing_vector(monkeypatch: pytest.MonkeyPatch)
     _install_dummy_client(monkeypatch)
     repo = PineconeRepository(_make_settings())
     assert repo.query(vector=[]) == {}
+
+
+def test_upsert_splits_requests_by_count_and_bytes(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _install_dummy_client(monkeypatch, dimension=3)
+    repo = PineconeRepository(
+        _make_settings(pinecone_upsert_max_vectors=3, pinecone_upsert_max_bytes=400, pinecone_upsert_concurrency=2)
+    )
+    items = [
+        {"id": f"doc-{i}", "values": [0.1, 0.2, 0.3], "metadata": {"text": "x" * (200 if i == 4 else 10)}}
+        for i in range(7)
+    ]
+
+    report = repo.upsert(items)
+
+    sent = sorted((vector["id"] for call in index.upserts for vector in call["vectors"]), key=lambda v: int(v[4:]))
+    assert sent == [item["id"] for item in items]
+    assert all(len(call["vectors"]) <= 3 for call in index.upserts)
+    assert report.vectors == 7
+    assert report.requests == len(index.upserts) >= 3
+    assert report.bytes_sent > 0 and report.retries == 0
+
+
+def test_upsert_retries_transient_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _install_dummy_client(monkeypatch)
+    repo = PineconeRepository(_make_settings(pinecone_upsert_max_retries=2))
+    repo._base_backoff_seconds = 0.0
+    failures = [TimeoutError("read timed out"), type("ApiError", (Exception,), {"status": 503})("unavailable")]
+    original = index.upsert
+
+    def _flaky_upsert(**kwargs: Any) -> None:
+        if failures:
+            raise failures.pop(0)
+        original(**kwargs)
+
+    monkeypatch.setattr(index, "upsert", _flaky_upsert)
+
+    report = repo.upsert([{"id": "doc-1", "values": [1.0, 2.0, 3.0]}])
+
+    assert report.retries == 2
+    assert len(index.upserts) == 1
+
+
+def test_upsert_does_not_retry_client_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _install_dummy_client(monkeypatch)
+    repo = PineconeRepository(_make_settings())
+    calls: List[int] = []
+
+    def _bad_request(**_: Any) -> None:
+        calls.append(1)
+        raise type("ApiError", (Exception,), {"status": 400})("invalid vector")
+
+    monkeypatch.setattr(index, "upsert", _bad_request)
+
+    with pytest.raises(RuntimeError, match="Failed to upsert vectors"):
+        repo.upsert([{"id": "doc-1", "values": [1.0, 2.0, 3.0]}])
+    assert calls == [1]
+
+
+def test_upsert_splits_requests_rejected_as_too_large(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _install_dummy_client(monkeypatch)
+    repo = PineconeRepository(_make_settings())
+    original = index.upsert
+
+    def _size_limited(**kwargs: Any) -> None:
+        if len(kwargs["vectors"]) > 1:
+            raise type("ApiError", (Exception,), {"status": 400})("Request size 5MB exceeds the maximum supported size")
+        original(**kwargs)
+
+    monkeypatch.setattr(index, "upsert", _size_limited)
+
+    report = repo.upsert([{"id": f"doc-{i}", "values": [1.0, 2.0, 3.0]} for i in range(3)])
+
+    assert sorted(vector["id"] for call in index.upserts for vector in call["vectors"]) == ["doc-0", "doc-1", "doc-2"]
+    assert report.retries == 2
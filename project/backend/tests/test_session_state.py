@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+"""Covers the compact session-state objects and LRU cache used by LLMService."""
+
+from datetime import datetime, timezone
+
+from clients.database.chat_repository import ChatMessageRecord, ChatSessionRecord, InMemoryChatRepository
+from clients.llm.service import LLMService
+from clients.llm.session_state import SessionState, SessionStateCache, StoredMessage
+
+
+def _record(session_id: str) -> ChatSessionRecord:
+    created = datetime(2024, 9, 1, 12, 0, tzinfo=timezone.utc)
+    return ChatSessionRecord(
+        session_id=session_id,
+        messages=[
+            ChatMessageRecord(
+                role="human",
+                content="Question:\nWhy?",
+                display_content="Why?",
+                created_at=created,
+                turn_classification="good",
+                classification_source="model",
+            ),
+            ChatMessageRecord(role="ai", content="Because.", display_content="Because.", created_at=created),
+        ],
+        friction_progress=2,
+        session_mode="guidance",
+        last_prompt="guidance",
+        guidance_ready=True,
+    )
+
+
+def test_stored_message_uses_slots_and_dedupes_display_text() -> None:
+    message = StoredMessage(role="ai", content="same", created_at="2024-09-01T00:00:00+00:00", display_text="same")
+
+    assert not hasattr(message, "__dict__")
+    assert message.display_text is None
+    assert message.display == "same"
+
+
+def test_session_state_from_record_restores_classification() -> None:
+    state = SessionState.from_record(_record("s-1"))
+
+    assert state.mode == "guidance"
+    assert state.friction_progress == 2
+    assert state.guidance_ready is True
+    assert [message.display for message in state.messages] == ["Why?", "Because."]
+    assert state.last_classification is not None
+    assert state.last_classification.label == "good"
+    assert state.last_classification.used_model is True
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = SessionStateCache(max_entries=2)
+    cache.put(SessionState("a"))
+    cache.put(SessionState("b"))
+    cache.touch("a")
+    cache.put(SessionState("c"))
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert list(cache) == ["a", "c"]
+
+
+def test_cache_reads_do_not_create_entries() -> None:
+    cache = SessionStateCache()
+
+    assert cache.get("missing") is None
+    assert len(cache) == 0
+
+
+def test_service_round_trips_state_through_repository(test_settings) -> None:
+    repository = InMemoryChatRepository()
+    repository.save_session(_record("s-2"))
+    service = LLMService(test_settings, repository=repository)
+
+    history = service.get_chat_history("s-2")
+    state = service.get_session_state("s-2")
+    rebuilt = service._build_session_record(service._sessions.get("s-2"))
+
+    assert [item["content"] for item in history["messages"]] == ["Why?", "Because."]
+    assert state["classification_label"] == "good"
+    assert state["last_prompt"] == "guidance"
+    assert rebuilt.messages[0].content == "Question:\nWhy?"
+    assert rebuilt.messages[1].display_content == "Because."
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state_with_text(session_id: str, text: str) -> SessionState:
+    state = SessionState(session_id)
+    state.messages.append(StoredMessage(role="human", content=text, created_at="2024-09-01T00:00:00+00:00"))
+    return state
+
+
+def test_cache_tracks_bytes_and_evicts_over_memory_ceiling() -> None:
+    big = _state_with_text("big", "x" * 10_000)
+    small = _state_with_text("small", "y")
+    cache = SessionStateCache(max_bytes=big.estimated_bytes() + small.estimated_bytes() // 2)
+
+    cache.put(big)
+    cache.put(small)
+
+    stats = cache.stats()
+    assert "big" not in cache
+    assert "small" in cache
+    assert stats["bytes"] == small.estimated_bytes()
+    assert stats["evictions_by_reason"]["memory"] == 1
+
+
+def test_cache_remeasures_state_on_put() -> None:
+    cache = SessionStateCache()
+    state = _state_with_text("s", "short")
+    cache.put(state)
+    before = cache.stats()["bytes"]
+
+    state.messages.append(StoredMessage(role="ai", content="z" * 500, created_at="2024-09-01T00:00:00+00:00"))
+    cache.put(state)
+
+    assert cache.stats()["bytes"] == state.estimated_bytes() > before
+
+
+def test_cache_expires_idle_entries_and_reports_hit_ratio() -> None:
+    clock = _FakeClock()
+    cache = SessionStateCache(ttl_seconds=10, clock=clock)
+    cache.put(SessionState("old"))
+    clock.now = 5
+    cache.put(SessionState("fresh"))
+    clock.now = 8
+
+    assert cache.get("old") is not None
+    clock.now = 16
+    assert cache.sweep_expired() == 1
+    assert "old" in cache
+    assert "fresh" not in cache
+
+    clock.now = 40
+    assert cache.get("old") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["evictions_by_reason"]["ttl"] == 2
+
+
+def test_background_sweeper_evicts_idle_entries() -> None:
+    import time
+
+    cache = SessionStateCache(ttl_seconds=0.01)
+    cache.put(SessionState("idle"))
+    cache.start_sweeper(0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while "idle" in cache and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        cache.stop_sweeper()
+
+    assert "idle" not in cache
+
+
+async def test_session_cache_debug_endpoint(async_client, test_llm_service: LLMService) -> None:
+    test_llm_service.get_chat_history("unknown")
+
+    response = await async_client.get("/debug/session-cache")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["entries"] == 0
+    assert {"entries", "bytes", "hit_ratio", "evictions"} <= payload.keys()
+
+
+def test_every_turn_reloads_the_session_from_the_repository(test_llm_service: LLMService) -> None:
+    from datetime import datetime, timezone
+
+    from clients.database.chat_repository import ChatMessageRecord, ChatSessionRecord
+
+    def record(*texts: str) -> ChatSessionRecord:
+        messages = [
+            ChatMessageRecord(role="human", content=text, created_at=datetime.now(timezone.utc)) for text in texts
+        ]
+        return ChatSessionRecord(
+            session_id="shared", messages=messages, friction_progress=0, session_mode="friction", last_prompt="friction"
+        )
+
+    test_llm_service._repository.save_session(record("first"))
+    test_llm_service._ensure_session_loaded("shared")
+    # Another worker appends a turn; this worker must not keep serving its cached copy.
+    test_llm_service._repository.save_session(record("first", "from another device"))
+
+    state = test_llm_service._ensure_session_loaded("shared")
+
+    assert [message.content for message in state.messages] == ["first", "from another device"]
+
+
+class _CountingRepository(InMemoryChatRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.full_loads = 0
+
+    def load_session(self, session_id: str):
+        self.full_loads += 1
+        return super().load_session(session_id)
+
+
+def test_turns_are_served_from_cache_while_the_stored_revision_is_unchanged(test_settings) -> None:
+    repository = _CountingRepository()
+    service = LLMService(test_settings, repository=repository)
+    state = service._ensure_session_loaded("s-3")
+    state.messages.append(StoredMessage("human", "hello", "2024-09-01T12:00:00+00:00"))
+    service._persist_session(state)
+
+    first = service._ensure_session_loaded("s-3")
+    second = service._ensure_session_loaded("s-3")
+
+    assert first is state and second is state
+    assert repository.full_loads == 1
+    assert service.get_session_cache_stats()["hit_ratio"] > 0
+
+
+def test_cached_session_reloads_after_another_writer_saves(test_settings) -> None:
+    repository = _CountingRepository()
+    service = LLMService(test_settings, repository=repository)
+    other_worker = LLMService(test_settings, repository=repository)
+    service._persist_session(service._ensure_session_loaded("s-4"))
+
+    remote = other_worker._ensure_session_loaded("s-4")
+    remote.messages.append(StoredMessage("human", "elsewhere", "2024-09-01T12:00:00+00:00"))
+    other_worker._persist_session(remote)
+
+    state = service._ensure_session_loaded("s-4")
+
+    assert [message.content for message in state.messages] == ["elsewhere"]
+    assert state.revision == repository.load_revision("s-4")
+
+
+def test_failed_save_drops_the_cached_session(test_settings) -> None:
+    class _FailingRepository(InMemoryChatRepository):
+        def save_session(self, record: ChatSessionRecord) -> None:
+            raise RuntimeError("firestore unavailable")
+
+    service = LLMService(test_settings, repository=_FailingRepository())
+    state = SessionState("s-5")
+    service._sessions.put(state)
+
+    try:
+        service._persist_session(state)
+    except RuntimeError:
+        pass
+
+    assert "s-5" not in service._sessions
+
+
+async def test_shutdown_stops_the_session_sweeper(test_settings, monkeypatch) -> None:
+    from clients.llm import service as service_module
+
+    service = LLMService(test_settings, repository=InMemoryChatRepository())
+    service._sessions.start_sweeper(60)
+    sweeper = service._sessions._sweeper
+    monkeypatch.setattr(service_module, "_llm_service", service)
+
+    await service_module.shutdown_llm_service()
+    sweeper.join(timeout=2)
+
+    assert sweeper is not None and not sweeper.is_alive()
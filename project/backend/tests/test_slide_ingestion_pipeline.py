@@ -33,8 +33,8 @@ class _StubExtractor(SlideExtractor):
     def __init__(self, slides: list[SlideChunk]) -> None:
         self._slides = slides
 
-    def extract(self, file_bytes: bytes):  # pragma: no cover - trivial
-        return list(self._slides)
+    def iter_slides(self, file_bytes: bytes):  # pragma: no cover - trivial
+        return iter(self._slides)
 
 
 class _StubChunker:
@@ -79,7 +79,7 @@ async def test_ingest_indexes_chunks_and_validates_dimension():
     assert len(repo.items) == 1
     stored = repo.items[0]
     assert stored[0]["metadata"]["document_id"] == "deck-1"
-    assert stored[0]["values"] == vectors[0]
+    assert stored[0]["values"].tolist() == pytest.approx(vectors[0])
 
 
 @pytest.mark.asyncio
@@ -114,8 +114,289 @@ def test_select_extractor_prefers_pdf_extension():
     assert isinstance(pipeline._select_extractor("report.pdf"), PDFExtractor)
 
 
-def test_batched_respects_chunk_size():
-    slides = [SlideChunk(slide_number=1, text="a", slide_title=None, chunk_index=i) for i in range(5)]
-    batches = list(SlideIngestionPipeline._batched(slides, batch_size=2))
-    assert len(batches) == 3
-    assert sum(len(batch) for batch in batches) == 5
+class _PerSlideChunker:
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def chunk(self, slides):
+        self.calls.extend(slide.slide_number for slide in slides)
+        return [
+            SlideChunk(slide_number=slide.slide_number, text=slide.text, slide_title=None, chunk_index=0)
+            for slide in slides
+        ]
+
+
+@pytest.mark.asyncio
+async def test_ingest_streams_batches_and_overlaps_embed_with_upsert():
+    import threading
+
+    slides = [SlideChunk(slide_number=i, text=f"slide {i}", slide_title=None, chunk_index=0) for i in (1, 2, 3)]
+    second_embed_started = threading.Event()
+    overlapped: list[bool] = []
+
+    class _SignallingEmbedder:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def embed(self, texts):
+            self.calls += 1
+            if self.calls == 2:
+                second_embed_started.set()
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    class _BlockingRepository(_StubRepository):
+        def upsert(self, items):
+            if not self.items:
+                # The first upsert only finishes once the next batch is already being embedded.
+                overlapped.append(second_embed_started.wait(timeout=2))
+            super().upsert(items)
+
+    repo = _BlockingRepository(dimension=3)
+    chunker = _PerSlideChunker()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=1, ingest_queue_size=1),
+        repository=repo,
+        extractor=_StubExtractor(slides),
+        pdf_extractor=PDFExtractor(),
+        chunker=chunker,
+        embedding_service=_SignallingEmbedder(),
+    )
+
+    result = await pipeline.ingest(document_id="deck", file_bytes=b"bytes", filename="slides.pptx")
+
+    assert overlapped == [True]
+    assert chunker.calls == [1, 2, 3]
+    assert [batch[0]["metadata"]["slide_number"] for batch in repo.items] == [1, 2, 3]
+    assert result.slide_count == 3
+    assert result.chunk_count == 3
+    assert set(result.stage_seconds) == {"extract", "chunk", "embed", "upsert"}
+    assert result.elapsed_seconds >= result.stage_seconds["upsert"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_reports_empty_documents_without_upserting():
+    repo = _StubRepository(dimension=3)
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=4),
+        repository=repo,
+        extractor=_StubExtractor([]),
+        pdf_extractor=PDFExtractor(),
+        chunker=_PerSlideChunker(),
+        embedding_service=_StubEmbedder([]),
+    )
+
+    result = await pipeline.ingest(document_id="empty", file_bytes=b"bytes", filename="slides.pptx")
+
+    assert result.slide_count == 0
+    assert result.chunk_count == 0
+    assert repo.items == []
+
+
+@pytest.mark.asyncio
+async def test_reingest_only_embeds_changed_chunks_and_deletes_removed_ids():
+    from clients.database.manifest_repository import InMemoryManifestRepository
+
+    class _DiffRepository(_StubRepository):
+        def delete_ids(self, ids):
+            self.deleted.extend(ids)
+
+        def existing_ids(self, ids):
+            return set(ids) - set(self.deleted)
+
+    class _RecordingEmbedder:
+        def __init__(self) -> None:
+            self.texts: list[str] = []
+
+        async def embed(self, texts):
+            self.texts.extend(texts)
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    class _Extractor:
+        def __init__(self) -> None:
+            self.slides: list[SlideChunk] = []
+
+        def iter_slides(self, file_bytes):
+            return iter(self.slides)
+
+    def _slides(*texts: str) -> list[SlideChunk]:
+        return [
+            SlideChunk(slide_number=index, text=text, slide_title=None, chunk_index=0)
+            for index, text in enumerate(texts, start=1)
+        ]
+
+    repo = _DiffRepository(dimension=3)
+    embedder = _RecordingEmbedder()
+    extractor = _Extractor()
+    manifests = InMemoryManifestRepository()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=10),
+        repository=repo,
+        extractor=extractor,
+        pdf_extractor=PDFExtractor(),
+        chunker=_PerSlideChunker(),
+        embedding_service=embedder,
+        manifest_repository=manifests,
+    )
+
+    extractor.slides = _slides("intro", "limits", "derivatives")
+    first = await pipeline.ingest(document_id="deck", file_bytes=b"v1", filename="deck.pptx")
+    embedder.texts.clear()
+    extractor.slides = _slides("intro", "limits, revised")
+    second = await pipeline.ingest(document_id="deck", file_bytes=b"v2", filename="deck.pptx")
+
+    assert (first.added_count, first.unchanged_count, first.removed_count) == (3, 0, 0)
+    # The edited chunk gets a fresh id (its old vector could still be claimed by a later slide).
+    assert (second.added_count, second.unchanged_count, second.removed_count) == (1, 1, 2)
+    assert second.chunk_count == 2
+    assert embedder.texts == ["limits, revised"]
+    assert sorted(repo.deleted) == ["deck-s2-c0", "deck-s3-c0"]
+    revised_id = repo.items[-1][0]["id"]
+    assert revised_id.startswith("deck-h")
+    assert set(manifests.load_manifest("deck").chunk_hashes) == {"deck-s1-c0", revised_id}
+
+    # Metadata stored with the vectors is part of the hash, so a metadata change re-upserts.
+    repo.deleted.clear()
+    third = await pipeline.ingest(
+        document_id="deck", file_bytes=b"v2", filename="deck.pptx", metadata={"course": "calc"}
+    )
+    assert (third.added_count, third.unchanged_count, third.removed_count) == (2, 0, 2)
+    third_ids = set(manifests.load_manifest("deck").chunk_hashes)
+
+    repo.deleted.clear()
+    pipeline.delete_document("deck")
+    assert manifests.load_manifest("deck") is None
+    assert set(repo.deleted) == third_ids
+
+
+@pytest.mark.asyncio
+async def test_reingest_after_inserting_a_slide_only_moves_the_following_chunks():
+    from clients.database.manifest_repository import InMemoryManifestRepository
+
+    class _MovingRepository(_StubRepository):
+        def __init__(self) -> None:
+            super().__init__(dimension=3)
+            self.positions: dict[str, dict] = {}
+
+        def delete_ids(self, ids):
+            self.deleted.extend(ids)
+
+        def existing_ids(self, ids):
+            return set(ids) - set(self.deleted)
+
+        def update_metadata(self, vector_id, metadata):
+            self.positions[vector_id] = metadata
+
+    class _RecordingEmbedder:
+        def __init__(self) -> None:
+            self.texts: list[str] = []
+
+        async def embed(self, texts):
+            self.texts.extend(texts)
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    class _Extractor:
+        def __init__(self) -> None:
+            self.slides: list[SlideChunk] = []
+
+        def iter_slides(self, file_bytes):
+            return iter(self.slides)
+
+    def _slides(*texts: str) -> list[SlideChunk]:
+        return [
+            SlideChunk(slide_number=index, text=text, slide_title=None, chunk_index=0)
+            for index, text in enumerate(texts, start=1)
+        ]
+
+    repo = _MovingRepository()
+    embedder = _RecordingEmbedder()
+    extractor = _Extractor()
+    manifests = InMemoryManifestRepository()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=10),
+        repository=repo,
+        extractor=extractor,
+        pdf_extractor=PDFExtractor(),
+        chunker=_PerSlideChunker(),
+        embedding_service=embedder,
+        manifest_repository=manifests,
+    )
+
+    extractor.slides = _slides("intro", "limits", "derivatives")
+    await pipeline.ingest(document_id="deck", file_bytes=b"v1", filename="deck.pptx")
+    embedder.texts.clear()
+    extractor.slides = _slides("intro", "continuity", "limits", "derivatives")
+    second = await pipeline.ingest(document_id="deck", file_bytes=b"v2", filename="deck.pptx")
+
+    assert (second.added_count, second.unchanged_count, second.removed_count) == (1, 3, 0)
+    assert embedder.texts == ["continuity"]
+    assert repo.deleted == []
+    assert repo.items[-1][0]["id"].startswith("deck-h")
+    assert repo.positions == {
+        "deck-s2-c0": {"slide_number": 3, "chunk_index": 0},
+        "deck-s3-c0": {"slide_number": 4, "chunk_index": 0},
+    }
+    manifest = manifests.load_manifest("deck")
+    assert manifest.chunk_positions["deck-s3-c0"] == "4:0"
+
+    # Re-uploading the same deck again touches nothing.
+    repo.positions.clear()
+    third = await pipeline.ingest(document_id="deck", file_bytes=b"v2", filename="deck.pptx")
+    assert (third.added_count, third.unchanged_count, third.removed_count) == (0, 4, 0)
+    assert repo.positions == {}
+
+
+@pytest.mark.asyncio
+async def test_ingest_folds_duplicate_chunks_and_records_provenance():
+    recap = "Recap: the learning rate scales every gradient step taken during training."
+    slides = [
+        SlideChunk(slide_number=1, text=recap, slide_title="Recap", chunk_index=0),
+        SlideChunk(slide_number=2, text="Momentum smooths noisy gradient updates.", slide_title="Momentum", chunk_index=0),
+        SlideChunk(slide_number=3, text="Questions?", slide_title=None, chunk_index=0),
+        SlideChunk(slide_number=4, text=recap, slide_title="Recap", chunk_index=0),
+        SlideChunk(slide_number=5, text="  QUESTIONS? ", slide_title=None, chunk_index=0),
+    ]
+
+    class _PassThroughChunker:
+        def chunk(self, slides):
+            return [SlideChunk(s.slide_number, s.text, s.slide_title, 0) for s in slides]
+
+    class _CountingEmbedder:
+        def __init__(self) -> None:
+            self.texts: list[str] = []
+
+        async def embed(self, texts):
+            self.texts.extend(texts)
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+    class _ProvenanceRepository(_StubRepository):
+        def __init__(self) -> None:
+            super().__init__(dimension=3)
+            self.metadata_updates: dict[str, dict] = {}
+
+        def update_metadata(self, vector_id: str, metadata: dict) -> None:
+            self.metadata_updates[vector_id] = metadata
+
+    repo = _ProvenanceRepository()
+    embedder = _CountingEmbedder()
+    pipeline = SlideIngestionPipeline(
+        settings=SimpleNamespace(ingest_batch_size=1, ingest_queue_size=1),
+        repository=repo,
+        extractor=_StubExtractor(slides),
+        pdf_extractor=PDFExtractor(),
+        chunker=_PassThroughChunker(),
+        embedding_service=embedder,
+    )
+
+    result = await pipeline.ingest(document_id="deck-d", file_bytes=b"bytes", filename="slides.pptx")
+
+    assert result.embeddings_avoided == 2
+    assert result.chunk_count == 3
+    assert len(embedder.texts) == 3
+    # Provenance lands in the upsert payload, or is patched afterwards when the copy arrived later.
+    stored = {item["id"]: dict(item["metadata"]) for batch in repo.items for item in batch}
+    for vector_id, metadata in repo.metadata_updates.items():
+        stored[vector_id].update(metadata)
+    assert sorted(stored) == ["deck-d-s1-c0", "deck-d-s2-c0", "deck-d-s3-c0"]
+    assert stored["deck-d-s1-c0"]["source_slides"] == ["1", "4"]
+    assert stored["deck-d-s3-c0"]["source_slides"] == ["3", "5"]
+    assert "source_slides" not in stored["deck-d-s2-c0"]
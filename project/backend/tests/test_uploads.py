@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Covers disk spooling of uploads with a size cap."""
+
+import pytest
+
+from starlette.requests import ClientDisconnect, Request
+
+from app.uploads import (
+    InvalidUploadError,
+    SpooledStreamingResponse,
+    TooManyFilesError,
+    UploadTooLargeError,
+    spool_multipart,
+)
+
+
+_BOUNDARY = "deckboundary"
+
+
+def _multipart(*parts: tuple) -> bytes:
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{_BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + value + b"\r\n"
+    return body + f"--{_BOUNDARY}--\r\n".encode()
+
+
+class _StreamedRequest:
+    """Builds a Request whose body arrives in ``chunk_bytes`` pieces and counts how many were read."""
+
+    def __init__(self, body: bytes, *, chunk_bytes: int = 8, content_type: str | None = None) -> None:
+        self.chunks = [body[start : start + chunk_bytes] for start in range(0, len(body), chunk_bytes)]
+        self.received = 0
+        header = content_type or f"multipart/form-data; boundary={_BOUNDARY}"
+        scope = {"type": "http", "method": "POST", "headers": [(b"content-type", header.encode())]}
+        self.request = Request(scope, self._receive)
+
+    async def _receive(self) -> dict:
+        chunk = self.chunks[self.received]
+        self.received += 1
+        return {"type": "http.request", "body": chunk, "more_body": self.received < len(self.chunks)}
+
+
+async def test_spool_multipart_writes_files_straight_to_disk(tmp_path) -> None:
+    body = _multipart(("session_id", b"s-1", None), ("file", b"abcdefghij" * 5, "deck.pptx"))
+    streamed = _StreamedRequest(body)
+
+    form = await spool_multipart(streamed.request, max_bytes=100, directory=str(tmp_path))
+
+    assert form.fields == {"session_id": "s-1"}
+    [upload] = form.files_named("file")
+    assert upload.filename == "deck.pptx"
+    assert upload.path is not None and upload.path.suffix == ".pptx"
+    assert upload.path.read_bytes() == b"abcdefghij" * 5
+    assert list(tmp_path.iterdir()) == [upload.path]
+
+
+async def test_spool_multipart_enforces_cap_while_streaming_and_removes_partial_file(tmp_path) -> None:
+    body = _multipart(("session_id", b"s-1", None), ("file", b"x" * 400, "deck.pptx"))
+    streamed = _StreamedRequest(body)
+
+    with pytest.raises(UploadTooLargeError):
+        await spool_multipart(streamed.request, max_bytes=64, directory=str(tmp_path))
+
+    assert list(tmp_path.iterdir()) == []
+    # Reading stopped once the cap was passed rather than draining the whole body.
+    assert streamed.received < len(streamed.chunks)
+
+
+async def test_spool_multipart_can_skip_oversized_files_and_keep_the_rest(tmp_path) -> None:
+    body = _multipart(("files", b"x" * 100, "huge.pdf"), ("files", b"small", "week1.pdf"))
+
+    form = await spool_multipart(
+        _StreamedRequest(body).request, max_bytes=16, directory=str(tmp_path), max_files=5, skip_oversized=True
+    )
+
+    huge, small = form.files_named("files")
+    assert huge.path is None and huge.error is not None and "limit" in huge.error
+    assert small.path is not None and small.path.read_bytes() == b"small"
+    assert list(tmp_path.iterdir()) == [small.path]
+
+
+async def test_spool_multipart_rejects_extra_files_and_bad_bodies(tmp_path) -> None:
+    two_files = _multipart(("file", b"one", "a.pdf"), ("file", b"two", "b.pdf"))
+
+    with pytest.raises(TooManyFilesError):
+        await spool_multipart(_StreamedRequest(two_files).request, max_bytes=0, directory=str(tmp_path))
+    with pytest.raises(InvalidUploadError):
+        await spool_multipart(
+            _StreamedRequest(b"{}", content_type="application/json").request, max_bytes=0, directory=str(tmp_path)
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_spooled_streaming_response_cleans_up_when_the_client_leaves_before_the_body(tmp_path) -> None:
+    spooled = tmp_path / "deck.pptx"
+    spooled.write_bytes(b"deck")
+    started = []
+
+    async def body():
+        started.append(True)
+        yield "line\n"
+
+    async def receive():  # pragma: no cover - not awaited on ASGI 2.4
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    response = SpooledStreamingResponse(body(), spooled=[spooled], media_type="application/x-ndjson")
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+    with pytest.raises(ClientDisconnect):
+        await response(scope, receive, send)
+
+    assert not spooled.exists()
+    assert started == []
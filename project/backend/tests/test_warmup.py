@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+"""Covers background warm-up bookkeeping and the /ready endpoint."""
+
+import pytest
+
+from app import main
+from app.warmup import WarmupState, run_warmup
+
+
+def _boom() -> None:
+    raise RuntimeError("pinecone unavailable")
+
+
+async def test_run_warmup_records_each_component() -> None:
+    state = WarmupState()
+    calls = []
+
+    await run_warmup(
+        state,
+        {
+            "service": lambda: calls.append("service"),
+            "retriever": lambda: False,
+            "ingestion": _boom,
+        },
+    )
+
+    snapshot = state.snapshot()
+    components = snapshot["components"]
+    assert state.ready is True
+    assert calls == ["service"]
+    assert snapshot["status"] == "degraded"
+    assert components["service"]["status"] == "ok"
+    assert components["retriever"]["status"] == "skipped"
+    assert components["ingestion"]["status"] == "failed"
+    assert components["ingestion"]["error"] == "pinecone unavailable"
+    assert all(item["duration_ms"] is not None for item in components.values())
+
+
+async def test_ready_endpoint_reports_warming_then_ready(async_client, monkeypatch: pytest.MonkeyPatch) -> None:
+    state = WarmupState()
+    monkeypatch.setattr(main, "warmup_state", state)
+    state.begin({"service": None})
+
+    warming = await async_client.get("/ready")
+    await run_warmup(state, {"service": lambda: None})
+    ready = await async_client.get("/ready")
+
+    assert warming.status_code == 503
+    assert warming.json()["status"] == "warming"
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert ready.json()["components"]["service"]["status"] == "ok"
+
+
+async def test_ready_endpoint_reports_hybrid_retrieval_without_a_chunk_store(
+    async_client, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from types import SimpleNamespace
+
+    state = WarmupState()
+    state.mark_disabled()
+    monkeypatch.setattr(main, "warmup_state", state)
+    monkeypatch.setattr(
+        main, "get_settings", lambda: SimpleNamespace(retrieval_hybrid_enabled=True, chunk_store_path="")
+    )
+
+    response = await async_client.get("/ready")
+
+    assert response.json()["hybrid_retrieval"] == "no_chunk_store"
@@ -12,6 +12,9 @@ const poppins = Poppins({
 const API_BASE_URL = (process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000").replace(/\/$/, "");
 const INGEST_ENDPOINT = `${API_BASE_URL}/ingest/upload`;
 const DELETE_INGEST_ENDPOINT = `${API_BASE_URL}/ingest/document`;
+const INGEST_JOB_POLL_MS = 1500;
+// Give up polling after this long; large decks normally finish well within it.
+const INGEST_JOB_TIMEOUT_MS = 15 * 60 * 1000;
 
 const DRAFT_STORAGE_KEYS = [
   "quizConfigDraft",
@@ -51,6 +54,39 @@ const ensureSessionId = () => {
   return sessionId;
 };
 
+/**
+ * Polls a queued ingestion job until it finishes; resolves with the ingestion summary.
+ * Rejects if the job is unknown to the server (404) or still unfinished after INGEST_JOB_TIMEOUT_MS.
+ */
+const waitForIngestJob = async (statusUrl, onProgress) => {
+  const deadline = Date.now() + INGEST_JOB_TIMEOUT_MS;
+  for (;;) {
+    const response = await fetch(`${API_BASE_URL}${statusUrl}`);
+    if (response.status === 404) {
+      // Jobs are tracked per server; a restart or another instance answering loses the job.
+      throw new Error(
+        "The server no longer knows about this ingestion job. Check whether the document was ingested, or upload it again."
+      );
+    }
+    if (!response.ok) {
+      const payload = await response.json().catch(() => ({}));
+      throw new Error(payload.detail || "Unable to check ingestion status.");
+    }
+    const job = await response.json();
+    if (job.status === "succeeded") {
+      return job.result || {};
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "File ingestion failed.");
+    }
+    onProgress?.(job);
+    if (Date.now() + INGEST_JOB_POLL_MS > deadline) {
+      throw new Error("Ingestion is taking longer than expected. Check back later or upload the file again.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, INGEST_JOB_POLL_MS));
+  }
+};
+
 /**
  * Landing experience for instructors to pick quiz mode, upload content, and ingest slides.
  */
@@ -167,7 +203,16 @@ export default function QuizGeneratorPage() {
         throw new Error(payload.detail || "File ingestion failed.");
       }
 
-      const data = await ingestResponse.json();
+      // Uploads are queued by default (202 + job id); poll the job until the summary is ready.
+      const accepted = await ingestResponse.json();
+      const data =
+        ingestResponse.status === 202 && accepted.status_url
+          ? await waitForIngestJob(accepted.status_url, (job) =>
+              setIngestSuccessMessage(
+                `Ingesting… ${job.stage} (${job.chunks_upserted ?? 0} chunks indexed)`
+              )
+            )
+          : accepted;
       const slideLabel =
         typeof data.slide_count === "number" && data.slide_count > 0
           ? `${data.slide_count} slides`
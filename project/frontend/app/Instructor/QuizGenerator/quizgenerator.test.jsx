@@ -47,6 +47,91 @@ describe("QuizGeneratorPage", () => {
     expect(push).toHaveBeenCalledWith("/Instructor/Assessment");
   });
 
+  it("polls a queued ingestion job until it succeeds", async () => {
+    global.fetch
+      .mockResolvedValueOnce({
+        ok: true,
+        status: 202,
+        json: jest.fn().mockResolvedValue({
+          status: "queued",
+          job_id: "job-1",
+          document_id: "doc-456",
+          status_url: "/ingest/jobs/job-1",
+        }),
+      })
+      .mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: jest.fn().mockResolvedValue({
+          status: "succeeded",
+          result: { document_id: "doc-456", slide_count: 4, chunk_count: 9 },
+        }),
+      });
+
+    render(<QuizGeneratorPage />);
+
+    const fileInput = screen.getByLabelText(/Upload Slides\/Notes/i);
+    const file = new File(["dummy"], "deck.pptx");
+    fireEvent.change(fileInput, { target: { files: [file] } });
+    fireEvent.click(screen.getByRole("button", { name: "Ingest File" }));
+
+    await screen.findByText(/Ingested 4 slides \(9 chunks\)\./i);
+    expect(global.fetch).toHaveBeenLastCalledWith("http://localhost:8000/ingest/jobs/job-1");
+  });
+
+  const queuedJob = () => ({
+    ok: true,
+    status: 202,
+    json: jest.fn().mockResolvedValue({
+      status: "queued",
+      job_id: "job-1",
+      document_id: "doc-456",
+      status_url: "/ingest/jobs/job-1",
+    }),
+  });
+
+  const ingestDeck = () => {
+    render(<QuizGeneratorPage />);
+    const fileInput = screen.getByLabelText(/Upload Slides\/Notes/i);
+    fireEvent.change(fileInput, { target: { files: [new File(["dummy"], "deck.pptx")] } });
+    fireEvent.click(screen.getByRole("button", { name: "Ingest File" }));
+  };
+
+  it("stops polling with a clear error when the server no longer knows the job", async () => {
+    global.fetch.mockResolvedValueOnce(queuedJob()).mockResolvedValueOnce({
+      ok: false,
+      status: 404,
+      json: jest.fn().mockResolvedValue({ detail: "Ingestion job not found" }),
+    });
+
+    ingestDeck();
+
+    await screen.findByText(/no longer knows about this ingestion job/i);
+    expect(global.fetch).toHaveBeenCalledTimes(2);
+  });
+
+  it("gives up polling once the job outlasts the deadline", async () => {
+    let now = 0;
+    const clock = jest.spyOn(Date, "now").mockImplementation(() => now);
+    global.fetch.mockResolvedValueOnce(queuedJob()).mockImplementationOnce(async () => {
+      now = 60 * 60 * 1000;
+      return {
+        ok: true,
+        status: 200,
+        json: jest.fn().mockResolvedValue({ status: "running", stage: "embedding" }),
+      };
+    });
+
+    try {
+      ingestDeck();
+
+      await screen.findByText(/taking longer than expected/i);
+      expect(global.fetch).toHaveBeenCalledTimes(2);
+    } finally {
+      clock.mockRestore();
+    }
+  });
+
   it("ingests a file and navigates to practice after success", async () => {
     const push = jest.fn();
     useRouter.mockReturnValue({ push });